@@ -16,49 +16,86 @@
 
 # /// script
 # requires-python = ">=3.10"
-# dependencies = []
+# dependencies = [
+#   "numpy",
+# ]
 # ///
 
 import argparse
-import itertools
 import json
 import os
 
+import numpy as np
+
+WINDOW_SIZE = 20
+MERGE_FLANK = 30
+# Array sums add the same terms as the original per-pair loops but in a
+# different order, so a mean this close to a cutoff is recomputed with the
+# original summation order to keep every decision identical.
+_TIE_TOLERANCE = 1e-9
+
+
+def _as_pae_array(pae_matrix):
+  """Returns the PAE matrix as an array (int64 if all entries are ints)."""
+  pae = np.asarray(pae_matrix)
+  if pae.dtype.kind not in "iuf":
+    pae = pae.astype(np.float64)
+  return pae
+
+
+def _window_sums(pae):
+  """Band prefix sums of the symmetrized PAE just above the diagonal.
+
+  Row d (1 <= d <= WINDOW_SIZE) of the result holds, for each residue i,
+  sum over k = 1..d of (pae[i-k][i] + pae[i][i-k]); entries with i < d are
+  unused. Row 0 is zero.
+  """
+  n_res = len(pae)
+  sums = np.zeros((WINDOW_SIZE + 1, n_res), dtype=np.float64)
+  for d in range(1, min(WINDOW_SIZE, n_res - 1) + 1):
+    cols = np.arange(d, n_res)
+    sums[d, d:] = pae[cols - d, cols] + pae[cols, cols - d]
+  np.cumsum(sums, axis=0, out=sums)
+  return sums
+
 
 def find_sub_domains(pae_matrix, distance_cutoff=7.0, min_domain_size=40):
   """Identifies structurally independent sub-domains based on the PAE matrix."""
-  n_res = len(pae_matrix)
+  pae = _as_pae_array(pae_matrix)
+  n_res = len(pae)
+  window_sums = _window_sums(pae)
   domains = []
-  current_domain = []
-
-  for i in range(n_res):
-    if not current_domain:
-      current_domain.append(i)
-      continue
-
-    window_size = min(20, len(current_domain))
-    recent_res = current_domain[-window_size:]
+  domain_start = 0
+
+  for i in range(1, n_res):
+    # The current domain is always the contiguous run domain_start..i-1.
+    window_size = min(WINDOW_SIZE, i - domain_start)
+    avg_pae = window_sums[window_size, i] / (2.0 * window_size)
+    if abs(avg_pae - distance_cutoff) <= _TIE_TOLERANCE:
+      pae_sum = sum(
+          float(pae[r, i]) + float(pae[i, r]) for r in range(i - window_size, i)
+      )
+      avg_pae = pae_sum / (2.0 * window_size)
 
-    pae_sum = sum(pae_matrix[r][i] + pae_matrix[i][r] for r in recent_res)
-    avg_pae = pae_sum / (2.0 * window_size)
+    if not avg_pae < distance_cutoff:
+      if i - domain_start >= min_domain_size:
+        domains.append((domain_start, i - 1))
+      domain_start = i
 
-    if avg_pae < distance_cutoff:
-      current_domain.append(i)
-    else:
-      if len(current_domain) >= min_domain_size:
-        domains.append(current_domain)
-      current_domain = [i]
+  if n_res and n_res - domain_start >= min_domain_size:
+    domains.append((domain_start, n_res - 1))
 
-  if len(current_domain) >= min_domain_size:
-    domains.append(current_domain)
+  return [[start + 1, end + 1] for start, end in domains]
 
-  domain_boundaries = []
-  for comp in domains:
-    start = comp[0] + 1
-    end = comp[-1] + 1
-    domain_boundaries.append([start, end])
 
-  return domain_boundaries
+def _block_mean(pae, rows, cols):
+  """Mean of pae[r1][r2] + pae[r2][r1] over the block, as in the pair loop."""
+  block = pae[rows.start : rows.stop, cols.start : cols.stop]
+  mirror = pae[cols.start : cols.stop, rows.start : rows.stop]
+  n_pairs = 2 * block.size
+  if not n_pairs:
+    return None
+  return (float(block.sum()) + float(mirror.sum())) / n_pairs
 
 
 def merge_global_domains(boundaries, pae_matrix, merge_cutoff=15.0):
@@ -66,6 +103,7 @@ def merge_global_domains(boundaries, pae_matrix, merge_cutoff=15.0):
   if not boundaries:
     return []
 
+  pae = _as_pae_array(pae_matrix)
   if len(boundaries) == 1:
     merged = boundaries
   else:
@@ -75,17 +113,22 @@ def merge_global_domains(boundaries, pae_matrix, merge_cutoff=15.0):
       prev_end = merged[-1][1] - 1
       curr_start = boundaries[i][0] - 1
 
-      lookback = max(merged[-1][0] - 1, prev_end - 30)
-      lookfwd = min(boundaries[i][1] - 1, curr_start + 30)
-
-      pae_sum = 0
-      n_pairs = 0
-      for r1 in range(lookback, prev_end + 1):
-        for r2 in range(curr_start, lookfwd + 1):
-          pae_sum += pae_matrix[r1][r2] + pae_matrix[r2][r1]
-          n_pairs += 2
-
-      if n_pairs > 0 and (pae_sum / n_pairs) < merge_cutoff:
+      lookback = max(merged[-1][0] - 1, prev_end - MERGE_FLANK)
+      lookfwd = min(boundaries[i][1] - 1, curr_start + MERGE_FLANK)
+
+      rows = range(lookback, prev_end + 1)
+      cols = range(curr_start, lookfwd + 1)
+      mean_pae = _block_mean(pae, rows, cols)
+      if mean_pae is not None and abs(mean_pae - merge_cutoff) <= (
+          _TIE_TOLERANCE
+      ):
+        pae_sum = 0
+        for r1 in rows:
+          for r2 in cols:
+            pae_sum += float(pae[r1, r2]) + float(pae[r2, r1])
+        mean_pae = pae_sum / (2 * len(rows) * len(cols))
+
+      if mean_pae is not None and mean_pae < merge_cutoff:
         merged[-1][1] = boundaries[i][1]
       else:
         merged.append(boundaries[i])
@@ -95,6 +138,76 @@ def merge_global_domains(boundaries, pae_matrix, merge_cutoff=15.0):
   return filtered_merged
 
 
+def load_pae(pae_file):
+  """Loads the PAE matrix from an AFDB PAE JSON file as an array.
+
+  Returns:
+    The matrix, or None (after printing why) if the file has no PAE matrix.
+
+  Raises:
+    IOError, json.JSONDecodeError: If the file cannot be read or parsed.
+  """
+  with open(pae_file, "r") as f:
+    data = json.load(f)[0]
+
+  if "predicted_aligned_error" in data:
+    return _as_pae_array(data.pop("predicted_aligned_error"))
+  if "distance" in data:
+    return _as_pae_array(data.pop("distance"))
+  print(
+      "     [!] Could not locate PAE matrix in JSON keys:"
+      f" {list(data.keys())}"
+  )
+  return None
+
+
+def summarize_pae(pae):
+  """Computes PAE statistics, global domains and a conclusion (no output).
+
+  Args:
+    pae: Non-empty PAE matrix (nested lists or array).
+
+  Returns:
+    Dict with matrix_shape, mean_pae, max_pae, min_pae, confident_pairs_pct
+    (unrounded), domains as [start, end] pairs, and conclusion.
+  """
+  pae = _as_pae_array(pae)
+  mean_pae = float(pae.sum(dtype=np.float64)) / pae.size
+  # .item() keeps ints as ints, so the JSON summary is unchanged.
+  max_pae = pae.max().item()
+  min_pae = pae.min().item()
+  confident_pairs = int(np.count_nonzero(pae < 5.0)) / pae.size * 100
+
+  sub_domains = find_sub_domains(pae, distance_cutoff=7.0, min_domain_size=40)
+  global_domains = merge_global_domains(sub_domains, pae, merge_cutoff=15.0)
+
+  if len(global_domains) == 1:
+    conclusion = (
+        "The protein consists of a single well-folded, rigid composite"
+        " domain."
+    )
+  elif len(global_domains) > 1:
+    conclusion = (
+        f"The protein has {len(global_domains)} independently positioned"
+        " global domains separated by truly flexible joints."
+    )
+  else:
+    conclusion = (
+        "The protein is likely entirely disordered or lacks rigid"
+        " tertiary structure."
+    )
+
+  return {
+      "matrix_shape": f"{pae.shape[0]}x{pae.shape[1]}",
+      "mean_pae": mean_pae,
+      "max_pae": max_pae,
+      "min_pae": min_pae,
+      "confident_pairs_pct": confident_pairs,
+      "domains": global_domains,
+      "conclusion": conclusion,
+  }
+
+
 def analyze_pae(pae_file):
   """Parses a PAE JSON file and calculates structural domain metrics."""
   print(
@@ -102,45 +215,29 @@ def analyze_pae(pae_file):
       f" {os.path.basename(pae_file)}..."
   )
   try:
-    with open(pae_file, "r") as f:
-      data = json.load(f)[0]
-
-    if "predicted_aligned_error" in data:
-      pae = data["predicted_aligned_error"]
-    elif "distance" in data:
-      pae = data["distance"]
-    else:
-      print(
-          "     [!] Could not locate PAE matrix in JSON keys:"
-          f" {list(data.keys())}"
-      )
+    pae = load_pae(pae_file)
+    if pae is None:
       return
 
-    flat_pae = list(itertools.chain.from_iterable(pae))
-    if not flat_pae:
+    if not pae.size:
       print("     [!] PAE matrix is empty.")
       return
 
-    mean_pae = sum(flat_pae) / len(flat_pae)
-    max_pae = max(flat_pae)
-    min_pae = min(flat_pae)
-    confident_pairs = sum(1 for p in flat_pae if p < 5.0) / len(flat_pae) * 100
+    summary = summarize_pae(pae)
+    global_domains = summary["domains"]
 
-    print(f"  -> PAE Matrix Shape: {len(pae)}x{len(pae[0])}")
-    print(f"  -> Mean Error: {mean_pae:.2f} Å")
+    print(f"  -> PAE Matrix Shape: {summary['matrix_shape']}")
+    print(f"  -> Mean Error: {summary['mean_pae']:.2f} Å")
     print(
-        f"  -> Max Error: {max_pae:.2f} Å (suggests max possible distance"
-        " between domains)"
+        f"  -> Max Error: {summary['max_pae']:.2f} Å (suggests max possible"
+        " distance between domains)"
     )
-    print(f"  -> Min Error: {min_pae:.2f} Å")
+    print(f"  -> Min Error: {summary['min_pae']:.2f} Å")
     print(
         "  -> Fraction of confident residue pairs (<5Å PAE):"
-        f" {confident_pairs:.1f}%"
+        f" {summary['confident_pairs_pct']:.1f}%"
     )
 
-    sub_domains = find_sub_domains(pae, distance_cutoff=7.0, min_domain_size=40)
-    global_domains = merge_global_domains(sub_domains, pae, merge_cutoff=15.0)
-
     print("\n[*] Domain Boundary Analysis:")
     if not global_domains:
       print("  -> No distinct rigidly-folded domains detected (>50 AAs).")
@@ -156,35 +253,20 @@ def analyze_pae(pae_file):
         )
 
     print("\n[*] PAE Structural Conclusion:")
-    if len(global_domains) == 1:
-      conclusion = (
-          "The protein consists of a single well-folded, rigid composite"
-          " domain."
-      )
-    elif len(global_domains) > 1:
-      conclusion = (
-          f"The protein has {len(global_domains)} independently positioned"
-          " global domains separated by truly flexible joints."
-      )
-    else:
-      conclusion = (
-          "The protein is likely entirely disordered or lacks rigid"
-          " tertiary structure."
-      )
-    print(f"  -> {conclusion}")
+    print(f"  -> {summary['conclusion']}")
 
     return {
         "pae_file": os.path.basename(pae_file),
-        "matrix_shape": f"{len(pae)}x{len(pae[0])}",
-        "mean_pae": round(mean_pae, 2),
-        "max_pae": round(max_pae, 2),
-        "min_pae": round(min_pae, 2),
-        "confident_pairs_pct": round(confident_pairs, 1),
+        "matrix_shape": summary["matrix_shape"],
+        "mean_pae": round(summary["mean_pae"], 2),
+        "max_pae": round(summary["max_pae"], 2),
+        "min_pae": round(summary["min_pae"], 2),
+        "confident_pairs_pct": round(summary["confident_pairs_pct"], 1),
         "domains": [
             {"start": s, "end": e, "length": e - s + 1}
             for s, e in global_domains
         ],
-        "conclusion": conclusion,
+        "conclusion": summary["conclusion"],
     }
 
   except (IOError, json.JSONDecodeError) as e:
@@ -42,75 +42,84 @@ def analyze_plddt(metadata_file):
   return _analyze_entry(entry)
 
 
-def _analyze_entry(entry):
-  """Parses and analyzes pLDDT confidence metrics from the API payload."""
-  accession = entry.get("uniprotAccession", "Unknown")
-  print(f"\n[*] AlphaFold pLDDT Metrics for Accession: {accession}")
-  global_plddt = entry.get("globalMetricValue", 0.0)
-  frac_vlow = entry.get("fractionPlddtVeryLow", 0.0)
-  frac_low = entry.get("fractionPlddtLow", 0.0)
-  frac_conf = entry.get("fractionPlddtConfident", 0.0)
-  frac_vhigh = entry.get("fractionPlddtVeryHigh", 0.0)
-
-  print("-" * 65)
-  print(f"  -> Overall Global pLDDT   : {global_plddt:.2f}")
-  print(f"  -> Fraction Very Low (<50): {frac_vlow:.3f} ({frac_vlow*100:.1f}%)")
-  print(f"  -> Fraction Low (50-70)   : {frac_low:.3f} ({frac_low*100:.1f}%)")
-  print(f"  -> Fraction Confident     : {frac_conf:.3f} ({frac_conf*100:.1f}%)")
-  print(
-      f"  -> Fraction Very High     : {frac_vhigh:.3f} ({frac_vhigh*100:.1f}%)"
-  )
-  print("-" * 65)
-
+def plddt_conclusion(frac_vlow, frac_conf, frac_vhigh):
+  """Returns the heuristic confidence assessment for pLDDT fractions."""
   conf_total = frac_conf + frac_vhigh
 
-  print("[*] pLDDT Conclusion:")
   if conf_total >= CONFIDENT_THRESHOLD:
     if frac_vlow > NOTABLE_DISORDER_THRESHOLD:
-      conclusion = (
+      return (
           "Protein is mostly confidently predicted, but contains notable"
           " disordered regions."
       )
-    else:
-      conclusion = (
-          "Protein is confidently predicted and likely fully"
-          " ordered/structured."
-      )
-  elif conf_total >= MODERATE_THRESHOLD:
+    return (
+        "Protein is confidently predicted and likely fully"
+        " ordered/structured."
+    )
+  if conf_total >= MODERATE_THRESHOLD:
     if frac_vlow >= MIXED_DISORDER_THRESHOLD:
-      conclusion = (
+      return (
           "Protein has a mixture of confidently predicted structured"
           " domains and significant intrinsically disordered regions."
       )
-    else:
-      conclusion = (
-          "Protein has moderate prediction confidence. Certain regions"
-          " might be flexible or poorly predicted."
-      )
-  else:
-    if frac_vlow >= MOSTLY_DISORDERED_THRESHOLD:
-      conclusion = (
-          "Protein is mostly poorly predicted, likely being highly"
-          " intrinsically disordered."
-      )
-    else:
-      conclusion = "Protein prediction is of low confidence overall."
-  print(f"  -> {conclusion}")
-  print()
-
+    return (
+        "Protein has moderate prediction confidence. Certain regions"
+        " might be flexible or poorly predicted."
+    )
+  if frac_vlow >= MOSTLY_DISORDERED_THRESHOLD:
+    return (
+        "Protein is mostly poorly predicted, likely being highly"
+        " intrinsically disordered."
+    )
+  return "Protein prediction is of low confidence overall."
+
+
+def summarize_entry(entry):
+  """Extracts pLDDT metrics and the conclusion from the API payload."""
+  frac_vlow = entry.get("fractionPlddtVeryLow", 0.0)
+  frac_low = entry.get("fractionPlddtLow", 0.0)
+  frac_conf = entry.get("fractionPlddtConfident", 0.0)
+  frac_vhigh = entry.get("fractionPlddtVeryHigh", 0.0)
   return {
-      "uniprot_id": accession,
-      "global_plddt": global_plddt,
+      "uniprot_id": entry.get("uniprotAccession", "Unknown"),
+      "global_plddt": entry.get("globalMetricValue", 0.0),
       "fractions": {
           "very_low": frac_vlow,
           "low": frac_low,
           "confident": frac_conf,
           "very_high": frac_vhigh,
       },
-      "conclusion": conclusion,
+      "conclusion": plddt_conclusion(frac_vlow, frac_conf, frac_vhigh),
   }
 
 
+def _analyze_entry(entry):
+  """Parses and analyzes pLDDT confidence metrics from the API payload."""
+  summary = summarize_entry(entry)
+  fractions = summary["fractions"]
+  frac_vlow = fractions["very_low"]
+  frac_low = fractions["low"]
+  frac_conf = fractions["confident"]
+  frac_vhigh = fractions["very_high"]
+
+  print(f"\n[*] AlphaFold pLDDT Metrics for Accession: {summary['uniprot_id']}")
+  print("-" * 65)
+  print(f"  -> Overall Global pLDDT   : {summary['global_plddt']:.2f}")
+  print(f"  -> Fraction Very Low (<50): {frac_vlow:.3f} ({frac_vlow*100:.1f}%)")
+  print(f"  -> Fraction Low (50-70)   : {frac_low:.3f} ({frac_low*100:.1f}%)")
+  print(f"  -> Fraction Confident     : {frac_conf:.3f} ({frac_conf*100:.1f}%)")
+  print(
+      f"  -> Fraction Very High     : {frac_vhigh:.3f} ({frac_vhigh*100:.1f}%)"
+  )
+  print("-" * 65)
+
+  print("[*] pLDDT Conclusion:")
+  print(f"  -> {summary['conclusion']}")
+  print()
+
+  return summary
+
+
 if __name__ == "__main__":
   parser = argparse.ArgumentParser(
       description="Analyze pLDDT confidence metrics from an AFDB metadata file"
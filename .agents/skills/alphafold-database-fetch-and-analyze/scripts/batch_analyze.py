@@ -0,0 +1,404 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batch pLDDT and PAE analysis for many AlphaFold DB entries.
+
+Takes UniProt accessions (arguments or a file) and/or a directory of files
+saved by fetch_structure.py. Missing metadata and PAE files are fetched
+concurrently under the shared AFDB rate limit, every entry is analyzed in a
+process pool, and one summary table (CSV, or Parquet with pyarrow) is written
+with one row per protein.
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#   "numpy",
+#   "polite-http",
+# ]
+# ///
+
+import argparse
+from concurrent import futures
+import contextlib
+import csv
+import glob
+import io
+import json
+import os
+import sys
+
+import analyze_pae
+import analyze_plddt
+import fetch_structure
+from polite_http import http_client
+
+SUMMARY_COLUMNS = [
+    "accession",
+    "entry_accession",
+    "is_canonical",
+    "is_fragment",
+    "global_plddt",
+    "fraction_very_low",
+    "fraction_low",
+    "fraction_confident",
+    "fraction_very_high",
+    "plddt_conclusion",
+    "pae_matrix_shape",
+    "mean_pae",
+    "max_pae",
+    "min_pae",
+    "confident_pairs_pct",
+    "n_domains",
+    "domains",
+    "pae_conclusion",
+    "metadata_file",
+    "pae_file",
+    "error",
+]
+_FLOAT_COLUMNS = (
+    "global_plddt",
+    "fraction_very_low",
+    "fraction_low",
+    "fraction_confident",
+    "fraction_very_high",
+    "mean_pae",
+    "max_pae",
+    "min_pae",
+    "confident_pairs_pct",
+)
+
+
+def read_accessions(accessions, accessions_file):
+  """Merges accessions from arguments and a file ('-' for stdin)."""
+  collected = list(accessions or [])
+  if accessions_file:
+    handle = sys.stdin if accessions_file == "-" else open(accessions_file)
+    with handle:
+      for line in handle:
+        line = line.split("#", 1)[0].replace(",", " ")
+        collected.extend(line.split())
+  return list(dict.fromkeys(a.strip().upper() for a in collected if a.strip()))
+
+
+def _is_fragment(entry):
+  """True if the full protein is longer than AFDB's single-entry limit."""
+  length = len(entry.get("uniprotSequence") or "") or entry.get(
+      "sequenceEnd", 0
+  )
+  return length > fetch_structure.FRAGMENT_LENGTH
+
+
+def _pae_path(entry, data_dir):
+  """Returns the local PAE path for an entry (may not exist yet)."""
+  pae_url = entry.get("paeDocUrl")
+  if pae_url:
+    return os.path.join(data_dir, pae_url.split("/")[-1])
+  acc = entry.get("uniprotAccession", "")
+  matches = sorted(
+      glob.glob(
+          os.path.join(data_dir, f"AF-{acc}-F1-predicted_aligned_error_v*.json")
+      )
+  )
+  return matches[-1] if matches else None
+
+
+def _download(url, path):
+  data = fetch_structure.CLIENT.fetch_bytes(url)
+  tmp_path = f"{path}.tmp{os.getpid()}"
+  with open(tmp_path, "wb") as f:
+    f.write(data)
+  os.replace(tmp_path, path)
+
+
+def _job_for_entry(accession, entry, metadata_file, data_dir, is_canonical):
+  return {
+      "accession": accession,
+      "entry_accession": entry.get("uniprotAccession", accession),
+      "is_canonical": is_canonical,
+      "is_fragment": _is_fragment(entry),
+      "metadata_file": metadata_file,
+      "pae_file": _pae_path(entry, data_dir),
+  }
+
+
+def fetch_accession(accession, data_dir, with_cif=False):
+  """Ensures metadata and PAE files for an accession exist locally.
+
+  Files already on disk are reused without any request. Otherwise the entry
+  is chosen as in fetch_structure.py and missing files are downloaded.
+
+  Returns:
+    A job dict for analyze_job; on failure it carries an 'error' key.
+  """
+  metadata_file = fetch_structure.metadata_path_for(accession, data_dir)
+  if os.path.exists(metadata_file):
+    try:
+      with open(metadata_file) as f:
+        entry = json.load(f)
+    except (OSError, ValueError):
+      pass  # Unreadable; fetched again below.
+    else:
+      job = _job_for_entry(accession, entry, metadata_file, data_dir, True)
+      if job["pae_file"] and os.path.exists(job["pae_file"]) and not with_cif:
+        return job
+
+  try:
+    data = fetch_structure.CLIENT.fetch_json(
+        f"https://alphafold.ebi.ac.uk/api/prediction/{accession}"
+    )
+  except http_client.HttpError as e:
+    reason = "not in AFDB" if e.status_code == 404 else f"HTTP error: {e}"
+    return {"accession": accession, "error": reason}
+  except OSError as e:
+    return {"accession": accession, "error": f"request failed: {e}"}
+  if not data:
+    return {"accession": accession, "error": "no AFDB entries"}
+
+  entry, is_canonical = fetch_structure.select_entry(data, accession)
+  metadata_file = fetch_structure.metadata_path_for(
+      entry.get("uniprotAccession", accession), data_dir
+  )
+  try:
+    with open(metadata_file, "w") as f:
+      json.dump(entry, f, indent=2)
+  except OSError as e:
+    return {"accession": accession, "error": f"metadata write failed: {e}"}
+  job = _job_for_entry(accession, entry, metadata_file, data_dir, is_canonical)
+  job["is_fragment"] = job["is_fragment"] or (
+      max((e.get("sequenceEnd", 0) for e in data), default=0)
+      > fetch_structure.FRAGMENT_LENGTH
+  )
+
+  urls = [entry.get("paeDocUrl")]
+  if with_cif:
+    urls.append(entry.get("cifUrl"))
+  for url in filter(None, urls):
+    path = os.path.join(data_dir, url.split("/")[-1])
+    if os.path.exists(path):
+      continue
+    try:
+      _download(url, path)
+    except (http_client.HttpError, OSError) as e:
+      job["error"] = f"download failed for {os.path.basename(path)}: {e}"
+  return job
+
+
+def find_local_jobs(directory):
+  """Builds jobs for every metadata file saved in a directory."""
+  jobs = []
+  for metadata_file in sorted(
+      glob.glob(os.path.join(directory, "AF-*-F1-metadata.json"))
+  ):
+    accession = os.path.basename(metadata_file).split("-")[1]
+    try:
+      with open(metadata_file) as f:
+        entry = json.load(f)
+    except (OSError, ValueError) as e:
+      jobs.append({
+          "accession": accession,
+          "error": f"metadata parse failed: {e}",
+      })
+      continue
+    accession = entry.get("uniprotAccession") or accession
+    jobs.append(
+        _job_for_entry(accession, entry, metadata_file, directory, True)
+    )
+  return jobs
+
+
+def analyze_job(job):
+  """Analyzes one entry (in a worker process) and returns its summary row."""
+  row = dict.fromkeys(SUMMARY_COLUMNS)
+  row.update({k: v for k, v in job.items() if k in row})
+  errors = [job["error"]] if job.get("error") else []
+
+  if job.get("metadata_file"):
+    try:
+      with open(job["metadata_file"]) as f:
+        plddt = analyze_plddt.summarize_entry(json.load(f))
+    except (OSError, ValueError) as e:
+      errors.append(f"metadata parse failed: {e}")
+    else:
+      fractions = plddt["fractions"]
+      row.update({
+          "global_plddt": plddt["global_plddt"],
+          "fraction_very_low": fractions["very_low"],
+          "fraction_low": fractions["low"],
+          "fraction_confident": fractions["confident"],
+          "fraction_very_high": fractions["very_high"],
+          "plddt_conclusion": plddt["conclusion"],
+      })
+
+  pae_file = job.get("pae_file")
+  if pae_file and os.path.exists(pae_file):
+    try:
+      with contextlib.redirect_stdout(io.StringIO()):
+        pae = analyze_pae.load_pae(pae_file)
+      if pae is None or not pae.size:
+        errors.append("no PAE matrix")
+      else:
+        summary = analyze_pae.summarize_pae(pae)
+        row.update({
+            "pae_matrix_shape": summary["matrix_shape"],
+            "mean_pae": round(summary["mean_pae"], 2),
+            "max_pae": round(summary["max_pae"], 2),
+            "min_pae": round(summary["min_pae"], 2),
+            "confident_pairs_pct": round(summary["confident_pairs_pct"], 1),
+            "n_domains": len(summary["domains"]),
+            "domains": ";".join(f"{s}-{e}" for s, e in summary["domains"]),
+            "pae_conclusion": summary["conclusion"],
+        })
+    except (
+        OSError,
+        ValueError,
+        LookupError,
+        TypeError,
+        AttributeError,
+    ) as e:
+      # Malformed payloads (empty list, missing key, ragged matrix) too.
+      errors.append(f"PAE parse failed: {e!r}")
+  elif job.get("metadata_file"):
+    errors.append("PAE file missing")
+
+  row["error"] = "; ".join(errors) or None
+  return row
+
+
+def _import_pyarrow():
+  try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+  except ImportError:
+    sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+  return pa, pq
+
+
+def write_summary(rows, path):
+  """Writes rows as Parquet (.parquet, needs pyarrow) or CSV/TSV."""
+  os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+  if path.endswith(".parquet"):
+    pa, pq = _import_pyarrow()
+    # Explicit types: max/min PAE are ints for some AFDB versions.
+    types = {
+        "is_canonical": pa.bool_(),
+        "is_fragment": pa.bool_(),
+        "n_domains": pa.int32(),
+    }
+    for name in _FLOAT_COLUMNS:
+      types[name] = pa.float64()
+    schema = pa.schema(
+        [(name, types.get(name, pa.string())) for name in SUMMARY_COLUMNS]
+    )
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), path)
+    return
+  delimiter = "\t" if path.endswith(".tsv") else ","
+  with open(path, "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS, delimiter=delimiter)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description=(
+          "Fetch (if needed) and analyze pLDDT and PAE for many AlphaFold DB"
+          " entries, writing one summary table"
+      )
+  )
+  parser.add_argument("accessions", nargs="*", help="UniProt accessions")
+  parser.add_argument(
+      "--accessions-file",
+      help='File of UniProt accessions, one per line ("-" for stdin)',
+  )
+  parser.add_argument(
+      "--input-dir",
+      help="Directory of files saved by fetch_structure.py to analyze",
+  )
+  parser.add_argument(
+      "-o",
+      "--output-dir",
+      help=(
+          "Directory for downloaded files (default: --input-dir); files"
+          " already there are not fetched again"
+      ),
+  )
+  parser.add_argument(
+      "--summary",
+      required=True,
+      help="Summary table path (.csv, .tsv or .parquet)",
+  )
+  parser.add_argument(
+      "--concurrency",
+      type=int,
+      default=4,
+      help="Concurrent downloads (all share the AFDB rate limit)",
+  )
+  parser.add_argument(
+      "--workers",
+      type=int,
+      default=None,
+      help="Analysis processes (default: CPU count)",
+  )
+  parser.add_argument(
+      "--with-cif",
+      action="store_true",
+      help="Also download mmCIF structure files",
+  )
+  args = parser.parse_args()
+
+  accessions = read_accessions(args.accessions, args.accessions_file)
+  data_dir = args.output_dir or args.input_dir
+  if accessions and not data_dir:
+    parser.error("--output-dir is required when fetching accessions")
+  if not accessions and not args.input_dir:
+    parser.error("give accessions, --accessions-file or --input-dir")
+  if args.summary.endswith(".parquet"):
+    _import_pyarrow()  # Fail before any downloads.
+
+  jobs = find_local_jobs(args.input_dir) if args.input_dir else []
+  seen = {job["accession"] for job in jobs}
+  accessions = [a for a in accessions if a not in seen]
+  if accessions:
+    os.makedirs(data_dir, exist_ok=True)
+    print(
+        f"[*] Resolving {len(accessions)} accession(s) in {data_dir}...",
+        file=sys.stderr,
+    )
+    with futures.ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+      for i, job in enumerate(
+          pool.map(
+              lambda acc: fetch_accession(acc, data_dir, args.with_cif),
+              accessions,
+          ),
+          1,
+      ):
+        jobs.append(job)
+        if i % 100 == 0:
+          print(f"    {i}/{len(accessions)} resolved", file=sys.stderr)
+
+  print(f"[*] Analyzing {len(jobs)} entries...", file=sys.stderr)
+  workers = max(1, min(args.workers or os.cpu_count() or 1, len(jobs) or 1))
+  with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+    rows = list(pool.map(analyze_job, jobs, chunksize=8))
+
+  write_summary(rows, args.summary)
+  failed = sum(1 for row in rows if row["error"])
+  print(
+      f"[*] Wrote {len(rows)} row(s) to {args.summary} ({failed} with errors)"
+  )
+
+
+if __name__ == "__main__":
+  main()
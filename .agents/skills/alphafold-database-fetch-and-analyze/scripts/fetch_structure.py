@@ -28,6 +28,29 @@ import sys
 from polite_http import http_client
 
 CLIENT = http_client.HttpClient("https://alphafold.ebi.ac.uk", qps=1.0)
+FRAGMENT_LENGTH = 2700
+
+
+def select_entry(data, uniprot_id):
+  """Picks the AFDB entry to use from a prediction API response.
+
+  The API may return multiple entries (e.g. isoforms) for a single UniProt
+  ID. Prefer the canonical entry whose accession matches exactly; if there is
+  none (common for very large proteins like Dystrophin), fall back to the
+  longest available isoform so the user gets the most complete structure.
+
+  Returns:
+    Tuple of (entry, is_canonical).
+  """
+  for e in data:
+    if e.get("uniprotAccession") == uniprot_id:
+      return e, True
+  return max(data, key=lambda e: e.get("sequenceEnd", 0)), False
+
+
+def metadata_path_for(entry_acc, output_dir):
+  """Returns where fetch_structure saves the API metadata for an entry."""
+  return os.path.join(output_dir, f"AF-{entry_acc}-F1-metadata.json")
 
 
 def fetch_structure(uniprot_id, output_dir):
@@ -59,18 +82,8 @@ def fetch_structure(uniprot_id, output_dir):
     print(f"[!] No AlphaFold data returned for {uniprot_id}")
     sys.exit(1)
 
-  # The API may return multiple entries (e.g. isoforms) for a single
-  # UniProt ID. Prefer the canonical entry whose accession matches exactly.
-  entry = None
-  for e in data:
-    if e.get("uniprotAccession") == uniprot_id:
-      entry = e
-      break
-  # If no canonical entry exists (common for very large proteins like
-  # Dystrophin), fall back to the longest available isoform so the user
-  # gets the most complete structure.
-  if entry is None:
-    entry = max(data, key=lambda e: e.get("sequenceEnd", 0))
+  entry, is_canonical = select_entry(data, uniprot_id)
+  if not is_canonical:
     entry_acc = entry.get("uniprotAccession", "unknown")
     entry_len = entry.get("sequenceEnd", 0)
     print(
@@ -81,7 +94,7 @@ def fetch_structure(uniprot_id, output_dir):
     )
 
   max_seq_len = max((e.get("sequenceEnd", 0) for e in data), default=0)
-  if max_seq_len > 2700:
+  if max_seq_len > FRAGMENT_LENGTH:
     print(
         f"[!] WARNING: Protein {uniprot_id} is massive"
         f" ({max_seq_len} amino acids). Only the first entry has"
@@ -91,8 +104,7 @@ def fetch_structure(uniprot_id, output_dir):
     is_fragment = True
 
   entry_acc = entry.get("uniprotAccession", uniprot_id)
-  metadata_filename = f"AF-{entry_acc}-F1-metadata.json"
-  metadata_path = os.path.join(output_dir, metadata_filename)
+  metadata_path = metadata_path_for(entry_acc, output_dir)
   with open(metadata_path, "w") as f:
     json.dump(entry, f, indent=2)
   print(f"  -> Saved API metadata to: {metadata_path}")
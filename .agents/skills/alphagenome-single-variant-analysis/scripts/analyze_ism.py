@@ -70,40 +70,166 @@ def _reverse_complement(seq: str) -> str:
   return seq[::-1].translate(str.maketrans('ACGTacgt', 'TGCAtgca'))
 
 
+# Relative slack when comparing cumulative-sum window scores; candidates this
+# close to the best are re-summed exactly so ties break as a direct scan would.
+_TIE_TOLERANCE = 1e-9
+
+
+def _ontology_indices(
+    adata: Any,
+    ontology_id: str,
+    gene_name: str | None,
+    cache: dict[tuple[int, int], Any],
+) -> tuple[Any, np.ndarray | None]:
+  """Returns (row indexer, column indices) for an ISM result, cached.
+
+  Results from one `score_ism_variants` call normally share their track
+  metadata, so the masks are computed once per distinct var/obs table.
+  Column indices are None when the ontology term has no tracks.
+  """
+  key = (id(adata.var), id(adata.obs))
+  if key in cache:
+    return cache[key][2:]
+
+  columns = None
+  rows = slice(None)  # All rows
+  if 'ontology_curie' in adata.var.columns:
+    col_mask = (adata.var['ontology_curie'] == ontology_id).to_numpy()
+    if col_mask.any():
+      columns = np.flatnonzero(col_mask)
+      if gene_name and 'gene_name' in adata.obs.columns:
+        gene_mask = (adata.obs['gene_name'] == gene_name).to_numpy()
+        if gene_mask.any():
+          rows = np.flatnonzero(gene_mask)
+    else:
+      print(
+          'Info: No scores found for ontology term'
+          f' {ontology_id!r} in ISM result.'
+      )
+  # Keep var/obs alive so their ids are not reused while cached.
+  cache[key] = (adata.var, adata.obs, rows, columns)
+  return rows, columns
+
+
 def extract_ontology_scores(
     ism_results: list[tuple[Any, ...]],
     ontology_id: str,
     gene_name: str | None = None,
 ) -> tuple[list[float], list[Any]]:
   """Extracts scores for a specific ontology ID from ISM results."""
-  scores_flat: list[float] = []
-  variants_flat: list[Any] = []
-
-  for adata, *_ in ism_results:
-    var_obj = adata.uns['variant']
-    score = 0.0
-
-    if 'ontology_curie' in adata.var.columns:
-      col_mask = adata.var['ontology_curie'] == ontology_id
-      if col_mask.any():
-        row_mask = slice(None)  # All rows
-        if gene_name and 'gene_name' in adata.obs.columns:
-          gene_mask = adata.obs['gene_name'] == gene_name
-          if gene_mask.any():
-            row_mask = gene_mask
-        score = np.nanmean(adata.X[row_mask, col_mask])
-      else:
-        print(
-            'Info: No scores found for ontology term'
-            f' {ontology_id!r} in ISM result.'
-        )
-
-    scores_flat.append(score)
-    variants_flat.append(var_obj)
+  scores_flat: list[float] = [0.0] * len(ism_results)
+  variants_flat: list[Any] = [adata.uns['variant'] for adata, *_ in ism_results]
+
+  cache = {}
+  groups = {}
+  for i, (adata, *_) in enumerate(ism_results):
+    rows, columns = _ontology_indices(adata, ontology_id, gene_name, cache)
+    if columns is not None:
+      key = (id(adata.var), id(adata.obs), np.shape(adata.X))
+      groups.setdefault(key, (rows, columns, []))[2].append(i)
+
+  # Average each group of same-shaped results as one stacked array.
+  for rows, columns, members in groups.values():
+    stacked = np.stack([np.asarray(ism_results[i][0].X) for i in members])
+    selected = stacked[:, rows][:, :, columns]
+    for i, block in zip(members, selected):
+      # Per-block reduction keeps the summation order of a single-result mean.
+      scores_flat[i] = np.nanmean(block)
 
   return scores_flat, variants_flat
 
 
+def summarize_ism_matrices(
+    ism_mats: np.ndarray,
+    bases: list[str],
+    kmer_length: int,
+    min_threshold: float,
+) -> list[dict[str, Any]]:
+  """Extracts consensus motifs and top k-mers from stacked ISM matrices.
+
+  All matrices are processed together: per-position maxima and base choices
+  come from one argmax, the consensus strings from one table lookup, and the
+  k-mer scores from cumulative-sum sliding windows.
+
+  Args:
+    ism_mats: Array of shape (num_variants, length, num_bases), or a single
+      (length, num_bases) matrix.
+    bases: Base labels for the last axis.
+    kmer_length: Length of the k-mer window. Values below 1 give an empty
+      kmer, as the original per-window scan did.
+    min_threshold: Minimum absolute score for a consensus position.
+
+  Returns:
+    One dict per matrix with top_pos, consensus, and (when the matrix is at
+    least kmer_length long) kmer, kmer_start and kmer_score. Positions are
+    indices into the matrix; subtract length // 2 for variant-relative
+    offsets.
+  """
+  ism_mats = np.asarray(ism_mats)
+  if ism_mats.ndim == 2:
+    ism_mats = ism_mats[np.newaxis]
+  num_mats, length, _ = ism_mats.shape
+
+  abs_mats = np.abs(ism_mats)
+  best_base = np.argmax(abs_mats, axis=2)
+  best_abs = np.take_along_axis(abs_mats, best_base[..., np.newaxis], axis=2)[
+      ..., 0
+  ]
+  top_pos = np.argmax(np.max(abs_mats, axis=2), axis=1)
+
+  # Same as max(overall_max * 0.1, min_threshold), including NaN handling.
+  scaled_max = np.max(abs_mats, axis=(1, 2)) * 0.1
+  threshold = np.where(min_threshold > scaled_max, min_threshold, scaled_max)
+  labels = np.frombuffer(''.join(bases).encode('ascii') + b'.', dtype=np.uint8)
+  codes = np.where(
+      best_abs > threshold[:, np.newaxis], best_base, len(bases)
+  ).astype(np.intp)
+  consensus = labels[codes]
+
+  summaries = [
+      {
+          'top_pos': int(top_pos[n]),
+          'consensus': consensus[n].tobytes().decode('ascii'),
+      }
+      for n in range(num_mats)
+  ]
+  if kmer_length < 1:
+    for summary in summaries:
+      summary.update(kmer='', kmer_start=0, kmer_score=0.0)
+    return summaries
+  if length < kmer_length:
+    return summaries
+
+  is_nan = np.isnan(best_abs)
+  cumsum = np.zeros((num_mats, length + 1))
+  np.cumsum(np.where(is_nan, 0.0, best_abs), axis=1, out=cumsum[:, 1:])
+  nan_count = np.zeros((num_mats, length + 1), dtype=np.int64)
+  np.cumsum(is_nan, axis=1, out=nan_count[:, 1:])
+  windows = cumsum[:, kmer_length:] - cumsum[:, :-kmer_length]
+  # Windows containing NaN never win, as in a `score > best` scan.
+  has_nan = nan_count[:, kmer_length:] > nan_count[:, :-kmer_length]
+  windows = np.where(has_nan, -np.inf, windows)
+  best_windows = np.max(windows, axis=1)
+  for n in range(num_mats):
+    if best_windows[n] == -np.inf:
+      summaries[n].update(kmer='', kmer_start=0, kmer_score=-1.0)
+      continue
+    slack = _TIE_TOLERANCE * (1.0 + abs(best_windows[n]))
+    start, score = 0, -1.0
+    for i in np.flatnonzero(windows[n] >= best_windows[n] - slack):
+      exact = np.sum(best_abs[n, i : i + kmer_length])
+      if exact > score:
+        start, score = int(i), exact
+    summaries[n].update(
+        kmer=labels[best_base[n, start : start + kmer_length]]
+        .tobytes()
+        .decode('ascii'),
+        kmer_start=start,
+        kmer_score=score,
+    )
+  return summaries
+
+
 def interpret_ism_matrix(
     ref_ism_mat: np.ndarray,
     bases: list[str],
@@ -116,8 +242,10 @@ def interpret_ism_matrix(
     print('ISM matrix is all zeros. No relevant tracks or scores found.')
     return
 
-  max_scores_per_pos = np.max(np.abs(ref_ism_mat), axis=1)
-  top_pos_idx = int(np.argmax(max_scores_per_pos))
+  (summary,) = summarize_ism_matrices(
+      ref_ism_mat, bases, kmer_length, min_threshold
+  )
+  top_pos_idx = summary['top_pos']
   top_score = ref_ism_mat[top_pos_idx, :]
   center_idx = ref_ism_mat.shape[0] // 2
 
@@ -127,41 +255,16 @@ def interpret_ism_matrix(
   )
   print(f'Scores at Top Position: {dict(zip(bases, top_score))}')
 
-  # Use relative threshold but ensure it's at least min_threshold
-  threshold = max(np.max(np.abs(ref_ism_mat)) * 0.1, min_threshold)
-
-  consensus_seq: list[str] = []
-  for i in range(ref_ism_mat.shape[0]):
-    row = ref_ism_mat[i, :]
-    best_idx = np.argmax(np.abs(row))
-    if abs(row[best_idx]) > threshold:
-      consensus_seq.append(bases[best_idx])
-    else:
-      consensus_seq.append('.')
-
-  consensus_str = ''.join(consensus_seq)
+  consensus_str = summary['consensus']
   print(f'Consensus Motif: {consensus_str}')
   print(f'Reverse Compl  : {_reverse_complement(consensus_str)}')
 
-  if ref_ism_mat.shape[0] >= kmer_length:
-    best_kmer_score = -1.0
-    best_kmer_seq = ''
-    best_kmer_start = 0
-    for i in range(ref_ism_mat.shape[0] - kmer_length + 1):
-      window = ref_ism_mat[i : i + kmer_length, :]
-      score = np.sum(np.max(np.abs(window), axis=1))
-      if score > best_kmer_score:
-        best_kmer_score = score
-        best_kmer_start = i
-        seq = ''
-        for j in range(kmer_length):
-          w_row = window[j, :]
-          seq += bases[np.argmax(np.abs(w_row))]
-        best_kmer_seq = seq
+  if 'kmer' in summary:
+    best_kmer_seq = summary['kmer']
     print(
         f'Top {kmer_length}-mer: {best_kmer_seq}'
-        f' (Start: {best_kmer_start - center_idx},'
-        f' Score: {best_kmer_score:.3f})'
+        f' (Start: {summary["kmer_start"] - center_idx},'
+        f' Score: {summary["kmer_score"]:.3f})'
     )
     print(f'RevComp {kmer_length}-mer: {_reverse_complement(best_kmer_seq)}')
   print('----------------------------------\n')
@@ -314,6 +417,8 @@ def main(argv: Sequence[str] | None = None) -> None:
   )
 
   args = parser.parse_args(argv)
+  if args.kmer_length < 1:
+    parser.error('--kmer_length must be at least 1.')
 
   analyze_ism(
       args.chrom,
@@ -0,0 +1,309 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local, memory-mapped store of the GENCODE annotation with lookup indexes.
+
+The GENCODE feather file is downloaded once and rewritten as an uncompressed
+Arrow IPC file, which is memory-mapped on open, so no rows are parsed until
+they are selected. Two indexes are built next to it as `.npy` arrays, and
+these are memory-mapped too:
+
+  * Symbols: the sorted unique gene names, with offsets into a row-id array
+    grouped by name. A lookup is one binary search.
+  * Intervals: row ids sorted by (Chromosome, Start), the sorted starts, and a
+    running maximum of the ends. An overlap query takes two binary searches
+    and then checks only the rows that can overlap.
+
+Row ids are positions in the original file. Query results are returned in file
+order, so DataFrames built from them match the old boolean-mask filtering row
+for row.
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#   "numpy",
+#   "pandas",
+#   "pyarrow",
+# ]
+# ///
+
+from __future__ import annotations
+
+import collections
+import json
+import os
+import shutil
+import tempfile
+from typing import Iterable
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+GTF_URL = (
+    'https://storage.googleapis.com/alphagenome/reference/gencode/'
+    'hg38/gencode.v46.annotation.gtf.gz.feather'
+)
+DEFAULT_CACHE_DIR = os.environ.get('ALPHAGENOME_ANNOTATION_CACHE') or (
+    os.path.join(os.path.expanduser('~'), '.cache', 'alphagenome', 'gencode')
+)
+
+# Bump when the on-disk layout changes so existing stores are rebuilt.
+STORE_VERSION = 1
+
+_TABLE_FILE = 'annotation.arrow'
+_META_FILE = 'meta.json'
+_INDEX_FILES = (
+    'symbols',
+    'symbol_offsets',
+    'symbol_rows',
+    'interval_rows',
+    'interval_starts',
+    'interval_end_max',
+)
+
+GeneIntervals = collections.namedtuple(
+    'GeneIntervals',
+    ['rows', 'starts', 'ends', 'end_max', 'end_argmax', 'names', 'gene_ids'],
+)
+
+
+def _store_dir(cache_dir: str, source: str) -> str:
+  name = os.path.basename(source.rstrip('/'))
+  for suffix in ('.feather', '.gz', '.gtf'):
+    name = name.removesuffix(suffix)
+  return os.path.join(cache_dir, name)
+
+
+def _column_values(table: pa.Table, name: str) -> np.ndarray:
+  column = table.column(name)
+  if pa.types.is_dictionary(column.type):
+    column = column.cast(column.type.value_type)
+  return column.to_numpy(zero_copy_only=False)
+
+
+def _download(source: str, path: str) -> None:
+  """Copies source (URL or local path) to path atomically."""
+  fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+  try:
+    with os.fdopen(fd, 'wb') as out:
+      if os.path.exists(source):
+        with open(source, 'rb') as src:
+          shutil.copyfileobj(src, out)
+      else:
+        with urllib.request.urlopen(source) as src:
+          shutil.copyfileobj(src, out, 1 << 20)
+    os.replace(tmp_path, path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+
+
+def build_store(directory: str, source: str = GTF_URL) -> None:
+  """Downloads source and writes the Arrow table and indexes to directory."""
+  os.makedirs(directory, exist_ok=True)
+  feather_path = os.path.join(directory, 'source.feather')
+  print(f'Building local annotation store from {source}...')
+  _download(source, feather_path)
+  table = feather.read_table(feather_path)
+
+  # Uncompressed IPC so the file can be memory-mapped without decoding.
+  table_path = os.path.join(directory, _TABLE_FILE)
+  with pa.OSFile(table_path + '.part', 'wb') as sink:
+    with pa.ipc.new_file(sink, table.schema) as writer:
+      writer.write_table(table)
+  os.replace(table_path + '.part', table_path)
+
+  names = _column_values(table, 'gene_name')
+  names = np.where(pd.isna(names), '', names).astype(str)
+  symbol_rows = np.argsort(names, kind='stable').astype(np.int64)
+  symbols, first = np.unique(names[symbol_rows], return_index=True)
+  symbol_offsets = np.append(first, len(names)).astype(np.int64)
+
+  chroms = _column_values(table, 'Chromosome').astype(str)
+  starts = _column_values(table, 'Start').astype(np.int64)
+  ends = _column_values(table, 'End').astype(np.int64)
+  interval_rows = np.lexsort((starts, chroms)).astype(np.int64)
+  sorted_chroms = chroms[interval_rows]
+  interval_starts = starts[interval_rows]
+  sorted_ends = ends[interval_rows]
+  interval_end_max = np.empty_like(sorted_ends)
+  chrom_ranges = {}
+  boundaries = np.flatnonzero(sorted_chroms[1:] != sorted_chroms[:-1]) + 1
+  for lo, hi in zip(
+      np.concatenate([[0], boundaries]),
+      np.concatenate([boundaries, [len(sorted_chroms)]]),
+  ):
+    if hi > lo:
+      chrom_ranges[str(sorted_chroms[lo])] = [int(lo), int(hi)]
+      interval_end_max[lo:hi] = np.maximum.accumulate(sorted_ends[lo:hi])
+
+  arrays = {
+      'symbols': symbols,
+      'symbol_offsets': symbol_offsets,
+      'symbol_rows': symbol_rows,
+      'interval_rows': interval_rows,
+      'interval_starts': interval_starts,
+      'interval_end_max': interval_end_max,
+  }
+  for name, values in arrays.items():
+    np.save(os.path.join(directory, f'{name}.npy'), values)
+
+  with open(os.path.join(directory, _META_FILE), 'w') as f:
+    json.dump(
+        {
+            'version': STORE_VERSION,
+            'source': source,
+            'num_rows': table.num_rows,
+            'chrom_ranges': chrom_ranges,
+        },
+        f,
+    )
+  os.remove(feather_path)
+
+
+def _is_current(directory: str, source: str) -> bool:
+  try:
+    with open(os.path.join(directory, _META_FILE)) as f:
+      meta = json.load(f)
+  except (OSError, ValueError):
+    return False
+  if meta.get('version') != STORE_VERSION or meta.get('source') != source:
+    return False
+  files = [_TABLE_FILE] + [f'{name}.npy' for name in _INDEX_FILES]
+  return all(os.path.exists(os.path.join(directory, f)) for f in files)
+
+
+class AnnotationStore:
+  """Memory-mapped GENCODE annotation with symbol and interval indexes."""
+
+  def __init__(self, directory: str):
+    with open(os.path.join(directory, _META_FILE)) as f:
+      meta = json.load(f)
+    self.directory = directory
+    self.source = meta['source']
+    self._chrom_ranges = meta['chrom_ranges']
+    self._gene_intervals = {}
+    self.table = pa.ipc.open_file(
+        pa.memory_map(os.path.join(directory, _TABLE_FILE))
+    ).read_all()
+    for name in _INDEX_FILES:
+      setattr(
+          self,
+          f'_{name}',
+          np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r'),
+      )
+
+  @classmethod
+  def open(
+      cls, cache_dir: str = DEFAULT_CACHE_DIR, source: str = GTF_URL
+  ) -> AnnotationStore:
+    """Opens the store for source in cache_dir, building it on first use."""
+    directory = _store_dir(cache_dir, source)
+    if not _is_current(directory, source):
+      build_store(directory, source)
+    return cls(directory)
+
+  @property
+  def num_rows(self) -> int:
+    return self.table.num_rows
+
+  @property
+  def columns(self) -> list[str]:
+    return self.table.column_names
+
+  def rows_for_symbols(self, symbols: Iterable[str]) -> np.ndarray:
+    """Returns row ids (in file order) whose gene_name is in symbols."""
+    parts = []
+    for symbol in set(symbols):
+      i = int(np.searchsorted(self._symbols, symbol))
+      if i < len(self._symbols) and self._symbols[i] == symbol:
+        lo, hi = self._symbol_offsets[i], self._symbol_offsets[i + 1]
+        parts.append(self._symbol_rows[lo:hi])
+    if not parts:
+      return np.empty(0, dtype=np.int64)
+    return np.sort(np.concatenate(parts))
+
+  def rows_overlapping(self, chrom: str, start: int, end: int) -> np.ndarray:
+    """Returns row ids (in file order) with Start <= end and End >= start."""
+    if chrom not in self._chrom_ranges:
+      return np.empty(0, dtype=np.int64)
+    lo, hi = self._chrom_ranges[chrom]
+    # Rows before `first` end before start. Rows from `last` on start after end.
+    first = lo + int(
+        np.searchsorted(self._interval_end_max[lo:hi], start, side='left')
+    )
+    last = lo + int(
+        np.searchsorted(self._interval_starts[lo:hi], end, side='right')
+    )
+    if first >= last:
+      return np.empty(0, dtype=np.int64)
+    candidates = np.asarray(self._interval_rows[first:last])
+    ends = self.table.column('End').take(pa.array(candidates))
+    keep = ends.to_numpy(zero_copy_only=False) >= start
+    return np.sort(candidates[keep])
+
+  def gene_intervals(self, chrom: str) -> GeneIntervals:
+    """Returns the gene features on chrom sorted by Start.
+
+    `end_max[i]` is the largest End among the first i + 1 genes and
+    `end_argmax[i]` the position of that gene. Built once per chromosome.
+    """
+    if chrom in self._gene_intervals:
+      return self._gene_intervals[chrom]
+    lo, hi = self._chrom_ranges.get(chrom, (0, 0))
+    rows = np.asarray(self._interval_rows[lo:hi])
+    starts = np.asarray(self._interval_starts[lo:hi])
+    feature_col = 'Feature' if 'Feature' in self.columns else 'feature'
+    if feature_col in self.columns:
+      features = _column_values(
+          self.table.select([feature_col]).take(pa.array(rows)), feature_col
+      )
+      is_gene = features == 'gene'
+      rows, starts = rows[is_gene], starts[is_gene]
+    taken = self.table.select(['End', 'gene_name', 'gene_id_nopatch']).take(
+        pa.array(rows, type=pa.int64())
+    )
+    ends = _column_values(taken, 'End').astype(np.int64)
+    end_max = np.maximum.accumulate(ends)
+    is_new_max = np.ones(len(ends), dtype=bool)
+    is_new_max[1:] = ends[1:] > end_max[:-1]
+    end_argmax = np.maximum.accumulate(
+        np.where(is_new_max, np.arange(len(ends)), 0)
+    )
+    intervals = GeneIntervals(
+        rows=rows,
+        starts=starts,
+        ends=ends,
+        end_max=end_max,
+        end_argmax=end_argmax,
+        names=_column_values(taken, 'gene_name'),
+        gene_ids=_column_values(taken, 'gene_id_nopatch'),
+    )
+    self._gene_intervals[chrom] = intervals
+    return intervals
+
+  def frame(
+      self, rows: np.ndarray, columns: list[str] | None = None
+  ) -> pd.DataFrame:
+    """Returns the selected rows as a DataFrame, in the order given."""
+    table = self.table if columns is None else self.table.select(columns)
+    return table.take(pa.array(rows, type=pa.int64())).to_pandas()
+
+  def to_pandas(self) -> pd.DataFrame:
+    """Returns the full annotation as a DataFrame."""
+    return self.table.to_pandas()
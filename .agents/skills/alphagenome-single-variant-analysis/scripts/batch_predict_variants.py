@@ -0,0 +1,328 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batch AlphaGenome variant predictions into a local prediction store.
+
+Design Note:
+  Runs `predict_variant` for every variant in a VCF with one shared client
+  and a bounded number of requests in flight. Raw REF/ALT track outputs are
+  written to the on-disk prediction store (see prediction_store.py). The
+  single-variant scripts read from that store, so re-running interpretation
+  or plots with other ontology terms or tissues never calls the model again.
+
+  Duplicate variants are predicted once. Variants that share a prediction
+  interval share one stored REF copy. Variants already in the store are
+  skipped, so an interrupted batch can be resumed by re-running it.
+
+  Each stored prediction is keyed by its interval. To pre-fill the store for
+  a script, use the same sequence length that script predicts with:
+  visualize_variant_effects.py uses 1MB (the default here) and
+  interpret_splicing.py uses 131072 (100KB).
+
+Usage:
+  uv run scripts/batch_predict_variants.py --vcf=variants.vcf.gz
+
+Examples:
+  uv run scripts/batch_predict_variants.py --vcf=gwas_hits.vcf \
+    --ontology=UBERON:0002107,UBERON:0000948 --max_in_flight=8
+
+  uv run scripts/batch_predict_variants.py --vcf=splice_candidates.vcf \
+    --sequence_length=131072 \
+    --outputs=SPLICE_JUNCTIONS,SPLICE_SITE_USAGE,RNA_SEQ
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#   "alphagenome",
+#   "numpy",
+#   "pandas",
+#   "python-dotenv",
+# ]
+# ///
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import gzip
+import os
+import sys
+from typing import Sequence
+
+from alphagenome.data import genome
+from alphagenome.models import dna_client
+import dotenv
+from prediction_store import DEFAULT_STORE_DIR
+from prediction_store import PredictionStore
+
+API_ADDRESS = 'dns:///gdmscience.googleapis.com:443'
+
+# Everything visualize_variant_effects.py can plot with --tracks=all.
+DEFAULT_OUTPUTS = (
+    'RNA_SEQ,SPLICE_JUNCTIONS,SPLICE_SITE_USAGE,SPLICE_SITES,'
+    'DNASE,CHIP_TF,CHIP_HISTONE'
+)
+
+
+def _normalize_chrom(chrom: str) -> str:
+  if not chrom.startswith('chr'):
+    chrom = 'chr' + chrom
+  return 'chrM' if chrom == 'chrMT' else chrom
+
+
+def read_vcf_variants(path: str) -> list[genome.Variant]:
+  """Reads variants from a (gzipped) VCF, one per ALT allele."""
+  variants = []
+  opener = gzip.open if path.endswith('.gz') else open
+  with opener(path, 'rt') as f:
+    for line in f:
+      if line.startswith('#') or not line.strip():
+        continue
+      chrom, pos, name, ref, alts = line.rstrip('\n').split('\t')[:5]
+      for alt in alts.split(','):
+        if alt in ('.', '*') or alt.startswith('<'):
+          continue  # Symbolic and missing alleles cannot be predicted.
+        variants.append(
+            genome.Variant(
+                _normalize_chrom(chrom),
+                int(pos),
+                ref.upper(),
+                alt.upper(),
+                name=name if name != '.' else '',
+            )
+        )
+  return variants
+
+
+def prediction_interval(
+    variant: genome.Variant, sequence_length: int
+) -> genome.Interval:
+  """Returns the interval centered on the variant, as the other scripts use."""
+  return genome.Interval(
+      variant.chromosome,
+      variant.position - sequence_length // 2,
+      variant.position + sequence_length // 2,
+  )
+
+
+def plan_requests(
+    variants: list[genome.Variant],
+    sequence_length: int,
+    store: PredictionStore,
+    requested_outputs: list[dna_client.OutputType],
+    ontology_terms: list[str] | None,
+    force: bool = False,
+) -> tuple[list[tuple[genome.Interval, genome.Variant]], dict[str, int]]:
+  """Dedupes variants and drops those already in the store.
+
+  Returns:
+    The (interval, variant) requests to run, grouped by interval, and counts
+    of duplicates, stored entries and distinct intervals.
+  """
+  unique = {}
+  for v in variants:
+    key = (v.chromosome, v.position, v.reference_bases, v.alternate_bases)
+    unique.setdefault(key, v)
+  requests = []
+  stored = 0
+  for variant in unique.values():
+    interval = prediction_interval(variant, sequence_length)
+    if not force and store.contains(
+        interval, variant, requested_outputs, ontology_terms
+    ):
+      stored += 1
+      continue
+    requests.append((interval, variant))
+  # Requests sharing an interval run together and reuse one stored REF.
+  requests.sort(key=lambda r: (r[0].chromosome, r[0].start, r[1].position))
+  stats = {
+      'variants': len(variants),
+      'duplicates': len(variants) - len(unique),
+      'stored': stored,
+      'intervals': len({(i.chromosome, i.start, i.end) for i, _ in requests}),
+  }
+  return requests, stats
+
+
+def run_batch(
+    dna_model: dna_client.DnaClient,
+    store: PredictionStore,
+    requests: list[tuple[genome.Interval, genome.Variant]],
+    requested_outputs: list[dna_client.OutputType],
+    ontology_terms: list[str] | None,
+    max_in_flight: int,
+    force: bool = False,
+) -> list[tuple[genome.Variant, Exception]]:
+  """Predicts and stores every request with at most max_in_flight at once.
+
+  Results are written to the store by the worker that fetched them and are
+  not kept in memory. With force, stored outputs are replaced.
+
+  Returns:
+    The (variant, error) pairs of failed requests.
+  """
+
+  def _predict(interval: genome.Interval, variant: genome.Variant) -> None:
+    fetch_terms = ontology_terms
+    if not force:
+      fetch_terms = store.request_terms(
+          interval, variant, requested_outputs, ontology_terms
+      )
+    prediction = dna_model.predict_variant(
+        interval=interval,
+        variant=variant,
+        requested_outputs=requested_outputs,
+        ontology_terms=fetch_terms,
+    )
+    store.save(
+        interval,
+        variant,
+        prediction,
+        requested_outputs,
+        fetch_terms,
+        overwrite=force,
+    )
+
+  failures = []
+  with concurrent.futures.ThreadPoolExecutor(
+      max_workers=max(1, max_in_flight)
+  ) as executor:
+    futures = {
+        executor.submit(_predict, interval, variant): variant
+        for interval, variant in requests
+    }
+    for done, future in enumerate(
+        concurrent.futures.as_completed(futures), start=1
+    ):
+      variant = futures[future]
+      try:
+        future.result()
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        failures.append((variant, e))
+        print(f'[{done}/{len(futures)}] FAILED {variant}: {e}')
+      else:
+        print(f'[{done}/{len(futures)}] Stored {variant}')
+  return failures
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+  """Main entry point for the batch prediction CLI tool."""
+  dotenv.load_dotenv(os.path.expanduser('~/.env'))
+  parser = argparse.ArgumentParser(
+      description='Batch AlphaGenome variant predictions into a local store.'
+  )
+  parser.add_argument(
+      '--vcf', required=True, help='VCF of variants (may be gzipped).'
+  )
+  parser.add_argument(
+      '--store',
+      default=DEFAULT_STORE_DIR,
+      help=(
+          'Prediction store directory (default: $ALPHAGENOME_PREDICTION_STORE'
+          ' or ~/.cache/alphagenome/predictions).'
+      ),
+  )
+  parser.add_argument(
+      '--outputs',
+      default=DEFAULT_OUTPUTS,
+      help=f'Comma-separated output types (default: {DEFAULT_OUTPUTS}).',
+  )
+  parser.add_argument(
+      '--ontology',
+      default=None,
+      help=(
+          'Comma-separated ontology CURIEs to keep. Later runs can filter to'
+          ' any subset locally. Default: all tracks (large on disk).'
+      ),
+  )
+  parser.add_argument(
+      '--sequence_length',
+      type=int,
+      default=dna_client.SEQUENCE_LENGTH_1MB,
+      choices=sorted(dna_client.SUPPORTED_SEQUENCE_LENGTHS.values()),
+      help='Prediction interval width centered on each variant.',
+  )
+  parser.add_argument(
+      '--max_in_flight',
+      type=int,
+      default=4,
+      help='Maximum number of concurrent prediction requests.',
+  )
+  parser.add_argument(
+      '--force',
+      action='store_true',
+      help='Re-predict variants that are already in the store.',
+  )
+  args = parser.parse_args(argv)
+
+  try:
+    requested_outputs = [
+        dna_client.OutputType[o.strip().upper()]
+        for o in args.outputs.split(',')
+        if o.strip()
+    ]
+  except KeyError as e:
+    parser.error(
+        f'Unknown output type {e}. Valid options:'
+        f' {[o.name for o in dna_client.OutputType]}'
+    )
+  ontology_terms = (
+      sorted({t.strip() for t in args.ontology.split(',') if t.strip()})
+      if args.ontology
+      else None
+  )
+
+  store = PredictionStore(args.store)
+  variants = read_vcf_variants(args.vcf)
+  requests, stats = plan_requests(
+      variants,
+      args.sequence_length,
+      store,
+      requested_outputs,
+      ontology_terms,
+      args.force,
+  )
+  print(
+      f"{stats['variants']} variants: {stats['duplicates']} duplicates,"
+      f" {stats['stored']} already stored, {len(requests)} to predict over"
+      f" {stats['intervals']} intervals."
+  )
+  if not requests:
+    return
+
+  api_key = os.environ.get('ALPHAGENOME_API_KEY')
+  if not api_key:
+    raise ValueError('ALPHAGENOME_API_KEY environment variable not set.')
+  dna_model = dna_client.create(api_key=api_key, address=API_ADDRESS)
+
+  failures = run_batch(
+      dna_model,
+      store,
+      requests,
+      requested_outputs,
+      ontology_terms,
+      args.max_in_flight,
+      args.force,
+  )
+  print(
+      f'Done: {len(requests) - len(failures)} stored, {len(failures)} failed.'
+      f' Store: {args.store}'
+  )
+  if failures:
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
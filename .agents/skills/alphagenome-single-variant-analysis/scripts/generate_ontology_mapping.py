@@ -14,8 +14,14 @@
 
 """Generates tissue_ontology_mapping.json from the AlphaGenome API.
 
+Also writes the search index used by resolve_ontology_terms.py
+(tissue_ontology_mapping.index.json) and a binary copy of the mapping
+(tissue_ontology_mapping.pkl) next to the mapping. The binary copy records a
+hash of each CURIE's metadata rows, so --incremental only rebuilds the entries
+whose rows changed and leaves the files untouched if nothing changed.
+
 Usage:
- uv run scripts/generate_ontology_mapping.py
+ uv run scripts/generate_ontology_mapping.py [--incremental]
 
 Can be imported and called programmatically:
   from generate_ontology_mapping import generate_mapping_file
@@ -31,11 +37,15 @@ Can be imported and called programmatically:
 # ]
 # ///
 
+import argparse
+import hashlib
 import json
 import logging
 import os
+from typing import Any
 
 import dotenv
+import ontology_index
 
 logger = logging.getLogger(__name__)
 
@@ -43,35 +53,23 @@ from alphagenome.models import dna_client
 import pandas as pd
 
 
-def clean_list(series: pd.Series) -> list[str]:
-  """Clean a pandas series to a sorted list of unique non-empty values."""
-  vals = set(series.dropna().astype(str))
-  vals = {
-      v
-      for v in vals
-      if v.strip() and v.lower() not in ('none', 'nan', 'null', '')
-  }
-  return sorted(list(vals))
-
-
-def prune_empty(d):
-  """Recursively remove empty values from nested dicts and lists."""
-  if not isinstance(d, (dict, list)):
-    return d
-  if isinstance(d, list):
-    return [
-        v for v in (prune_empty(v) for v in d) if v not in (None, [], {}, '')
-    ]
-  if isinstance(d, dict):
-    return {
-        k: v
-        for k, v in ((k, prune_empty(v)) for k, v in d.items())
-        if v not in (None, [], {}, '')
-    }
+# Placeholder strings treated as missing values.
+_EMPTY_VALUES = ('none', 'nan', 'null', '')
 
+# Columns aggregated per CURIE and per (CURIE, assay), keyed by output field.
+_BIOSAMPLE_LISTS = {
+    'life': 'biosample_life_stage',
+    'sources': 'data_source',
+}
+_MOLECULAR_LISTS = {
+    'histones': 'histone_mark',
+    'tfs': 'transcription_factor',
+}
+_ASSAY_LISTS = ('output_type', 'histone_mark', 'transcription_factor')
 
-def create_biological_mapping(df: pd.DataFrame) -> dict:
-  """Create a mapping from ontology CURIEs to biosample metadata."""
+
+def prepare_metadata(df: pd.DataFrame) -> pd.DataFrame:
+  """Drops columns not used by the mapping and normalizes output types."""
   df_proc = df.drop(
       columns=['genetically_modified', 'nonzero_mean', 'name'], errors='ignore'
   ).copy()
@@ -80,41 +78,153 @@ def create_biological_mapping(df: pd.DataFrame) -> dict:
       .astype(str)
       .str.replace('OutputType.', '', regex=False)
   )
+  return df_proc
+
+
+def _clean_values(series: pd.Series) -> pd.Series:
+  """Returns the values as strings, with empty or placeholder values as NA."""
+  values = series.astype(str)
+  valid = (
+      series.notna()
+      & (values.str.strip() != '')
+      & ~values.str.lower().isin(_EMPTY_VALUES)
+  )
+  return values.where(valid)
+
+
+def _sorted_unique_values(
+    df: pd.DataFrame, keys: list[str], columns: list[str]
+) -> dict[tuple[Any, ...], list[str]]:
+  """Maps (*keys, column) to the sorted unique clean values of that column.
+
+  All columns are aggregated in one pass over a long-format frame.
+  """
+  long = df[keys].copy()
+  long[columns] = df[columns].apply(_clean_values)
+  long = long.melt(id_vars=keys, value_vars=columns, var_name='column')
+  long = long.dropna(subset=['value']).drop_duplicates()
+  long = long.sort_values([*keys, 'column', 'value'])
+  grouped = long.groupby([*keys, 'column'], sort=False, observed=True)
+  return grouped['value'].agg(list).to_dict()
+
+
+def _without_empty(entry: dict[str, Any]) -> dict[str, Any]:
+  return {k: v for k, v in entry.items() if v not in (None, [], {}, '')}
+
+
+def create_biological_mapping(df: pd.DataFrame) -> dict:
+  """Create a mapping from ontology CURIEs to biosample metadata.
+
+  Every list field is aggregated for all CURIEs (and assays) at once with a
+  single groupby, instead of one groupby per CURIE.
+  """
+  df_proc = prepare_metadata(df)
+  df_proc = df_proc[df_proc['ontology_curie'].notna()]
+  df_proc['ontology_curie'] = df_proc['ontology_curie'].astype('category')
+
+  per_curie = _sorted_unique_values(
+      df_proc,
+      ['ontology_curie'],
+      [*_BIOSAMPLE_LISTS.values(), *_MOLECULAR_LISTS.values()],
+  )
+  assays = df_proc[df_proc['Assay title'].notna()]
+  per_assay = _sorted_unique_values(
+      assays, ['ontology_curie', 'Assay title'], list(_ASSAY_LISTS)
+  )
+  assay_titles = (
+      assays[['ontology_curie', 'Assay title']]
+      .drop_duplicates()
+      .sort_values(['ontology_curie', 'Assay title'])
+      .groupby('ontology_curie', observed=True)['Assay title']
+      .agg(list)
+      .to_dict()
+  )
+  # The biosample name and type come from the first row of each CURIE.
+  first_rows = (
+      df_proc.drop_duplicates('ontology_curie')
+      .set_index('ontology_curie')[['biosample_name', 'biosample_type']]
+      .sort_index()
+  )
+
   mapping = {}
-  for curie, group in df_proc.groupby('ontology_curie'):
-    if pd.isna(curie):
-      continue
-    entry = {
-        'biosample': {
-            'name': group['biosample_name'].iloc[0],
-            'type': group['biosample_type'].iloc[0],
-            'life': clean_list(group['biosample_life_stage']),
-            'sources': clean_list(group['data_source']),
-        },
-        'molecular': {
-            'histones': clean_list(group['histone_mark']),
-            'tfs': clean_list(group['transcription_factor']),
-        },
-        'assays': {
-            assay: {
-                'tracks': clean_list(ag['output_type']),
-                'marks': (
-                    clean_list(ag['histone_mark'])
-                    + clean_list(ag['transcription_factor'])
-                ),
-            }
-            for assay, ag in group.groupby('Assay title')
-        },
+  for curie, name, biosample_type in first_rows.itertuples():
+    biosample = {'name': name, 'type': biosample_type}
+    for field, column in _BIOSAMPLE_LISTS.items():
+      biosample[field] = per_curie.get((curie, column), [])
+    molecular = {
+        field: per_curie.get((curie, column), [])
+        for field, column in _MOLECULAR_LISTS.items()
     }
-    mapping[curie] = prune_empty(entry)
+    assay_entries = {}
+    for assay in assay_titles.get(curie, []):
+      assay_entries[assay] = _without_empty({
+          'tracks': per_assay.get((curie, assay, 'output_type'), []),
+          'marks': (
+              per_assay.get((curie, assay, 'histone_mark'), [])
+              + per_assay.get((curie, assay, 'transcription_factor'), [])
+          ),
+      })
+    mapping[curie] = _without_empty({
+        'biosample': _without_empty(biosample),
+        'molecular': _without_empty(molecular),
+        'assays': _without_empty(assay_entries),
+    })
   return mapping
 
 
-def generate_mapping_file(output_path: str) -> dict:
+def curie_row_hashes(df: pd.DataFrame) -> dict[str, str]:
+  """Hashes the metadata rows of each CURIE, in row order."""
+  df_proc = prepare_metadata(df)
+  df_proc = df_proc[df_proc['ontology_curie'].notna()]
+  df_proc = df_proc[sorted(df_proc.columns)]
+  row_hashes = pd.util.hash_pandas_object(df_proc, index=False).to_numpy()
+  groups = df_proc.groupby('ontology_curie', sort=True).indices
+  return {
+      curie: hashlib.sha256(row_hashes[rows].tobytes()).hexdigest()
+      for curie, rows in groups.items()
+  }
+
+
+def update_mapping(
+    df: pd.DataFrame,
+    previous: dict[str, Any],
+    previous_hashes: dict[str, str],
+    row_hashes: dict[str, str],
+) -> tuple[dict, list[str]]:
+  """Rebuilds only the CURIEs whose metadata rows changed.
+
+  Args:
+    df: The current output metadata.
+    previous: The previously generated mapping.
+    previous_hashes: Per-CURIE row hashes the previous mapping was built from.
+    row_hashes: Per-CURIE row hashes of df.
+
+  Returns:
+    The updated mapping and the CURIEs that were added or rebuilt.
+  """
+  changed = [
+      curie
+      for curie, digest in row_hashes.items()
+      if previous_hashes.get(curie) != digest or curie not in previous
+  ]
+  rebuilt = create_biological_mapping(df[df['ontology_curie'].isin(changed)])
+  mapping = {
+      curie: rebuilt[curie] if curie in rebuilt else previous[curie]
+      for curie in row_hashes
+  }
+  return mapping, changed
+
+
+def generate_mapping_file(output_path: str, incremental: bool = False) -> dict:
   """Fetches AlphaGenome metadata and writes the ontology mapping JSON.
 
+  Also writes the search index and the binary mapping (with per-CURIE row
+  hashes) next to the JSON.
+
   Args:
     output_path: Path to write the tissue_ontology_mapping.json file.
+    incremental: Reuse the entries of the existing mapping for CURIEs whose
+      metadata rows are unchanged, and skip writing when nothing changed.
 
   Returns:
     The generated mapping dictionary.
@@ -134,15 +244,61 @@ def generate_mapping_file(output_path: str) -> dict:
   dna_model = dna_client.create(api_key=api_key)
   df = dna_model.output_metadata(dna_client.Organism.HOMO_SAPIENS).concatenate()
   logger.info('Got %d rows.', len(df))
+  return write_mapping_files(df, output_path, incremental)
+
 
-  logger.info('Building ontology mapping...')
-  mapping = create_biological_mapping(df)
-  logger.info('Created %d entries.', len(mapping))
+def write_mapping_files(
+    df: pd.DataFrame, output_path: str, incremental: bool = False
+) -> dict:
+  """Builds the mapping from output metadata and writes the mapping files.
 
-  os.makedirs(os.path.dirname(output_path), exist_ok=True)
+  See generate_mapping_file for the arguments.
+  """
+  row_hashes = curie_row_hashes(df)
+  previous = None
+  if incremental and os.path.exists(output_path):
+    previous = ontology_index.read_binary_mapping(output_path)
+    if previous is None:
+      logger.info('No up-to-date binary mapping; rebuilding everything.')
+
+  if previous is not None:
+    if previous['row_hashes'] == row_hashes:
+      logger.info('Metadata unchanged; keeping %s', output_path)
+      return previous['mapping']
+    logger.info('Updating ontology mapping...')
+    mapping, changed = update_mapping(
+        df, previous['mapping'], previous['row_hashes'], row_hashes
+    )
+    removed = len(previous['mapping'].keys() - mapping.keys())
+    logger.info(
+        'Rebuilt %d of %d entries (%d removed).',
+        len(changed),
+        len(mapping),
+        removed,
+    )
+  else:
+    logger.info('Building ontology mapping...')
+    mapping = create_biological_mapping(df)
+    logger.info('Created %d entries.', len(mapping))
+
+  os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
   with open(output_path, 'w') as f:
     json.dump(mapping, f, indent=2)
   logger.info('Wrote mapping to %s', output_path)
+  source_sha256 = ontology_index.file_sha256(output_path)
+
+  binary_path = ontology_index.get_binary_mapping_path(output_path)
+  ontology_index.write_binary_mapping(
+      mapping, binary_path, source_sha256, row_hashes
+  )
+  logger.info('Wrote binary mapping to %s', binary_path)
+
+  index_path = ontology_index.get_ontology_index_path(output_path)
+  index = ontology_index.build_index(mapping, source_sha256)
+  ontology_index.write_index(index, index_path)
+  logger.info(
+      'Wrote search index (%d terms) to %s', len(index['postings']), index_path
+  )
 
   return mapping
 
@@ -161,9 +317,20 @@ def get_tissue_ontology_mapping_path(resource_dir: str) -> str:
 
 def main():
   dotenv.load_dotenv(os.path.expanduser('~/.env'))
+  parser = argparse.ArgumentParser(
+      description='Generates the tissue ontology mapping from AlphaGenome.'
+  )
+  parser.add_argument(
+      '--incremental',
+      action='store_true',
+      help='Only rebuild entries whose metadata changed since the last run.',
+  )
+  args = parser.parse_args()
   script_dir = os.path.dirname(os.path.abspath(__file__))
   resource_dir = os.path.join(script_dir, '..', 'resources')
-  generate_mapping_file(get_tissue_ontology_mapping_path(resource_dir))
+  generate_mapping_file(
+      get_tissue_ontology_mapping_path(resource_dir), args.incremental
+  )
 
 
 if __name__ == '__main__':
@@ -52,6 +52,8 @@ from alphagenome.models import dna_client
 import dotenv
 import numpy as np
 import pandas as pd
+from prediction_store import predict_variant_cached
+from prediction_store import PredictionStore
 
 API_ADDRESS = 'dns:///gdmscience.googleapis.com:443'
 
@@ -109,6 +111,7 @@ def analyze_splicing(
     alt: str,
     ontology_id: str,
     window: int,
+    prediction_store: str | None = None,
 ) -> None:
   """Runs the splicing analysis for a specific variant."""
   api_key = os.environ.get('ALPHAGENOME_API_KEY')
@@ -132,7 +135,10 @@ def analyze_splicing(
       dna_client.OutputType.RNA_SEQ,
   ]
 
-  prediction = dna_model.predict_variant(
+  store = PredictionStore(prediction_store) if prediction_store else None
+  prediction = predict_variant_cached(
+      dna_model,
+      store,
       interval=pred_interval,
       variant=variant,
       requested_outputs=requested_outputs,
@@ -289,6 +295,14 @@ def main(argv: Sequence[str] | None = None) -> None:
       default=1500,
       help='Window size around variant for analysis.',
   )
+  parser.add_argument(
+      '--prediction_store',
+      default=None,
+      help=(
+          'Directory of stored predictions (see batch_predict_variants.py).'
+          ' Stored predictions are reused and new ones are added.'
+      ),
+  )
   args = parser.parse_args(argv)
 
   analyze_splicing(
@@ -298,6 +312,7 @@ def main(argv: Sequence[str] | None = None) -> None:
       args.alt,
       args.ontology_id,
       args.window,
+      args.prediction_store,
   )
 
 
@@ -24,13 +24,19 @@ Usage:
 
   # 3. List and filter transcripts for a gene
   uv run scripts/lookup_gene_info.py --genes='EGFR' --transcripts --mane
+
+  # 4. Annotate many positions (BED/VCF/TSV) with nearest genes
+  uv run scripts/lookup_gene_info.py --positions=gwas_hits.vcf.gz \
+    --output=nearest_genes.tsv
 """
 
 # /// script
 # requires-python = ">=3.10"
 # dependencies = [
 #   "alphagenome",
+#   "numpy",
 #   "pandas",
+#   "pyarrow",
 #   "python-dotenv",
 # ]
 # ///
@@ -38,24 +44,48 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import gzip
 import os
 import re
 from typing import Sequence
 
 from alphagenome.data import gene_annotation
+from annotation_store import AnnotationStore
+from annotation_store import DEFAULT_CACHE_DIR
+from annotation_store import GTF_URL
 import dotenv
+import numpy as np
 import pandas as pd
-
-GTF_URL = (
-    'https://storage.googleapis.com/alphagenome/reference/gencode/'
-    'hg38/gencode.v46.annotation.gtf.gz.feather'
-)
-
-
-def load_gtf() -> pd.DataFrame:
-  """Loads the GTF feather file."""
-  print(f'Loading GTF from {GTF_URL}...')
-  return pd.read_feather(GTF_URL)
+import pyarrow as pa
+from pyarrow import parquet
+
+GENE_COLUMNS = [
+    'gene_name',
+    'gene_id_nopatch',
+    'Chromosome',
+    'Start',
+    'End',
+    'Strand',
+]
+
+
+BULK_SCHEMA = {
+    'chrom': 'string',
+    'start': 'int64',
+    'end': 'int64',
+    'name': 'string',
+    'nearest_gene': 'string',
+    'nearest_gene_id': 'string',
+    'distance': 'int64',
+    'overlapping_genes': 'string',
+    'genes_in_window': 'string',
+}
+
+
+def load_gtf(cache_dir: str = DEFAULT_CACHE_DIR) -> AnnotationStore:
+  """Opens the local GTF store, downloading and indexing it on first use."""
+  print(f'Loading GTF from {GTF_URL} (cache: {cache_dir})...')
+  return AnnotationStore.open(cache_dir, GTF_URL)
 
 
 def parse_gene_input(genes: list[str]) -> list[str]:
@@ -91,7 +121,7 @@ def parse_coord(coord_str: str) -> tuple[str, int, int]:
 
 
 # --- Mode 1: Gene Symbol <-> Coord Lookup (from lookup_ensg_gtf) ---
-def run_gene_lookup(gtf: pd.DataFrame, genes_input: list[str]) -> None:
+def run_gene_lookup(gtf: AnnotationStore, genes_input: list[str]) -> None:
   """Looks up gene symbols or coordinates in GTF."""
   genes_of_interest = parse_gene_input(genes_input)
   coords_to_lookup, symbols_to_lookup = classify_queries(genes_of_interest)
@@ -100,24 +130,14 @@ def run_gene_lookup(gtf: pd.DataFrame, genes_input: list[str]) -> None:
 
   # Handle symbols
   if symbols_to_lookup:
-    mask = gtf['gene_name'].isin(symbols_to_lookup)
-    result_df = gtf[mask][
-        ['gene_name', 'gene_id_nopatch', 'Chromosome', 'Start', 'End', 'Strand']
-    ]
-    results.append(result_df)
+    rows = gtf.rows_for_symbols(symbols_to_lookup)
+    results.append(gtf.frame(rows, GENE_COLUMNS))
 
   # Handle coordinates
   for coord in coords_to_lookup:
     chrom, pos, _ = parse_coord(coord)
-    mask = (
-        (gtf['Chromosome'] == chrom)
-        & (gtf['Start'] <= pos)
-        & (gtf['End'] >= pos)
-    )
-    result_df = gtf[mask][
-        ['gene_name', 'gene_id_nopatch', 'Chromosome', 'Start', 'End', 'Strand']
-    ]
-    results.append(result_df)
+    rows = gtf.rows_overlapping(chrom, pos, pos)
+    results.append(gtf.frame(rows, GENE_COLUMNS))
 
   if not results:
     print('No matches found.')
@@ -131,7 +151,7 @@ def run_gene_lookup(gtf: pd.DataFrame, genes_input: list[str]) -> None:
 
 
 # --- Mode 2: Find Genes at Coordinate (from lookup_gene_at_coord) ---
-def run_coord_search(gtf: pd.DataFrame, coord: str, window: int) -> None:
+def run_coord_search(gtf: AnnotationStore, coord: str, window: int) -> None:
   """Finds genes near a coordinate."""
   chrom, start, end = parse_coord(coord)
 
@@ -144,13 +164,8 @@ def run_coord_search(gtf: pd.DataFrame, coord: str, window: int) -> None:
   print(f'\nSearching for genes at {chrom}:{search_start:,}-{search_end:,}')
   print('-' * 50)
 
-  mask = (
-      (gtf['Chromosome'] == chrom)
-      & (gtf['Start'] <= search_end)
-      & (gtf['End'] >= search_start)
-  )
-
-  matching_genes = gtf[mask].copy()
+  rows = gtf.rows_overlapping(chrom, search_start, search_end)
+  matching_genes = gtf.frame(rows)
 
   if matching_genes.empty:
     print('No genes found in this region.')
@@ -159,12 +174,13 @@ def run_coord_search(gtf: pd.DataFrame, coord: str, window: int) -> None:
   # Calculate distance if it's a single point query
   if start == end:
 
-    def calc_dist(row):
-      if row['Start'] <= start <= row['End']:
-        return 0
-      return min(abs(row['Start'] - start), abs(row['End'] - start))
-
-    matching_genes['Distance'] = matching_genes.apply(calc_dist, axis=1)
+    starts = matching_genes['Start'].to_numpy()
+    ends = matching_genes['End'].to_numpy()
+    matching_genes['Distance'] = np.where(
+        (starts <= start) & (start <= ends),
+        0,
+        np.minimum(np.abs(starts - start), np.abs(ends - start)),
+    )
     matching_genes = matching_genes.sort_values('Distance')
     cols = [
         'gene_name',
@@ -193,9 +209,218 @@ def run_coord_search(gtf: pd.DataFrame, coord: str, window: int) -> None:
     print(matching_genes[cols].drop_duplicates().to_string(index=False))
 
 
+# --- Mode 4: Bulk Nearest-Gene Annotation ---
+def _normalize_chrom(chrom: str) -> str:
+  chrom = chrom.strip()
+  if not chrom.startswith('chr'):
+    chrom = 'chr' + chrom
+  return 'chrM' if chrom == 'chrMT' else chrom
+
+
+def _iter_position_lines(path: str):
+  opener = gzip.open if path.endswith('.gz') else open
+  with opener(path, 'rt') as f:
+    for line in f:
+      line = line.rstrip('\n')
+      if line.strip():
+        yield line
+
+
+def read_positions(path: str) -> pd.DataFrame:
+  """Reads query positions from a BED, VCF or TSV/CSV file.
+
+  BED intervals are converted from 0-based half-open to the 1-based closed
+  coordinates used by --coord. VCF records use POS (and ID as the name). Other
+  files may hold `chr:pos[-end]` strings or `chrom, pos[, end][, name]`
+  columns; header and comment lines are skipped.
+
+  Args:
+    path: Input file, optionally gzipped.
+
+  Returns:
+    DataFrame with chrom, start, end and name columns, in input order.
+  """
+  lower = path.lower().removesuffix('.gz')
+  is_vcf = lower.endswith('.vcf')
+  is_bed = lower.endswith('.bed')
+  records = []
+  for line in _iter_position_lines(path):
+    if line.startswith('#') or line.startswith(('track', 'browser')):
+      continue
+    if is_vcf:
+      fields = line.split('\t')
+      pos = int(fields[1])
+      name = fields[2] if len(fields) > 2 and fields[2] != '.' else ''
+      records.append((_normalize_chrom(fields[0]), pos, pos, name))
+      continue
+    if is_bed:
+      fields = line.split('\t')
+      name = fields[3] if len(fields) > 3 else ''
+      records.append((
+          _normalize_chrom(fields[0]),
+          int(fields[1]) + 1,
+          int(fields[2]),
+          name,
+      ))
+      continue
+    fields = [x.strip() for x in re.split(r'[\t,]|\s+', line.strip())]
+    if re.match(r'^(chr)?[0-9XYMT]+:\d+', fields[0]):
+      chrom, start, end = parse_coord(fields[0].replace(',', ''))
+      name = fields[1] if len(fields) > 1 else ''
+      records.append((_normalize_chrom(chrom), start, end, name))
+      continue
+    if len(fields) < 2 or not fields[1].isdigit():
+      continue  # Header line.
+    start = int(fields[1])
+    end = int(fields[2]) if len(fields) > 2 and fields[2].isdigit() else start
+    rest = fields[3:] if len(fields) > 2 and fields[2].isdigit() else fields[2:]
+    records.append(
+        (_normalize_chrom(fields[0]), start, end, rest[0] if rest else '')
+    )
+  return pd.DataFrame(records, columns=['chrom', 'start', 'end', 'name'])
+
+
+def _expand_ranges(
+    lo: np.ndarray, hi: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+  """Returns (query, index) pairs for every index in [lo[i], hi[i])."""
+  counts = np.maximum(hi - lo, 0)
+  owners = np.repeat(np.arange(len(lo)), counts)
+  group_starts = np.cumsum(counts) - counts
+  offsets = np.arange(counts.sum()) - np.repeat(group_starts, counts)
+  return owners, np.repeat(lo, counts) + offsets
+
+
+def _overlapping_genes(
+    genes, starts: np.ndarray, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+  """Returns (query, gene) pairs for genes overlapping [starts, ends]."""
+  first = np.searchsorted(genes.end_max, starts, side='left')
+  last = np.searchsorted(genes.starts, ends, side='right')
+  owners, index = _expand_ranges(first, last)
+  keep = genes.ends[index] >= starts[owners]
+  return owners[keep], index[keep]
+
+
+def _join_gene_names(genes, owners, index, num_queries: int) -> list[str]:
+  names = [[] for _ in range(num_queries)]
+  for owner, name in zip(owners.tolist(), genes.names[index].tolist()):
+    if name:
+      names[owner].append(name)
+  return [','.join(dict.fromkeys(x)) for x in names]
+
+
+def nearest_genes(
+    genes, starts: np.ndarray, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+  """Finds the nearest gene for each query interval on one chromosome.
+
+  The distance matches `run_coord_search`: 0 when the gene overlaps the query,
+  otherwise the gap to the closer gene boundary.
+
+  Args:
+    genes: `GeneIntervals` for the chromosome (at least one gene).
+    starts: Query starts.
+    ends: Query ends (equal to starts for point queries).
+
+  Returns:
+    Positions into `genes` of the nearest gene, and the distances.
+  """
+  num_genes = len(genes.starts)
+  k = np.searchsorted(genes.starts, ends, side='right')
+  # Among genes starting at or before the query end, the furthest-reaching
+  # one either overlaps the query or is the closest upstream gene.
+  upstream = genes.end_argmax[np.maximum(k - 1, 0)]
+  upstream_dist = np.where(
+      k > 0, starts - genes.ends[upstream], np.iinfo(np.int64).max
+  )
+  downstream = np.minimum(k, num_genes - 1)
+  downstream_dist = np.where(
+      k < num_genes, genes.starts[downstream] - ends, np.iinfo(np.int64).max
+  )
+  use_upstream = upstream_dist <= downstream_dist
+  index = np.where(use_upstream, upstream, downstream)
+  distance = np.maximum(np.minimum(upstream_dist, downstream_dist), 0)
+  return index, distance
+
+
+def annotate_positions(
+    gtf: AnnotationStore, positions: pd.DataFrame, window: int
+) -> pd.DataFrame:
+  """Annotates positions on a single chromosome with nearby genes."""
+  positions = positions.sort_values('start', kind='stable')
+  starts = positions['start'].to_numpy(dtype=np.int64)
+  ends = positions['end'].to_numpy(dtype=np.int64)
+  num_queries = len(positions)
+  genes = gtf.gene_intervals(positions['chrom'].iloc[0])
+  result = positions.reset_index(drop=True)
+  if not len(genes.starts):
+    result['nearest_gene'] = ''
+    result['nearest_gene_id'] = ''
+    result['distance'] = pd.array([None] * num_queries, dtype='Int64')
+    result['overlapping_genes'] = ''
+    result['genes_in_window'] = ''
+    return result
+
+  index, distance = nearest_genes(genes, starts, ends)
+  result['nearest_gene'] = genes.names[index]
+  result['nearest_gene_id'] = genes.gene_ids[index]
+  result['distance'] = pd.array(distance, dtype='Int64')
+  owners, overlap = _overlapping_genes(genes, starts, ends)
+  result['overlapping_genes'] = _join_gene_names(
+      genes, owners, overlap, num_queries
+  )
+  owners, nearby = _overlapping_genes(genes, starts - window, ends + window)
+  result['genes_in_window'] = _join_gene_names(
+      genes, owners, nearby, num_queries
+  )
+  return result
+
+
+def run_bulk_coord_search(
+    gtf: AnnotationStore, positions_path: str, window: int, output: str
+) -> None:
+  """Annotates every position in a file and streams results to TSV/Parquet.
+
+  Positions are grouped by chromosome and sorted, then matched against the
+  gene intervals with binary-search sweeps; one chromosome is written at a
+  time.
+  """
+  positions = read_positions(positions_path)
+  print(f'Annotating {len(positions):,} positions from {positions_path}...')
+  is_parquet = output.endswith('.parquet')
+  if is_parquet:
+    schema = pa.schema([
+        (name, pa.string() if kind == 'string' else pa.int64())
+        for name, kind in BULK_SCHEMA.items()
+    ])
+    writer = parquet.ParquetWriter(output, schema)
+  else:
+    writer = open(output, 'w')
+
+  try:
+    header = True
+    for _, chrom_positions in positions.groupby('chrom', sort=False):
+      chunk = annotate_positions(gtf, chrom_positions, window)[
+          list(BULK_SCHEMA)
+      ]
+      if is_parquet:
+        writer.write_table(
+            pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        )
+      else:
+        chunk.to_csv(writer, sep='\t', index=False, header=header)
+      header = False
+    if header and not is_parquet:
+      writer.write('\t'.join(BULK_SCHEMA) + '\n')
+  finally:
+    writer.close()
+  print(f'Wrote {output}')
+
+
 # --- Mode 3: List and Filter Transcripts (from lookup_transcripts) ---
 def run_transcript_lookup(
-    gtf: pd.DataFrame,
+    gtf: AnnotationStore,
     genes_input: list[str],
     mane: bool,
     protein_coding: bool,
@@ -206,7 +431,7 @@ def run_transcript_lookup(
   """Lists and filters transcripts for genes."""
   genes_list = parse_gene_input(genes_input)
 
-  filtered = gtf[gtf['gene_name'].isin(genes_list)].copy()
+  filtered = gtf.frame(gtf.rows_for_symbols(genes_list))
 
   if filtered.empty:
     print(f'No data found for genes: {genes_list}')
@@ -274,6 +499,13 @@ def main(argv: Sequence[str] | None = None) -> None:
   group.add_argument(
       '--coord', help='Genomic coordinate for search (e.g. chr17:7675148).'
   )
+  group.add_argument(
+      '--positions',
+      help=(
+          'BED, VCF or TSV file of many positions to annotate with their'
+          ' nearest and overlapping genes (bulk mode; requires --output).'
+      ),
+  )
 
   parser.add_argument(
       '--window',
@@ -308,12 +540,28 @@ def main(argv: Sequence[str] | None = None) -> None:
   parser.add_argument(
       '--details', action='store_true', help='Show full transcript details.'
   )
+  parser.add_argument(
+      '--output',
+      help='Bulk mode output file (.tsv, or .parquet for Parquet).',
+  )
+  parser.add_argument(
+      '--annotation_cache',
+      default=DEFAULT_CACHE_DIR,
+      help=(
+          'Directory for the local indexed GTF store (default:'
+          ' $ALPHAGENOME_ANNOTATION_CACHE or ~/.cache/alphagenome/gencode).'
+      ),
+  )
 
   args = parser.parse_args(argv)
+  if args.positions is not None and not args.output:
+    parser.error('--positions requires --output.')
 
-  gtf = load_gtf()
+  gtf = load_gtf(args.annotation_cache)
 
-  if args.coord is not None:
+  if args.positions is not None:
+    run_bulk_coord_search(gtf, args.positions, args.window, args.output)
+  elif args.coord is not None:
     run_coord_search(gtf, args.coord, args.window)
   elif args.genes is not None:
     genes_list = [x.strip() for x in args.genes.split(',')]
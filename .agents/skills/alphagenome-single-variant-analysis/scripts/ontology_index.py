@@ -0,0 +1,347 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Inverted index over the tissue ontology mapping for fast term search.
+
+The index maps each token to a postings list of (document, weight) pairs,
+where a document is one ontology CURIE. Weights are BM25F term frequencies.
+They combine the biosample name field (weighted higher) with the rest of the
+metadata (CURIE, type, life stage, sources, assays, marks), each normalized
+by field length. At query time each query word is matched exactly, by prefix,
+or (for likely typos) fuzzily against the sorted vocabulary. Only the
+postings of matched terms are scored.
+
+`generate_ontology_mapping.py` writes the index next to the mapping file,
+together with a binary (pickled) copy of the mapping that loads several times
+faster than the JSON and also holds the per-CURIE metadata hashes used for
+incremental regeneration. `resolve_ontology_terms.py` loads the index, or
+rebuilds it when the mapping has changed.
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = []
+# ///
+
+from __future__ import annotations
+
+import bisect
+import collections
+import difflib
+import hashlib
+import json
+import math
+import os
+import pickle
+import re
+from typing import Any
+
+# Bump when tokenization or weighting changes so stale indexes are rebuilt.
+INDEX_VERSION = 1
+# Bump when the binary mapping payload changes.
+BINARY_MAPPING_VERSION = 1
+
+NAME_WEIGHT = 3.0
+METADATA_WEIGHT = 1.0
+K1 = 1.2
+B = 0.75
+
+PREFIX_WEIGHT = 0.7
+FUZZY_WEIGHT = 0.5
+FUZZY_CUTOFF = 0.8
+MAX_EXPANSIONS = 50
+
+
+def tokenize(text: str) -> list[str]:
+  """Lowercases and splits text into alphanumeric words of length > 2."""
+  text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text.lower())
+  return [t for t in text.split() if len(t) > 2]
+
+
+def get_ontology_index_path(mapping_path: str) -> str:
+  """Returns the index path stored next to a mapping JSON file."""
+  return os.path.splitext(mapping_path)[0] + '.index.json'
+
+
+def get_binary_mapping_path(mapping_path: str) -> str:
+  """Returns the binary mapping path stored next to a mapping JSON file."""
+  return os.path.splitext(mapping_path)[0] + '.pkl'
+
+
+def file_sha256(path: str) -> str:
+  digest = hashlib.sha256()
+  with open(path, 'rb') as f:
+    for block in iter(lambda: f.read(1 << 20), b''):
+      digest.update(block)
+  return digest.hexdigest()
+
+
+def _metadata_values(value: Any, key: str | None = None):
+  """Yields the leaf strings of a mapping entry, plus assay names."""
+  if isinstance(value, dict):
+    for k, v in value.items():
+      if key == 'assays':
+        yield k
+      yield from _metadata_values(v, k)
+  elif isinstance(value, list):
+    for v in value:
+      yield from _metadata_values(v, key)
+  elif value is not None and key != 'name':
+    yield str(value)
+
+
+def build_index(mapping: dict[str, Any], source_sha256: str = '') -> dict:
+  """Builds the JSON-serializable inverted index for a mapping."""
+  docs = []
+  name_tokens = []
+  meta_tokens = []
+  for curie, data in mapping.items():
+    biosample = data.get('biosample', {})
+    name = biosample.get('name', '')
+    docs.append({
+        'curie': curie,
+        'name': name,
+        'type': biosample.get('type', 'N/A'),
+        'assays': list(data.get('assays', {}).keys()),
+    })
+    name_tokens.append(collections.Counter(tokenize(name)))
+    meta_text = ' '.join([curie, *_metadata_values(data)])
+    meta_tokens.append(collections.Counter(tokenize(meta_text)))
+
+  num_docs = max(len(docs), 1)
+  avg_name = sum(sum(c.values()) for c in name_tokens) / num_docs or 1.0
+  avg_meta = sum(sum(c.values()) for c in meta_tokens) / num_docs or 1.0
+
+  postings = collections.defaultdict(list)
+  for doc_id, (names, metas) in enumerate(zip(name_tokens, meta_tokens)):
+    name_norm = 1 - B + B * sum(names.values()) / avg_name
+    meta_norm = 1 - B + B * sum(metas.values()) / avg_meta
+    for term in names.keys() | metas.keys():
+      tf = (
+          NAME_WEIGHT * names[term] / name_norm
+          + METADATA_WEIGHT * metas[term] / meta_norm
+      )
+      postings[term].append([doc_id, round(tf, 6)])
+
+  return {
+      'version': INDEX_VERSION,
+      'source_sha256': source_sha256,
+      'docs': docs,
+      'postings': dict(sorted(postings.items())),
+  }
+
+
+def write_index(index: dict, path: str) -> None:
+  tmp_path = f'{path}.tmp{os.getpid()}'
+  with open(tmp_path, 'w') as f:
+    json.dump(index, f, separators=(',', ':'))
+  os.replace(tmp_path, path)
+
+
+def write_binary_mapping(
+    mapping: dict[str, Any],
+    path: str,
+    source_sha256: str,
+    row_hashes: dict[str, str] | None = None,
+) -> None:
+  """Writes the mapping and its metadata hashes as a pickle.
+
+  Args:
+    mapping: The ontology mapping.
+    path: Output path (see get_binary_mapping_path).
+    source_sha256: SHA-256 of the mapping JSON this copy matches.
+    row_hashes: Per-CURIE hashes of the metadata rows the entries were built
+      from, for incremental regeneration.
+  """
+  payload = {
+      'version': BINARY_MAPPING_VERSION,
+      'source_sha256': source_sha256,
+      'row_hashes': row_hashes or {},
+      'mapping': mapping,
+  }
+  tmp_path = f'{path}.tmp{os.getpid()}'
+  with open(tmp_path, 'wb') as f:
+    pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+  os.replace(tmp_path, path)
+
+
+def read_binary_mapping(
+    mapping_path: str, source_sha256: str | None = None
+) -> dict[str, Any] | None:
+  """Returns the binary mapping payload if it matches the JSON, else None.
+
+  Only files written by write_binary_mapping next to the mapping are read.
+  """
+  if source_sha256 is None:
+    source_sha256 = file_sha256(mapping_path)
+  try:
+    with open(get_binary_mapping_path(mapping_path), 'rb') as f:
+      payload = pickle.load(f)
+  except (OSError, pickle.UnpicklingError, EOFError):
+    return None
+  if (
+      not isinstance(payload, dict)
+      or payload.get('version') != BINARY_MAPPING_VERSION
+      or payload.get('source_sha256') != source_sha256
+  ):
+    return None
+  return payload
+
+
+def load_mapping(
+    mapping_path: str, source_sha256: str | None = None
+) -> dict[str, Any]:
+  """Loads the mapping, from the binary copy when it is up to date."""
+  payload = read_binary_mapping(mapping_path, source_sha256)
+  if payload is not None:
+    return payload['mapping']
+  with open(mapping_path) as f:
+    return json.load(f)
+
+
+class OntologyIndex:
+  """Searchable view of a built index."""
+
+  def __init__(self, index: dict):
+    self.docs = index['docs']
+    self.postings = index['postings']
+    self.terms = sorted(self.postings)
+    num_docs = len(self.docs)
+    self.idf = {
+        term: math.log(1 + (num_docs - len(p) + 0.5) / (len(p) + 0.5))
+        for term, p in self.postings.items()
+    }
+
+  @classmethod
+  def from_mapping(cls, mapping: dict[str, Any]) -> OntologyIndex:
+    return cls(build_index(mapping))
+
+  @classmethod
+  def load(cls, mapping_path: str, save: bool = True) -> OntologyIndex:
+    """Loads the index for mapping_path, rebuilding it if missing or stale.
+
+    Args:
+      mapping_path: Path to tissue_ontology_mapping.json.
+      save: Whether to write a rebuilt index next to the mapping.
+
+    Returns:
+      The loaded index.
+    """
+    index_path = get_ontology_index_path(mapping_path)
+    source_sha256 = file_sha256(mapping_path)
+    try:
+      with open(index_path) as f:
+        index = json.load(f)
+      if (
+          index.get('version') == INDEX_VERSION
+          and index.get('source_sha256') == source_sha256
+      ):
+        return cls(index)
+    except (OSError, ValueError):
+      pass
+    index = build_index(
+        load_mapping(mapping_path, source_sha256), source_sha256
+    )
+    if save:
+      try:
+        write_index(index, index_path)
+      except OSError:
+        pass  # Read-only resources; the in-memory index still works.
+    return cls(index)
+
+  def _prefix_terms(self, word: str) -> list[str]:
+    matches = []
+    i = bisect.bisect_right(self.terms, word)
+    while (
+        i < len(self.terms)
+        and self.terms[i].startswith(word)
+        and len(matches) < MAX_EXPANSIONS
+    ):
+      matches.append(self.terms[i])
+      i += 1
+    return matches
+
+  def _fuzzy_terms(self, word: str) -> list[tuple[str, float]]:
+    candidates = [t for t in self.terms if abs(len(t) - len(word)) <= 2]
+    matcher = difflib.SequenceMatcher(b=word)
+    scored = []
+    for term in candidates:
+      matcher.set_seq1(term)
+      if matcher.real_quick_ratio() < FUZZY_CUTOFF:
+        continue
+      if matcher.quick_ratio() < FUZZY_CUTOFF:
+        continue
+      ratio = matcher.ratio()
+      if ratio >= FUZZY_CUTOFF:
+        scored.append((term, ratio))
+    scored.sort(key=lambda x: -x[1])
+    return scored[:3]
+
+  def expand_query(
+      self, query: str, prefix: bool = True, fuzzy: bool = True
+  ) -> dict[str, list[tuple[str, float]]]:
+    """Maps each query word to the index terms it matches, with weights.
+
+    Exact matches have weight 1. Prefix matches are always added. Fuzzy
+    matches are only tried when a word matches nothing else.
+
+    Args:
+      query: Free-text query.
+      prefix: Whether to match index terms that start with a query word.
+      fuzzy: Whether to fall back to close spellings of unmatched words.
+
+    Returns:
+      A dict from each query word to its (term, weight) matches.
+    """
+    expanded = {}
+    for word in sorted(set(tokenize(query))):
+      matches = []
+      if word in self.postings:
+        matches.append((word, 1.0))
+      if prefix:
+        matches.extend((t, PREFIX_WEIGHT) for t in self._prefix_terms(word))
+      if fuzzy and not matches:
+        matches.extend(
+            (t, FUZZY_WEIGHT * ratio) for t, ratio in self._fuzzy_terms(word)
+        )
+      expanded[word] = matches
+    return expanded
+
+  def search(
+      self,
+      query: str,
+      limit: int = 10,
+      prefix: bool = True,
+      fuzzy: bool = True,
+  ) -> list[dict[str, Any]]:
+    """Returns the top documents for query ranked by BM25F score."""
+    scores = collections.defaultdict(float)
+    for matches in self.expand_query(query, prefix, fuzzy).values():
+      # A query word counts once per document, via its best-scoring term.
+      best = {}
+      for term, weight in matches:
+        idf = self.idf[term]
+        for doc_id, tf in self.postings[term]:
+          score = weight * idf * tf * (K1 + 1) / (K1 + tf)
+          if score > best.get(doc_id, 0.0):
+            best[doc_id] = score
+      for doc_id, score in best.items():
+        scores[doc_id] += score
+
+    results = [
+        dict(self.docs[doc_id], score=score) for doc_id, score in scores.items()
+    ]
+    # Prefer shorter, more specific names when scores tie.
+    results.sort(key=lambda x: (x['score'], -len(x['name'])), reverse=True)
+    return results[:limit]
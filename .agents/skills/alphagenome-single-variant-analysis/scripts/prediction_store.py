@@ -0,0 +1,400 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk store of raw AlphaGenome variant predictions.
+
+Each `predict_variant` result is saved under its prediction interval and
+variant. There is one compressed `.npz` per output type and allele:
+
+  <root>/<chrom>_<start>_<end>/ref/<OUTPUT_TYPE>.npz
+  <root>/<chrom>_<start>_<end>/alt/<pos>_<ref>_<alt>/<OUTPUT_TYPE>.npz
+
+Variants that share a prediction interval share the REF files. Each allele
+directory has a `manifest.json` that records which outputs are stored and the
+ontology terms they were requested with (null means all tracks). A stored
+output can serve any later request whose ontology terms are a subset of the
+stored ones. Those requests are filtered locally, so re-plotting or
+re-interpreting with other tissues does not call the model again.
+
+Predictions depend on their sequence context, so entries are only reused for
+exactly the same interval, never sliced out of a larger one.
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#   "alphagenome",
+#   "numpy",
+#   "pandas",
+# ]
+# ///
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import threading
+from typing import Iterable
+
+from alphagenome.data import genome
+from alphagenome.data import junction_data
+from alphagenome.data import track_data
+from alphagenome.models import dna_client
+from alphagenome.models import dna_output
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.environ.get('ALPHAGENOME_PREDICTION_STORE') or (
+    os.path.join(
+        os.path.expanduser('~'), '.cache', 'alphagenome', 'predictions'
+    )
+)
+
+_MANIFEST_FILE = 'manifest.json'
+_MAX_ALLELE_KEY = 64
+_OUTPUT_FIELDS = {
+    field.metadata['output_type']: field.name
+    for field in dataclasses.fields(dna_output.Output)
+}
+
+
+def interval_key(interval: genome.Interval) -> str:
+  return f'{interval.chromosome}_{interval.start}_{interval.end}'
+
+
+def variant_key(variant: genome.Variant) -> str:
+  alleles = f'{variant.reference_bases}_{variant.alternate_bases}'
+  key = f'{variant.position}_{alleles}'
+  if len(key) > _MAX_ALLELE_KEY:
+    digest = hashlib.sha1(key.encode('ascii')).hexdigest()[:16]
+    key = f'{variant.position}_{digest}'
+  return key
+
+
+def _normalize_terms(ontology_terms: Iterable[str] | None) -> list[str] | None:
+  if ontology_terms is None:
+    return None
+  return sorted({str(t) for t in ontology_terms})
+
+
+def _covers(stored: list[str] | None, requested: list[str] | None) -> bool:
+  if stored is None:
+    return True
+  return requested is not None and set(requested) <= set(stored)
+
+
+def _metadata_to_json(metadata: pd.DataFrame) -> np.ndarray:
+  return np.array(metadata.to_json(orient='table', index=False))
+
+
+def _metadata_from_json(value: np.ndarray) -> pd.DataFrame:
+  return pd.read_json(io.StringIO(str(value)), orient='table')
+
+
+def _encode(data: track_data.TrackData | junction_data.JunctionData) -> dict:
+  arrays = {
+      'values': np.asarray(data.values),
+      'metadata': _metadata_to_json(data.metadata),
+      'interval': np.array(str(data.interval) if data.interval else ''),
+  }
+  if isinstance(data, junction_data.JunctionData):
+    arrays['kind'] = np.array('junctions')
+    arrays['junction_chrom'] = np.array(
+        [j.chromosome for j in data.junctions], dtype=str
+    )
+    arrays['junction_start'] = np.array(
+        [j.start for j in data.junctions], dtype=np.int64
+    )
+    arrays['junction_end'] = np.array(
+        [j.end for j in data.junctions], dtype=np.int64
+    )
+    arrays['junction_strand'] = np.array(
+        [j.strand for j in data.junctions], dtype=str
+    )
+  else:
+    arrays['kind'] = np.array('tracks')
+    arrays['resolution'] = np.array(data.resolution)
+  return arrays
+
+
+def _decode(
+    npz: np.lib.npyio.NpzFile,
+) -> track_data.TrackData | junction_data.JunctionData:
+  metadata = _metadata_from_json(npz['metadata'])
+  interval_str = str(npz['interval'])
+  interval = genome.Interval.from_str(interval_str) if interval_str else None
+  if str(npz['kind']) == 'junctions':
+    junctions = np.array(
+        [
+            genome.Interval(str(chrom), int(start), int(end), str(strand))
+            for chrom, start, end, strand in zip(
+                npz['junction_chrom'],
+                npz['junction_start'],
+                npz['junction_end'],
+                npz['junction_strand'],
+            )
+        ],
+        dtype=object,
+    )
+    return junction_data.JunctionData(
+        junctions=junctions,
+        values=npz['values'],
+        metadata=metadata,
+        interval=interval,
+    )
+  return track_data.TrackData(
+      values=npz['values'],
+      metadata=metadata,
+      resolution=int(npz['resolution']),
+      interval=interval,
+  )
+
+
+def _filter_ontology(data, ontology_terms: list[str] | None):
+  if data is None or ontology_terms is None:
+    return data
+  if 'ontology_curie' not in data.metadata.columns:
+    return data
+  mask = data.metadata['ontology_curie'].isin(ontology_terms).to_numpy()
+  return data.filter_tracks(mask)
+
+
+class PredictionStore:
+  """Saves and loads `predict_variant` outputs keyed by interval and variant.
+
+  Safe to use from several threads of one process.
+  """
+
+  def __init__(self, root: str = DEFAULT_STORE_DIR):
+    self.root = root
+    self._lock = threading.Lock()
+
+  def _allele_dir(
+      self, interval: genome.Interval, variant: genome.Variant | None
+  ) -> str:
+    base = os.path.join(self.root, interval_key(interval))
+    if variant is None:
+      return os.path.join(base, 'ref')
+    return os.path.join(base, 'alt', variant_key(variant))
+
+  def _read_manifest(self, directory: str) -> dict[str, list[str] | None]:
+    try:
+      with open(os.path.join(directory, _MANIFEST_FILE)) as f:
+        return json.load(f)
+    except (OSError, ValueError):
+      return {}
+
+  def _missing(
+      self,
+      directory: str,
+      outputs: Iterable[dna_client.OutputType],
+      ontology_terms: list[str] | None,
+  ) -> list[dna_client.OutputType]:
+    manifest = self._read_manifest(directory)
+    return [
+        o
+        for o in outputs
+        if o.name not in manifest
+        or not _covers(manifest[o.name], ontology_terms)
+    ]
+
+  def request_terms(
+      self,
+      interval: genome.Interval,
+      variant: genome.Variant,
+      requested_outputs: Iterable[dna_client.OutputType],
+      ontology_terms: Iterable[str] | None,
+  ) -> list[str] | None:
+    """Returns the ontology terms to fetch so stored tracks are not lost.
+
+    Saving replaces an output file, so a request for new terms fetches the
+    union of those and the terms already stored for the same outputs.
+    """
+    terms = _normalize_terms(ontology_terms)
+    if terms is None:
+      return None
+    merged = set(terms)
+    for directory in (
+        self._allele_dir(interval, None),
+        self._allele_dir(interval, variant),
+    ):
+      manifest = self._read_manifest(directory)
+      for output_type in requested_outputs:
+        if output_type.name in manifest:
+          stored = manifest[output_type.name]
+          if stored is None:
+            return None
+          merged.update(stored)
+    return sorted(merged)
+
+  def contains(
+      self,
+      interval: genome.Interval,
+      variant: genome.Variant,
+      requested_outputs: Iterable[dna_client.OutputType],
+      ontology_terms: Iterable[str] | None = None,
+  ) -> bool:
+    """Returns True if the store can answer this predict_variant request."""
+    terms = _normalize_terms(ontology_terms)
+    outputs = list(requested_outputs)
+    return not self._missing(
+        self._allele_dir(interval, None), outputs, terms
+    ) and not self._missing(self._allele_dir(interval, variant), outputs, terms)
+
+  def _save_output(
+      self,
+      directory: str,
+      output: dna_output.Output,
+      requested_outputs: list[dna_client.OutputType],
+      ontology_terms: list[str] | None,
+      overwrite: bool = False,
+  ) -> None:
+    missing = requested_outputs
+    if not overwrite:
+      missing = self._missing(directory, requested_outputs, ontology_terms)
+    if not missing:
+      return  # E.g. the REF of an interval already saved for another variant.
+    os.makedirs(directory, exist_ok=True)
+    saved = {}
+    for output_type in missing:
+      data = output.get(output_type)
+      # Outputs the model did not return are recorded too, so they are not
+      # requested again.
+      saved[output_type.name] = ontology_terms
+      if data is None:
+        continue
+      path = os.path.join(directory, f'{output_type.name}.npz')
+      tmp_path = f'{path}.tmp{os.getpid()}.{threading.get_ident()}.npz'
+      np.savez_compressed(tmp_path, **_encode(data))
+      os.replace(tmp_path, path)
+    with self._lock:
+      manifest = self._read_manifest(directory)
+      manifest.update(saved)
+      tmp_path = os.path.join(directory, f'{_MANIFEST_FILE}.tmp')
+      with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+      os.replace(tmp_path, os.path.join(directory, _MANIFEST_FILE))
+
+  def save(
+      self,
+      interval: genome.Interval,
+      variant: genome.Variant,
+      prediction: dna_output.VariantOutput,
+      requested_outputs: Iterable[dna_client.OutputType],
+      ontology_terms: Iterable[str] | None = None,
+      overwrite: bool = False,
+  ) -> None:
+    """Saves the REF and ALT outputs of a predict_variant call.
+
+    Args:
+      interval: The prediction interval.
+      variant: The predicted variant.
+      prediction: The predict_variant result.
+      requested_outputs: Output types that were requested.
+      ontology_terms: Ontology terms that were requested (None for all).
+      overwrite: Replace outputs that are already stored. By default only
+        outputs not yet covered are written.
+    """
+    outputs = list(requested_outputs)
+    terms = _normalize_terms(ontology_terms)
+    self._save_output(
+        self._allele_dir(interval, None),
+        prediction.reference,
+        outputs,
+        terms,
+        overwrite,
+    )
+    self._save_output(
+        self._allele_dir(interval, variant),
+        prediction.alternate,
+        outputs,
+        terms,
+        overwrite,
+    )
+
+  def _load_output(
+      self,
+      directory: str,
+      requested_outputs: list[dna_client.OutputType],
+      ontology_terms: list[str] | None,
+  ) -> dna_output.Output:
+    fields = {}
+    for output_type in requested_outputs:
+      path = os.path.join(directory, f'{output_type.name}.npz')
+      if not os.path.exists(path):
+        continue  # Requested but not returned by the model.
+      with np.load(path) as npz:
+        data = _filter_ontology(_decode(npz), ontology_terms)
+      fields[_OUTPUT_FIELDS[output_type]] = data
+    return dna_output.Output(**fields)
+
+  def load(
+      self,
+      interval: genome.Interval,
+      variant: genome.Variant,
+      requested_outputs: Iterable[dna_client.OutputType],
+      ontology_terms: Iterable[str] | None = None,
+  ) -> dna_output.VariantOutput | None:
+    """Returns the stored prediction filtered to ontology_terms, or None."""
+    outputs = list(requested_outputs)
+    terms = _normalize_terms(ontology_terms)
+    if not self.contains(interval, variant, outputs, terms):
+      return None
+    return dna_output.VariantOutput(
+        reference=self._load_output(
+            self._allele_dir(interval, None), outputs, terms
+        ),
+        alternate=self._load_output(
+            self._allele_dir(interval, variant), outputs, terms
+        ),
+    )
+
+
+def predict_variant_cached(
+    dna_model: dna_client.DnaClient | None,
+    store: PredictionStore | None,
+    *,
+    interval: genome.Interval,
+    variant: genome.Variant,
+    requested_outputs: Iterable[dna_client.OutputType],
+    ontology_terms: Iterable[str] | None,
+) -> dna_output.VariantOutput:
+  """Same as `dna_model.predict_variant`, served from and saved to store."""
+  outputs = list(requested_outputs)
+  if store is not None:
+    prediction = store.load(interval, variant, outputs, ontology_terms)
+    if prediction is not None:
+      print(f'Loaded stored prediction for {variant} from {store.root}')
+      return prediction
+  if dna_model is None:
+    raise ValueError(f'No stored prediction for {variant} and no client.')
+  fetch_terms = ontology_terms
+  if store is not None:
+    fetch_terms = store.request_terms(
+        interval, variant, outputs, ontology_terms
+    )
+  prediction = dna_model.predict_variant(
+      interval=interval,
+      variant=variant,
+      requested_outputs=outputs,
+      ontology_terms=fetch_terms,
+  )
+  if store is not None:
+    store.save(interval, variant, prediction, outputs, fetch_terms)
+    if fetch_terms != _normalize_terms(ontology_terms):
+      return store.load(interval, variant, outputs, ontology_terms)
+  return prediction
@@ -15,9 +15,12 @@
 """Resolves ontology terms by searching the AlphaGenome ontology mapping file for closest matches.
 
 This script acts as a candidate retriever for mapping free-text queries to
-AlphaGenome-compatible ontology terms. It performs a fast,
-simple word-overlap search over the available tissues and returns the top
-matches ranked by score.
+AlphaGenome-compatible ontology terms. It searches a precomputed inverted
+index over the available tissues (see ontology_index.py) with BM25-style
+scoring, where words in the biosample name count more than words elsewhere in
+the metadata. Query words also match by prefix ("hepat" -> "hepatocyte"), and
+unmatched words fall back to close spellings. Many queries can be resolved in
+one run.
 
 Design Note:
   This tool acts as a simple candidate retriever for ontology mapping.
@@ -32,6 +35,8 @@ Usage:
 Examples:
   uv run resolve_ontology_terms.py --query='liver'
   uv run resolve_ontology_terms.py --query='k562' --limit=5
+  uv run resolve_ontology_terms.py --query='liver' --query='left ventricle'
+  uv run resolve_ontology_terms.py --queries_file=tissues.txt --limit=3
 """
 
 # /// script
@@ -44,13 +49,13 @@ Examples:
 # ///
 
 import argparse
-import json
 import os
-import re
 import sys
 from typing import Any, Sequence
 
 import dotenv
+from ontology_index import OntologyIndex
+from ontology_index import tokenize
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 RESOURCES_DIR = os.path.join(SCRIPT_DIR, "..", "resources")
@@ -59,47 +64,68 @@ MAPPING_FILE = os.path.join(RESOURCES_DIR, "tissue_ontology_mapping.json")
 
 def normalize_and_split(text: str) -> set[str]:
   """Lowercases and splits text into alphanumeric words of length > 2."""
-  text = re.sub(r"[^a-zA-Z0-9\s]", " ", text.lower())
-  return {t.strip() for t in text.split() if len(t.strip()) > 2}
+  return set(tokenize(text))
 
 
 def search_ontology(
-    query: str, mapping: dict[str, Any], limit: int = 10
+    query: str,
+    index: OntologyIndex | dict[str, Any],
+    limit: int = 10,
+    exact: bool = False,
 ) -> list[dict[str, Any]]:
-  """Search for tissues matching the query words."""
-  query_words = normalize_and_split(query)
-
-  if not query_words:
-    return []
-
-  results = []
-  for curie, data in mapping.items():
-    name = data.get("biosample", {}).get("name", "")
-    # Flatten all metadata for searching
-    full_text = f"{curie} {name} {str(data)}"
-    record_words = normalize_and_split(full_text)
-
-    # Calculate intersection score
-    # Score is the number of query words found in the record
-    score = len(query_words & record_words)
-
-    # Give extra weight if the word is in the specific name
-    name_words = normalize_and_split(name)
-    score += len(query_words & name_words) * 2.0
-
-    if score > 0:
-      results.append({
-          "curie": curie,
-          "name": name,
-          "type": data.get("biosample", {}).get("type", "N/A"),
-          "assays": list(data.get("assays", {}).keys()),
-          "score": score,
-      })
-
-  # Sort by score descending, then by name length
-  # (prefer shorter, more specific names if score tied)
-  results.sort(key=lambda x: (x["score"], -len(x["name"])), reverse=True)
-  return results[:limit]
+  """Search for tissues matching the query words.
+
+  Args:
+    query: Free-text tissue or cell type query.
+    index: A loaded OntologyIndex, or a raw mapping dict (indexed on the fly).
+    limit: Maximum number of results.
+    exact: Only match whole words (no prefix or fuzzy matching).
+
+  Returns:
+    Result dicts with curie, name, type, assays and score, best first.
+  """
+  if not isinstance(index, OntologyIndex):
+    index = OntologyIndex.from_mapping(index)
+  return index.search(query, limit, prefix=not exact, fuzzy=not exact)
+
+
+def print_results(
+    query: str,
+    index: OntologyIndex,
+    results: list[dict[str, Any]],
+    exact: bool = False,
+) -> None:
+  """Prints the result table for one query."""
+  print(f"\nSearch results for: '{query}'")
+  print(f"Query words used: {normalize_and_split(query)}")
+  approximate = {
+      word: [term for term, _ in matches if term != word]
+      for word, matches in index.expand_query(
+          query, prefix=not exact, fuzzy=not exact
+      ).items()
+  }
+  approximate = {word: terms for word, terms in approximate.items() if terms}
+  if approximate:
+    print("Approximate matches (prefix/spelling):")
+    for word, terms in approximate.items():
+      shown = ", ".join(terms[:5]) + (", ..." if len(terms) > 5 else "")
+      print(f"  {word} -> {shown}")
+  print("-" * 60)
+
+  if not results:
+    print("No matches found.")
+  else:
+    print(
+        f"{'Rank':<4} | {'ID':<15} | {'Name':<40} | {'Type':<10} | {'Score':<5}"
+    )
+    print("-" * 80)
+    for i, res in enumerate(results):
+      # Truncate name if too long for table
+      name = res["name"][:37] + "..." if len(res["name"]) > 40 else res["name"]
+      print(
+          f"[{i+1:<2}] | {res['curie']:<15} | {name:<40} | {res['type']:<10} |"
+          f" {res['score']:.1f}"
+      )
 
 
 def main(argv: Sequence[str] | None = None) -> None:
@@ -108,13 +134,32 @@ def main(argv: Sequence[str] | None = None) -> None:
       description="Resolves ontology terms by searching available tracks."
   )
   parser.add_argument(
-      "--query", required=True, help="Tissue name or keyword to search for."
+      "--query",
+      action="append",
+      default=[],
+      help="Tissue name or keyword to search for (repeat for several).",
+  )
+  parser.add_argument(
+      "--queries_file",
+      help="File with one query per line, resolved in a single run.",
   )
   parser.add_argument(
       "--limit", type=int, default=10, help="Max number of results to return."
   )
+  parser.add_argument(
+      "--exact",
+      action="store_true",
+      help="Only match whole words (disable prefix and fuzzy matching).",
+  )
   args = parser.parse_args(argv)
 
+  queries = list(args.query)
+  if args.queries_file:
+    with open(args.queries_file) as f:
+      queries.extend(line.strip() for line in f if line.strip())
+  if not queries:
+    parser.error("Provide --query and/or --queries_file.")
+
   if not os.path.exists(MAPPING_FILE):
     print(
         f"Error: Mapping file not found at {MAPPING_FILE}.",
@@ -126,29 +171,10 @@ def main(argv: Sequence[str] | None = None) -> None:
     )
     return
 
-  with open(MAPPING_FILE, "r") as f:
-    mapping = json.load(f)
-
-  results = search_ontology(args.query, mapping, args.limit)
-
-  print(f"\nSearch results for: '{args.query}'")
-  print(f"Query words used: {normalize_and_split(args.query)}")
-  print("-" * 60)
-
-  if not results:
-    print("No matches found.")
-  else:
-    print(
-        f"{'Rank':<4} | {'ID':<15} | {'Name':<40} | {'Type':<10} | {'Score':<5}"
-    )
-    print("-" * 80)
-    for i, res in enumerate(results):
-      # Truncate name if too long for table
-      name = res["name"][:37] + "..." if len(res["name"]) > 40 else res["name"]
-      print(
-          f"[{i+1:<2}] | {res['curie']:<15} | {name:<40} | {res['type']:<10} |"
-          f" {res['score']:.1f}"
-      )
+  index = OntologyIndex.load(MAPPING_FILE)
+  for query in queries:
+    results = search_ontology(query, index, args.limit, args.exact)
+    print_results(query, index, results, args.exact)
 
 
 if __name__ == "__main__":
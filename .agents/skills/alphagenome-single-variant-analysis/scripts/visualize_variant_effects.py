@@ -65,6 +65,8 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from prediction_store import predict_variant_cached
+from prediction_store import PredictionStore
 
 GTF_URL = (
     'https://storage.googleapis.com/alphagenome/reference/gencode/'
@@ -240,73 +242,108 @@ class ColoredSashimi(plot_components.Sashimi):
         ax.set_ylabel(ylabel)
 
 
-def dynamic_label(track: Any, label_suffix: str = '') -> str:
-  """Constructs a label based on available metadata columns."""
-  if track is None or track.metadata.empty:
-    return f'Track {label_suffix}'
+# Metadata columns that name a ChIP target, in order of preference.
+TARGET_COLUMNS = (
+    'target',
+    'antibody',
+    'bio_target',
+    'experiment_target',
+    'target_label',
+)
+
+
+def _join_label_parts(
+    label: pd.Series,
+    started: pd.Series,
+    part: pd.Series,
+    present: pd.Series | None = None,
+) -> tuple[pd.Series, pd.Series]:
+  """Appends part to label where present (default: every row)."""
+  joined = label.mask(started, label + ' ') + part
+  if present is None:
+    return joined, started | True
+  return label.mask(present, joined), started | present
+
+
+def metadata_labels(
+    metadata: pd.DataFrame, label_suffix: str = ''
+) -> pd.Series:
+  """Constructs a label for every track from the metadata columns.
+
+  Labels are built from the assay title, the first non-empty target column
+  and the biosample name, in that order.
 
-  cols = track.metadata.columns
-  parts = []
+  Args:
+    metadata: Track metadata, one row per track.
+    label_suffix: Suffix to append to each label.
 
-  # Get first row for labeling
-  row = track.metadata.iloc[0]
+  Returns:
+    A Series of labels aligned with metadata.
+  """
+  cols = metadata.columns
+  index = metadata.index
+  label = pd.Series('', index=index, dtype=object)
+  started = pd.Series(False, index=index)
+  title = target = None
 
   # Assay / Output Type
   if 'Assay title' in cols:
-    title = str(row['Assay title'])
+    title = metadata['Assay title'].astype(str)
     # Clean up long titles for display
-    if 'total RNA-seq' in title:
-      title = 'Total RNA'
-    elif 'polyA plus RNA-seq' in title:
-      title = 'PolyA RNA'
-    parts.append(title)
-
-  # Target / Antibody (Critically important for ChIP)
-  # Check common column names for TF/Histone targets
-  target_cols = [
-      'target',
-      'antibody',
-      'bio_target',
-      'experiment_target',
-      'target_label',
-  ]
-  for c in target_cols:
-    if c in cols:
-      val = str(row[c]).strip()
-      if val and val.lower() != 'nan' and val.lower() != 'none':
-        parts.append(val)
-        break  # Use the first valid target column found
+    title = title.mask(
+        title.str.contains('total RNA-seq', regex=False), 'Total RNA'
+    ).mask(
+        ~title.str.contains('total RNA-seq', regex=False)
+        & title.str.contains('polyA plus RNA-seq', regex=False),
+        'PolyA RNA',
+    )
+    label, started = _join_label_parts(label, started, title)
+
+  # Target / Antibody (Critically important for ChIP). Each track uses the
+  # first target column with a valid value.
+  target_cols = [c for c in TARGET_COLUMNS if c in cols]
+  if target_cols:
+    target = pd.Series('', index=index, dtype=object)
+    has_target = pd.Series(False, index=index)
+    for c in target_cols:
+      val = metadata[c].astype(str).str.strip()
+      valid = (val != '') & ~val.str.lower().isin(['nan', 'none'])
+      target = target.mask(~has_target & valid, val)
+      has_target |= valid
+    label, started = _join_label_parts(label, started, target, has_target)
 
   # Clean up name if it contains weird characters like $
   # (User reported "$aorta" in labels)
-  name = row.get('name', '')
-  if isinstance(name, str):
-    name = name.lstrip('$')  # Remove leading $
-    if name and name.lower() != 'nan':
-      # Only add name if it provides new info (not just a duplicate of target)
-      if name not in parts:
-        parts.append(name)
-
-  parts.append(label_suffix)
-  return ' '.join(parts).strip()
+  if 'name' in cols:
+    is_str = metadata['name'].map(lambda x: isinstance(x, str)).astype(bool)
+    name = metadata['name'].where(is_str, '').astype(str).str.lstrip('$')
+    show_name = is_str & (name != '') & (name.str.lower() != 'nan')
+    # Only add name if it provides new info (not just a duplicate of target)
+    if title is not None:
+      show_name &= name != title
+    if target is not None:
+      show_name &= ~has_target | (name != target)
+    label, started = _join_label_parts(label, started, name, show_name)
+
+  label, _ = _join_label_parts(
+      label, started, pd.Series(label_suffix, index=index)
+  )
+  return label.str.strip()
 
 
-def filter_preference(track: Any) -> Any:
-  """Prefers 'total RNA-seq' over 'polyA plus RNA-seq' if both exist.
-
-  Also aggressively dedups if 'Assay title' is not present but 'biosample_type'
-  or implicit duplicates exist.
+def dynamic_label(track: Any, label_suffix: str = '') -> str:
+  """Constructs a label based on available metadata columns."""
+  if track is None or track.metadata.empty:
+    return f'Track {label_suffix}'
+  return metadata_labels(track.metadata.iloc[:1], label_suffix).iloc[0]
 
-  Args:
-    track: The track to filter.
 
-  Returns:
-    The filtered track.
-  """
-  if track is None or len(track.metadata) < 2:
-    return track
+def _preferred_rows(metadata: pd.DataFrame) -> np.ndarray | None:
+  """Returns a mask of total RNA-seq rows if both total and polyA exist."""
+  if len(metadata) < 2:
+    return None
 
-  cols = track.metadata.columns
+  cols = metadata.columns
   # Check for 'Assay title' or 'Assay Title'
   title_col = None
   if 'Assay title' in cols:
@@ -315,7 +352,7 @@ def filter_preference(track: Any) -> Any:
     title_col = 'Assay Title'
 
   if title_col:
-    titles = track.metadata[title_col].unique()
+    titles = metadata[title_col].unique()
     # Case insensitive check
     titles_lower = [t.lower() for t in titles if isinstance(t, str)]
 
@@ -324,43 +361,38 @@ def filter_preference(track: Any) -> Any:
 
     if has_total and has_polya:
       # Filter to total RNA-seq only
-      mask = track.metadata[title_col].str.contains(
-          'total RNA-seq', case=False, na=False
+      return (
+          metadata[title_col]
+          .str.contains('total RNA-seq', case=False, na=False)
+          .to_numpy(dtype=bool)
       )
-      return track.filter_tracks(np.flatnonzero(mask.values))
 
-  return track
+  return None
 
 
-def get_deduplicated_indices(
-    track: Any, label_suffix: str = '', max_tracks: int = 5
-) -> list[int]:
-  """Returns indices of tracks with unique labels.
+def filter_preference(track: Any) -> Any:
+  """Prefers 'total RNA-seq' over 'polyA plus RNA-seq' if both exist.
 
-  When multiple tracks produce the same label (via `dynamic_label`), only the
-  index of the first track with that label is kept.
+  Also aggressively dedups if 'Assay title' is not present but 'biosample_type'
+  or implicit duplicates exist.
 
   Args:
-    track: The track to deduplicate.
-    label_suffix: Suffix to append to the label.
-    max_tracks: Maximum number of tracks to keep.
+    track: The track to filter.
 
   Returns:
-    List of integer indices to keep.
+    The filtered track.
   """
-  if track is None or track.metadata.empty:
-    return []
-
-  keep_indices = []
-  seen_labels = set()
+  if track is None:
+    return track
+  mask = _preferred_rows(track.metadata)
+  if mask is None:
+    return track
+  return track.filter_tracks(np.flatnonzero(mask))
 
-  for i in range(len(track.metadata)):
-    sub_track = track.filter_tracks([i])
-    label = dynamic_label(sub_track, label_suffix)
 
-    if label not in seen_labels:
-      seen_labels.add(label)
-      keep_indices.append(i)
+def _first_label_positions(labels: pd.Series, max_tracks: int) -> list[int]:
+  """Returns positions of the first row of each label, up to max_tracks."""
+  keep_indices = labels.reset_index(drop=True).drop_duplicates().index.tolist()
 
   if len(keep_indices) > max_tracks:
     print(
@@ -372,6 +404,29 @@ def get_deduplicated_indices(
   return keep_indices
 
 
+def get_deduplicated_indices(
+    track: Any, label_suffix: str = '', max_tracks: int = 5
+) -> list[int]:
+  """Returns indices of tracks with unique labels.
+
+  When multiple tracks produce the same label (via `metadata_labels`), only
+  the index of the first track with that label is kept. Labels are computed
+  from the metadata alone, so the track values are never copied.
+
+  Args:
+    track: The track to deduplicate.
+    label_suffix: Suffix to append to the label.
+    max_tracks: Maximum number of tracks to keep.
+
+  Returns:
+    List of integer indices to keep.
+  """
+  if track is None or track.metadata.empty:
+    return []
+  labels = metadata_labels(track.metadata, label_suffix)
+  return _first_label_positions(labels, max_tracks)
+
+
 def deduplicate_tracks(
     track: Any, label_suffix: str = '', max_tracks: int = 5
 ) -> Any:
@@ -406,14 +461,7 @@ def filter_and_create_overlay(
 
   # Filter by TF if provided
   if target_tf:
-    target_cols = [
-        'target',
-        'antibody',
-        'bio_target',
-        'experiment_target',
-        'target_label',
-    ]
-    tf_cols = [c for c in target_cols if c in ref_track.metadata.columns]
+    tf_cols = [c for c in TARGET_COLUMNS if c in ref_track.metadata.columns]
     if tf_cols:
       target = str(target_tf).strip().lower()
       # Succinct pandas-based row-wise check across TF columns
@@ -436,26 +484,23 @@ def filter_and_create_overlay(
   if np.sum(valid_mask) == 0:
     return []
 
-  ref_filt = ref_track.filter_tracks(valid_mask)
-  alt_filt = alt_track.filter_tracks(valid_mask)
-
-  # Apply Preference Filter (Total > PolyA)
-  ref_filt = filter_preference(ref_filt)
-  alt_filt = filter_preference(alt_filt)
-
-  # Deduplicate by label. We skip deduplicate_tracks() here and inline the
-  # logic so we can filter BOTH ref and alt by the same indices, preserving
-  # Ref/Alt pairing required by OverlaidTracks.
-  if ref_filt is None or ref_filt.metadata.empty:
+  # Apply the preference filter (Total > PolyA) and deduplicate by label on
+  # the metadata alone, then slice REF and ALT once with the same indices to
+  # preserve the Ref/Alt pairing required by OverlaidTracks.
+  keep_indices = np.flatnonzero(valid_mask)
+  preferred = _preferred_rows(ref_track.metadata.iloc[keep_indices])
+  if preferred is not None:
+    keep_indices = keep_indices[preferred]
+  if keep_indices.size == 0:
     return []
 
-  keep_indices = get_deduplicated_indices(ref_filt, label_suffix)
+  labels = metadata_labels(ref_track.metadata.iloc[keep_indices], label_suffix)
+  positions = _first_label_positions(labels, max_tracks=5)
+  keep_indices = keep_indices[positions]
+  labels = labels.to_numpy()[positions]
 
-  ref_filt = ref_filt.filter_tracks(keep_indices)
-  alt_filt = alt_filt.filter_tracks(keep_indices)
-
-  if ref_filt.metadata.empty:
-    return []
+  ref_filt = ref_track.filter_tracks(keep_indices)
+  alt_filt = alt_track.filter_tracks(keep_indices)
 
   components = []
   # Create individual component for each unique track to ensure correct labeling
@@ -464,8 +509,7 @@ def filter_and_create_overlay(
     r_track = ref_filt.filter_tracks([i])
     a_track = alt_filt.filter_tracks([i])
 
-    # Generate specific label for this track
-    label = dynamic_label(r_track, label_suffix)
+    label = labels[i]
 
     try:
       comp = plot_components.OverlaidTracks(
@@ -1056,8 +1100,14 @@ def visualize_variant_effects(variant_args: Any) -> None:
       gtf, variant_args.gene, interval_1mb
   )
 
-  # Predict
-  prediction = dna_model.predict_variant(
+  # Predict (or reuse a stored prediction)
+  store = None
+  store_dir = getattr(variant_args, 'prediction_store', None)
+  if store_dir:
+    store = PredictionStore(store_dir)
+  prediction = predict_variant_cached(
+      dna_model,
+      store,
       interval=interval_1mb,
       variant=variant,
       requested_outputs=requested_outputs,
@@ -1189,6 +1239,14 @@ def main(argv: list[str] | None = None) -> None:
       default=None,
       help='Natural language summary of the variant effect.',
   )
+  parser.add_argument(
+      '--prediction_store',
+      default=None,
+      help=(
+          'Directory of stored predictions (see batch_predict_variants.py).'
+          ' Stored predictions are reused and new ones are added.'
+      ),
+  )
   args = parser.parse_args(argv)
 
   visualize_variant_effects(args)
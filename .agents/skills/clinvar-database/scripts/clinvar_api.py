@@ -25,15 +25,18 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import json
 import os
 import sys
-from typing import Any
+from typing import Any, Iterator
 import urllib.parse
 import xml.etree.ElementTree as ET
 
+import clinvar_snapshot
 import dotenv
 from polite_http import http_client
+import response_cache
 
 
 class _Response:
@@ -47,29 +50,67 @@ class RateLimitError(Exception):
   """Raised when the NCBI API rate limit is exceeded."""
 
 
+def _variation_uid(variant_id: str | int) -> str:
+  """Returns the numeric variation ID of a UID or VCV accession.
+
+  esummary reports records by UID, so 'VCV000012345.3' maps to '12345'.
+  """
+  text = str(variant_id).strip().upper()
+  if text.startswith('VCV'):
+    text = text[3:].split('.')[0]
+  return str(int(text)) if text.isdigit() else str(variant_id)
+
+
 class ClinVarClient:
   """A robust Python client for querying the NCBI ClinVar database.
 
   This client uses NCBI E-utilities and handles rate limiting, API key
-  authentication, and complex XML/JSON response parsing.
+  authentication, and complex XML/JSON response parsing. With a local
+  snapshot (see clinvar_snapshot.py), searches, summaries and evidence are
+  answered offline instead.
   """
 
   BASE_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
+  # IDs per esummary request; longer lists go through the History Server.
+  SUMMARY_CHUNK_SIZE = 500
+  # ClinVar is updated weekly; interpretations should not lag by more than a
+  # day.
+  CACHE_TTL_SECONDS = 24 * 3600
 
-  def __init__(self):
+  def __init__(
+      self,
+      cache_dir: str | None = response_cache.DEFAULT_CACHE_DIR,
+      snapshot: clinvar_snapshot.ClinVarSnapshot | None = None,
+  ):
+    """Initializes the client.
+
+    Args:
+      cache_dir: Directory for the persistent response cache, or None to
+        always hit the network.
+      snapshot: Local ClinVar snapshot to answer queries from, or None to
+        query NCBI.
+    """
+    self.snapshot = snapshot
     # Look for the NCBI API Key in the environment
     self.api_key = os.environ.get('NCBI_API_KEY')
 
     # NCBI limits: 10 req/sec with key, 3 req/sec without key
     self.rate_limit = 10 if self.api_key else 3
-    self.client = http_client.HttpClient(self.BASE_URL, qps=self.rate_limit)
+    self.http = http_client.HttpClient(self.BASE_URL, qps=self.rate_limit)
+    self.client = response_cache.wrap_client(
+        self.http, 'clinvar', self.CACHE_TTL_SECONDS, cache_dir
+    )
 
-  def _request(self, endpoint: str, params: dict[str, Any]) -> '_Response':
+  def _request(
+      self, endpoint: str, params: dict[str, Any], post: bool = False
+  ) -> '_Response':
     """Makes an HTTP request to the given E-utilities endpoint.
 
     Args:
       endpoint: The API endpoint to call (e.g. 'esearch.fcgi').
       params: Query parameters for the request.
+      post: Whether to send the parameters as a POST body (for long ID
+        lists) instead of in the URL. POST requests are never cached.
 
     Returns:
       A `_Response` with status code and content bytes.
@@ -85,8 +126,15 @@ class ClinVarClient:
     query_string = urllib.parse.urlencode(params, doseq=True)
     full_url = f'{url}?{query_string}'
 
+    # History-server (WebEnv) results are session-bound; never cache them.
+    client = self.http if 'WebEnv' in params else self.client
     try:
-      resp = self.client.fetch(full_url)
+      if post:
+        resp = self.http.fetch(
+            url, method='POST', data=query_string.encode('utf-8')
+        )
+      else:
+        resp = client.fetch(full_url)
       return _Response(resp.status_code, resp.data)
     except http_client.HttpError as exc:
       if exc.status_code == 429:
@@ -118,6 +166,8 @@ class ClinVarClient:
     Returns:
         Total number of matching variant IDs.
     """
+    if self.snapshot is not None:
+      return self.snapshot.count(query)
     params = {
         'db': 'clinvar',
         'term': query,
@@ -153,6 +203,19 @@ class ClinVarClient:
         - ``fetched_count``: Number of IDs actually retrieved.
         - ``variant_ids``: List of ClinVar Variation ID strings.
     """
+    if self.snapshot is not None:
+      total_count = self.snapshot.count(query)
+      ids = self.snapshot.search(query, retmax)
+      print(
+          f'Total matching variants: {total_count}. Fetched {len(ids)} from'
+          f' the local snapshot.'
+      )
+      return {
+          'total_count': total_count,
+          'fetched_count': len(ids),
+          'variant_ids': ids,
+      }
+
     page_size = min(page_size, 10000)
 
     # Step 1: Get total count.
@@ -161,37 +224,37 @@ class ClinVarClient:
 
     print(f'Total matching variants: {total_count}. Fetching {target}...')
 
-    # Step 2: Paginate.
+    # Step 2: Paginate. Page offsets are known up front, so pages are
+    # fetched concurrently (the HTTP client enforces the NCBI rate limit).
     all_ids: list[str] = []
-    retstart = 0
-    page_num = 0
-    total_pages = (target + page_size - 1) // page_size if target > 0 else 0
-
-    while retstart < target:
-      page_num += 1
-      current_page_size = min(page_size, target - retstart)
-      print(
-          f'  Fetching page {page_num}/{total_pages}'
-          f' (IDs {retstart + 1}-{retstart + current_page_size}'
-          f' of {target})...'
-      )
+    starts = list(range(0, target, page_size))
+    total_pages = len(starts)
 
+    def _fetch_page(retstart: int) -> list[str]:
       params = {
           'db': 'clinvar',
           'term': query,
           'retmode': 'json',
-          'retmax': current_page_size,
+          'retmax': min(page_size, target - retstart),
           'retstart': retstart,
       }
       response = self._request('esearch.fcgi', params)
       data = json.loads(response.content)
-      ids = data.get('esearchresult', {}).get('idlist', [])
-
-      if not ids:
-        break
-
-      all_ids.extend(ids)
-      retstart += len(ids)
+      return data.get('esearchresult', {}).get('idlist', [])
+
+    if starts:
+      with concurrent.futures.ThreadPoolExecutor(
+          max_workers=min(self.rate_limit, total_pages)
+      ) as executor:
+        for page_num, ids in enumerate(
+            executor.map(_fetch_page, starts), start=1
+        ):
+          print(
+              f'  Fetched page {page_num}/{total_pages}'
+              f' ({len(ids)} IDs from offset {starts[page_num - 1]}'
+              f' of {target})'
+          )
+          all_ids.extend(ids)
 
     print(f'Fetched {len(all_ids)} variant IDs.')
 
@@ -202,99 +265,191 @@ class ClinVarClient:
     }
 
   def get_interpretation_summary(
-      self, variant_ids: list[str | int]
+      self,
+      variant_ids: list[str | int],
+      chunk_size: int = SUMMARY_CHUNK_SIZE,
   ) -> list[dict[str, str | list[str]]]:
     """Retrieves top-line clinical significance labels and star ratings.
 
+    Lists longer than chunk_size are uploaded to the History Server and
+    summarized in concurrent chunks (see iter_interpretation_summaries).
+
     Args:
         variant_ids: A list of variant IDs to summarize.
+        chunk_size: Number of IDs per esummary request.
 
     Returns:
-        A list of summary dictionaries for rapid variant screening.
+        A list of summary dictionaries for rapid variant screening, in the
+        order of variant_ids.
     """
     if not variant_ids:
       return []
+    summaries = list(
+        self.iter_interpretation_summaries(variant_ids, chunk_size)
+    )
+    order = {}
+    for i, v in enumerate(variant_ids):
+      order.setdefault(_variation_uid(v), i)
+    summaries.sort(
+        key=lambda s: order.get(_variation_uid(s['variant_id']), len(order))
+    )
+    return summaries
 
-    # Ensure all IDs are strings and join with commas
-    ids_str = ','.join(map(str, variant_ids))
+  def iter_interpretation_summaries(
+      self,
+      variant_ids: list[str | int],
+      chunk_size: int = SUMMARY_CHUNK_SIZE,
+  ) -> Iterator[dict[str, str | list[str]]]:
+    """Yields interpretation summaries as their esummary responses arrive.
 
-    params = {'db': 'clinvar', 'id': ids_str, 'retmode': 'json'}
+    A list that fits in one chunk is summarized with a single GET. Longer
+    lists are POSTed once to the History Server (epost), then fetched in
+    chunk_size pages with retstart/retmax, up to the NCBI rate limit in
+    parallel. Chunks are yielded in completion order, so callers can write
+    results out before the whole list is done.
 
+    Args:
+        variant_ids: A list of variant IDs to summarize.
+        chunk_size: Number of IDs per esummary request (max 10000).
+
+    Yields:
+        Summary dictionaries, as returned by get_interpretation_summary.
+    """
+    ids = list(dict.fromkeys(str(v) for v in variant_ids))
+    if not ids:
+      return
+    if self.snapshot is not None:
+      yield from self.snapshot.summaries(ids)
+      return
+
+    chunk_size = max(1, min(chunk_size, 10000))
+    if len(ids) <= chunk_size:
+      yield from self._fetch_summaries({'id': ','.join(ids)})
+      return
+
+    webenv, query_key = self._post_ids(ids)
+    starts = range(0, len(ids), chunk_size)
+    print(f'Summarizing {len(ids)} variants in {len(starts)} chunks...')
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(self.rate_limit, len(starts))
+    ) as executor:
+      futures = [
+          executor.submit(
+              self._fetch_summaries,
+              {
+                  'WebEnv': webenv,
+                  'query_key': query_key,
+                  'retstart': retstart,
+                  'retmax': chunk_size,
+              },
+          )
+          for retstart in starts
+      ]
+      for done, future in enumerate(
+          concurrent.futures.as_completed(futures), start=1
+      ):
+        summaries = future.result()
+        print(f'  Chunk {done}/{len(futures)}: {len(summaries)} summaries')
+        yield from summaries
+
+  def _post_ids(self, variant_ids: list[str]) -> tuple[str, str]:
+    """Uploads IDs to the History Server and returns (WebEnv, query_key)."""
+    response = self._request(
+        'epost.fcgi', {'db': 'clinvar', 'id': ','.join(variant_ids)}, post=True
+    )
+    try:
+      root = ET.fromstring(response.content.decode('utf-8'))
+    except ET.ParseError as e:
+      raise RuntimeError(f'Failed to parse NCBI epost response: {e}') from e
+    webenv = root.findtext('WebEnv')
+    query_key = root.findtext('QueryKey')
+    if not webenv or not query_key:
+      raise RuntimeError(
+          'NCBI epost did not return a WebEnv:'
+          f" {root.findtext('ERROR') or 'no error message'}"
+      )
+    return webenv, query_key
+
+  def _fetch_summaries(
+      self, params: dict[str, Any]
+  ) -> list[dict[str, str | list[str]]]:
+    """Runs one esummary request and parses every record in it."""
+    params = {'db': 'clinvar', 'retmode': 'json'} | params
     response = self._request('esummary.fcgi', params)
     data = json.loads(response.content)
 
     result_data = data.get('result', {})
     uids = result_data.get('uids', [])
-
-    summaries = []
-    for uid in uids:
-      var_data = result_data.get(uid, {})
-      significance = 'Unknown'
-      review_status = 'Unknown'
-      last_evaluated = 'Unknown'
-
-      # Extract primary classification and date from possible classification
-      # blocks
-      for sig_key in [
-          'clinical_significance',
-          'germline_classification',
-          'clinical_impact_classification',
-          'oncogenicity_classification',
-      ]:
-        sig_data = var_data.get(sig_key)
-        if sig_data and isinstance(sig_data, dict):
-          desc = sig_data.get('description')
-          if desc and significance == 'Unknown':
-            significance = desc
-            review_status = sig_data.get('review_status', 'Unknown')
-
-          date = sig_data.get('last_evaluated')
-          if date and last_evaluated == 'Unknown':
-            last_evaluated = date
-        elif sig_data and significance == 'Unknown':
-          significance = str(sig_data)
-
-      # Extract phenotypes from classification trait sets
-      phenotypes = []
-      for class_key in [
-          'germline_classification',
-          'clinical_impact_classification',
-          'oncogenicity_classification',
-      ]:
-        classification = var_data.get(class_key, {})
-        for trait in classification.get('trait_set', []):
-          name = trait.get('trait_name')
-          if name and name not in phenotypes:
-            phenotypes.append(name)
-
-      # Extract gene information
-      genes = []
-      for gene in var_data.get('genes', []):
-        genes.append({
-            'gene_id': gene.get('geneid', ''),
-            'symbol': gene.get('symbol', ''),
-            'strand': gene.get('strand', ''),
-        })
-
-      # Extract variation type (uses obj_type in esummary)
-      variation_type = var_data.get('obj_type', '')
-
-      # Extract molecular consequence (uses molecular_consequence_list)
-      molecular_consequences = var_data.get('molecular_consequence_list', [])
-
-      summaries.append({
-          'variant_id': uid,
-          'clinical_significance': significance,
-          'review_status': review_status,
-          'last_evaluated': last_evaluated,
-          'phenotypes': phenotypes,
-          'title': var_data.get('title', ''),
-          'genes': genes,
-          'variation_type': variation_type,
-          'molecular_consequences': molecular_consequences,
+    return [self._parse_summary(uid, result_data.get(uid, {})) for uid in uids]
+
+  def _parse_summary(
+      self, uid: str, var_data: dict[str, Any]
+  ) -> dict[str, str | list[str]]:
+    """Extracts the screening fields from one esummary record."""
+    significance = 'Unknown'
+    review_status = 'Unknown'
+    last_evaluated = 'Unknown'
+
+    # Extract primary classification and date from possible classification
+    # blocks
+    for sig_key in [
+        'clinical_significance',
+        'germline_classification',
+        'clinical_impact_classification',
+        'oncogenicity_classification',
+    ]:
+      sig_data = var_data.get(sig_key)
+      if sig_data and isinstance(sig_data, dict):
+        desc = sig_data.get('description')
+        if desc and significance == 'Unknown':
+          significance = desc
+          review_status = sig_data.get('review_status', 'Unknown')
+
+        date = sig_data.get('last_evaluated')
+        if date and last_evaluated == 'Unknown':
+          last_evaluated = date
+      elif sig_data and significance == 'Unknown':
+        significance = str(sig_data)
+
+    # Extract phenotypes from classification trait sets
+    phenotypes = []
+    for class_key in [
+        'germline_classification',
+        'clinical_impact_classification',
+        'oncogenicity_classification',
+    ]:
+      classification = var_data.get(class_key, {})
+      for trait in classification.get('trait_set', []):
+        name = trait.get('trait_name')
+        if name and name not in phenotypes:
+          phenotypes.append(name)
+
+    # Extract gene information
+    genes = []
+    for gene in var_data.get('genes', []):
+      genes.append({
+          'gene_id': gene.get('geneid', ''),
+          'symbol': gene.get('symbol', ''),
+          'strand': gene.get('strand', ''),
       })
 
-    return summaries
+    # Extract variation type (uses obj_type in esummary)
+    variation_type = var_data.get('obj_type', '')
+
+    # Extract molecular consequence (uses molecular_consequence_list)
+    molecular_consequences = var_data.get('molecular_consequence_list', [])
+
+    return {
+        'variant_id': uid,
+        'clinical_significance': significance,
+        'review_status': review_status,
+        'last_evaluated': last_evaluated,
+        'phenotypes': phenotypes,
+        'title': var_data.get('title', ''),
+        'genes': genes,
+        'variation_type': variation_type,
+        'molecular_consequences': molecular_consequences,
+    }
 
   def get_clinical_evidence(self, variant_id: str) -> dict[str, Any]:
     """Fetches full records including free-text clinician rationales.
@@ -308,23 +463,10 @@ class ClinVarClient:
         A dictionary containing clinical evidence submissions, allele
         information, conditions, and structural variant details.
     """
-    # Ensure we're using a VCV accession for the efetch call
-    if not str(variant_id).startswith('VCV'):
-      try:
-        vcv_id = f'VCV{int(variant_id):09d}'
-      except ValueError:
-        vcv_id = variant_id
+    if self.snapshot is not None:
+      root = self.snapshot.record(variant_id)
     else:
-      vcv_id = variant_id
-
-    params = {'db': 'clinvar', 'id': vcv_id, 'rettype': 'vcv', 'retmode': 'xml'}
-
-    response = self._request('efetch.fcgi', params)
-
-    try:
-      root = ET.fromstring(response.content.decode('utf-8'))
-    except ET.ParseError as e:
-      raise RuntimeError(f'Failed to parse NCBI XML response: {e}') from e
+      root = self._fetch_vcv_record(variant_id)
 
     # Navigate the ClinVarSet XML structure
     # Submissions are typically found under ClinVarAssertion or
@@ -403,6 +545,26 @@ class ClinVarClient:
         'submissions': submissions,
     }
 
+  def _fetch_vcv_record(self, variant_id: str) -> ET.Element:
+    """Fetches and parses the VCV XML record of a variant."""
+    # Ensure we're using a VCV accession for the efetch call
+    if not str(variant_id).startswith('VCV'):
+      try:
+        vcv_id = f'VCV{int(variant_id):09d}'
+      except ValueError:
+        vcv_id = variant_id
+    else:
+      vcv_id = variant_id
+
+    params = {'db': 'clinvar', 'id': vcv_id, 'rettype': 'vcv', 'retmode': 'xml'}
+
+    response = self._request('efetch.fcgi', params)
+
+    try:
+      return ET.fromstring(response.content.decode('utf-8'))
+    except ET.ParseError as e:
+      raise RuntimeError(f'Failed to parse NCBI XML response: {e}') from e
+
   def _extract_global_citations(self, root: ET.Element) -> list[str]:
     """Extracts PMIDs for variant classification."""
     pmids = []
@@ -609,11 +771,50 @@ def write_output(data, output_file):
     sys.exit(1)
 
 
+def write_jsonl_output(records, output_file):
+  """Writes records to a JSON Lines file as they are produced."""
+  count = 0
+  try:
+    with open(output_file, 'w', encoding='utf-8') as f:
+      for record in records:
+        f.write(json.dumps(record) + '\n')
+        count += 1
+    print(f'Success! {count} records written to: {output_file}')
+  except (OSError, TypeError) as e:
+    print(f'Error writing to file {output_file}: {e}')
+    sys.exit(1)
+
+
+def read_variant_ids(path):
+  """Reads variant IDs from search output JSON or a one-per-line file."""
+  with open(path, encoding='utf-8') as f:
+    text = f.read()
+  try:
+    data = json.loads(text)
+  except ValueError:
+    return [line.strip() for line in text.splitlines() if line.strip()]
+  if isinstance(data, dict):
+    data = data.get('variant_ids', [])
+  return [str(v) for v in data]
+
+
 def main():
   dotenv.load_dotenv(os.path.expanduser('~/.env'))
   parser = argparse.ArgumentParser(
       description='ClinVar Database API Wrapper Script'
   )
+  response_cache.add_cache_arguments(parser)
+  parser.add_argument(
+      '--snapshot',
+      nargs='?',
+      const=clinvar_snapshot.DEFAULT_SNAPSHOT_PATH,
+      default=None,
+      help=(
+          'Answer queries offline from a local ClinVar snapshot built with'
+          ' clinvar_snapshot.py (default path: $CLINVAR_SNAPSHOT or'
+          ' ~/.cache/clinvar/clinvar_snapshot.sqlite).'
+      ),
+  )
   subparsers = parser.add_subparsers(dest='command', required=True)
 
   # count
@@ -663,14 +864,35 @@ def main():
           ' variant IDs'
       ),
   )
-  p_summary.add_argument(
+  summary_ids = p_summary.add_mutually_exclusive_group(required=True)
+  summary_ids.add_argument(
       '--variant_ids',
       nargs='+',
-      required=True,
       help='One or more ClinVar Variation IDs',
   )
+  summary_ids.add_argument(
+      '--variant_ids_file',
+      help=(
+          'File of Variation IDs: the JSON output of the search command, or'
+          ' one ID per line'
+      ),
+  )
   p_summary.add_argument(
-      '--output', required=True, help='Output JSON file path'
+      '--chunk_size',
+      type=int,
+      default=ClinVarClient.SUMMARY_CHUNK_SIZE,
+      help=(
+          'Number of IDs per esummary request (default:'
+          f' {ClinVarClient.SUMMARY_CHUNK_SIZE}, max: 10000).'
+      ),
+  )
+  p_summary.add_argument(
+      '--output',
+      required=True,
+      help=(
+          'Output file path. A .jsonl path is written one summary per line'
+          ' as results arrive.'
+      ),
   )
 
   # evidence
@@ -688,22 +910,43 @@ def main():
   )
 
   args = parser.parse_args()
-  client = ClinVarClient()
-
-  if args.command == 'count':
-    total = client.count_variants(args.query)
-    data = {'total_count': total}
-    print(f'Total matching variants: {total}')
-  elif args.command == 'search':
-    data = client.search_variants(
-        args.query, retmax=args.retmax, page_size=args.page_size
-    )
-  elif args.command == 'summary':
-    data = client.get_interpretation_summary(args.variant_ids)
-  elif args.command == 'evidence':
-    data = client.get_clinical_evidence(args.variant_id)
-  else:
-    raise AssertionError(f'Unknown command: {args.command}')
+  snapshot = None
+  if args.snapshot:
+    try:
+      snapshot = clinvar_snapshot.ClinVarSnapshot(args.snapshot)
+    except (FileNotFoundError, ValueError) as e:
+      print(f'Error: {e}')
+      sys.exit(1)
+  client = ClinVarClient(None if args.no_cache else args.cache_dir, snapshot)
+
+  try:
+    if args.command == 'count':
+      total = client.count_variants(args.query)
+      data = {'total_count': total}
+      print(f'Total matching variants: {total}')
+    elif args.command == 'search':
+      data = client.search_variants(
+          args.query, retmax=args.retmax, page_size=args.page_size
+      )
+    elif args.command == 'summary':
+      variant_ids = args.variant_ids or read_variant_ids(args.variant_ids_file)
+      if args.output.endswith('.jsonl'):
+        write_jsonl_output(
+            client.iter_interpretation_summaries(variant_ids, args.chunk_size),
+            args.output,
+        )
+        return
+      data = client.get_interpretation_summary(variant_ids, args.chunk_size)
+    elif args.command == 'evidence':
+      data = client.get_clinical_evidence(args.variant_id)
+    else:
+      raise AssertionError(f'Unknown command: {args.command}')
+  except (KeyError, ValueError) as e:
+    if snapshot is None:
+      raise
+    # Unsupported offline query or variant missing from the snapshot.
+    print(f'Error: {e.args[0]}')
+    sys.exit(1)
   write_output(data, args.output)
 
 
@@ -0,0 +1,575 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local, indexed snapshot of a ClinVar VCV XML release for offline queries.
+
+Ingestion streams the release (ClinVarVCVRelease_*.xml.gz, from a local file
+or straight from the NCBI FTP site) through an incremental XML parser, one
+VariationArchive record at a time, so memory use does not depend on the size
+of the release. Each record is written to a SQLite database with:
+
+  * the fields `ClinVarClient.get_interpretation_summary` returns, as JSON;
+  * the record's XML, compressed, which `get_clinical_evidence` parses exactly
+    as it parses an efetch response;
+  * indexes on Variation ID, gene symbol, rsID, clinical significance and
+    GRCh38 position, used by `search_variants` and `count_variants`.
+
+Offline queries accept a subset of the Entrez syntax: terms joined with AND,
+each one of `SYMBOL[gene]`, `N[chr]`, `START:STOP[chrpos]`, `"label"[clinsig]`,
+`N[uid]` or a bare `rsN`. Anything else raises ValueError.
+
+Usage:
+  uv run scripts/clinvar_snapshot.py \
+    --source ClinVarVCVRelease_00-latest.xml.gz
+  uv run scripts/clinvar_snapshot.py --source latest --genes BRCA1,BRCA2
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#   "polite-http",
+# ]
+# ///
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Any, Iterable, Iterator
+import xml.etree.ElementTree as ET
+import zlib
+
+from polite_http import http_client
+
+DEFAULT_SNAPSHOT_PATH = os.environ.get('CLINVAR_SNAPSHOT') or os.path.join(
+    os.path.expanduser('~'), '.cache', 'clinvar', 'clinvar_snapshot.sqlite'
+)
+LATEST_RELEASE_URL = (
+    'https://ftp.ncbi.nlm.nih.gov/pub/clinvar/xml/'
+    'ClinVarVCVRelease_00-latest.xml.gz'
+)
+# Bump when the schema or the stored summary format changes.
+SNAPSHOT_VERSION = 1
+
+_BATCH_SIZE = 1000
+_CHUNK_SIZE = 1 << 20
+# SQLite's default limit on host parameters per statement is 999.
+_MAX_PARAMS = 900
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE variants (
+  variation_id INTEGER PRIMARY KEY,
+  chromosome TEXT,
+  start INTEGER,
+  stop INTEGER,
+  rsid TEXT,
+  summary TEXT NOT NULL,
+  record BLOB
+);
+CREATE TABLE variant_genes (
+  symbol TEXT NOT NULL COLLATE NOCASE,
+  variation_id INTEGER NOT NULL
+);
+CREATE TABLE variant_clinsig (
+  term TEXT NOT NULL,
+  variation_id INTEGER NOT NULL
+);
+"""
+
+# Created after the bulk insert, which is much faster than indexing as rows
+# arrive.
+_INDEXES = """
+CREATE INDEX variants_rsid ON variants (rsid);
+CREATE INDEX variants_position ON variants (chromosome, start);
+CREATE INDEX variant_genes_symbol ON variant_genes (symbol);
+CREATE INDEX variant_clinsig_term ON variant_clinsig (term);
+"""
+
+_CLASSIFICATION_TAGS = (
+    'GermlineClassification',
+    'SomaticClinicalImpact',
+    'OncogenicityClassification',
+)
+
+_TERM_RE = re.compile(r'^"?(?P<value>[^"\[]+?)"?\s*\[(?P<field>[\w ]+)\]$')
+
+
+def _grch38_location(elem: ET.Element) -> ET.Element | None:
+  """Returns the GRCh38 SequenceLocation under elem, else the first one."""
+  first = None
+  for loc in elem.iterfind('.//SequenceLocation'):
+    if loc.get('Assembly') == 'GRCh38':
+      return loc
+    if first is None:
+      first = loc
+  return first
+
+
+def _esummary_date(date: str | None) -> str:
+  """Formats an XML date (2024-01-31) the way esummary does (2024/01/31)."""
+  if not date:
+    return 'Unknown'
+  return f"{date.replace('-', '/')} 00:00"
+
+
+def summarize_record(archive: ET.Element) -> dict[str, Any]:
+  """Builds the get_interpretation_summary entry for a VariationArchive."""
+  classifications = archive.find('.//Classifications')
+  significance = 'Unknown'
+  review_status = 'Unknown'
+  last_evaluated = 'Unknown'
+  phenotypes = []
+  for tag in _CLASSIFICATION_TAGS:
+    node = classifications.find(tag) if classifications is not None else None
+    if node is None:
+      continue
+    desc = node.findtext('Description')
+    if desc and significance == 'Unknown':
+      significance = desc
+      review_status = node.findtext('ReviewStatus') or 'Unknown'
+    date = node.get('DateLastEvaluated')
+    if date and last_evaluated == 'Unknown':
+      last_evaluated = _esummary_date(date)
+    for trait in node.iterfind('./ConditionList/TraitSet/Trait'):
+      name = trait.findtext('./Name/ElementValue[@Type="Preferred"]')
+      if name and name not in phenotypes:
+        phenotypes.append(name)
+
+  genes = []
+  seen_genes = set()
+  for gene in archive.iterfind('.//GeneList/Gene'):
+    symbol = gene.get('Symbol', '')
+    if symbol in seen_genes:
+      continue
+    seen_genes.add(symbol)
+    loc = _grch38_location(gene)
+    genes.append({
+        'gene_id': gene.get('GeneID', ''),
+        'symbol': symbol,
+        'strand': loc.get('Strand', '') if loc is not None else '',
+    })
+
+  consequences = []
+  for consequence in archive.iterfind('.//HGVS/MolecularConsequence'):
+    value = consequence.get('Type')
+    if value and value not in consequences:
+      consequences.append(value)
+
+  return {
+      'variant_id': archive.get('VariationID', ''),
+      'clinical_significance': significance,
+      'review_status': review_status,
+      'last_evaluated': last_evaluated,
+      'phenotypes': phenotypes,
+      'title': archive.get('VariationName', ''),
+      'genes': genes,
+      'variation_type': archive.get('VariationType', ''),
+      'molecular_consequences': consequences,
+  }
+
+
+def clinsig_terms(significance: str) -> set[str]:
+  """Returns the lowercase labels a [clinsig] query can match."""
+  significance = significance.lower()
+  if significance == 'unknown':
+    return set()
+  parts = re.split(r'[/,;]', significance)
+  return {significance} | {p.strip() for p in parts if p.strip()}
+
+
+def _read_chunks(source: str) -> Iterator[bytes]:
+  """Yields the (decompressed) bytes of a local file or URL."""
+  if source.startswith(('http://', 'https://')):
+    client = http_client.HttpClient(source.rsplit('/', 1)[0] + '/', qps=1)
+    chunks = client.stream_bytes(source, chunk_size=_CHUNK_SIZE)
+  else:
+
+    def _file_chunks():
+      with open(source, 'rb') as f:
+        while chunk := f.read(_CHUNK_SIZE):
+          yield chunk
+
+    chunks = _file_chunks()
+
+  decompressor = None
+  for chunk in chunks:
+    if decompressor is None:
+      # gzip members start with 1f 8b; the release is also served unzipped.
+      is_gzip = chunk[:2] == b'\x1f\x8b'
+      decompressor = zlib.decompressobj(wbits=31) if is_gzip else False
+    if decompressor:
+      while chunk:
+        yield decompressor.decompress(chunk)
+        # Concatenated gzip members continue in unused_data.
+        if decompressor.eof:
+          chunk = decompressor.unused_data
+          decompressor = zlib.decompressobj(wbits=31)
+        else:
+          chunk = b''
+    else:
+      yield chunk
+
+
+def iter_variation_archives(
+    chunks: Iterable[bytes],
+) -> Iterator[tuple[ET.Element, dict[str, str]]]:
+  """Yields each VariationArchive element and the release attributes.
+
+  Each element is only valid until the next one is requested: processed
+  records are dropped from the tree to keep memory bounded.
+  """
+  parser = ET.XMLPullParser(events=('start', 'end'))
+  root = None
+  release = {}
+
+  def _events():
+    nonlocal root, release
+    for event, elem in parser.read_events():
+      if event == 'start':
+        if root is None:
+          root = elem
+          release = dict(elem.attrib)
+        continue
+      if elem.tag == 'VariationArchive':
+        yield elem, release
+        root.clear()
+
+  for chunk in chunks:
+    parser.feed(chunk)
+    yield from _events()
+  parser.close()
+  yield from _events()
+
+
+def _record_row(
+    archive: ET.Element, keep_records: bool
+) -> tuple[tuple[Any, ...], dict[str, Any]]:
+  """Returns the variants table row and the summary of a record."""
+  summary = summarize_record(archive)
+  # The allele's own Location; gene locations (whole gene ranges) come first
+  # in document order.
+  allele_location = archive.find('.//SimpleAllele/Location')
+  loc = _grch38_location(
+      allele_location if allele_location is not None else archive
+  )
+  rsid = None
+  for xref in archive.iterfind('.//XRef'):
+    if xref.get('DB') == 'dbSNP':
+      rsid = f"rs{xref.get('ID', '')}"
+      break
+
+  def _int(value):
+    return int(value) if value and value.isdigit() else None
+
+  record = None
+  if keep_records:
+    record = zlib.compress(ET.tostring(archive, encoding='utf-8'))
+  return (
+      int(summary['variant_id']),
+      loc.get('Chr') if loc is not None else None,
+      _int(loc.get('start')) if loc is not None else None,
+      _int(loc.get('stop')) if loc is not None else None,
+      rsid,
+      json.dumps(summary),
+      record,
+  ), summary
+
+
+def ingest(
+    source: str,
+    path: str = DEFAULT_SNAPSHOT_PATH,
+    genes: Iterable[str] | None = None,
+    keep_records: bool = True,
+) -> dict[str, Any]:
+  """Builds a snapshot database from a ClinVar VCV XML release.
+
+  The database is written next to path and moved into place when complete,
+  so an interrupted ingestion never leaves a partial snapshot behind.
+
+  Args:
+    source: Path or URL of a VCV XML release (gzipped or not), or 'latest'
+      for the current release on the NCBI FTP site.
+    path: Snapshot database to write.
+    genes: If given, only keep variants in these genes.
+    keep_records: Whether to store the full records needed for
+      get_clinical_evidence. Without them, the snapshot only answers search
+      and summary queries but is several times smaller.
+
+  Returns:
+    The snapshot metadata.
+  """
+  if source == 'latest':
+    source = LATEST_RELEASE_URL
+  gene_filter = {g.upper() for g in genes} if genes else None
+
+  os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+  tmp_path = f'{path}.tmp{os.getpid()}'
+  if os.path.exists(tmp_path):
+    os.remove(tmp_path)
+  conn = sqlite3.connect(tmp_path)
+  try:
+    conn.execute('PRAGMA journal_mode=OFF')
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.executescript(_SCHEMA)
+
+    rows, gene_rows, clinsig_rows = [], [], []
+    seen = kept = 0
+    release = {}
+
+    def _flush():
+      conn.executemany(
+          'INSERT OR REPLACE INTO variants VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+      )
+      conn.executemany('INSERT INTO variant_genes VALUES (?, ?)', gene_rows)
+      conn.executemany(
+          'INSERT INTO variant_clinsig VALUES (?, ?)', clinsig_rows
+      )
+      rows.clear()
+      gene_rows.clear()
+      clinsig_rows.clear()
+
+    for archive, release in iter_variation_archives(_read_chunks(source)):
+      seen += 1
+      row, summary = _record_row(archive, keep_records)
+      symbols = {g['symbol'] for g in summary['genes'] if g['symbol']}
+      if gene_filter is not None and not gene_filter & {
+          s.upper() for s in symbols
+      }:
+        continue
+      kept += 1
+      rows.append(row)
+      gene_rows.extend((s, row[0]) for s in symbols)
+      clinsig_rows.extend(
+          (t, row[0]) for t in clinsig_terms(summary['clinical_significance'])
+      )
+      if len(rows) >= _BATCH_SIZE:
+        _flush()
+      if seen % 100_000 == 0:
+        print(f'  {seen} records read, {kept} kept...', file=sys.stderr)
+    _flush()
+
+    print('Building indexes...', file=sys.stderr)
+    conn.executescript(_INDEXES)
+    meta = {
+        'version': str(SNAPSHOT_VERSION),
+        'source': source,
+        'release_date': release.get('ReleaseDate', ''),
+        'ingested_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'variants': str(kept),
+        'has_records': str(keep_records).lower(),
+        'genes': ','.join(sorted(gene_filter)) if gene_filter else '',
+    }
+    conn.executemany('INSERT INTO meta VALUES (?, ?)', meta.items())
+    conn.commit()
+  except BaseException:
+    conn.close()
+    os.remove(tmp_path)
+    raise
+  conn.close()
+  os.replace(tmp_path, path)
+  return meta
+
+
+def _variation_id(variant_id: str | int) -> int:
+  """Parses a Variation ID given as 12345 or a VCV000012345 accession."""
+  text = str(variant_id).strip().upper()
+  if text.startswith('VCV'):
+    text = text[3:].split('.')[0]
+  return int(text)
+
+
+class ClinVarSnapshot:
+  """Read-only queries against a snapshot built by ingest()."""
+
+  def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+    if not os.path.exists(path):
+      raise FileNotFoundError(
+          f'No ClinVar snapshot at {path}. Build one with'
+          ' `uv run scripts/clinvar_snapshot.py --source latest`.'
+      )
+    self.path = path
+    self.conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    self.meta = dict(self.conn.execute('SELECT key, value FROM meta'))
+    if self.meta.get('version') != str(SNAPSHOT_VERSION):
+      raise ValueError(
+          f'Snapshot {path} has version {self.meta.get("version")}, expected'
+          f' {SNAPSHOT_VERSION}. Rebuild it with clinvar_snapshot.py.'
+      )
+
+  def _where(self, query: str) -> tuple[str, list[Any]]:
+    """Translates an Entrez query into a SQL WHERE clause."""
+    clauses = []
+    params = []
+    for term in re.split(r'\s+AND\s+', query.strip(), flags=re.IGNORECASE):
+      term = term.strip().strip('()').strip()
+      if re.fullmatch(r'rs\d+', term, flags=re.IGNORECASE):
+        clauses.append('rsid = ?')
+        params.append(term.lower())
+        continue
+      match = _TERM_RE.match(term)
+      field = match.group('field').strip().lower() if match else ''
+      value = match.group('value').strip() if match else ''
+      if field in ('gene', 'gene name'):
+        clauses.append(
+            'variation_id IN (SELECT variation_id FROM variant_genes'
+            ' WHERE symbol = ?)'
+        )
+        params.append(value)
+      elif field in ('chr', 'chromosome'):
+        clauses.append('chromosome = ?')
+        params.append(value.upper().removeprefix('CHR'))
+      elif field in ('chrpos', 'chrpos38') and re.fullmatch(
+          r'\d+(:\d+)?', value
+      ):
+        start, _, stop = value.partition(':')
+        clauses.append('start <= ? AND stop >= ?')
+        params.extend([int(stop or start), int(start)])
+      elif field in ('clinsig', 'clinical significance'):
+        clauses.append(
+            'variation_id IN (SELECT variation_id FROM variant_clinsig'
+            ' WHERE term = ?)'
+        )
+        params.append(value.lower())
+      elif field in ('uid', 'vid') and value.isdigit():
+        clauses.append('variation_id = ?')
+        params.append(int(value))
+      else:
+        raise ValueError(
+            f'Offline ClinVar queries do not support {term!r}. Use terms'
+            ' joined with AND: SYMBOL[gene], N[chr], START:STOP[chrpos],'
+            ' "label"[clinsig], N[uid] or rsN. Drop --snapshot to query'
+            ' NCBI instead.'
+        )
+    return ' AND '.join(clauses), params
+
+  def count(self, query: str) -> int:
+    """Returns the number of variants matching query."""
+    where, params = self._where(query)
+    (count,) = self.conn.execute(
+        f'SELECT COUNT(*) FROM variants WHERE {where}', params
+    ).fetchone()
+    return count
+
+  def search(self, query: str, retmax: int = 0) -> list[str]:
+    """Returns matching Variation IDs, newest first like Entrez."""
+    where, params = self._where(query)
+    sql = f'SELECT variation_id FROM variants WHERE {where}'
+    sql += ' ORDER BY variation_id DESC'
+    if retmax > 0:
+      sql += f' LIMIT {int(retmax)}'
+    return [str(row[0]) for row in self.conn.execute(sql, params)]
+
+  def summaries(
+      self, variant_ids: Iterable[str | int]
+  ) -> list[dict[str, Any]]:
+    """Returns the stored summaries of the given variants, in input order.
+
+    Variants missing from the snapshot are skipped with a warning.
+    """
+    ids = list(dict.fromkeys(_variation_id(v) for v in variant_ids))
+    found = {}
+    for i in range(0, len(ids), _MAX_PARAMS):
+      chunk = ids[i : i + _MAX_PARAMS]
+      placeholders = ','.join('?' * len(chunk))
+      for variation_id, summary in self.conn.execute(
+          'SELECT variation_id, summary FROM variants'
+          f' WHERE variation_id IN ({placeholders})',
+          chunk,
+      ):
+        found[variation_id] = json.loads(summary)
+    missing = len(ids) - len(found)
+    if missing:
+      print(
+          f'Warning: {missing} variant(s) not in the snapshot.',
+          file=sys.stderr,
+      )
+    return [found[i] for i in ids if i in found]
+
+  def record(self, variant_id: str | int) -> ET.Element:
+    """Returns a variant's record in the shape of an efetch VCV response.
+
+    Raises:
+      KeyError: If the variant is not in the snapshot.
+      ValueError: If the snapshot was built without records.
+    """
+    row = self.conn.execute(
+        'SELECT record FROM variants WHERE variation_id = ?',
+        (_variation_id(variant_id),),
+    ).fetchone()
+    if row is None:
+      raise KeyError(f'Variant {variant_id} is not in the snapshot.')
+    if row[0] is None:
+      raise ValueError(
+          'This snapshot was built with --no-records; rebuild it with records'
+          ' or drop --snapshot for clinical evidence.'
+      )
+    root = ET.Element('ClinVarResult-Set')
+    root.append(ET.fromstring(zlib.decompress(row[0])))
+    return root
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description='Build a local ClinVar snapshot for offline queries.'
+  )
+  parser.add_argument(
+      '--source',
+      required=True,
+      help=(
+          'ClinVar VCV XML release: a local path (.xml or .xml.gz), a URL, or'
+          ' "latest" to stream the current release from the NCBI FTP site.'
+      ),
+  )
+  parser.add_argument(
+      '--snapshot',
+      default=DEFAULT_SNAPSHOT_PATH,
+      help=(
+          'Snapshot database to write (default: $CLINVAR_SNAPSHOT or'
+          ' ~/.cache/clinvar/clinvar_snapshot.sqlite).'
+      ),
+  )
+  parser.add_argument(
+      '--genes',
+      default='',
+      help='Comma-separated gene symbols to keep (default: all variants).',
+  )
+  parser.add_argument(
+      '--no-records',
+      action='store_true',
+      help='Skip full records (no offline evidence; much smaller snapshot).',
+  )
+  args = parser.parse_args()
+
+  genes = [g.strip() for g in args.genes.split(',') if g.strip()]
+  print(f'Ingesting {args.source} into {args.snapshot}...', file=sys.stderr)
+  meta = ingest(
+      args.source,
+      args.snapshot,
+      genes=genes or None,
+      keep_records=not args.no_records,
+  )
+  print(
+      f"Snapshot of release {meta['release_date'] or 'unknown'} with"
+      f" {meta['variants']} variants written to {args.snapshot}"
+  )
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,341 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent on-disk HTTP response cache for polite_http clients.
+
+Responses are stored in a SQLite database keyed on the request method, the
+normalized URL (sorted query parameters, credentials removed) and the request
+body. Each entry has a TTL. Once an entry is stale it is revalidated with
+`If-None-Match` / `If-Modified-Since` when the server sent an ETag or
+Last-Modified header, and a 304 refreshes the entry without a download. The
+database is bounded in size and evicts least recently used entries.
+
+`CachedHttpClient` wraps an `http_client.HttpClient` and exposes the same
+`fetch`, `fetch_json`, `fetch_text` and `fetch_bytes` methods, so callers can
+swap it in without other changes. Streaming methods pass through uncached.
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#   "polite-http",
+# ]
+# ///
+
+from __future__ import annotations
+
+import argparse
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any
+import urllib.parse
+
+from polite_http import http_client
+
+DEFAULT_CACHE_DIR = os.environ.get('SKILLS_HTTP_CACHE_DIR') or os.path.join(
+    os.path.expanduser('~'), '.cache', 'skills-http'
+)
+DEFAULT_MAX_BYTES = 1 << 30  # 1 GiB per service database.
+
+# Query parameters that identify the caller rather than the resource.
+_IGNORED_PARAMS = frozenset({'api_key', 'email', 'tool'})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+  key TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  status_code INTEGER NOT NULL,
+  headers TEXT NOT NULL,
+  encoding TEXT,
+  data BLOB NOT NULL,
+  size INTEGER NOT NULL,
+  etag TEXT,
+  last_modified TEXT,
+  stored_at REAL NOT NULL,
+  expires_at REAL NOT NULL,
+  accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+CacheEntry = collections.namedtuple(
+    'CacheEntry',
+    ['response', 'etag', 'last_modified', 'expires_at'],
+)
+
+
+def normalize_url(url: str) -> str:
+  """Returns url with sorted query parameters and credentials removed."""
+  parts = urllib.parse.urlsplit(url)
+  params = sorted(
+      (k, v)
+      for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+      if k not in _IGNORED_PARAMS
+  )
+  return urllib.parse.urlunsplit((
+      parts.scheme.lower(),
+      parts.netloc.lower(),
+      parts.path,
+      urllib.parse.urlencode(params),
+      '',
+  ))
+
+
+def cache_key(method: str, url: str, body: bytes | None = None) -> str:
+  """Returns the cache key for a request."""
+  digest = hashlib.sha256()
+  digest.update(method.upper().encode('ascii'))
+  digest.update(b'\0')
+  digest.update(normalize_url(url).encode('utf-8'))
+  digest.update(b'\0')
+  digest.update(body or b'')
+  return digest.hexdigest()
+
+
+def _get_header(headers: dict[str, str], name: str) -> str | None:
+  for key, value in headers.items():
+    if key.lower() == name.lower():
+      return value
+  return None
+
+
+class ResponseCache:
+  """Size-bounded SQLite store of HTTP responses.
+
+  A new connection is opened per operation, so one cache can be shared by
+  threads and by concurrent processes (SQLite handles the locking).
+  """
+
+  def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+    self.path = path
+    self.max_bytes = max_bytes
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with self._connect() as conn:
+      conn.execute('PRAGMA journal_mode=WAL')
+      conn.executescript(_SCHEMA)
+
+  def _connect(self) -> sqlite3.Connection:
+    return sqlite3.connect(self.path, timeout=30)
+
+  def get(self, key: str) -> CacheEntry | None:
+    """Returns the stored entry for key (fresh or stale), or None."""
+    with self._connect() as conn:
+      row = conn.execute(
+          'SELECT url, status_code, headers, encoding, data, etag,'
+          ' last_modified, expires_at FROM responses WHERE key = ?',
+          (key,),
+      ).fetchone()
+      if row is None:
+        return None
+      conn.execute(
+          'UPDATE responses SET accessed_at = ? WHERE key = ?',
+          (time.time(), key),
+      )
+    url, status_code, headers, encoding, data, etag, last_modified, expires = (
+        row
+    )
+    response = http_client.HttpResponse(
+        data=data,
+        status_code=status_code,
+        headers=json.loads(headers),
+        url=url,
+        encoding=encoding,
+    )
+    return CacheEntry(response, etag, last_modified, expires)
+
+  def put(self, key: str, response: http_client.HttpResponse, ttl: float):
+    """Stores a response and evicts old entries if over the size bound."""
+    now = time.time()
+    with self._connect() as conn:
+      conn.execute(
+          'INSERT OR REPLACE INTO responses (key, url, status_code, headers,'
+          ' encoding, data, size, etag, last_modified, stored_at, expires_at,'
+          ' accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+          (
+              key,
+              response.url,
+              response.status_code,
+              json.dumps(dict(response.headers)),
+              response.encoding,
+              response.data,
+              len(response.data),
+              _get_header(response.headers, 'ETag'),
+              _get_header(response.headers, 'Last-Modified'),
+              now,
+              now + ttl,
+              now,
+          ),
+      )
+      self._evict(conn)
+
+  def refresh(self, key: str, ttl: float):
+    """Extends the lifetime of an entry after a 304 Not Modified."""
+    now = time.time()
+    with self._connect() as conn:
+      conn.execute(
+          'UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?',
+          (now + ttl, now, key),
+      )
+
+  def _evict(self, conn: sqlite3.Connection):
+    (total,) = conn.execute(
+        'SELECT COALESCE(SUM(size), 0) FROM responses'
+    ).fetchone()
+    if total <= self.max_bytes:
+      return
+    excess = total - self.max_bytes
+    doomed = []
+    for key, size in conn.execute(
+        'SELECT key, size FROM responses ORDER BY accessed_at'
+    ):
+      doomed.append((key,))
+      excess -= size
+      if excess <= 0:
+        break
+    conn.executemany('DELETE FROM responses WHERE key = ?', doomed)
+
+
+class CachedHttpClient:
+  """Drop-in wrapper that serves `HttpClient` requests from a ResponseCache.
+
+  Only methods in `cache_methods` are cached (GET by default; add POST for
+  endpoints whose POST body fully determines the response).
+  """
+
+  def __init__(
+      self,
+      client: http_client.HttpClient,
+      cache: ResponseCache,
+      ttl: float,
+      cache_methods: tuple[str, ...] = ('GET',),
+  ):
+    self._client = client
+    self._cache = cache
+    self.ttl = ttl
+    self.cache_methods = frozenset(m.upper() for m in cache_methods)
+
+  def __getattr__(self, name: str) -> Any:
+    # Streaming and limiter helpers go straight to the wrapped client.
+    return getattr(self._client, name)
+
+  def fetch(
+      self,
+      url: str,
+      *,
+      method: str = 'GET',
+      headers: dict[str, str] | None = None,
+      data: bytes | None = None,
+      json_body: Any | None = None,
+      **kwargs,
+  ) -> http_client.HttpResponse:
+    """Same as `HttpClient.fetch`, answering from the cache when possible."""
+    if method.upper() not in self.cache_methods:
+      return self._client.fetch(
+          url,
+          method=method,
+          headers=headers,
+          data=data,
+          json_body=json_body,
+          **kwargs,
+      )
+
+    body = data
+    if json_body is not None:
+      body = json.dumps(json_body, sort_keys=True).encode('utf-8')
+    full_url = urllib.parse.urljoin(self._client.base_url, url)
+    key = cache_key(method, full_url, body)
+
+    entry = self._cache.get(key)
+    if entry is not None and entry.expires_at > time.time():
+      return entry.response
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+      if entry.etag:
+        request_headers['If-None-Match'] = entry.etag
+      if entry.last_modified:
+        request_headers['If-Modified-Since'] = entry.last_modified
+    try:
+      response = self._client.fetch(
+          url,
+          method=method,
+          headers=request_headers,
+          data=data,
+          json_body=json_body,
+          **kwargs,
+      )
+    except http_client.HttpError as exc:
+      if exc.status_code == 304 and entry is not None:
+        self._cache.refresh(key, self.ttl)
+        return entry.response
+      raise
+    self._cache.put(key, response, self.ttl)
+    return response
+
+  def fetch_json(self, url: str, **kwargs) -> Any:
+    """Same as `HttpClient.fetch_json`."""
+    hdrs = kwargs.pop('headers', None) or {}
+    hdrs.setdefault('Accept', 'application/json')
+    return self.fetch(url, headers=hdrs, **kwargs).json()
+
+  def fetch_bytes(self, url: str, **kwargs) -> bytes:
+    """Same as `HttpClient.fetch_bytes`."""
+    return self.fetch(url, **kwargs).data
+
+  def fetch_text(self, url: str, **kwargs) -> str:
+    """Same as `HttpClient.fetch_text`."""
+    return self.fetch(url, **kwargs).text
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser):
+  """Adds the standard --cache-dir / --no-cache options to a parser."""
+  parser.add_argument(
+      '--cache-dir',
+      default=DEFAULT_CACHE_DIR,
+      help=(
+          'Directory for the persistent HTTP response cache (default:'
+          ' $SKILLS_HTTP_CACHE_DIR or ~/.cache/skills-http)'
+      ),
+  )
+  parser.add_argument(
+      '--no-cache',
+      action='store_true',
+      help='Bypass the persistent HTTP response cache',
+  )
+
+
+def wrap_client(
+    client: http_client.HttpClient,
+    service: str,
+    ttl: float,
+    cache_dir: str | None = DEFAULT_CACHE_DIR,
+    **kwargs,
+) -> CachedHttpClient | http_client.HttpClient:
+  """Returns client wrapped with the cache for service, or client if disabled.
+
+  Args:
+    client: The HttpClient to wrap.
+    service: Cache database name (e.g. 'ncbi'); one SQLite file per service.
+    ttl: Time to live for cached responses, in seconds.
+    cache_dir: Cache directory, or None to disable caching.
+    **kwargs: Extra arguments for CachedHttpClient.
+  """
+  if not cache_dir:
+    return client
+  cache = ResponseCache(os.path.join(cache_dir, f'{service}.sqlite'))
+  return CachedHttpClient(client, cache, ttl, **kwargs)
@@ -34,6 +34,7 @@ import sys
 import tempfile
 
 from polite_http import http_client
+import response_cache
 
 BASE_URL = "https://rest.ensembl.org"
 GRCH37_URL = "https://grch37.rest.ensembl.org"
@@ -47,13 +48,37 @@ VEP_PLUGINS = (
 _CLIENT_REGULAR = http_client.HttpClient(BASE_URL, qps=15)
 _CLIENT_GRCH37 = http_client.HttpClient(GRCH37_URL, qps=15)
 
+# Ensembl ships a release every ~3 months; GRCh37 is frozen.
+_CACHE_TTL_SECONDS = {
+    "ensembl": 7 * 24 * 3600,
+    "ensembl-grch37": 30 * 24 * 3600,
+}
+_cache_dir = response_cache.DEFAULT_CACHE_DIR
+_cached_clients = {}
+
+
+def _configure_cache(cache_dir):
+  """Set the response cache directory; None disables the cache."""
+  global _cache_dir
+  _cache_dir = cache_dir
+  _cached_clients.clear()
+
+
+def _cached(client, service):
+  """Return *client* wrapped with the persistent response cache."""
+  if service not in _cached_clients:
+    _cached_clients[service] = response_cache.wrap_client(
+        client, service, _CACHE_TTL_SECONDS[service], _cache_dir
+    )
+  return _cached_clients[service]
+
 
 def _get_client(assembly=None):
-  """Return the correct client for the requested assembly."""
+  """Return the correct (cached) client for the requested assembly."""
   if assembly and assembly.upper() == "GRCH37":
     print("[*] Using GRCh37 assembly.")
-    return _CLIENT_GRCH37
-  return _CLIENT_REGULAR
+    return _cached(_CLIENT_GRCH37, "ensembl-grch37")
+  return _cached(_CLIENT_REGULAR, "ensembl")
 
 
 def _get_species(args):
@@ -86,14 +111,14 @@ def _try_fallback(url: str, query: str, client=None) -> list[dict[str, str]]:
   Args:
     url: The URL for the cross-reference lookup.
     query: The original gene symbol query.
-    client: The HttpClient to use. Defaults to _CLIENT_REGULAR.
+    client: The HttpClient to use. Defaults to the GRCh38 client.
 
   Returns:
     A list of dictionaries, where each dictionary contains gene information
     resolved from the cross-reference.
   """
   if client is None:
-    client = _CLIENT_REGULAR
+    client = _get_client()
   fallback_data = client.fetch_json(url)
   if not fallback_data:
     return []
@@ -624,6 +649,7 @@ def main():
       default=None,
       help="Assembly (e.g. GRCh38, GRCh37). Default: GRCh38.",
   )
+  response_cache.add_cache_arguments(parent_parser)
 
   parser = argparse.ArgumentParser(
       description="Query the Ensembl REST API.",
@@ -770,6 +796,7 @@ def main():
   p.set_defaults(func=cmd_vep)
 
   args = parser.parse_args()
+  _configure_cache(None if args.no_cache else args.cache_dir)
   args.func(args)
 
 
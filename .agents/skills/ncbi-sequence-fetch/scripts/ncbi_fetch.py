@@ -24,6 +24,7 @@ Rate-limited to 3 requests/second (10/s with NCBI_API_KEY).
 # /// script
 # requires-python = ">=3.10"
 # dependencies = [
+#   "numpy",
 #   "polite-http",
 #   "python-dotenv",
 # ]
@@ -32,17 +33,24 @@ Rate-limited to 3 requests/second (10/s with NCBI_API_KEY).
 from __future__ import annotations
 
 import argparse
+from concurrent import futures
 import json
 import os
 import re
 import sys
-from typing import Any
+from typing import IO, Any, Iterable, Iterator, TextIO
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
 
 import dotenv
 from polite_http import http_client
+import response_cache
+
+try:
+  import numpy as np
+except ImportError:  # Translation falls back to bytes lookup tables.
+  np = None
 
 _CODON_TABLE = {
     'ATA': 'I',
@@ -111,10 +119,47 @@ _CODON_TABLE = {
     'TGG': 'W',
 }
 
+# Lookup tables for the translation engine. Bases map to A=0, C=1, G=2, T=3
+# and anything else (N, IUPAC ambiguity codes, gaps) to 4; a codon with any
+# such base translates to 'X', as in the codon-by-codon loop.
+_BASE_ORDER = 'ACGT'
+_BASE_CODES = bytes(
+    _BASE_ORDER.index(chr(c).upper()) if chr(c).upper() in _BASE_ORDER else 4
+    for c in range(256)
+)
+_COMPLEMENT_CODES = bytes((3 - c) if c < 4 else 4 for c in range(5))
+# Amino acid for codon index 16*b1 + 4*b2 + b3, with index 64 = 'X'.
+_CODON_AA = (
+    ''.join(
+        _CODON_TABLE[a + b + c]
+        for a in _BASE_ORDER
+        for b in _BASE_ORDER
+        for c in _BASE_ORDER
+    )
+    + 'X'
+).encode('ascii')
+# Pure-Python path: normalize to ACGTN bytes, then look up whole codons.
+_NORMALIZE_BASES = bytes(
+    ord((_BASE_ORDER + 'N')[_BASE_CODES[c]]) for c in range(256)
+)
+_REVERSE_COMPLEMENT_BASES = bytes.maketrans(b'ACGTN', b'TGCAN')
+_CODON_AA_BY_BYTES = {
+    (a + b + c).encode('ascii'): _CODON_TABLE.get(a + b + c, 'X')
+    for a in _BASE_ORDER + 'N'
+    for b in _BASE_ORDER + 'N'
+    for c in _BASE_ORDER + 'N'
+}
+_CODON_SPLIT = re.compile(b'...', re.DOTALL)
+
 
 EUTILS_BASE = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils'
 
+# Sequence records and links change rarely; a week keeps repeat runs offline.
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+
 _CLIENT = None
+_CACHED_CLIENT = None
+_CACHE_DIR = response_cache.DEFAULT_CACHE_DIR
 
 
 def get_api_client():
@@ -127,6 +172,32 @@ def get_api_client():
   return _CLIENT
 
 
+def configure_cache(cache_dir: str | None) -> None:
+  """Sets the response cache directory; None disables the cache."""
+  global _CACHE_DIR, _CACHED_CLIENT
+  _CACHE_DIR = cache_dir
+  _CACHED_CLIENT = None
+
+
+def get_cached_client():
+  """Returns the API client wrapped with the persistent response cache."""
+  global _CACHED_CLIENT
+  if _CACHED_CLIENT is None:
+    _CACHED_CLIENT = response_cache.wrap_client(
+        get_api_client(), 'ncbi', CACHE_TTL_SECONDS, _CACHE_DIR
+    )
+  return _CACHED_CLIENT
+
+
+def _is_cacheable(endpoint: str, params: dict[str, str | int]) -> bool:
+  """History-server requests are session-bound and must not be cached."""
+  return (
+      endpoint != 'epost.fcgi'
+      and 'WebEnv' not in params
+      and params.get('usehistory') != 'y'
+  )
+
+
 def _eutils_get(endpoint: str, params: dict[str, str | int]) -> str | None:
   """Sends a GET request to an NCBI E-utilities endpoint.
 
@@ -149,13 +220,174 @@ def _eutils_get(endpoint: str, params: dict[str, str | int]) -> str | None:
   if query_string:
     full_url += f'?{query_string}'
 
+  client = (
+      get_cached_client()
+      if _is_cacheable(endpoint, params)
+      else get_api_client()
+  )
+  try:
+    return client.fetch_text(full_url)
+  except http_client.HttpError as e:
+    print(f'{endpoint} error after all retires: {e}', file=sys.stderr)
+    return None
+
+
+def _eutils_post(endpoint: str, params: dict[str, str | int]) -> str | None:
+  """Sends a POST request to an NCBI E-utilities endpoint.
+
+  NCBI asks for POST when a request carries more than ~200 IDs. Responses are
+  never cached since POSTs here feed the history server.
+
+  Args:
+    endpoint: E-utilities endpoint name (e.g. 'epost.fcgi').
+    params: Form parameters as a dict.
+
+  Returns:
+    Response text or None on failure.
+  """
+  api_key = os.environ.get('NCBI_API_KEY', '')
+  if api_key:
+    params['api_key'] = api_key
+
   try:
-    return get_api_client().fetch_text(full_url)
+    return get_api_client().fetch_text(
+        f'{EUTILS_BASE}/{endpoint}',
+        method='POST',
+        headers={'Content-Type': 'application/x-www-form-urlencoded'},
+        data=urllib.parse.urlencode(params).encode('utf-8'),
+    )
   except http_client.HttpError as e:
     print(f'{endpoint} error after all retires: {e}', file=sys.stderr)
     return None
 
 
+def epost(db: str, ids: list[str]) -> tuple[str, str] | None:
+  """Uploads IDs to the NCBI history server.
+
+  Args:
+    db: Database name (protein, nuccore, etc.)
+    ids: IDs to upload.
+
+  Returns:
+    Tuple of (WebEnv, query_key), or None on failure.
+  """
+  text = _eutils_post('epost.fcgi', {'db': db, 'id': ','.join(ids)})
+  if text:
+    try:
+      root = ET.fromstring(text)
+      webenv = root.findtext('WebEnv')
+      query_key = root.findtext('QueryKey')
+      if webenv and query_key:
+        return webenv, query_key
+      print(
+          f'epost error: {root.findtext(".//ERROR") or text[:200]}',
+          file=sys.stderr,
+      )
+    except ET.ParseError as e:
+      print(f'epost parse error: {e}', file=sys.stderr)
+  return None
+
+
+def efetch_history(
+    db: str,
+    webenv: str,
+    query_key: str,
+    count: int,
+    retmode: str = 'text',
+    rettype: str = 'fasta',
+    batch_size: int = 500,
+    concurrency: int = 1,
+) -> Iterator[str]:
+  """Pages efetch results for a history-server query set.
+
+  Pages are requested with retstart/retmax and yielded in order as they
+  arrive, so callers can stream records without holding the full set.
+
+  Args:
+    db: Database name.
+    webenv: WebEnv from epost/esearch.
+    query_key: Query key from epost/esearch.
+    count: Number of records in the query set.
+    retmode: Return mode (text, xml).
+    rettype: Return type (fasta, gb, gp, etc.)
+    batch_size: Records per request (NCBI allows up to 10,000).
+    concurrency: Maximum pages in flight.
+
+  Yields:
+    Response text for each page (pages that failed are skipped).
+  """
+
+  def fetch_page(retstart: int) -> str | None:
+    return _eutils_get(
+        'efetch.fcgi',
+        {
+            'db': db,
+            'WebEnv': webenv,
+            'query_key': query_key,
+            'retstart': retstart,
+            'retmax': batch_size,
+            'rettype': rettype,
+            'retmode': retmode,
+        },
+    )
+
+  starts = range(0, count, batch_size)
+  if concurrency <= 1:
+    for retstart in starts:
+      page = fetch_page(retstart)
+      if page:
+        yield page
+    return
+  with futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+    for page in pool.map(fetch_page, starts):
+      if page:
+        yield page
+
+
+def efetch_batched(
+    db: str,
+    ids: list[str],
+    retmode: str = 'text',
+    rettype: str = 'fasta',
+    batch_size: int = 500,
+    post_size: int = 10000,
+    concurrency: int = 1,
+) -> Iterator[str]:
+  """Fetches many IDs through epost + WebEnv paging.
+
+  IDs are posted in groups of post_size, and each group is paged back with
+  batch_size records per request.
+
+  Args:
+    db: Database name.
+    ids: IDs to fetch.
+    retmode: Return mode (text, xml).
+    rettype: Return type (fasta, gb, gp, etc.)
+    batch_size: Records per efetch request.
+    post_size: IDs per epost upload.
+    concurrency: Maximum efetch pages in flight.
+
+  Yields:
+    Response text for each page, in input order.
+  """
+  for i in range(0, len(ids), post_size):
+    group = ids[i : i + post_size]
+    history = epost(db, group)
+    if history is None:
+      continue
+    webenv, query_key = history
+    yield from efetch_history(
+        db,
+        webenv,
+        query_key,
+        len(group),
+        retmode=retmode,
+        rettype=rettype,
+        batch_size=batch_size,
+        concurrency=concurrency,
+    )
+
+
 def efetch(
     db: str,
     db_id: str | int,
@@ -184,6 +416,37 @@ def efetch(
   )
 
 
+def efetch_stream(
+    db: str,
+    db_id: str | int,
+    retmode: str = 'xml',
+    rettype: str = 'gb',
+) -> Iterator[bytes]:
+  """Streams an efetch response as byte chunks without buffering it.
+
+  Meant for records too large to hold as text (e.g. genomic GenBank XML fed
+  to iter_genbank_xml). Streamed responses bypass the response cache.
+
+  Args:
+    db: Database name (protein, nuccore, etc.)
+    db_id: One or more comma-separated IDs.
+    retmode: Return mode (text, xml).
+    rettype: Return type (gb, gp, fasta, etc.)
+
+  Yields:
+    Response body chunks; nothing if the request fails.
+  """
+  params = {'db': db, 'id': str(db_id), 'rettype': rettype, 'retmode': retmode}
+  api_key = os.environ.get('NCBI_API_KEY', '')
+  if api_key:
+    params['api_key'] = api_key
+  url = f'{EUTILS_BASE}/efetch.fcgi?{urllib.parse.urlencode(params)}'
+  try:
+    yield from get_api_client().stream_bytes(url)
+  except http_client.HttpError as e:
+    print(f'efetch.fcgi error after all retires: {e}', file=sys.stderr)
+
+
 def esearch(
     db: str,
     term: str,
@@ -218,37 +481,47 @@ def esearch(
   return [], 0
 
 
-def elink(dbfrom: str, db: str, link_id: str) -> list[str]:
+def elink(
+    dbfrom: str,
+    db: str,
+    link_id: str | list[str],
+    batch_size: int = 200,
+) -> list[str]:
   """Follows cross-database links via NCBI elink.
 
+  Multiple source IDs are sent together (up to batch_size per request) and
+  the union of their links is returned. Larger sets are uploaded with epost
+  and linked from the history server.
+
   Args:
     dbfrom: Source database (e.g., pubmed).
     db: Target database (e.g., protein).
-    link_id: ID in the source database.
+    link_id: ID, or list of IDs, in the source database.
+    batch_size: Largest ID set sent inline instead of through epost.
 
   Returns:
-    List of linked IDs in the target database.
+    List of linked IDs in the target database, without duplicates.
   """
-  text = _eutils_get(
-      'elink.fcgi',
-      {
-          'dbfrom': dbfrom,
-          'db': db,
-          'id': link_id,
-          'retmode': 'json',
-      },
-  )
+  ids = [link_id] if isinstance(link_id, str) else list(link_id)
+  params = {'dbfrom': dbfrom, 'db': db, 'retmode': 'json'}
+  if len(ids) > batch_size:
+    history = epost(dbfrom, ids)
+    if history is None:
+      return []
+    params['WebEnv'], params['query_key'] = history
+  else:
+    params['id'] = ','.join(ids)
+  text = _eutils_get('elink.fcgi', params)
+  linked = []
   if text:
     try:
       data = json.loads(text)
-      linksets = data.get('linksets', [])
-      if linksets:
-        linksetdbs = linksets[0].get('linksetdbs', [])
-        if linksetdbs:
-          return linksetdbs[0].get('links', [])
+      for linkset in data.get('linksets', []):
+        for linksetdb in linkset.get('linksetdbs', [])[:1]:
+          linked.extend(linksetdb.get('links', []))
     except (json.JSONDecodeError, ValueError) as e:
       print(f'elink parse error: {e}', file=sys.stderr)
-  return []
+  return list(dict.fromkeys(linked))
 
 
 def esummary(db: str, ids: str | list[str]) -> dict[str, Any]:
@@ -301,24 +574,191 @@ def parse_fasta(text: str | None) -> list[tuple[str, str]]:
   return entries
 
 
+def parse_gbseq_records(xml_text: str | None) -> list[dict[str, Any]]:
+  """Parses GBSeq/INSDSeq XML into accession, definition and sequence dicts."""
+  if not xml_text:
+    return []
+  records = []
+  try:
+    root = ET.fromstring(xml_text)
+  except ET.ParseError as e:
+    print(f'XML parse error: {e}', file=sys.stderr)
+    return []
+  # NCBI returns GBSeq or INSDSeq depending on format
+  seq_els = root.findall('.//GBSeq')
+  pfx = 'GBSeq'
+  if not seq_els:
+    seq_els = root.findall('.//INSDSeq')
+    pfx = 'INSDSeq'
+  for gb_seq in seq_els:
+    seq = gb_seq.findtext(f'{pfx}_sequence')
+    if not seq:
+      continue
+    records.append({
+        'accession': gb_seq.findtext(f'{pfx}_primary-accession') or '',
+        'definition': gb_seq.findtext(f'{pfx}_definition') or '',
+        'moltype': gb_seq.findtext(f'{pfx}_moltype') or '',
+        'sequence': seq.upper(),
+        'length': len(seq),
+    })
+  return records
+
+
+def _map_concurrent(fn, items, concurrency: int = 1) -> list[Any]:
+  """Applies fn to each item, up to `concurrency` calls in flight.
+
+  The shared HttpClient rate limiter is cross-thread (and cross-process), so
+  concurrent calls still respect the NCBI QPS budget; they only overlap the
+  round-trip latency of requests that would otherwise run back to back.
+
+  Args:
+    fn: Callable taking one item.
+    items: Items to process.
+    concurrency: Maximum number of concurrent calls.
+
+  Returns:
+    List of results in the same order as items.
+  """
+  items = list(items)
+  if concurrency <= 1 or len(items) <= 1:
+    return [fn(item) for item in items]
+  get_cached_client()  # Initialize once before fanning out.
+  with futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+    return list(pool.map(fn, items))
+
+
+def _efetch_fasta_batches(
+    db: str,
+    ids: list[str],
+    batch_size: int = 20,
+    concurrency: int = 1,
+) -> list[tuple[str, str]]:
+  """Fetches FASTA for ids in batches and returns (header, sequence) tuples.
+
+  Sets larger than a single batch go through epost + WebEnv paging, which
+  needs one request per 500 records instead of one per batch_size IDs.
+  """
+  if len(ids) > batch_size:
+    entries = []
+    for fasta in efetch_batched(db, ids, concurrency=concurrency):
+      entries.extend(parse_fasta(fasta))
+    return entries
+  batches = [ids[i : i + batch_size] for i in range(0, len(ids), batch_size)]
+  entries = []
+  for fasta in _map_concurrent(
+      lambda batch: efetch(db, ','.join(batch)), batches, concurrency
+  ):
+    if fasta:
+      entries.extend(parse_fasta(fasta))
+  return entries
+
+
+def _clean_dna(seq: str) -> bytes:
+  return seq.replace('\n', '').replace(' ', '').encode('ascii', 'replace')
+
+
+def _base_codes(seq: bytes) -> Any:
+  """Returns the strand as a NumPy array of base codes (0-3, or 4)."""
+  return np.frombuffer(seq.translate(_BASE_CODES), dtype=np.uint8)
+
+
+def _frame_proteins(codes: Any) -> list[Any]:
+  """Translates the three forward frames of a code array in one pass.
+
+  Codon indices are computed for every offset at once and then strided per
+  frame, so each strand is scanned a single time.
+  """
+  if len(codes) < 3:
+    return [np.zeros(0, dtype=np.uint8)] * 3
+  first, second, third = codes[:-2], codes[1:-1], codes[2:]
+  index = (first.astype(np.uint16) << 4) | (second << 2) | third
+  index[(first == 4) | (second == 4) | (third == 4)] = 64
+  aa = np.frombuffer(_CODON_AA, dtype=np.uint8)[index]
+  return [aa[frame::3] for frame in range(3)]
+
+
+def _translate_bytes(seq: bytes) -> str:
+  """Pure-Python translation of cleaned DNA bytes (no NumPy)."""
+  codons = _CODON_SPLIT.findall(seq.translate(_NORMALIZE_BASES))
+  return ''.join(map(_CODON_AA_BY_BYTES.__getitem__, codons))
+
+
 def translate_dna(seq: str) -> str:
   """Translates a DNA sequence to protein using the standard codon table."""
-  protein = []
-  seq = seq.upper().replace('\n', '').replace(' ', '')
-  for i in range(0, len(seq) - len(seq) % 3, 3):
-    codon = seq[i : i + 3]
-    if 'N' in codon:
-      protein.append('X')
-    else:
-      aa = _CODON_TABLE.get(codon, 'X')
-      protein.append(aa)
-  return ''.join(protein).rstrip('*')
+  seq = _clean_dna(seq)
+  if np is None:
+    return _translate_bytes(seq).rstrip('*')
+  codes = _base_codes(seq[: len(seq) - len(seq) % 3]).reshape(-1, 3)
+  index = (codes[:, 0].astype(np.uint16) << 4) | (codes[:, 1] << 2)
+  index |= codes[:, 2]
+  index[(codes == 4).any(axis=1)] = 64
+  aa = np.frombuffer(_CODON_AA, dtype=np.uint8)[index]
+  return aa.tobytes().decode('ascii').rstrip('*')
+
+
+def six_frame_translations(seq: str) -> list[str]:
+  """Translates all six reading frames of a DNA sequence.
+
+  Args:
+    seq: DNA sequence string.
+
+  Returns:
+    Proteins for frames +1, +2, +3, -1, -2, -3 (reverse-complement frames
+    are read 5' to 3' on the reverse strand), trailing stops removed as in
+    translate_dna.
+  """
+  seq = _clean_dna(seq)
+  if np is None:
+    rev = seq.translate(_NORMALIZE_BASES).translate(
+        _REVERSE_COMPLEMENT_BASES
+    )[::-1]
+    return [
+        _translate_bytes(strand[frame:]).rstrip('*')
+        for strand in (seq, rev)
+        for frame in range(3)
+    ]
+  codes = _base_codes(seq)
+  rev_codes = np.frombuffer(_COMPLEMENT_CODES, dtype=np.uint8)[codes[::-1]]
+  return [
+      aa.tobytes().decode('ascii').rstrip('*')
+      for strand in (codes, rev_codes)
+      for aa in _frame_proteins(strand)
+  ]
+
+
+def _longest_orf_numpy(seq: bytes, min_len: int) -> str | None:
+  """Vectorized six-frame ORF scan using stop/start positions as arrays."""
+  stop, start = ord('*'), ord('M')
+  codes = _base_codes(seq)
+  rev_codes = np.frombuffer(_COMPLEMENT_CODES, dtype=np.uint8)[codes[::-1]]
+  best, best_len = None, 0
+  for strand in (codes, rev_codes):
+    for aa in _frame_proteins(strand):
+      stops = np.flatnonzero(aa == stop)
+      methionines = np.flatnonzero(aa == start)
+      if not len(methionines):
+        continue
+      # Segment k runs from stop k-1 (exclusive) to stop k (or the end);
+      # its ORF starts at the segment's first methionine.
+      segment = np.searchsorted(stops, methionines)
+      first = np.ones(len(segment), dtype=bool)
+      first[1:] = segment[1:] != segment[:-1]
+      orf_starts = methionines[first]
+      ends = np.append(stops, len(aa))[segment[first]]
+      lengths = ends - orf_starts
+      i = int(np.argmax(lengths))  # First of equal lengths wins, as before.
+      if lengths[i] >= min_len and lengths[i] > best_len:
+        best_len = int(lengths[i])
+        best = aa[orf_starts[i] : orf_starts[i] + best_len]
+  return best.tobytes().decode('ascii') if best is not None else None
 
 
 def get_longest_orf(seq: str, min_len: int = 75) -> str | None:
   """Finds the longest open reading frame in a DNA sequence.
 
-  Searches all 6 reading frames (3 forward + 3 reverse complement).
+  Searches all 6 reading frames (3 forward + 3 reverse complement). An ORF
+  runs from the first M after a stop codon up to the next stop; ties keep
+  the earliest ORF (forward frames first).
 
   Args:
     seq: DNA sequence string.
@@ -327,33 +767,190 @@ def get_longest_orf(seq: str, min_len: int = 75) -> str | None:
   Returns:
     Longest ORF protein sequence, or None.
   """
-  rev_comp = {'A': 'T', 'T': 'A', 'C': 'G', 'G': 'C', 'N': 'N'}
-  rev_seq = ''.join(rev_comp.get(b, 'N') for b in reversed(seq.upper()))
-
+  if np is not None:
+    return _longest_orf_numpy(_clean_dna(seq), min_len)
   longest = ''
-  for s in [seq.upper(), rev_seq]:
-    for frame in range(3):
-      translated = translate_dna(s[frame:])
-      # Split on stop codons
-      peptides = translated.split('*')
-      for pep in peptides:
-        idx = pep.find('M')
-        if idx != -1:
-          orf = pep[idx:]
-          if len(orf) >= min_len and len(orf) > len(longest):
-            longest = orf
+  for translated in six_frame_translations(seq):
+    for pep in translated.split('*'):
+      idx = pep.find('M')
+      if idx != -1:
+        orf = pep[idx:]
+        if len(orf) >= min_len and len(orf) > len(longest):
+          longest = orf
   return longest if longest else None
 
 
+def longest_orfs(
+    seqs: Iterable[str],
+    min_len: int = 75,
+    concurrency: int = 1,
+) -> list[str | None]:
+  """Batch get_longest_orf over many sequences.
+
+  NumPy releases the GIL in the array kernels, so concurrency > 1 overlaps
+  the scans of separate sequences in threads.
+
+  Args:
+    seqs: DNA sequences.
+    min_len: Minimum ORF length in amino acids.
+    concurrency: Number of worker threads.
+
+  Returns:
+    Longest ORF (or None) for each sequence, in input order.
+  """
+  seqs = list(seqs)
+  if concurrency <= 1 or len(seqs) <= 1:
+    return [get_longest_orf(seq, min_len) for seq in seqs]
+  with futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+    return list(pool.map(lambda seq: get_longest_orf(seq, min_len), seqs))
+
+
+def _iter_xml_chunks(
+    source: str | bytes | IO[bytes] | Iterable[bytes],
+    chunk_size: int = 1 << 16,
+) -> Iterator[bytes]:
+  """Normalizes text, bytes, a binary file object or a chunk iterator."""
+  if isinstance(source, str):
+    source = source.encode('utf-8')
+  if isinstance(source, bytes):
+    for i in range(0, len(source), chunk_size):
+      yield source[i : i + chunk_size]
+  elif hasattr(source, 'read'):
+    yield from iter(lambda: source.read(chunk_size), b'')
+  else:
+    yield from source
+
+
+_CDS_QUALIFIERS = ('product', 'gene', 'locus_tag', 'protein_id', 'note')
+
+
+def _is_genomic_moltype(value: str | None) -> bool:
+  return bool(value) and 'genomic' in value.lower()
+
+
+def iter_genbank_xml(
+    source: str | bytes | IO[bytes] | Iterable[bytes],
+) -> Iterator[tuple[str, dict[str, Any]]]:
+  """Streams CDS features and record info from GenBank (GBSeq) XML.
+
+  The document is fed incrementally to an XML pull parser and every feature
+  and sequence element is cleared once handled, so memory stays flat even for
+  chromosome-sized records.
+
+  Args:
+    source: XML as text, bytes, a binary file object, or an iterable of byte
+      chunks (e.g. a streamed HTTP response).
+
+  Yields:
+    ('moltype', info) when a record's molecule type is read and again after
+    its source feature, ('cds', entry) for each CDS feature with a
+    translation (keys: translation, product, gene, locus_tag, protein_id,
+    note), and ('record', info) when the record ends. info holds accession,
+    moltype and is_genomic (GBSeq_moltype or the source feature's mol_type
+    qualifier says genomic).
+
+  Raises:
+    ET.ParseError: If the XML is malformed.
+  """
+  parser = ET.XMLPullParser(events=('start', 'end'))
+  fed = False
+  root = None
+  info = {}
+  seen_source = False
+  for chunk in _iter_xml_chunks(source):
+    fed = fed or bool(chunk)
+    parser.feed(chunk)
+    for event, elem in parser.read_events():
+      tag = elem.tag
+      if event == 'start':
+        if root is None:
+          root = elem
+        elif tag == 'GBSeq':
+          info = {'accession': '', 'moltype': '', 'is_genomic': False}
+          seen_source = False
+        continue
+
+      if tag == 'GBSeq_primary-accession':
+        info['accession'] = elem.text or ''
+      elif tag == 'GBSeq_moltype':
+        info['moltype'] = elem.text or ''
+        info['is_genomic'] = _is_genomic_moltype(elem.text)
+        yield 'moltype', dict(info)
+      elif tag == 'GBSeq_sequence':
+        elem.clear()  # Drop potentially megabase-sized sequence text.
+      elif tag == 'GBFeature':
+        key = elem.findtext('GBFeature_key')
+        if key == 'source' and not seen_source:
+          seen_source = True
+          for qual in elem.iter('GBQualifier'):
+            if qual.findtext(
+                'GBQualifier_name'
+            ) == 'mol_type' and _is_genomic_moltype(
+                qual.findtext('GBQualifier_value')
+            ):
+              info['is_genomic'] = True
+          yield 'moltype', dict(info)
+        elif key == 'CDS':
+          entry = {
+              'translation': '',
+              'product': '',
+              'gene': '',
+              'locus_tag': '',
+              'protein_id': '',
+              'note': '',
+          }
+          for qual in elem.iter('GBQualifier'):
+            name = qual.findtext('GBQualifier_name')
+            val = qual.findtext('GBQualifier_value')
+            if val:
+              if name == 'translation':
+                entry['translation'] = val.upper()
+              elif name in _CDS_QUALIFIERS:
+                entry[name] = val
+          if entry['translation']:
+            yield 'cds', entry
+        elem.clear()
+      elif tag == 'GBSeq':
+        yield 'record', dict(info)
+        elem.clear()
+        if root is not None:
+          root.clear()  # Detach finished records from the document root.
+  if fed:  # An empty (failed) stream has no records rather than bad XML.
+    parser.close()
+
+
+def scan_genbank_xml(
+    source: str | bytes | IO[bytes] | Iterable[bytes] | None,
+) -> tuple[list[dict[str, str]], bool]:
+  """Returns (CDS translations, is_genomic) from a single streaming pass.
+
+  is_genomic follows the first record, matching is_genomic_record.
+  """
+  results = []
+  genomic = None
+  if not source:
+    return results, False
+  try:
+    for kind, payload in iter_genbank_xml(source):
+      if kind == 'cds':
+        results.append(payload)
+      elif kind == 'record' and genomic is None:
+        genomic = payload['is_genomic']
+  except ET.ParseError as e:
+    print(f'XML parse error: {e}', file=sys.stderr)
+  return results, bool(genomic)
+
+
 def extract_cds_translations(
-    xml_text: str | None,
+    xml_text: str | bytes | IO[bytes] | Iterable[bytes] | None,
     identifier: str | None = None,
     target_len: int = 0,
 ) -> list[dict[str, str]]:
   """Extracts CDS translations from GenBank XML.
 
   Args:
-    xml_text: GenBank XML string from efetch.
+    xml_text: GenBank XML from efetch, as text, bytes, a binary file object or
+      an iterable of byte chunks.
     identifier: Optional gene name to filter by.
     target_len: Optional target protein length for best-match selection.
 
@@ -362,215 +959,191 @@ def extract_cds_translations(
     gene, locus_tag, protein_id
   """
   del identifier, target_len  # Reserved for future filtering.
-  if not xml_text:
-    return []
-  results = []
-  try:
-    root = ET.fromstring(xml_text)
-    for seq in root.findall('.//GBSeq'):
-      for feat in seq.findall('.//GBFeature'):
-        key = feat.find('GBFeature_key')
-        if key is None or key.text != 'CDS':
-          continue
-        entry = {
-            'translation': '',
-            'product': '',
-            'gene': '',
-            'locus_tag': '',
-            'protein_id': '',
-            'note': '',
-        }
-        for qual in feat.findall('.//GBQualifier'):
-          name = qual.find('GBQualifier_name')
-          val = qual.find('GBQualifier_value')
-          if name is not None and val is not None and val.text:
-            if name.text == 'translation':
-              entry['translation'] = val.text.upper()
-            elif name.text in [
-                'product',
-                'gene',
-                'locus_tag',
-                'protein_id',
-                'note',
-            ]:
-              entry[name.text] = val.text
-        if entry['translation']:
-          results.append(entry)
-  except ET.ParseError as e:
-    print(f'XML parse error: {e}', file=sys.stderr)
-  return results
+  return scan_genbank_xml(xml_text)[0]
+
 
+def is_genomic_record(
+    xml_text: str | bytes | IO[bytes] | Iterable[bytes],
+) -> bool:
+  """Checks if a GenBank XML record is genomic DNA (not mRNA/CDS).
 
-def is_genomic_record(xml_text: str) -> bool:
-  """Checks if a GenBank XML record is genomic DNA (not mRNA/CDS)."""
+  Stops reading as soon as the first record's molecule type or source
+  feature settles the answer.
+  """
   try:
-    root = ET.fromstring(xml_text)
-    moltype = root.find('.//GBSeq_moltype')
-    if moltype is not None and moltype.text:
-      if 'genomic' in moltype.text.lower():
+    for kind, payload in iter_genbank_xml(xml_text):
+      if kind == 'moltype' and payload['is_genomic']:
         return True
-    for feat in root.iter('GBFeature'):
-      k = feat.find('GBFeature_key')
-      if k is not None and k.text == 'source':
-        for qual in feat.iter('GBQualifier'):
-          n = qual.find('GBQualifier_name')
-          v = qual.find('GBQualifier_value')
-          if (
-              n is not None
-              and n.text == 'mol_type'
-              and v is not None
-              and v.text
-              and 'genomic' in v.text.lower()
-          ):
-            return True
-        break
+      if kind == 'record':
+        return False
   except ET.ParseError:
     pass
   return False
 
 
+def _fetch_protein_entries(acc: str) -> list[dict[str, Any]]:
+  """Fetches FASTA entries for one protein accession."""
+  fasta = efetch('protein', acc)
+  entries = parse_fasta(fasta) if fasta else []
+  if not entries and '_' in acc:
+    # Try with dot variant
+    fasta = efetch('protein', acc.replace('_', '.'))
+    entries = parse_fasta(fasta) if fasta else []
+  if not entries:
+    return [{'accession': acc, 'error': 'Not found'}]
+  return [
+      {
+          'accession': acc,
+          'header': header,
+          'sequence': seq,
+          'length': len(seq),
+      }
+      for header, seq in entries
+  ]
+
+
 def cmd_fetch_protein(args: argparse.Namespace) -> None:
   """Fetches protein sequence by accession ID."""
   results = []
-  for acc in args.accession:
-    fasta = efetch('protein', acc)
-    entries = parse_fasta(fasta) if fasta else []
-    if entries:
-      for header, seq in entries:
-        results.append({
-            'accession': acc,
-            'header': header,
-            'sequence': seq,
-            'length': len(seq),
-        })
-    else:
-      # Try with dot variant
-      if '_' in acc:
-        fasta = efetch('protein', acc.replace('_', '.'))
-        entries = parse_fasta(fasta) if fasta else []
-        for header, seq in entries:
-          results.append({
-              'accession': acc,
-              'header': header,
-              'sequence': seq,
-              'length': len(seq),
-          })
-      if not any(r['accession'] == acc for r in results):
-        results.append({
-            'accession': acc,
-            'error': 'Not found',
-        })
+  for rows in _map_concurrent(
+      _fetch_protein_entries, args.accession, args.concurrency
+  ):
+    results.extend(rows)
   _write_output(results, args.output)
 
 
+def _fetch_nucleotide_entries(acc: str) -> list[dict[str, Any]]:
+  """Fetches FASTA entries for one nucleotide accession."""
+  fasta = efetch('nuccore', acc)
+  entries = parse_fasta(fasta) if fasta else []
+  if not entries:
+    return [{'accession': acc, 'error': 'Not found'}]
+  return [
+      {
+          'accession': acc,
+          'header': header,
+          'sequence': seq,
+          'length': len(seq),
+      }
+      for header, seq in entries
+  ]
+
+
 def cmd_fetch_nucleotide(args: argparse.Namespace) -> None:
   """Fetches nucleotide sequence by accession ID."""
   results = []
-  for acc in args.accession:
-    fasta = efetch('nuccore', acc)
-    entries = parse_fasta(fasta) if fasta else []
-    if entries:
-      for header, seq in entries:
-        results.append({
-            'accession': acc,
-            'header': header,
-            'sequence': seq,
-            'length': len(seq),
-        })
-    else:
-      results.append({'accession': acc, 'error': 'Not found'})
+  for rows in _map_concurrent(
+      _fetch_nucleotide_entries, args.accession, args.concurrency
+  ):
+    results.extend(rows)
   _write_output(results, args.output)
 
 
-def cmd_cds_translate(args: argparse.Namespace) -> None:
-  """Fetches CDS and translates to protein sequence.
+def _cds_translate_one(acc: str, target_length: int) -> dict[str, Any]:
+  """Fetches CDS for one accession and translates it to protein.
 
   Tries multiple approaches:
   1. NCBI fasta_cds_aa (pre-translated CDS protein)
-  2. GenBank XML CDS translation annotations
+  2. GenBank XML CDS translations
   3. Raw nucleotide to 6-frame ORF finding (if not genomic)
 
   Args:
-    args: Parsed CLI args with accession, target_length, and output attributes.
-  """
-  results = []
-  for acc in args.accession:
-    result = {'accession': acc}
+    acc: CDS/nucleotide accession.
+    target_length: Expected protein length (AA), or 0 for the longest.
 
-    # Approach 1: Pre-translated CDS protein
-    fasta = efetch('nuccore', acc, rettype='fasta_cds_aa')
-    if fasta:
-      entries = parse_fasta(fasta)
-      if entries:
-        best = _pick_best_by_length(entries, args.target_length)
-        if best:
-          header, seq = best
-          seq = seq.replace('*', '')
-          # Check for dominant isoform if multiple entries
-          if len(entries) > 1 and not args.target_length:
-            dom = _get_dominant_cds(acc)
-            if dom:
-              seq = dom
-              header = f'>dominant_isoform_{acc}'
-          result['header'] = header
-          result['sequence'] = seq
-          result['length'] = len(seq)
-          result['method'] = 'fasta_cds_aa'
-          results.append(result)
-          continue
+  Returns:
+    Result dict with the translation, or an 'error' key.
+  """
+  result = {'accession': acc}
 
-    # Approach 2: GenBank XML CDS translations
-    xml_data = efetch('nuccore', acc, retmode='xml', rettype='gb')
-    if xml_data:
-      genomic = is_genomic_record(xml_data)
-      cds_list = extract_cds_translations(xml_data)
-      if cds_list:
-        if args.target_length:
-          best_cds = min(
-              cds_list,
-              key=lambda c: abs(len(c['translation']) - args.target_length),
-          )
-        else:
-          best_cds = max(
-              cds_list,
-              key=lambda c: len(c['translation']),
-          )
-        result['header'] = (
-            f'>{best_cds["gene"]}'
-            f'|{best_cds["product"]}'
-            f'|{best_cds["protein_id"]}'
+  # Approach 1: Pre-translated CDS protein
+  fasta = efetch('nuccore', acc, rettype='fasta_cds_aa')
+  if fasta:
+    entries = parse_fasta(fasta)
+    if entries:
+      best = _pick_best_by_length(entries, target_length)
+      if best:
+        header, seq = best
+        seq = seq.replace('*', '')
+        # Check for dominant isoform if multiple entries
+        if len(entries) > 1 and not target_length:
+          dom = _get_dominant_cds(acc)
+          if dom:
+            seq = dom
+            header = f'>dominant_isoform_{acc}'
+        result['header'] = header
+        result['sequence'] = seq
+        result['length'] = len(seq)
+        result['method'] = 'fasta_cds_aa'
+        return result
+
+  # Approach 2: GenBank XML CDS translations
+  xml_data = efetch('nuccore', acc, retmode='xml', rettype='gb')
+  if xml_data:
+    cds_list, genomic = scan_genbank_xml(xml_data)
+    if cds_list:
+      if target_length:
+        best_cds = min(
+            cds_list,
+            key=lambda c: abs(len(c['translation']) - target_length),
         )
-        result['sequence'] = best_cds['translation']
-        result['length'] = len(best_cds['translation'])
-        result['method'] = 'genbank_xml_cds'
-        result['cds_info'] = best_cds
-        if genomic:
-          result['is_genomic'] = True
-        results.append(result)
-        continue
+      else:
+        best_cds = max(
+            cds_list,
+            key=lambda c: len(c['translation']),
+        )
+      result['header'] = (
+          f'>{best_cds["gene"]}'
+          f'|{best_cds["product"]}'
+          f'|{best_cds["protein_id"]}'
+      )
+      result['sequence'] = best_cds['translation']
+      result['length'] = len(best_cds['translation'])
+      result['method'] = 'genbank_xml_cds'
+      result['cds_info'] = best_cds
       if genomic:
         result['is_genomic'] = True
+      return result
+    if genomic:
+      result['is_genomic'] = True
+
+  # Approach 3: Raw nucleotide ORF finding
+  fasta = efetch('nuccore', acc)
+  if fasta:
+    entries = parse_fasta(fasta)
+    if entries:
+      _, dna_seq = entries[0]
+      orf = get_longest_orf(dna_seq)
+      if orf:
+        tl = target_length
+        if tl == 0 or abs(len(orf) - tl) < 50:
+          result['header'] = f'>ORF_{acc}'
+          result['sequence'] = orf
+          result['length'] = len(orf)
+          result['method'] = 'orf_translation'
+          return result
 
-    # Approach 3: Raw nucleotide ORF finding
-    fasta = efetch('nuccore', acc)
-    if fasta:
-      entries = parse_fasta(fasta)
-      if entries:
-        _, dna_seq = entries[0]
-        orf = get_longest_orf(dna_seq)
-        if orf:
-          tl = args.target_length
-          if tl == 0 or abs(len(orf) - tl) < 50:
-            result['header'] = f'>ORF_{acc}'
-            result['sequence'] = orf
-            result['length'] = len(orf)
-            result['method'] = 'orf_translation'
-            results.append(result)
-            continue
-
-    result['error'] = 'No CDS translation found'
-    results.append(result)
+  result['error'] = 'No CDS translation found'
+  return result
 
+
+def cmd_cds_translate(args: argparse.Namespace) -> None:
+  """Fetches CDS and translates to protein sequence.
+
+  Tries multiple approaches:
+  1. NCBI fasta_cds_aa (pre-translated CDS protein)
+  2. GenBank XML CDS translation annotations
+  3. Raw nucleotide to 6-frame ORF finding (if not genomic)
+
+  Args:
+    args: Parsed CLI args with accession, target_length, concurrency, and
+      output attributes.
+  """
+  results = _map_concurrent(
+      lambda acc: _cds_translate_one(acc, args.target_length),
+      args.accession,
+      args.concurrency,
+  )
   _write_output(results, args.output)
 
 
@@ -587,53 +1160,156 @@ def cmd_search(args: argparse.Namespace) -> None:
 
   # Optionally fetch FASTA for returned IDs
   if args.fetch_sequences and ids:
-    sequences = []
-    batch_size = 20
-    for i in range(0, len(ids), batch_size):
-      batch = ids[i : i + batch_size]
-      fasta = efetch(args.database, ','.join(batch))
-      if fasta:
-        entries = parse_fasta(fasta)
-        for header, seq in entries:
-          sequences.append({
-              'header': header,
-              'sequence': seq,
-              'length': len(seq),
-          })
-    result['sequences'] = sequences
+    entries = _efetch_fasta_batches(
+        args.database, ids, concurrency=args.concurrency
+    )
+    result['sequences'] = [
+        {
+            'header': header,
+            'sequence': seq,
+            'length': len(seq),
+        }
+        for header, seq in entries
+    ]
   _write_output(result, args.output)
 
 
 def cmd_elink(args: argparse.Namespace) -> None:
   """Follows cross-database links from one NCBI database to another."""
-  linked_ids = elink(args.dbfrom, args.db, args.id)
+  source_ids = _collect_ids(args.id, args.ids_file)
+  if not source_ids:
+    sys.exit('elink: no source IDs given')
+  linked_ids = elink(args.dbfrom, args.db, source_ids)
   result = {
       'source_db': args.dbfrom,
       'target_db': args.db,
-      'source_id': args.id,
+      'source_id': source_ids[0] if len(source_ids) == 1 else source_ids,
       'linked_ids': linked_ids,
       'count': len(linked_ids),
   }
 
   if args.fetch_sequences and linked_ids:
-    sequences = []
-    batch_size = 20
-    for i in range(0, len(linked_ids), batch_size):
-      batch = linked_ids[i : i + batch_size]
-      fasta = efetch(args.db, ','.join(batch))
-      if fasta:
-        entries = parse_fasta(fasta)
-        for header, seq in entries:
-          sequences.append({
-              'header': header,
-              'sequence': seq,
-              'length': len(seq),
-          })
-    result['sequences'] = sequences
+    entries = _efetch_fasta_batches(
+        args.db, linked_ids, concurrency=args.concurrency
+    )
+    result['sequences'] = [
+        {
+            'header': header,
+            'sequence': seq,
+            'length': len(seq),
+        }
+        for header, seq in entries
+    ]
 
   _write_output(result, args.output)
 
 
+def _collect_ids(ids: list[str] | None, ids_file: str | None) -> list[str]:
+  """Merges IDs from the command line and an ID file ('-' for stdin).
+
+  The file holds one ID per line (commas and whitespace also separate IDs;
+  '#' starts a comment). Duplicates are dropped, keeping first occurrence.
+  """
+  collected = list(ids or [])
+  if ids_file:
+    handle = sys.stdin if ids_file == '-' else open(ids_file)
+    with handle:
+      for line in handle:
+        line = line.split('#', 1)[0]
+        collected.extend(re.split(r'[\s,]+', line.strip()))
+  return list(dict.fromkeys(i for i in collected if i))
+
+
+def iter_batch_records(
+    db: str,
+    ids: list[str],
+    rettype: str = 'fasta',
+    batch_size: int = 500,
+    concurrency: int = 1,
+) -> Iterator[dict[str, Any]]:
+  """Streams parsed records for many IDs via epost + WebEnv paging.
+
+  Args:
+    db: Database name (protein, nuccore).
+    ids: IDs or accessions to fetch.
+    rettype: 'fasta', or 'gb'/'gp' for GenBank records (fetched as XML).
+    batch_size: Records per efetch request.
+    concurrency: Maximum efetch pages in flight.
+
+  Yields:
+    One dict per record, as soon as its page has been parsed.
+  """
+  fasta = rettype == 'fasta'
+  for page in efetch_batched(
+      db,
+      ids,
+      retmode='text' if fasta else 'xml',
+      rettype=rettype,
+      batch_size=batch_size,
+      concurrency=concurrency,
+  ):
+    if fasta:
+      for header, seq in parse_fasta(page):
+        yield {
+            'accession': header[1:].split(None, 1)[0] if header else '',
+            'header': header,
+            'sequence': seq,
+            'length': len(seq),
+        }
+    else:
+      yield from parse_gbseq_records(page)
+
+
+def _write_fasta_record(out: TextIO, record: dict[str, Any]) -> None:
+  header = record.get('header') or (
+      f'>{record["accession"]} {record.get("definition", "")}'.rstrip()
+  )
+  out.write(header + '\n')
+  seq = record['sequence']
+  for i in range(0, len(seq), 70):
+    out.write(seq[i : i + 70] + '\n')
+
+
+def cmd_batch_fetch(args: argparse.Namespace) -> None:
+  """Fetches thousands of records through the NCBI history server.
+
+  IDs are uploaded with epost and paged back with WebEnv/query_key and
+  retstart/retmax, so N IDs cost about N/batch_size requests instead of N.
+  Records are written as they arrive (JSON Lines or FASTA), never buffered.
+
+  Args:
+    args: Parsed CLI args with ids, ids_file, database, rettype, format,
+      batch_size, concurrency, and output attributes.
+  """
+  ids = _collect_ids(args.ids, args.ids_file)
+  if not ids:
+    sys.exit('batch-fetch: no IDs given (use positional IDs or --ids-file)')
+
+  out = open(args.output, 'w') if args.output else sys.stdout
+  count = 0
+  try:
+    for record in iter_batch_records(
+        args.database,
+        ids,
+        rettype=args.rettype,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+    ):
+      if args.format == 'fasta':
+        _write_fasta_record(out, record)
+      else:
+        out.write(json.dumps(record) + '\n')
+      count += 1
+      if count % 1000 == 0:
+        print(f'Progress: {count} records written...', file=sys.stderr)
+  finally:
+    if out is not sys.stdout:
+      out.close()
+  print(f'{count} record(s) for {len(ids)} ID(s)', file=sys.stderr)
+  if args.output:
+    print(f'Results written to: {args.output}')
+
+
 def cmd_gene_protein(args: argparse.Namespace) -> None:
   """Searches for protein sequence by gene name and organism.
 
@@ -656,18 +1332,19 @@ def cmd_gene_protein(args: argparse.Namespace) -> None:
     query += f' AND {lo}:{hi}[Sequence Length]'
 
   ids, count = esearch('protein', query, retmax=args.retmax)
-  if ids:
-    for uid in ids[: args.retmax]:
-      fasta = efetch('protein', uid)
-      if fasta:
-        entries = parse_fasta(fasta)
-        for header, seq in entries:
-          results.append({
-              'uid': uid,
-              'header': header,
-              'sequence': seq,
-              'length': len(seq),
-          })
+  uids = ids[: args.retmax]
+  for uid, fasta in zip(
+      uids,
+      _map_concurrent(lambda uid: efetch('protein', uid), uids, args.concurrency),
+  ):
+    if fasta:
+      for header, seq in parse_fasta(fasta):
+        results.append({
+            'uid': uid,
+            'header': header,
+            'sequence': seq,
+            'length': len(seq),
+        })
 
   output = {
       'gene': gene,
@@ -718,23 +1395,18 @@ def cmd_locus_protein(args: argparse.Namespace) -> None:
   nuc_query = f'{locus}[Accession] OR {locus}[All Fields]'
   nuc_ids, _ = esearch('nuccore', nuc_query, retmax=10)
   if nuc_ids:
-    xml_data = efetch(
-        'nuccore',
-        ','.join(nuc_ids),
-        retmode='xml',
-        rettype='gb',
-    )
-    if xml_data:
-      cds_list = extract_cds_translations(xml_data, identifier=locus)
-      for cds in cds_list:
-        results.append({
-            'header': f'>{cds["gene"]}|{cds["product"]}|{cds["protein_id"]}',
-            'sequence': cds['translation'],
-            'length': len(cds['translation']),
-            'source': 'nuccore_cds',
-            'gene': cds['gene'],
-            'locus_tag': cds['locus_tag'],
-        })
+    # Nuccore hits can be whole chromosomes; stream instead of buffering.
+    xml_stream = efetch_stream('nuccore', ','.join(nuc_ids))
+    cds_list = extract_cds_translations(xml_stream, identifier=locus)
+    for cds in cds_list:
+      results.append({
+          'header': f'>{cds["gene"]}|{cds["product"]}|{cds["protein_id"]}',
+          'sequence': cds['translation'],
+          'length': len(cds['translation']),
+          'source': 'nuccore_cds',
+          'gene': cds['gene'],
+          'locus_tag': cds['locus_tag'],
+      })
 
   output = {
       'locus': locus,
@@ -770,63 +1442,50 @@ def cmd_pubmed_proteins(args: argparse.Namespace) -> None:
 
   if prot_ids:
     batch_size = 20
-    for i in range(0, len(prot_ids), batch_size):
-      batch = prot_ids[i : i + batch_size]
-      xml_data = efetch('protein', ','.join(batch), retmode='xml', rettype='gp')
-      if xml_data:
-        try:
-          root = ET.fromstring(xml_data)
-          # NCBI returns GBSeq or INSDSeq depending on format
-          seq_els = root.findall('.//GBSeq')
-          pfx = 'GBSeq'
-          if not seq_els:
-            seq_els = root.findall('.//INSDSeq')
-            pfx = 'INSDSeq'
-          for gb_seq in seq_els:
-            defn = gb_seq.find(f'{pfx}_definition')
-            acc = gb_seq.find(f'{pfx}_primary-accession')
-            seq_el = gb_seq.find(f'{pfx}_sequence')
-            if seq_el is not None and seq_el.text:
-              defn_text = (defn.text or '') if defn is not None else ''
-              entry = {
-                  'accession': acc.text if acc is not None else '',
-                  'definition': defn_text,
-                  'sequence': seq_el.text.upper(),
-                  'length': len(seq_el.text),
-                  'source': 'protein_db',
-              }
-              if identifier:
-                entry['matches_identifier'] = (
-                    identifier.lower() in defn_text.lower()
-                )
-              results.append(entry)
-        except (ET.ParseError, AttributeError):
-          pass
+    if len(prot_ids) > batch_size:
+      pages = efetch_batched('protein', prot_ids, retmode='xml', rettype='gp')
+    else:
+      pages = [
+          efetch('protein', ','.join(prot_ids), retmode='xml', rettype='gp')
+      ]
+    for xml_data in pages:
+      for record in parse_gbseq_records(xml_data):
+        entry = {
+            'accession': record['accession'],
+            'definition': record['definition'],
+            'sequence': record['sequence'],
+            'length': record['length'],
+            'source': 'protein_db',
+        }
+        if identifier:
+          entry['matches_identifier'] = (
+              identifier.lower() in record['definition'].lower()
+          )
+        results.append(entry)
 
   # Step 3: Nuccore records for CDS translations
   nuc_ids, _ = esearch('nuccore', f'{pmid}[PMID]', retmax=100)
   if nuc_ids:
     for i in range(0, len(nuc_ids), 10):
       batch = nuc_ids[i : i + 10]
-      xml_data = efetch('nuccore', ','.join(batch), retmode='xml', rettype='gb')
-      if xml_data:
-        cds_list = extract_cds_translations(xml_data, identifier=identifier)
-        for cds in cds_list:
-          entry = {
-              'gene': cds['gene'],
-              'product': cds['product'],
-              'protein_id': cds['protein_id'],
-              'sequence': cds['translation'],
-              'length': len(cds['translation']),
-              'source': 'nuccore_cds',
-          }
-          if identifier:
-            entry['matches_identifier'] = (
-                identifier.lower() in cds['gene'].lower()
-                or identifier.lower() in cds['product'].lower()
-                or identifier.lower() in cds['protein_id'].lower()
-            )
-          results.append(entry)
+      xml_stream = efetch_stream('nuccore', ','.join(batch))
+      cds_list = extract_cds_translations(xml_stream, identifier=identifier)
+      for cds in cds_list:
+        entry = {
+            'gene': cds['gene'],
+            'product': cds['product'],
+            'protein_id': cds['protein_id'],
+            'sequence': cds['translation'],
+            'length': len(cds['translation']),
+            'source': 'nuccore_cds',
+        }
+        if identifier:
+          entry['matches_identifier'] = (
+              identifier.lower() in cds['gene'].lower()
+              or identifier.lower() in cds['product'].lower()
+              or identifier.lower() in cds['protein_id'].lower()
+          )
+        results.append(entry)
 
   output = {
       'pmid': pmid,
@@ -894,32 +1553,28 @@ def cmd_patent_search(args: argparse.Namespace) -> None:
     all_ids = all_ids[: args.retmax]  # dedupe preserving order
 
     if all_ids:
-      batch_size = 20
-      for i in range(0, len(all_ids), batch_size):
-        batch = all_ids[i : i + batch_size]
-        fasta = efetch('protein', ','.join(batch))
-        if fasta:
-          entries = parse_fasta(fasta)
-          for header, seq in entries:
-            # Filter results that don't mention our patent's digits
-            if digits and digits not in header:
-              continue
-
-            seq_id_match = re.search(r'Sequence (\d+)', header)
-            pat_match = re.search(
-                r'patent\s+(?:[a-zA-Z]{2}\s*)?(\d{7,10})',
-                header,
-                re.IGNORECASE,
-            )
-            results.append({
-                'header': header,
-                'sequence': seq,
-                'length': len(seq),
-                'seq_id_no': (
-                    int(seq_id_match.group(1)) if seq_id_match else None
-                ),
-                'patent_number': pat_match.group(1) if pat_match else patent,
-            })
+      for header, seq in _efetch_fasta_batches(
+          'protein', all_ids, concurrency=args.concurrency
+      ):
+        # Filter results that don't mention our patent's digits
+        if digits and digits not in header:
+          continue
+
+        seq_id_match = re.search(r'Sequence (\d+)', header)
+        pat_match = re.search(
+            r'patent\s+(?:[a-zA-Z]{2}\s*)?(\d{7,10})',
+            header,
+            re.IGNORECASE,
+        )
+        results.append({
+            'header': header,
+            'sequence': seq,
+            'length': len(seq),
+            'seq_id_no': (
+                int(seq_id_match.group(1)) if seq_id_match else None
+            ),
+            'patent_number': pat_match.group(1) if pat_match else patent,
+        })
 
   elif args.keywords:
     # Mode 2: Search by keywords with patent filter
@@ -935,25 +1590,21 @@ def cmd_patent_search(args: argparse.Namespace) -> None:
 
     ids, _ = esearch('protein', query, retmax=args.retmax)
     if ids:
-      batch_size = 20
-      for i in range(0, len(ids), batch_size):
-        batch = ids[i : i + batch_size]
-        fasta = efetch('protein', ','.join(batch))
-        if fasta:
-          entries = parse_fasta(fasta)
-          for header, seq in entries:
-            pat_match = re.search(
-                r'patent\s+US\s*(\d{7,8})',
-                header,
-                re.IGNORECASE,
-            )
-            if pat_match:
-              results.append({
-                  'header': header,
-                  'sequence': seq,
-                  'length': len(seq),
-                  'patent_number': pat_match.group(1),
-              })
+      for header, seq in _efetch_fasta_batches(
+          'protein', ids, concurrency=args.concurrency
+      ):
+        pat_match = re.search(
+            r'patent\s+US\s*(\d{7,8})',
+            header,
+            re.IGNORECASE,
+        )
+        if pat_match:
+          results.append({
+              'header': header,
+              'sequence': seq,
+              'length': len(seq),
+              'patent_number': pat_match.group(1),
+          })
 
   output = {
       'patent_number': args.patent_number or '',
@@ -983,18 +1634,14 @@ def cmd_organism_length(args: argparse.Namespace) -> None:
   query = f'"{organism}"[Organism] AND {length}[SLEN]'
   ids, count = esearch('protein', query, retmax=args.retmax)
   if ids:
-    batch_size = 20
-    for i in range(0, len(ids), batch_size):
-      batch = ids[i : i + batch_size]
-      fasta = efetch('protein', ','.join(batch))
-      if fasta:
-        entries = parse_fasta(fasta)
-        for header, seq in entries:
-          results.append({
-              'header': header,
-              'sequence': seq,
-              'length': len(seq),
-          })
+    for header, seq in _efetch_fasta_batches(
+        'protein', ids, concurrency=args.concurrency
+    ):
+      results.append({
+          'header': header,
+          'sequence': seq,
+          'length': len(seq),
+      })
 
   output = {
       'organism': organism,
@@ -1122,7 +1769,10 @@ def main() -> None:
 
   # elink
   p = sub.add_parser('elink', help='Follow cross-database links')
-  p.add_argument('id', help='Source ID')
+  p.add_argument('id', nargs='*', help='Source ID(s)')
+  p.add_argument(
+      '--ids-file', help='File of source IDs, one per line ("-" for stdin)'
+  )
   p.add_argument(
       '--dbfrom', required=True, help='Source database (e.g., pubmed)'
   )
@@ -1134,6 +1784,41 @@ def main() -> None:
   )
   p.add_argument('--output', '-o', help='Output JSON file')
 
+  # batch-fetch
+  p = sub.add_parser(
+      'batch-fetch',
+      help='Fetch many records via epost + WebEnv paging (streams output)',
+  )
+  p.add_argument('ids', nargs='*', help='IDs or accessions')
+  p.add_argument(
+      '--ids-file', help='File of IDs, one per line ("-" for stdin)'
+  )
+  p.add_argument(
+      '--database',
+      '-d',
+      default='protein',
+      help='Database (protein, nuccore)',
+  )
+  p.add_argument(
+      '--rettype',
+      choices=['fasta', 'gb', 'gp'],
+      default='fasta',
+      help='Record type; gb/gp are fetched as GenBank XML',
+  )
+  p.add_argument(
+      '--format',
+      choices=['jsonl', 'fasta'],
+      default='jsonl',
+      help='Output format (default: JSON Lines, one record per line)',
+  )
+  p.add_argument(
+      '--batch-size',
+      type=int,
+      default=500,
+      help='Records per efetch request (max 10000)',
+  )
+  p.add_argument('--output', '-o', help='Output file (default: stdout)')
+
   # gene-protein
   p = sub.add_parser(
       'gene-protein',
@@ -1194,10 +1879,23 @@ def main() -> None:
   p.add_argument('--retmax', type=int, default=50, help='Max results')
   p.add_argument('--output', '-o', help='Output JSON file')
 
+  for subparser in sub.choices.values():
+    subparser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help=(
+            'Maximum concurrent requests for batch work (shares the NCBI'
+            ' QPS budget)'
+        ),
+    )
+    response_cache.add_cache_arguments(subparser)
+
   args = parser.parse_args()
   if not args.command:
     parser.print_help()
     sys.exit(1)
+  configure_cache(None if args.no_cache else args.cache_dir)
 
   cmd_map = {
       'fetch-protein': cmd_fetch_protein,
@@ -1205,6 +1903,7 @@ def main() -> None:
       'cds-translate': cmd_cds_translate,
       'search': cmd_search,
       'elink': cmd_elink,
+      'batch-fetch': cmd_batch_fetch,
       'gene-protein': cmd_gene_protein,
       'locus-protein': cmd_locus_protein,
       'pubmed-proteins': cmd_pubmed_proteins,
@@ -0,0 +1,98 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for GenBank XML parsing in ncbi_fetch."""
+
+import unittest
+
+import ncbi_fetch
+
+_GENBANK_XML = b"""<?xml version="1.0"?>
+<GBSet>
+  <GBSeq>
+    <GBSeq_primary-accession>NC_000001</GBSeq_primary-accession>
+    <GBSeq_moltype>DNA</GBSeq_moltype>
+    <GBSeq_feature-table>
+      <GBFeature>
+        <GBFeature_key>source</GBFeature_key>
+        <GBFeature_quals>
+          <GBQualifier>
+            <GBQualifier_name>mol_type</GBQualifier_name>
+            <GBQualifier_value>genomic DNA</GBQualifier_value>
+          </GBQualifier>
+        </GBFeature_quals>
+      </GBFeature>
+      <GBFeature>
+        <GBFeature_key>CDS</GBFeature_key>
+        <GBFeature_quals>
+          <GBQualifier>
+            <GBQualifier_name>gene</GBQualifier_name>
+            <GBQualifier_value>abcA</GBQualifier_value>
+          </GBQualifier>
+          <GBQualifier>
+            <GBQualifier_name>locus_tag</GBQualifier_name>
+            <GBQualifier_value>ABC_0001</GBQualifier_value>
+          </GBQualifier>
+          <GBQualifier>
+            <GBQualifier_name>note</GBQualifier_name>
+            <GBQualifier_value>putative</GBQualifier_value>
+          </GBQualifier>
+          <GBQualifier>
+            <GBQualifier_name>codon_start</GBQualifier_name>
+            <GBQualifier_value>1</GBQualifier_value>
+          </GBQualifier>
+          <GBQualifier>
+            <GBQualifier_name>product</GBQualifier_name>
+            <GBQualifier_value>ABC transporter</GBQualifier_value>
+          </GBQualifier>
+          <GBQualifier>
+            <GBQualifier_name>protein_id</GBQualifier_name>
+            <GBQualifier_value>WP_000001.1</GBQualifier_value>
+          </GBQualifier>
+          <GBQualifier>
+            <GBQualifier_name>translation</GBQualifier_name>
+            <GBQualifier_value>mkvl</GBQualifier_value>
+          </GBQualifier>
+        </GBFeature_quals>
+      </GBFeature>
+    </GBSeq_feature-table>
+    <GBSeq_sequence>atgaaagtgctg</GBSeq_sequence>
+  </GBSeq>
+</GBSet>
+"""
+
+
+class ExtractCdsTranslationsTest(unittest.TestCase):
+
+  def test_cds_qualifiers(self):
+    self.assertEqual(
+        ncbi_fetch.extract_cds_translations(_GENBANK_XML),
+        [{
+            'translation': 'MKVL',
+            'product': 'ABC transporter',
+            'gene': 'abcA',
+            'locus_tag': 'ABC_0001',
+            'protein_id': 'WP_000001.1',
+            'note': 'putative',
+        }],
+    )
+
+  def test_scan_reports_genomic_record(self):
+    cds, is_genomic = ncbi_fetch.scan_genbank_xml(_GENBANK_XML)
+    self.assertEqual(len(cds), 1)
+    self.assertTrue(is_genomic)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -23,6 +23,7 @@
 
 
 import argparse
+from concurrent import futures
 import os
 import sys
 
@@ -60,10 +61,11 @@ def download_files(args: argparse.Namespace):
   if not os.path.exists(args.output_dir):
     os.makedirs(args.output_dir, exist_ok=True)
 
-  for pdb_id in ids:
+  ext = "cif" if args.format == "mmcif" else "pdb"
+
+  def _download(pdb_id: str) -> None:
     sanitized_id = sanitize_id(pdb_id)
     shard_chars = sanitized_id[-3:-1]
-    ext = "cif" if args.format == "mmcif" else "pdb"
 
     url = (
         f"/pub/wwpdb/pdb/data/entries/{shard_chars}/{sanitized_id}/"
@@ -82,6 +84,11 @@ def download_files(args: argparse.Namespace):
     except Exception as e:
       print(f"Failed to download {pdb_id}: {e}", file=sys.stderr)
 
+  # The client's rate limiter is shared across threads, so concurrent
+  # downloads stay within the QPS budget while overlapping transfer time.
+  with futures.ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+    list(pool.map(_download, ids))
+
 
 def parse_args() -> argparse.Namespace:
   """Parse command line arguments."""
@@ -105,6 +112,12 @@ def parse_args() -> argparse.Namespace:
       required=True,
       help="Directory to save files to",
   )
+  parser.add_argument(
+      "--concurrency",
+      type=int,
+      default=1,
+      help="Maximum concurrent downloads (shares the 5 QPS budget)",
+  )
   return parser.parse_args()
 
 
@@ -0,0 +1,230 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serve Predicting The Past inference from models kept in memory.
+
+Loading a checkpoint, its dataset and its retrieval embeddings takes much
+longer than running inference on one text. This server loads them once per
+language at startup and answers JSON requests on a local HTTP port, so a
+batch job over many texts pays the startup cost once.
+
+Endpoints:
+  GET  /health  Returns the loaded languages.
+  POST /infer   Runs inference on one text. The body is a JSON object with
+                "text" and any run_inference.py option named in
+                run_inference.REQUEST_OPTIONS, without the leading dashes.
+                The response is the same JSON run_inference.py writes with
+                --output_json.
+
+Requests are handled one at a time, in arrival order.
+
+Usage:
+  uv run scripts/inference_server.py --languages=latin,greek
+
+Examples:
+  uv run scripts/run_inference.py --server=http://127.0.0.1:8765 \
+    --language=latin --input="..." --attribute
+
+  curl -s http://127.0.0.1:8765/infer -d '{"language": "greek",
+    "text": "...", "attribute": true, "contextualize": true}'
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#   "jax",
+#   "numpy",
+#   "predictingthepast",
+# ]
+# ///
+
+import argparse
+import http.server
+import json
+import sys
+from typing import Any
+
+import run_inference
+
+_DEFAULT_PORT: int = 8765
+
+
+def load_languages(
+    languages: list[str], models_dir: str
+) -> dict[str, tuple[Any, ...]]:
+  """Loads the resources run_inference.infer_text needs for each language."""
+  resources = {}
+  for language in languages:
+    args = argparse.Namespace(language=language, models_dir=models_dir)
+    resources[language] = run_inference._load_resources(args)
+  return resources
+
+
+def request_args(
+    request: Any, languages: list[str]
+) -> tuple[str, argparse.Namespace]:
+  """Validates a request body and returns its text and inference options.
+
+  Options missing from the request take the run_inference.py defaults.
+
+  Args:
+    request: The decoded JSON request body.
+    languages: Languages loaded by the server.
+
+  Returns:
+    A tuple of (text, args) for run_inference.infer_text.
+
+  Raises:
+    ValueError: If the request is malformed.
+  """
+  if not isinstance(request, dict):
+    raise ValueError('Request body must be a JSON object.')
+  unknown = set(request) - set(run_inference.REQUEST_OPTIONS) - {'text'}
+  if unknown:
+    raise ValueError(f'Unknown request fields: {sorted(unknown)}')
+
+  text = request.get('text')
+  if not isinstance(text, str) or not text.strip():
+    raise ValueError('"text" must be a non-empty string.')
+  if request.get('language') not in languages:
+    raise ValueError(f'"language" must be one of {languages}.')
+
+  parser = run_inference.build_parser()
+  options = {}
+  for name in run_inference.REQUEST_OPTIONS:
+    default = parser.get_default(name)
+    value = request.get(name, default)
+    if default is not None:
+      expected = (int, float) if isinstance(default, float) else type(default)
+      if isinstance(value, bool) != isinstance(default, bool) or not (
+          isinstance(value, expected)
+      ):
+        raise ValueError(f'"{name}" must be of type {type(default).__name__}.')
+    options[name] = value
+
+  args = argparse.Namespace(**options)
+  if not (args.attribute or args.contextualize or args.restore):
+    raise ValueError(
+        'At least one of "attribute", "contextualize" or "restore" must be'
+        ' true.'
+    )
+  return text, args
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+  """Routes /health and /infer requests to the loaded models."""
+
+  server: 'InferenceServer'
+
+  def do_GET(self) -> None:  # pylint: disable=invalid-name
+    if self.path != '/health':
+      self._send_json(404, {'error': f'Unknown path: {self.path}'})
+      return
+    self._send_json(200, {'languages': sorted(self.server.resources)})
+
+  def do_POST(self) -> None:  # pylint: disable=invalid-name
+    if self.path != '/infer':
+      self._send_json(404, {'error': f'Unknown path: {self.path}'})
+      return
+    try:
+      length = int(self.headers.get('Content-Length', 0))
+      text, args = request_args(
+          json.loads(self.rfile.read(length)), sorted(self.server.resources)
+      )
+    except ValueError as e:
+      self._send_json(400, {'error': str(e)})
+      return
+
+    try:
+      output = run_inference.infer_text(
+          text, args, self.server.resources[args.language]
+      )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+      print(f'Inference failed: {e}', file=sys.stderr)
+      self._send_json(500, {'error': f'Inference failed: {e}'})
+      return
+    self._send_json(200, output)
+
+  def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+    body = json.dumps(payload).encode('utf-8')
+    self.send_response(status)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+
+class InferenceServer(http.server.HTTPServer):
+  """HTTP server holding the loaded resources for each language."""
+
+  # Batch clients may open many connections while a request is running.
+  request_queue_size = 64
+
+  def __init__(
+      self, address: tuple[str, int], resources: dict[str, tuple[Any, ...]]
+  ):
+    super().__init__(address, _Handler)
+    self.resources = resources
+
+
+def main() -> None:
+  """Entry point: loads the requested languages and serves until stopped."""
+  parser = argparse.ArgumentParser(
+      description='Serve Predicting The Past inference from loaded models.'
+  )
+  parser.add_argument(
+      '--languages',
+      default='latin,greek',
+      help='Comma-separated languages to load (default: latin,greek).',
+  )
+  parser.add_argument(
+      '--models_dir',
+      default=run_inference._MODELS_DIR,
+      help='Directory containing model files.',
+  )
+  parser.add_argument(
+      '--host',
+      default='127.0.0.1',
+      help='Address to listen on (default: 127.0.0.1, local only).',
+  )
+  parser.add_argument(
+      '--port',
+      type=int,
+      default=_DEFAULT_PORT,
+      help=f'Port to listen on (default: {_DEFAULT_PORT}).',
+  )
+  args = parser.parse_args()
+
+  languages = [l.strip() for l in args.languages.split(',') if l.strip()]
+  for language in languages:
+    if language not in ('latin', 'greek'):
+      parser.error(f'Unknown language: {language}')
+
+  server = InferenceServer(
+      (args.host, args.port), load_languages(languages, args.models_dir)
+  )
+  print(
+      f'Serving {", ".join(languages)} on http://{args.host}:{args.port}',
+      file=sys.stderr,
+  )
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+
+
+if __name__ == '__main__':
+  main()
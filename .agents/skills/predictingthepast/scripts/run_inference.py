@@ -21,13 +21,20 @@ and contextualization via parallel inscription retrieval. Optionally
 generates a text embedding vector.
 
 For texts exceeding 750 characters, the input is split into overlapping
-windows and attribution scores are averaged across all windows.
+windows and attribution scores are averaged across all windows. With
+--batch_windows, attribution and contextualization for all windows run as one
+batched, jit-compiled model call instead of one call per window and task.
+
+With --server, the text is sent to a running inference_server.py that keeps
+the models, datasets and retrieval embeddings loaded, instead of loading them
+in this process.
 """
 
 # /// script
 # requires-python = ">=3.10"
 # dependencies = [
 #   "jax",
+#   "numpy",
 #   "predictingthepast",
 # ]
 # ///
@@ -43,9 +50,12 @@ import urllib.error
 import urllib.request
 
 import jax
+import jax.numpy as jnp
+import numpy as np
 from predictingthepast.eval import inference
 from predictingthepast.models import model as model_lib
 from predictingthepast.util import alphabet as util_alphabet
+from predictingthepast.util import eval as eval_util
 
 # Per-language model checkpoint, dataset, and retrieval-embedding filenames.
 _LATIN_FILES: dict[str, str] = {
@@ -87,6 +97,23 @@ GCS_BASE: str = 'https://storage.googleapis.com/ithaca-resources/models'
 _MAX_LEN: int = 750
 _MIN_LEN: int = 25
 
+# Options sent to an inference server in client mode (see --server), in
+# addition to the text itself.
+REQUEST_OPTIONS: tuple[str, ...] = (
+    'language',
+    'attribute',
+    'restore',
+    'contextualize',
+    'embedding',
+    'batch_windows',
+    'window_overlap',
+    'restore_beam_width',
+    'restore_max_len',
+    'restore_temperature',
+    'contextualize_top_k',
+    'contextualize_exclude_test_valid',
+)
+
 
 @functools.cache
 def _load_region_names(language: str) -> list[str]:
@@ -268,8 +295,8 @@ def average_attributions(
   """Averages attribution scores across windows.
 
   Takes a list of attribution dictionaries (one per window) and returns a
-  single dictionary with numerical scores (like date_scores and region_scores)
-  averaged together.
+  single dictionary with numerical scores (year_scores and per-location
+  scores) averaged together. Locations are re-ranked by averaged score.
 
   Args:
     attr_list: List of attribution dictionaries to average.
@@ -284,31 +311,46 @@ def average_attributions(
   if len(valid) == 1:
     return valid[0]
 
-  averaged = json.loads(json.dumps(valid[0]))
-
-  if 'date_scores' in averaged:
-    n = len(valid)
-    scores = averaged['date_scores']
-    for attr in valid[1:]:
-      if 'date_scores' in attr:
-        for i, score in enumerate(attr['date_scores']):
-          if i < len(scores):
-            scores[i] = scores[i] + score
-    averaged['date_scores'] = [s / n for s in scores]
-
-  if 'region_scores' in averaged:
-    n = len(valid)
-    scores = averaged['region_scores']
-    for attr in valid[1:]:
-      if 'region_scores' in attr:
-        for i, score in enumerate(attr['region_scores']):
-          if i < len(scores):
-            scores[i] = scores[i] + score
-    averaged['region_scores'] = [s / n for s in scores]
+  # Only the averaged score fields are replaced, so a shallow copy suffices.
+  averaged = dict(valid[0])
+  for key in ('year_scores', 'date_scores', 'region_scores'):
+    if key in averaged:
+      averaged[key] = _mean_scores(valid, key)
+
+  if 'locations' in averaged:
+    num_locations = 1 + max(
+        loc['location_id']
+        for attr in valid
+        for loc in attr.get('locations', [])
+    )
+    totals = np.zeros(num_locations)
+    for attr in valid:
+      locations = attr.get('locations', [])
+      np.add.at(
+          totals,
+          [loc['location_id'] for loc in locations],
+          [loc['score'] for loc in locations],
+      )
+    mean = totals / len(valid)
+    order = np.argsort(-mean, kind='stable')
+    averaged['locations'] = [
+        {'location_id': int(i), 'score': float(mean[i])} for i in order
+    ]
 
   return averaged
 
 
+def _mean_scores(valid: list[dict[str, Any]], key: str) -> list[float]:
+  """Averages one score list across windows, aligned to the first window."""
+  first = np.asarray(valid[0][key], dtype=np.float64)
+  total = first.copy()
+  for attr in valid[1:]:
+    if key in attr:
+      scores = np.asarray(attr[key][: len(first)], dtype=np.float64)
+      total[: len(scores)] += scores
+  return (total / len(valid)).tolist()
+
+
 def _download_model_file(url: str, dest_path: str):
   """Downloads a model file from a URL to a local path."""
   print(f'[*] Downloading {url} to {dest_path}...', file=sys.stderr)
@@ -373,6 +415,223 @@ def _load_resources(
   return model_config, region_map, alphabet, params, forward, dataset, retrieval
 
 
+def _batch_bucket(size: int) -> int:
+  """Rounds a batch size up to a power of two so few shapes are compiled."""
+  return 1 << max(size - 1, 0).bit_length()
+
+
+@functools.cache
+def _make_batched_forward(
+    forward: Any, vocab_char_size: int, attribute: bool, embed: bool
+) -> Any:
+  """Returns one jit-compiled function running the window tasks on a batch.
+
+  The function takes a [batch, length] array of character ids and returns
+  the date and region logits, grad x input saliency for the top date and
+  region of each row (when attribute is set), and the torso outputs used for
+  contextualization (when embed is set). Rows are independent, so the
+  gradient of the summed top logits gives every row its own saliency.
+  The function is cached per model so a long-running process traces it once
+  per batch size bucket.
+
+  Args:
+    forward: JAX model forward function.
+    vocab_char_size: Character vocabulary size from model_config.
+    attribute: Whether to compute logits and saliency.
+    embed: Whether to return torso outputs.
+  """
+  rng = jax.random.PRNGKey(inference.SEED)
+
+  def top_logit_sum(params, text_char_emb, padding, output):
+    logits = forward(params, text_char_emb=text_char_emb, padding=padding)[
+        output
+    ]
+    top = logits.argmax(axis=-1)[:, None]
+    return jnp.take_along_axis(logits, top, axis=-1).sum()
+
+  def run(params, text_char):
+    (date_logits, region_logits, _, _, _), torso = forward(
+        params,
+        text_char=text_char,
+        output_return_emb=True,
+        rngs={'dropout': rng},
+        is_training=False,
+    )
+    outputs = {}
+    if attribute:
+      embedding = params['params']['char_embeddings']['embedding']
+      onehot = jax.nn.one_hot(text_char, vocab_char_size)
+      text_char_emb = jnp.matmul(onehot.astype(embedding.dtype), embedding)
+      padding = jnp.where(text_char > 0, 1, 0)
+      grad_fn = jax.grad(top_logit_sum, argnums=1)
+      outputs['date_logits'] = date_logits
+      outputs['region_logits'] = region_logits
+      outputs['date_input_grad'] = (
+          grad_fn(params, text_char_emb, padding, 0) * text_char_emb
+      )
+      outputs['region_input_grad'] = (
+          grad_fn(params, text_char_emb, padding, 1) * text_char_emb
+      )
+    if embed:
+      outputs['torso'] = torso
+    return outputs
+
+  return jax.jit(run)
+
+
+def _saliency(
+    input_grad: np.ndarray,
+    text_char: np.ndarray,
+    text_len: Any,
+    alphabet: Any,
+    vocab_char_size: int,
+) -> list[float]:
+  """Normalized per-character saliency, as in inference.attribute."""
+  onehot = np.eye(vocab_char_size, dtype=np.float32)[text_char]
+  saliency = eval_util.grad_to_saliency_char(
+      input_grad, onehot, text_len=text_len, alphabet=alphabet
+  )
+  saliency = saliency / np.max(saliency[1:])
+  # Skip the start of sequence symbol.
+  return saliency.tolist()[1:]
+
+
+def _precomputed_forward(torso: Any) -> Any:
+  """Returns a forward stand-in that yields already computed torso outputs."""
+  return lambda *args, **kwargs: (None, torso)
+
+
+def _process_windows_batched(
+    *,
+    windows: list[str],
+    args: argparse.Namespace,
+    forward: Any,
+    params: Any,
+    alphabet: Any,
+    vocab_char_size: int,
+    dataset: Any,
+    retrieval: Any,
+    region_map: Any,
+) -> tuple[list[dict[str, Any] | None], list[dict[str, Any] | None]]:
+  """Runs attribution and contextualization for all windows in one call.
+
+  Windows are padded into a single batch, rounded up to a power of two by
+  repeating the first window, and run through one jit-compiled function that
+  covers both tasks. Results match running inference.attribute and
+  inference.contextualize on each window.
+
+  Args:
+    windows: List of text windows produced by split_into_windows().
+    args: Parsed command-line arguments.
+    forward: JAX model forward function.
+    params: JAX model parameters.
+    alphabet: Language-specific alphabet encoder.
+    vocab_char_size: Character vocabulary size from model_config.
+    dataset: Loaded dataset for contextualization.
+    retrieval: Loaded retrieval embeddings for contextualization.
+    region_map: Region ID mapping from the checkpoint.
+
+  Returns:
+    Two parallel lists of per-window results for attribution and
+    contextualization. Entries are None on failure or when skipped.
+  """
+  all_attr = [None] * len(windows)
+  all_ctx = [None] * len(windows)
+
+  prepared = []
+  for i, window in enumerate(windows):
+    try:
+      text, _, _, text_char, text_len, _, _ = inference._prepare_text(
+          window, alphabet
+      )
+    except Exception as e:
+      print(f'Window {i+1} could not be encoded: {e}', file=sys.stderr)
+      continue
+    prepared.append((i, text, text_char, text_len))
+  if not prepared:
+    return all_attr, all_ctx
+
+  text_chars = np.concatenate([p[2] for p in prepared])
+  padding_rows = _batch_bucket(len(prepared)) - len(prepared)
+  text_chars = np.concatenate(
+      [text_chars, np.repeat(text_chars[:1], padding_rows, axis=0)]
+  )
+  print(
+      f'Running {len(prepared)} window(s) as one batch of {len(text_chars)}...',
+      file=sys.stderr,
+  )
+  run = _make_batched_forward(
+      forward, vocab_char_size, args.attribute, args.contextualize
+  )
+  outputs = jax.device_get(run(params, text_chars))
+
+  include_test = not args.contextualize_exclude_test_valid
+  for row, (i, text, text_char, text_len) in enumerate(prepared):
+    window = windows[i]
+    if args.attribute:
+      try:
+        region_probs = eval_util.softmax(outputs['region_logits'][row])
+        locations = [
+            inference.LocationPrediction(location_id=id, score=prob)
+            for id, prob in enumerate(region_probs.tolist())
+        ]
+        locations.sort(key=lambda loc: loc.score, reverse=True)
+        attr = inference.AttributionResults(
+            input_text=text,
+            locations=locations,
+            year_scores=eval_util.softmax(
+                outputs['date_logits'][row]
+            ).tolist(),
+            date_saliency=_saliency(
+                outputs['date_input_grad'][row : row + 1],
+                text_char,
+                text_len,
+                alphabet,
+                vocab_char_size,
+            ),
+            location_saliency=_saliency(
+                outputs['region_input_grad'][row : row + 1],
+                text_char,
+                text_len,
+                alphabet,
+                vocab_char_size,
+            ),
+        )
+        attr_dict = _enrich_attribution(attr, [])
+        if attr_dict:
+          attr_dict['input_text'] = window
+        all_attr[i] = attr_dict
+      except Exception as e:
+        print(f'Attribution failed for window {i+1}: {e}', file=sys.stderr)
+
+    if args.contextualize:
+      try:
+        ctx = inference.contextualize(
+            text=window,
+            dataset=dataset,
+            retrieval=retrieval,
+            forward=_precomputed_forward(outputs['torso'][row : row + 1]),
+            params=params,
+            alphabet=alphabet,
+            region_map=region_map,
+            include_test=include_test,
+            top_k=args.contextualize_top_k,
+        )
+        if hasattr(ctx, 'dict'):
+          ctx_dict = ctx.dict()
+        elif hasattr(ctx, 'json'):
+          ctx_dict = json.loads(ctx.json())
+        else:
+          ctx_dict = ctx
+        all_ctx[i] = ctx_dict
+      except Exception as e:
+        print(
+            f'Contextualization failed for window {i+1}: {e}', file=sys.stderr
+        )
+
+  return all_attr, all_ctx
+
+
 def _process_windows(
     *,
     windows: list[str],
@@ -392,7 +651,9 @@ def _process_windows(
   """Runs attribution, restoration, and contextualization on each window.
 
   Each window is processed independently.  Only the tasks selected via
-  --attribute, --restore, and --contextualize flags are executed.
+  --attribute, --restore, and --contextualize flags are executed. With
+  --batch_windows, attribution and contextualization run for all windows at
+  once (see _process_windows_batched); restoration always runs per window.
 
   Args:
     windows: List of text windows produced by split_into_windows().
@@ -415,11 +676,27 @@ def _process_windows(
 
   include_test = not args.contextualize_exclude_test_valid
 
+  batched_attr = batched_ctx = None
+  if args.batch_windows and (args.attribute or args.contextualize):
+    batched_attr, batched_ctx = _process_windows_batched(
+        windows=windows,
+        args=args,
+        forward=forward,
+        params=params,
+        alphabet=alphabet,
+        vocab_char_size=vocab_char_size,
+        dataset=dataset,
+        retrieval=retrieval,
+        region_map=region_map,
+    )
+
   for i, window in enumerate(windows):
     print(f'Processing window {i+1}/{len(windows)}...', file=sys.stderr)
 
     # 1. Attribution
-    if args.attribute:
+    if batched_attr is not None:
+      all_attr.append(batched_attr[i])
+    elif args.attribute:
       try:
         attr = inference.attribute(
             window,
@@ -468,7 +745,9 @@ def _process_windows(
       all_restore.append(None)
 
     # 3. Contextualization
-    if args.contextualize:
+    if batched_ctx is not None:
+      all_ctx.append(batched_ctx[i])
+    elif args.contextualize:
       try:
         ctx = inference.contextualize(
             text=window,
@@ -614,31 +893,19 @@ def generate_embedding(
     return None
 
 
-def main() -> None:
-  """Entry point: parses args, loads models, runs inference, and outputs."""
-  args = _parse_args()
+def infer_text(
+    text: str, args: argparse.Namespace, resources: tuple[Any, ...]
+) -> dict[str, Any]:
+  """Runs the requested tasks on a text with already loaded resources.
 
-  if not (args.attribute or args.contextualize or args.restore):
-    print(
-        'ERROR: At least one of --attribute, --contextualize, or --restore '
-        'must be provided.',
-        file=sys.stderr,
-    )
-    sys.exit(1)
-
-  if args.input:
-    text = args.input
-  else:
-    with open(args.input_file, 'r', encoding='utf-8') as f:
-      text = f.read()
-
-  if args.restore and ('?' not in text and '#' not in text):
-    print(
-        'WARNING: --restore was requested but no ? or # found in input. '
-        'Restoration will be skipped.',
-        file=sys.stderr,
-    )
+  Args:
+    text: Preprocessed input text.
+    args: Parsed command-line arguments (or an equivalent namespace).
+    resources: The tuple returned by _load_resources() for args.language.
 
+  Returns:
+    The combined output dictionary written by --output_json.
+  """
   windows = split_into_windows(
       text, max_len=_MAX_LEN, overlap=args.window_overlap
   )
@@ -648,7 +915,7 @@ def main() -> None:
   )
 
   model_config, region_map, alphabet, params, forward, dataset, retrieval = (
-      _load_resources(args)
+      resources
   )
   vocab_char_size = model_config['vocab_char_size']
 
@@ -678,14 +945,13 @@ def main() -> None:
 
   final_restore = all_restore if any(all_restore) else None
 
+  final_ctx = None
   if args.contextualize:
     if not region_names_list:
       region_names_list = _load_region_names(args.language)
     final_ctx = [
         _enrich_contextualization(c, region_names_list) for c in all_ctx
     ]
-  else:
-    final_ctx = [None] * len(all_ctx)
 
   embedding = None
   if args.embedding:
@@ -693,26 +959,92 @@ def main() -> None:
         text=text, forward=forward, params=params, alphabet=alphabet
     )
 
-  output = {
+  return {
       'attribution': final_attr,
       'restoration': final_restore,
-      'contextualize': final_ctx if args.contextualize else None,
+      'contextualize': final_ctx,
       'embedding': embedding,
       'num_windows': len(windows),
   }
 
+
+def request_from_args(text: str, args: argparse.Namespace) -> dict[str, Any]:
+  """Returns the inference server request equivalent to a CLI invocation."""
+  request = {
+      name: getattr(args, name)
+      for name in REQUEST_OPTIONS
+      if name in vars(args)
+  }
+  request['text'] = text
+  return request
+
+
+def _infer_remote(server: str, request: dict[str, Any]) -> dict[str, Any]:
+  """Sends one request to a running inference_server.py and returns output."""
+  http_request = urllib.request.Request(
+      server.rstrip('/') + '/infer',
+      data=json.dumps(request).encode('utf-8'),
+      headers={'Content-Type': 'application/json'},
+  )
+  try:
+    with urllib.request.urlopen(http_request) as response:
+      return json.load(response)
+  except urllib.error.HTTPError as e:
+    detail = e.read().decode('utf-8', errors='replace')
+    print(
+        f'ERROR: Inference server returned {e.code}: {detail}', file=sys.stderr
+    )
+    sys.exit(1)
+  except urllib.error.URLError as e:
+    print(
+        f'ERROR: Could not reach inference server at {server}: {e.reason}',
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+
+def main() -> None:
+  """Entry point: parses args, loads models, runs inference, and outputs."""
+  args = _parse_args()
+
+  if not (args.attribute or args.contextualize or args.restore):
+    print(
+        'ERROR: At least one of --attribute, --contextualize, or --restore '
+        'must be provided.',
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+  if args.input:
+    text = args.input
+  else:
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+      text = f.read()
+
+  if args.restore and ('?' not in text and '#' not in text):
+    print(
+        'WARNING: --restore was requested but no ? or # found in input. '
+        'Restoration will be skipped.',
+        file=sys.stderr,
+    )
+
+  if args.server:
+    output = _infer_remote(args.server, request_from_args(text, args))
+  else:
+    output = infer_text(text, args, _load_resources(args))
+
   _handle_output(
       output=output,
       args=args,
-      final_attr=final_attr,
-      final_restore=final_restore,
-      final_ctx=final_ctx,
-      embedding=embedding,
+      final_attr=output['attribution'],
+      final_restore=output['restoration'],
+      final_ctx=output['contextualize'] or [],
+      embedding=output['embedding'],
   )
 
 
-def _parse_args() -> argparse.Namespace:
-  """Parses and returns command-line arguments for the inference script."""
+def build_parser() -> argparse.ArgumentParser:
+  """Returns the command-line parser for the inference script."""
   parser = argparse.ArgumentParser(
       description='Run Predicting The Past inference.'
   )
@@ -742,6 +1074,15 @@ def _parse_args() -> argparse.Namespace:
       default=0.33,
       help='Overlap fraction for long-text windowing.',
   )
+  parser.add_argument(
+      '--batch_windows',
+      action='store_true',
+      default=False,
+      help=(
+          'Run attribution and contextualization for all windows as one'
+          ' batched, jit-compiled model call.'
+      ),
+  )
   parser.add_argument(
       '--attribute',
       action='store_true',
@@ -782,7 +1123,20 @@ def _parse_args() -> argparse.Namespace:
       default=False,
       help='Generate a text embedding vector.',
   )
-  return parser.parse_args()
+  parser.add_argument(
+      '--server',
+      default='',
+      help=(
+          'URL of a running inference_server.py (e.g. http://127.0.0.1:8765).'
+          ' Models are not loaded locally when set.'
+      ),
+  )
+  return parser
+
+
+def _parse_args() -> argparse.Namespace:
+  """Parses and returns command-line arguments for the inference script."""
+  return build_parser().parse_args()
 
 
 if __name__ == '__main__':
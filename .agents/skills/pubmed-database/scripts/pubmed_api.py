@@ -22,6 +22,8 @@ Usage:
     search_pubmed "BRCA1 cancer" 5 relevance
   uv run pubmed_api.py abstract_35113657_31234568.json \
     fetch_article_abstracts "35113657,31234568"
+  uv run pubmed_api.py corpus.jsonl \
+    harvest_article_abstracts "$WEBENV" 1
 """
 
 # /// script
@@ -176,6 +178,70 @@ def _id_params(ids, webenv, query_key):
   return {"id": ",".join(ids) if isinstance(ids, list) else ids}
 
 
+def _parse_pubmed_article(
+    article: ET.Element,
+) -> dict[str, str | list[str] | None] | None:
+  """Extracts the metadata and abstract of one PubmedArticle element."""
+  pmid_elem = article.find(".//PMID")
+  if pmid_elem is None:
+    return None
+
+  art = article.find(".//Article")
+  if art is None:
+    return None
+
+  authors = []
+  for author in art.findall(".//AuthorList/Author"):
+    last = author.findtext("LastName") or ""
+    init = author.findtext("Initials") or ""
+    name = (
+        f"{last} {init}".strip()
+        if last
+        else author.findtext("CollectiveName") or ""
+    )
+    if name:
+      authors.append(name)
+
+  abstract_parts = []
+  for at in art.findall(".//Abstract/AbstractText"):
+    label = at.get("Label")
+    text = "".join(at.itertext())
+    if label:
+      abstract_parts.append(f"{label}: {text}")
+    else:
+      abstract_parts.append(text)
+  abstract = "\n".join(abstract_parts) if abstract_parts else None
+
+  doi = None
+  for eid in art.findall("ELocationID"):
+    if eid.get("EIdType") == "doi":
+      doi = eid.text
+      break
+
+  journal_elem = art.find(".//Journal")
+  journal = None
+  pubdate = None
+  if journal_elem is not None:
+    journal = journal_elem.findtext("Title")
+    pd = journal_elem.find(".//PubDate")
+    if pd is not None:
+      year = pd.findtext("Year") or ""
+      month = pd.findtext("Month") or ""
+      day = pd.findtext("Day") or ""
+      medline = pd.findtext("MedlineDate") or ""
+      pubdate = f"{year} {month} {day}".strip() if year else medline
+
+  return {
+      "pmid": pmid_elem.text,
+      "title": art.findtext("ArticleTitle"),
+      "authors": authors,
+      "journal": journal,
+      "pubdate": pubdate,
+      "doi": doi,
+      "abstract": abstract,
+  }
+
+
 def fetch_article_abstracts(
     pmids: list[str],
     webenv: str = "",
@@ -189,7 +255,8 @@ def fetch_article_abstracts(
   concatenated with their section labels.
 
   Can accept either explicit pmids or a webenv/query_key pair from
-  cache_results_history to reference a previously uploaded set.
+  cache_results_history to reference a previously uploaded set. For sets of
+  thousands of articles, use harvest_article_abstracts instead.
 
   Args:
     pmids: List of PMIDs
@@ -216,66 +283,192 @@ def fetch_article_abstracts(
 
   results = []
   for article in root.iter("PubmedArticle"):
-    pmid_elem = article.find(".//PMID")
-    if pmid_elem is None:
-      continue
-
-    art = article.find(".//Article")
-    if art is None:
-      continue
-
-    authors = []
-    for author in art.findall(".//AuthorList/Author"):
-      last = author.findtext("LastName") or ""
-      init = author.findtext("Initials") or ""
-      name = (
-          f"{last} {init}".strip()
-          if last
-          else author.findtext("CollectiveName") or ""
+    record = _parse_pubmed_article(article)
+    if record is not None:
+      results.append(record)
+  return results
+
+
+def _history_count(webenv, query_key):
+  """Returns the number of records in a History Server set, or an error."""
+  params = _env_params() | {
+      "db": "pubmed",
+      "term": f"#{query_key}",
+      "WebEnv": webenv,
+      "usehistory": "y",
+      "retmax": 0,
+      "retmode": "json",
+  }
+  data = _get(f"{EUTILS_BASE}/entrez/eutils/esearch.fcgi", params)
+  if isinstance(data, dict) and "error" in data:
+    return data
+  try:
+    return int(data["esearchresult"]["count"])
+  except (KeyError, TypeError, ValueError):
+    return {
+        "error": "Unexpected esearch response structure",
+        "endpoint": "esearch.fcgi",
+    }
+
+
+def _stream_pubmed_articles(url):
+  """Yields parsed articles from an efetch XML response as it downloads.
+
+  Each PubmedArticle element is parsed and cleared as soon as it is complete,
+  so memory use is bounded by one article rather than the whole response.
+  """
+  parser = ET.XMLPullParser(events=("end",))
+
+  def _articles():
+    for _, elem in parser.read_events():
+      if elem.tag == "PubmedArticle":
+        record = _parse_pubmed_article(elem)
+        elem.clear()
+        if record is not None:
+          yield record
+
+  for chunk in get_eutils_client().stream_bytes(url):
+    parser.feed(chunk)
+    yield from _articles()
+  parser.close()
+  yield from _articles()
+
+
+def _harvest_checkpoint_path(output_file):
+  return f"{output_file}.checkpoint.json"
+
+
+def _write_harvest_checkpoint(path, state):
+  tmp_path = f"{path}.tmp"
+  with open(tmp_path, "w", encoding="utf-8") as f:
+    json.dump(state, f)
+  os.replace(tmp_path, path)
+
+
+def harvest_article_abstracts(
+    output_file: str,
+    webenv: str,
+    query_key: str,
+    page_size: int = 500,
+) -> dict[str, str | int]:
+  """Streams every article in a History Server set to a JSON Lines file.
+
+  Pages through the set with efetch retstart/retmax and parses each page
+  incrementally, writing one article per line in the format of
+  fetch_article_abstracts. Memory use does not grow with the size of the set,
+  so this suits corpora of tens of thousands of PMIDs.
+
+  After each page a checkpoint is saved next to the output file. Re-running
+  the same command after an interruption resumes from the last complete page.
+  A WebEnv expires after some hours of inactivity; to resume with a new one,
+  rebuild the same set in the same order and pass its webenv/query_key.
+
+  Args:
+    output_file: JSON Lines file to write (one article per line)
+    webenv: WebEnv from cache_results_history
+    query_key: query_key from cache_results_history
+    page_size: Records fetched per efetch request (max 10000)
+
+  Returns:
+    Dict with output_file, total records in the set, and articles written
+  """
+  page_size = max(1, min(page_size, 10000))
+  checkpoint_path = _harvest_checkpoint_path(output_file)
+  state = {
+      "webenv": webenv,
+      "query_key": query_key,
+      "retstart": 0,
+      "articles": 0,
+      "bytes": 0,
+  }
+  resume = os.path.exists(checkpoint_path)
+  if resume and not os.path.exists(output_file):
+    print(
+        f"Output file {output_file} is missing; restarting the harvest.",
+        file=sys.stderr,
+    )
+    resume = False
+  if resume:
+    with open(checkpoint_path, encoding="utf-8") as f:
+      saved = json.load(f)
+    if os.path.getsize(output_file) < saved["bytes"]:
+      return {
+          "error": (
+              f"Output file {output_file} is shorter than its checkpoint."
+              f" Delete {checkpoint_path} and the output file to start over."
+          )
+      }
+    state = saved
+    if (state["webenv"], state["query_key"]) != (webenv, query_key):
+      print(
+          "WebEnv differs from the checkpoint; assuming the new set lists"
+          " the same records in the same order.",
+          file=sys.stderr,
+      )
+      state["webenv"] = webenv
+      state["query_key"] = query_key
+    print(
+        f"Resuming at record {state['retstart']} with {state['articles']}"
+        " articles written",
+        file=sys.stderr,
+    )
+  elif os.path.exists(output_file):
+    return {"error": f"Output file {output_file} already exists"}
+
+  total = _history_count(webenv, query_key)
+  if isinstance(total, dict):
+    return total
+
+  if not resume:
+    # Saved before the first page so a failed first fetch can be resumed.
+    _write_harvest_checkpoint(checkpoint_path, state)
+  with open(output_file, "ab") as f:
+    # Drop any partial page written after the last checkpoint.
+    f.truncate(state["bytes"])
+    while state["retstart"] < total:
+      params = _env_params() | {
+          "db": "pubmed",
+          "WebEnv": webenv,
+          "query_key": query_key,
+          "rettype": "abstract",
+          "retmode": "xml",
+          "retstart": state["retstart"],
+          "retmax": page_size,
+      }
+      url = (
+          f"{EUTILS_BASE}/entrez/eutils/efetch.fcgi?"
+          + urllib.parse.urlencode(params)
+      )
+      articles = 0
+      try:
+        for record in _stream_pubmed_articles(url):
+          f.write(json.dumps(record).encode("utf-8") + b"\n")
+          articles += 1
+      except (http_client.HttpError, OSError, ET.ParseError) as e:
+        return {
+            "error": (
+                f"Failed at record {state['retstart']} of {total}: {e}."
+                " Re-run the same command to resume."
+            ),
+            "endpoint": "efetch.fcgi",
+        }
+      f.flush()
+      os.fsync(f.fileno())
+      state["retstart"] = min(state["retstart"] + page_size, total)
+      state["articles"] += articles
+      state["bytes"] = f.tell()
+      _write_harvest_checkpoint(checkpoint_path, state)
+      print(
+          f"Harvested {state['retstart']}/{total} records"
+          f" ({state['articles']} articles)",
+          file=sys.stderr,
       )
-      if name:
-        authors.append(name)
-
-    abstract_parts = []
-    for at in art.findall(".//Abstract/AbstractText"):
-      label = at.get("Label")
-      text = "".join(at.itertext())
-      if label:
-        abstract_parts.append(f"{label}: {text}")
-      else:
-        abstract_parts.append(text)
-    abstract = "\n".join(abstract_parts) if abstract_parts else None
-
-    doi = None
-    for eid in art.findall("ELocationID"):
-      if eid.get("EIdType") == "doi":
-        doi = eid.text
-        break
-
-    journal_elem = art.find(".//Journal")
-    journal = None
-    pubdate = None
-    if journal_elem is not None:
-      journal = journal_elem.findtext("Title")
-      pd = journal_elem.find(".//PubDate")
-      if pd is not None:
-        year = pd.findtext("Year") or ""
-        month = pd.findtext("Month") or ""
-        day = pd.findtext("Day") or ""
-        medline = pd.findtext("MedlineDate") or ""
-        pubdate = f"{year} {month} {day}".strip() if year else medline
-
-    results.append({
-        "pmid": pmid_elem.text,
-        "title": art.findtext("ArticleTitle"),
-        "authors": authors,
-        "journal": journal,
-        "pubdate": pubdate,
-        "doi": doi,
-        "abstract": abstract,
-    })
 
-  return results
+  return {
+      "output_file": output_file,
+      "total": total,
+      "articles": state["articles"],
+  }
 
 
 def find_linked_biological_data(
@@ -607,6 +800,7 @@ FUNCTIONS = {
     for fn in [
         search_pubmed,
         fetch_article_abstracts,
+        harvest_article_abstracts,
         find_linked_biological_data,
         discover_available_links,
         get_full_text_pmc,
@@ -645,12 +839,14 @@ def main():
     print(f"Error: Unknown function: {func_name}")
     sys.exit(1)
 
-  if os.path.exists(output_file):
-    print(f"Error: Output file {output_file} already exists")
-    sys.exit(1)
-
   fn = FUNCTIONS[func_name]
   sig = inspect.signature(fn)
+  # Functions taking output_file write it themselves (and may resume it).
+  writes_output = "output_file" in sig.parameters
+
+  if os.path.exists(output_file) and not writes_output:
+    print(f"Error: Output file {output_file} already exists")
+    sys.exit(1)
 
   positional = []
   flags = {}
@@ -672,7 +868,9 @@ def main():
   kwargs = {}
   pos_idx = 0
   for name, param in sig.parameters.items():
-    if name in flags:
+    if name == "output_file":
+      kwargs[name] = output_file
+    elif name in flags:
       kwargs[name] = _coerce_arg(flags[name], param.annotation)
     elif pos_idx < len(positional):
       kwargs[name] = _coerce_arg(positional[pos_idx], param.annotation)
@@ -698,6 +896,10 @@ def main():
       print(f"API error: {msg}")
     sys.exit(1)
 
+  if writes_output:
+    print(f"API call OK: {json.dumps(result)}")
+    return
+
   with open(output_file, "w", encoding="utf-8") as f:
     json.dump(result, f, indent=2)
     print(file=f)
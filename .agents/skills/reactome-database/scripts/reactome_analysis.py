@@ -19,21 +19,29 @@ Provides subcommands covering all endpoints of the Reactome Analysis Service
 (https://reactome.org/ContentService/). Supports pathway enrichment analysis,
 identifier mapping, token-based result retrieval, report/download features,
 Content Service queries, diagram export, and cross-reference mapping.
+
+The identifier and analyze commands also take --offline to run the enrichment
+against a local pathway index (see reactome_offline.py) instead of the
+AnalysisService, with the same output layout.
 """
 
 # /// script
 # requires-python = ">=3.10"
 # dependencies = [
+#   "numpy",
 #   "polite-http",
+#   "scipy",
 # ]
 # ///
 
 from __future__ import annotations
 
 import argparse
+import csv
+import functools
 import json
 import sys
-from typing import Any
+from typing import Any, Callable
 import urllib.parse
 
 from polite_http import http_client
@@ -42,6 +50,34 @@ ANALYSIS_BASE_URL = "https://reactome.org/AnalysisService"
 CONTENT_BASE_URL = "https://reactome.org/ContentService"
 _CLIENT = http_client.HttpClient("https://reactome.org/", qps=1)
 _ENCODE_FIELDS = frozenset({"id", "species_id", "species", "species_name"})
+# Value of a bare --offline; resolved to reactome_offline.DEFAULT_INDEX_PATH.
+_DEFAULT_INDEX = object()
+# Columns of the --table output, one row per pathway.
+PATHWAY_COLUMNS = (
+    "stId",
+    "name",
+    "species",
+    "llp",
+    "inDisease",
+    "entities_resource",
+    "entities_found",
+    "entities_total",
+    "entities_ratio",
+    "entities_pValue",
+    "entities_fdr",
+    "reactions_found",
+    "reactions_total",
+    "reactions_ratio",
+)
+
+
+def _report_output(output_path: str, size: int) -> None:
+  print(f"Output written to {output_path}")
+  if size > 100_000:
+    print(
+        "WARNING: Large output file. Do NOT read the full file into context. "
+        "Use 'jq' or a script to extract relevant fields.",
+    )
 
 
 def _write_output(
@@ -56,64 +92,142 @@ def _write_output(
   else:
     with open(output_path, "w") as f:
       f.write(content)
-  print(f"Output written to {output_path}")
-  if len(content) > 100_000:
-    print(
-        "WARNING: Large output file. Do NOT read the full file into context. "
-        "Use 'jq' or a script to extract relevant fields.",
+  _report_output(output_path, len(content))
+
+
+def _write_json(output_path: str, data: Any) -> None:
+  """Writes data as indented JSON, encoding it chunk by chunk."""
+  with open(output_path, "w") as f:
+    for chunk in json.JSONEncoder(indent=2).iterencode(data):
+      f.write(chunk)
+    size = f.tell()
+  _report_output(output_path, size)
+
+
+def _import_pyarrow():
+  try:
+    import pyarrow as pa  # pylint: disable=g-import-not-at-top
+    import pyarrow.parquet as pq  # pylint: disable=g-import-not-at-top
+  except ImportError:
+    sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+  return pa, pq
+
+
+def _pathway_rows(data: Any) -> list[dict[str, Any]]:
+  """Flattens the pathways of an analysis result into table rows."""
+  if not isinstance(data, dict):
+    return []
+  rows = []
+  for p in data.get("pathways") or []:
+    entities = p.get("entities") or {}
+    reactions = p.get("reactions") or {}
+    rows.append({
+        "stId": p.get("stId"),
+        "name": p.get("name"),
+        "species": (p.get("species") or {}).get("name"),
+        "llp": p.get("llp"),
+        "inDisease": p.get("inDisease"),
+        "entities_resource": entities.get("resource"),
+        "entities_found": entities.get("found"),
+        "entities_total": entities.get("total"),
+        "entities_ratio": entities.get("ratio"),
+        "entities_pValue": entities.get("pValue"),
+        "entities_fdr": entities.get("fdr"),
+        "reactions_found": reactions.get("found"),
+        "reactions_total": reactions.get("total"),
+        "reactions_ratio": reactions.get("ratio"),
+    })
+  return rows
+
+
+def _write_pathway_table(data: Any, path: str) -> None:
+  """Writes the pathway list as Parquet (.parquet, needs pyarrow) or TSV."""
+  rows = _pathway_rows(data)
+  if path.endswith(".parquet"):
+    pa, pq = _import_pyarrow()
+    types = {"llp": pa.bool_(), "inDisease": pa.bool_()}
+    for name in PATHWAY_COLUMNS:
+      if name.endswith(("_found", "_total")):
+        types[name] = pa.int64()
+      elif name.endswith(("_ratio", "_pValue", "_fdr")):
+        types[name] = pa.float64()
+    schema = pa.schema(
+        [(name, types.get(name, pa.string())) for name in PATHWAY_COLUMNS]
     )
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), path)
+  else:
+    delimiter = "," if path.endswith(".csv") else "\t"
+    with open(path, "w", newline="") as f:
+      writer = csv.DictWriter(
+          f, fieldnames=PATHWAY_COLUMNS, delimiter=delimiter
+      )
+      writer.writeheader()
+      writer.writerows(rows)
+  print(f"Pathway table ({len(rows)} rows) written to {path}")
 
 
 def _filter_pathways(
-    result_text: str,
+    data: Any,
     fdr: float | None = None,
     pvalue: float | None = None,
-) -> str:
+) -> Any:
   """Filter analysis result pathways by FDR/p-value."""
   if fdr is None and pvalue is None:
-    return result_text
+    return data
+  if not isinstance(data, dict) or "pathways" not in data:
+    return data
   try:
-    data = json.loads(result_text)
-    if "pathways" not in data:
-      return result_text
-    filtered = data["pathways"]
-    if fdr is not None:
-      filtered = [
-          p for p in filtered if p.get("entities", {}).get("fdr", 1.0) <= fdr
-      ]
-    if pvalue is not None:
-      filtered = [
-          p
-          for p in filtered
-          if p.get("entities", {}).get("pValue", 1.0) <= pvalue
-      ]
-    data["pathways"] = filtered
-    data["pathwaysFound"] = len(filtered)
-    return json.dumps(data)
-  except (json.JSONDecodeError, TypeError, KeyError):
-    return result_text
-
-
-def _summarize_result(result_text: str, limit: int = 100) -> str:
+    filtered = [
+        p
+        for p in data["pathways"]
+        if (fdr is None or p.get("entities", {}).get("fdr", 1.0) <= fdr)
+        and (
+            pvalue is None
+            or p.get("entities", {}).get("pValue", 1.0) <= pvalue
+        )
+    ]
+  except (TypeError, AttributeError):
+    return data
+  data["pathways"] = filtered
+  data["pathwaysFound"] = len(filtered)
+  return data
+
+
+def _summarize_result(data: Any, limit: int = 100) -> Any:
   """Summarizes large JSON results by truncating lists."""
-  try:
-    data = json.loads(result_text)
-    if isinstance(data, list):
-      if len(data) > limit:
-        print(f"Truncating list from {len(data)} to {limit} items.")
-        data = data[:limit]
-    elif isinstance(data, dict):
-      if "pathways" in data and isinstance(data["pathways"], list):
-        if len(data["pathways"]) > limit:
-          print(
-              f"Truncating pathways list from {len(data['pathways'])} to"
-              f" {limit} items."
-          )
-          data["pathways"] = data["pathways"][:limit]
-          data["_truncated"] = True
-    return json.dumps(data)
-  except (json.JSONDecodeError, TypeError):
-    return result_text
+  if isinstance(data, list):
+    if len(data) > limit:
+      print(f"Truncating list from {len(data)} to {limit} items.")
+      data = data[:limit]
+  elif isinstance(data, dict):
+    if "pathways" in data and isinstance(data["pathways"], list):
+      if len(data["pathways"]) > limit:
+        print(
+            f"Truncating pathways list from {len(data['pathways'])} to"
+            f" {limit} items."
+        )
+        data["pathways"] = data["pathways"][:limit]
+        data["_truncated"] = True
+  return data
+
+
+def _result_transforms(
+    cfg: dict[str, Any],
+    args: argparse.Namespace,
+) -> list[Callable[[Any], Any]]:
+  """Returns the transforms to apply, in order, to a parsed JSON result."""
+  transforms = []
+  if cfg.get("filterable"):
+    transforms.append(
+        functools.partial(
+            _filter_pathways,
+            fdr=getattr(args, "fdr", None),
+            pvalue=getattr(args, "pvalue", None),
+        )
+    )
+  if getattr(args, "summary", False):
+    transforms.append(_summarize_result)
+  return transforms
 
 
 def _build_params(
@@ -275,6 +389,7 @@ COMMANDS: list[dict[str, Any]] = [
         "help": "Analyse a single identifier",
         "path": "/identifier/{id}",
         "filterable": True,
+        "offline": True,
         "common": True,
         "args": [_ID],
     },
@@ -283,6 +398,7 @@ COMMANDS: list[dict[str, Any]] = [
         "help": "Analyse identifier with projection",
         "path": "/identifier/{id}/projection",
         "filterable": True,
+        "offline": True,
         "common": True,
         "args": [_ID],
     },
@@ -293,6 +409,7 @@ COMMANDS: list[dict[str, Any]] = [
         "path": "/identifiers/",
         "input": "data",
         "filterable": True,
+        "offline": True,
         "common": True,
         "input_flags": True,
     },
@@ -303,6 +420,7 @@ COMMANDS: list[dict[str, Any]] = [
         "path": "/identifiers/projection",
         "input": "data",
         "filterable": True,
+        "offline": True,
         "common": True,
         "input_flags": True,
     },
@@ -313,6 +431,7 @@ COMMANDS: list[dict[str, Any]] = [
         "path": "/identifiers/form",
         "input": "form",
         "filterable": True,
+        "offline": True,
         "common": True,
         "args": [_FILE_REQ],
     },
@@ -323,6 +442,7 @@ COMMANDS: list[dict[str, Any]] = [
         "path": "/identifiers/form/projection",
         "input": "form",
         "filterable": True,
+        "offline": True,
         "common": True,
         "args": [_FILE_REQ],
     },
@@ -891,6 +1011,48 @@ def _load_data(cfg, args):
   return data, content_type
 
 
+def _offline_result(cfg, args) -> dict[str, Any]:
+  """Runs an enrichment command against the local pathway index."""
+  input_type = cfg.get("input")
+  if input_type == "form":
+    with open(args.file, "r") as f:
+      text = f.read()
+  elif input_type == "data":
+    text = _read_data(args)
+    if not text:
+      print("Error: provide --data or --file", file=sys.stderr)
+      sys.exit(1)
+  else:
+    text = args.id
+  # numpy and scipy are only needed offline.
+  import reactome_offline  # pylint: disable=g-import-not-at-top
+
+  index_path = args.offline
+  if index_path is _DEFAULT_INDEX:
+    index_path = reactome_offline.DEFAULT_INDEX_PATH
+  try:
+    index = reactome_offline.PathwayIndex(index_path)
+    if args.species and not index.matches_species(args.species):
+      raise ValueError(
+          f"The offline index at {index_path} is built for"
+          f" {index.species}, not {args.species}."
+      )
+    (result,) = index.analyze_lists(
+        [reactome_offline.parse_identifiers(text)],
+        resource=args.resource,
+        include_disease=args.include_disease is not False,
+        sort_by=args.sort_by,
+        order=args.order,
+        page=args.page,
+        page_size=args.page_size,
+        projection=cfg["path"].endswith("projection"),
+    )
+  except (FileNotFoundError, ValueError) as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
+  return result
+
+
 def _generate_url(cfg, args) -> str:
   """Generates the URL for the given config and arguments."""
   path = _fill_path(cfg["path"], args)
@@ -915,12 +1077,8 @@ def _generate_url(cfg, args) -> str:
   return url
 
 
-def _dispatch(args: argparse.Namespace) -> None:
-  """Generic command handler driven by config."""
-  cfg = args._cfg
-  method = cfg.get("method", "GET")
-  handler = cfg.get("handler", "json")
-
+def _fetch(cfg, args, method: str, handler: str) -> str | bytes:
+  """Sends the configured request and returns the response body."""
   data, content_type = _load_data(cfg, args)
   url = _generate_url(cfg, args)
 
@@ -935,21 +1093,29 @@ def _dispatch(args: argparse.Namespace) -> None:
   }
 
   if handler == "binary":
-    result = _CLIENT.fetch_bytes(url, method=method, headers=headers, data=data)
+    return _CLIENT.fetch_bytes(url, method=method, headers=headers, data=data)
+  return _CLIENT.fetch_text(url, method=method, headers=headers, data=data)
+
+
+def _dispatch(args: argparse.Namespace) -> None:
+  """Generic command handler driven by config."""
+  cfg = args._cfg
+  method = cfg.get("method", "GET")
+  handler = cfg.get("handler", "json")
+
+  if getattr(args, "offline", None):
+    result = _offline_result(cfg, args)
   else:
-    result = _CLIENT.fetch_text(url, method=method, headers=headers, data=data)
+    result = _fetch(cfg, args, method, handler)
 
   if handler == "json":
-    if cfg.get("filterable"):
-      result = _filter_pathways(
-          result,
-          getattr(args, "fdr", None),
-          getattr(args, "pvalue", None),
-      )
-    if getattr(args, "summary", False):
-      result = _summarize_result(result)
-    data = json.loads(result)
-    _write_output(args.output, json.dumps(data, indent=2))
+    # Parse once; filters and truncation work on the parsed result.
+    data = json.loads(result) if isinstance(result, str) else result
+    for transform in _result_transforms(cfg, args):
+      data = transform(data)
+    _write_json(args.output, data)
+    if getattr(args, "table", None):
+      _write_pathway_table(data, args.table)
   elif handler == "binary":
     if isinstance(result, str):
       result = result.encode("utf-8")
@@ -957,15 +1123,9 @@ def _dispatch(args: argparse.Namespace) -> None:
   elif handler == "csv":
     _write_output(args.output, result)
   elif handler == "text_wrap":
-    _write_output(
-        args.output,
-        json.dumps({cfg["wrap_key"]: result.strip()}, indent=2),
-    )
+    _write_json(args.output, {cfg["wrap_key"]: result.strip()})
   elif handler == "page_wrap":
-    _write_output(
-        args.output,
-        json.dumps({"page": result}, indent=2),
-    )
+    _write_json(args.output, {"page": result})
 
 
 def _add_common_flags(
@@ -1065,6 +1225,15 @@ def _add_common_flags(
       default=None,
       help="Max p-value threshold for filtering",
   )
+  p.add_argument(
+      "--table",
+      type=str,
+      default=None,
+      help=(
+          "Also write the pathways as a table, one row per pathway (.tsv,"
+          " .csv or .parquet; Parquet needs pyarrow)"
+      ),
+  )
 
 
 def _add_input_flags(
@@ -1110,6 +1279,19 @@ def parse_args() -> argparse.Namespace:
     if cfg.get("common"):
       _add_common_flags(p)
 
+    if cfg.get("offline"):
+      p.add_argument(
+          "--offline",
+          nargs="?",
+          const=_DEFAULT_INDEX,
+          default=None,
+          help=(
+              "Analyse against a local index built with reactome_offline.py"
+              " instead of the AnalysisService (default path:"
+              " $REACTOME_INDEX or ~/.cache/reactome/reactome_index.npz)"
+          ),
+      )
+
     p.set_defaults(func=_dispatch, _cfg=cfg)
 
   return parser.parse_args()
@@ -0,0 +1,791 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local Reactome pathway index for offline over-representation analysis.
+
+`build` reads Reactome's released mapping files (from a download directory or
+straight from https://reactome.org/download/current/) for one species and
+stores, per identifier type, a sparse identifier x pathway membership matrix
+covering all levels of the pathway hierarchy:
+
+  * UNIPROT   - UniProt2Reactome_All_Levels.txt
+  * ENSEMBL   - Ensembl2Reactome_All_Levels.txt (gene IDs only)
+  * NCBI_GENE - NCBI2Reactome_All_Levels.txt
+  * SYMBOL    - ReactomePathways.gmt.zip (human only)
+
+Pathway names, species and the hierarchy (for the `llp` and `inDisease`
+flags) come from ReactomePathways.txt and ReactomePathwaysRelation.txt.
+
+Each gene list is matched against the identifier type it overlaps most (or
+the one named with --resource). Found counts for every list and pathway come
+from one sparse matrix product, and hypergeometric p-values and
+Benjamini-Hochberg FDRs are computed as vectors across pathways. Results use
+the AnalysisService JSON layout, without a token or reaction counts.
+
+`analyze` runs many gene lists (one list per file, or one per line of a
+.gmt file) across worker processes, writing one result JSON per list.
+
+Usage:
+  uv run scripts/reactome_offline.py build
+  uv run scripts/reactome_offline.py build --source ~/reactome_release \
+    --species "Mus musculus" --index ~/.cache/reactome/mouse.npz
+  uv run scripts/reactome_offline.py analyze --output-dir results/ \
+    --fdr 0.05 contrasts/*.txt
+"""
+
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#   "numpy",
+#   "polite-http",
+#   "scipy",
+# ]
+# ///
+
+from __future__ import annotations
+
+import argparse
+import collections
+import concurrent.futures
+import datetime
+import io
+import json
+import os
+import re
+import sys
+from typing import Any, Iterable, Iterator
+import zipfile
+
+import numpy as np
+from polite_http import http_client
+from scipy import sparse
+from scipy import stats
+
+DEFAULT_INDEX_PATH = os.environ.get("REACTOME_INDEX") or os.path.join(
+    os.path.expanduser("~"), ".cache", "reactome", "reactome_index.npz"
+)
+RELEASE_URL = "https://reactome.org/download/current/"
+# Bump when the stored arrays change.
+INDEX_VERSION = 1
+
+# Identifier-to-pathway files, in the order used to break overlap ties.
+RESOURCE_FILES = {
+    "UNIPROT": "UniProt2Reactome_All_Levels.txt",
+    "SYMBOL": "ReactomePathways.gmt.zip",
+    "ENSEMBL": "Ensembl2Reactome_All_Levels.txt",
+    "NCBI_GENE": "NCBI2Reactome_All_Levels.txt",
+}
+PATHWAYS_FILE = "ReactomePathways.txt"
+RELATIONS_FILE = "ReactomePathwaysRelation.txt"
+# Stable ID suffix of the top-level "Disease" pathway in every species.
+_DISEASE_SUFFIX = "-1643685"
+_ENSEMBL_GENE = re.compile(r"^ENS[A-Z]*G\d+$")
+_CHUNK_SIZE = 1 << 20
+# Gene lists per worker task in `analyze`.
+_TASK_SIZE = 64
+
+# NCBI taxon IDs accepted for --species, as the AnalysisService does.
+SPECIES_TAX_IDS = {
+    "Homo sapiens": "9606",
+    "Mus musculus": "10090",
+    "Rattus norvegicus": "10116",
+}
+
+SORT_FIELDS = {
+    "NAME": "name",
+    "TOTAL_ENTITIES": "total",
+    "FOUND_ENTITIES": "found",
+    "ENTITIES_RATIO": "ratio",
+    "ENTITIES_PVALUE": "pValue",
+    "ENTITIES_FDR": "fdr",
+}
+
+
+def _read_bytes(source: str, name: str) -> Iterator[bytes]:
+  """Yields the bytes of a release file from a directory or URL."""
+  if source.startswith(("http://", "https://")):
+    base = source if source.endswith("/") else source + "/"
+    client = http_client.HttpClient(base, qps=1)
+    yield from client.stream_bytes(base + name, chunk_size=_CHUNK_SIZE)
+    return
+  with open(os.path.join(source, name), "rb") as f:
+    while chunk := f.read(_CHUNK_SIZE):
+      yield chunk
+
+
+def _read_rows(source: str, name: str) -> Iterator[list[str]]:
+  """Yields the tab-separated rows of a release text file."""
+  pending = b""
+  for chunk in _read_bytes(source, name):
+    lines = (pending + chunk).split(b"\n")
+    pending = lines.pop()
+    for line in lines:
+      if line.strip():
+        yield line.decode("utf-8").rstrip("\r").split("\t")
+  if pending.strip():
+    yield pending.decode("utf-8").rstrip("\r").split("\t")
+
+
+def _read_gene_sets(source: str, name: str) -> Iterator[list[str]]:
+  """Yields the rows of the zipped GMT file (name, stId, symbols...)."""
+  data = b"".join(_read_bytes(source, name))
+  with zipfile.ZipFile(io.BytesIO(data)) as archive:
+    member = next(n for n in archive.namelist() if n.endswith(".gmt"))
+    text = archive.read(member).decode("utf-8")
+  for line in text.splitlines():
+    if line.strip():
+      yield line.split("\t")
+
+
+def _membership(
+    pairs: Iterable[tuple[str, int]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  """Returns sorted identifiers and CSR (indptr, indices) for the pairs."""
+  by_id = collections.defaultdict(set)
+  for identifier, pathway in pairs:
+    by_id[identifier].add(pathway)
+  ids = sorted(by_id)
+  indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+  indptr[1:] = np.cumsum([len(by_id[i]) for i in ids])
+  indices = np.fromiter(
+      (p for i in ids for p in sorted(by_id[i])),
+      dtype=np.int32,
+      count=int(indptr[-1]),
+  )
+  return np.array(ids, dtype=str), indptr, indices
+
+
+def build_index(
+    source: str,
+    path: str,
+    species: str = "Homo sapiens",
+    resources: Iterable[str] | None = None,
+) -> dict[str, int]:
+  """Builds the index for one species from Reactome release files.
+
+  Args:
+    source: Directory holding the release files, or their base URL.
+    path: Output .npz path. Written atomically.
+    species: Species name as written in the release files.
+    resources: Identifier types to include (keys of RESOURCE_FILES). Default:
+      all that exist for the species.
+
+  Returns:
+    The number of pathways and of identifiers per type.
+
+  Raises:
+    ValueError: If the release has no pathways for the species.
+  """
+  resources = list(resources or RESOURCE_FILES)
+  for resource in resources:
+    if resource not in RESOURCE_FILES:
+      raise ValueError(f"Unknown resource: {resource}")
+
+  names = {
+      row[0]: row[1]
+      for row in _read_rows(source, PATHWAYS_FILE)
+      if len(row) >= 3 and row[2] == species
+  }
+  if not names:
+    raise ValueError(f"No pathways for species {species!r} in {source}")
+  pathways = sorted(names)
+  position = {stid: i for i, stid in enumerate(pathways)}
+
+  children = collections.defaultdict(list)
+  for row in _read_rows(source, RELATIONS_FILE):
+    if len(row) >= 2 and row[0] in position and row[1] in position:
+      children[position[row[0]]].append(position[row[1]])
+  llp = np.ones(len(pathways), dtype=bool)
+  llp[list(children)] = False
+  in_disease = np.zeros(len(pathways), dtype=bool)
+  stack = [position[s] for s in pathways if s.endswith(_DISEASE_SUFFIX)]
+  while stack:
+    node = stack.pop()
+    if not in_disease[node]:
+      in_disease[node] = True
+      stack.extend(children[node])
+
+  arrays = {
+      "version": np.array(INDEX_VERSION),
+      "species": np.array(species),
+      "built": np.array(datetime.date.today().isoformat()),
+      "pathways": np.array(pathways, dtype=str),
+      "names": np.array([names[s] for s in pathways], dtype=str),
+      "llp": llp,
+      "in_disease": in_disease,
+  }
+  counts = {"pathways": len(pathways)}
+  for resource in resources:
+    if resource == "SYMBOL":
+      # The GMT file only covers human pathways.
+      pairs = (
+          (symbol.upper(), position[row[1]])
+          for row in _read_gene_sets(source, RESOURCE_FILES[resource])
+          if len(row) >= 3 and row[1] in position
+          for symbol in row[2:]
+          if symbol
+      )
+    else:
+      pairs = (
+          (row[0].upper(), position[row[1]])
+          for row in _read_rows(source, RESOURCE_FILES[resource])
+          if len(row) >= 6 and row[5] == species and row[1] in position
+      )
+      if resource == "ENSEMBL":
+        pairs = ((i, p) for i, p in pairs if _ENSEMBL_GENE.match(i))
+    ids, indptr, indices = _membership(pairs)
+    if not len(ids):
+      continue
+    arrays[f"{resource}_ids"] = ids
+    arrays[f"{resource}_indptr"] = indptr
+    arrays[f"{resource}_indices"] = indices
+    counts[resource] = len(ids)
+  if len(counts) == 1:
+    raise ValueError(f"No identifiers for species {species!r} in {source}")
+
+  os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+  tmp_path = f"{path}.tmp{os.getpid()}.npz"
+  np.savez_compressed(tmp_path, **arrays)
+  os.replace(tmp_path, path)
+  return counts
+
+
+def parse_identifiers(text: str) -> list[str]:
+  """Returns the identifiers of a Reactome-style data block.
+
+  Lines starting with '#' are headers; the first column of every other line
+  is an identifier (expression columns are ignored).
+  """
+  identifiers = []
+  for line in text.splitlines():
+    fields = line.split()
+    if fields and not fields[0].startswith("#"):
+      identifiers.append(fields[0])
+  return identifiers
+
+
+def _sort_key(field: str):
+  if field == "name":
+    return lambda p: p["name"]
+  return lambda p: p["entities"][field]
+
+
+def _benjamini_hochberg(pvalues: np.ndarray) -> np.ndarray:
+  order = np.argsort(pvalues)
+  ranked = pvalues[order] * len(pvalues) / np.arange(1, len(pvalues) + 1)
+  fdr = np.empty_like(pvalues)
+  fdr[order] = np.minimum.accumulate(ranked[::-1])[::-1].clip(max=1.0)
+  return fdr
+
+
+class PathwayIndex:
+  """Pathway memberships of one species, loaded from build_index output."""
+
+  def __init__(self, path: str = DEFAULT_INDEX_PATH):
+    if not os.path.exists(path):
+      raise FileNotFoundError(
+          f"No Reactome index at {path}. Build one with:"
+          " uv run scripts/reactome_offline.py build"
+      )
+    with np.load(path, allow_pickle=False) as data:
+      if int(data["version"]) != INDEX_VERSION:
+        raise ValueError(
+            f"Reactome index {path} has an old format; rebuild it."
+        )
+      self.path = path
+      self.species = str(data["species"])
+      self.built = str(data["built"])
+      self.pathways = data["pathways"]
+      self.names = data["names"]
+      self.llp = data["llp"]
+      self.in_disease = data["in_disease"]
+      self.ids = {}
+      self.matrices = {}
+      for resource in RESOURCE_FILES:
+        if f"{resource}_ids" not in data:
+          continue
+        ids = data[f"{resource}_ids"]
+        indices = data[f"{resource}_indices"]
+        self.ids[resource] = ids
+        self.matrices[resource] = sparse.csr_matrix(
+            (
+                np.ones(len(indices), dtype=np.int32),
+                indices,
+                data[f"{resource}_indptr"],
+            ),
+            shape=(len(ids), len(self.pathways)),
+        )
+    self.totals = {
+        r: np.bincount(m.indices, minlength=len(self.pathways))
+        for r, m in self.matrices.items()
+    }
+
+  def matches_species(self, species: str) -> bool:
+    """Returns whether a species name or taxon ID names the index species."""
+    species = species.strip().lower()
+    return species in (
+        self.species.lower(),
+        SPECIES_TAX_IDS.get(self.species),
+    )
+
+  def _match(
+      self, resource: str, identifiers: list[str]
+  ) -> tuple[np.ndarray, int]:
+    """Returns the distinct index rows found and the count of ids not found."""
+    ids = self.ids[resource]
+    query = np.array([i.upper() for i in identifiers], dtype=str)
+    if not len(query):
+      return np.zeros(0, dtype=np.int64), 0
+    rows = np.searchsorted(ids, query).clip(max=len(ids) - 1)
+    found = ids[rows] == query
+    # Retry versioned Ensembl IDs and UniProt isoforms without the suffix.
+    missed = np.flatnonzero(~found)
+    if len(missed):
+      bases = np.array(
+          [re.split(r"[.-]", query[i], maxsplit=1)[0] for i in missed],
+          dtype=str,
+      )
+      base_rows = np.searchsorted(ids, bases).clip(max=len(ids) - 1)
+      base_found = ids[base_rows] == bases
+      rows[missed[base_found]] = base_rows[base_found]
+      found[missed[base_found]] = True
+    return np.unique(rows[found]), len(np.unique(query[~found]))
+
+  def _resource_for(self, identifiers: list[str], resource: str | None) -> str:
+    if resource and resource.upper() != "TOTAL":
+      if resource.upper() not in self.ids:
+        raise ValueError(
+            f"Resource {resource} is not in the index. Available:"
+            f" {', '.join(self.ids)}"
+        )
+      return resource.upper()
+    overlap = {r: len(self._match(r, identifiers)[0]) for r in self.ids}
+    return max(overlap, key=overlap.get)
+
+  def analyze_lists(
+      self,
+      gene_lists: list[list[str]],
+      resource: str | None = None,
+      include_disease: bool = True,
+      sort_by: str | None = None,
+      order: str | None = None,
+      page: int | None = None,
+      page_size: int | None = None,
+      projection: bool = False,
+      sample_names: list[str] | None = None,
+  ) -> list[dict[str, Any]]:
+    """Runs over-representation analysis for each list of identifiers.
+
+    Args:
+      gene_lists: Lists of identifiers (any supported type, per list).
+      resource: Identifier type to match, or None/TOTAL to pick the one with
+        the most matches for each list.
+      include_disease: Whether to report pathways under "Disease".
+      sort_by: One of SORT_FIELDS (default ENTITIES_PVALUE).
+      order: ASC (default) or DESC.
+      page: 1-based page of pathways to return (default 1).
+      page_size: Pathways per page (default: all).
+      projection: Value of summary.projection in the results.
+      sample_names: Optional name per list for summary.sampleName.
+
+    Returns:
+      One AnalysisService-style result dictionary per list.
+
+    Raises:
+      ValueError: If resource or sort_by is not supported offline.
+    """
+    sort_key = SORT_FIELDS.get((sort_by or "ENTITIES_PVALUE").upper())
+    if sort_key is None:
+      raise ValueError(
+          f"--sort-by {sort_by} is not available offline. Use one of"
+          f" {', '.join(SORT_FIELDS)}."
+      )
+    by_resource = collections.defaultdict(list)
+    for i, identifiers in enumerate(gene_lists):
+      by_resource[self._resource_for(identifiers, resource)].append(i)
+
+    results = [None] * len(gene_lists)
+    for res, list_ids in by_resource.items():
+      matched, not_found = zip(
+          *(self._match(res, gene_lists[i]) for i in list_ids)
+      )
+      query = sparse.csr_matrix(
+          (
+              np.ones(sum(len(m) for m in matched), dtype=np.int32),
+              np.concatenate(matched),
+              np.concatenate([[0], np.cumsum([len(m) for m in matched])]),
+          ),
+          shape=(len(list_ids), len(self.ids[res])),
+      )
+      found = (query @ self.matrices[res]).tocsr()
+      found.sort_indices()
+      if not include_disease:
+        found.data[self.in_disease[found.indices]] = 0
+        found.eliminate_zeros()
+
+      # p-values for every (list, hit pathway) pair at once.
+      universe = len(self.ids[res])
+      totals = self.totals[res][found.indices]
+      sizes = np.repeat([len(m) for m in matched], np.diff(found.indptr))
+      pvalues = stats.hypergeom.sf(found.data - 1, universe, totals, sizes)
+
+      for row, i in enumerate(list_ids):
+        start, stop = found.indptr[row], found.indptr[row + 1]
+        hits = found.indices[start:stop]
+        pathways = self._pathways(
+            res,
+            hits,
+            found.data[start:stop],
+            pvalues[start:stop],
+            universe,
+        )
+        pathways.sort(
+            key=_sort_key(sort_key),
+            reverse=(order or "ASC").upper() == "DESC",
+        )
+        if page_size:
+          first = ((page or 1) - 1) * page_size
+          pathways = pathways[first : first + page_size]
+        results[i] = self._result(
+            res,
+            pathways,
+            not_found[row],
+            len(hits),
+            include_disease,
+            projection,
+            sample_names[i] if sample_names else "",
+        )
+    return results
+
+  def _pathways(
+      self,
+      resource: str,
+      hits: np.ndarray,
+      found: np.ndarray,
+      pvalues: np.ndarray,
+      universe: int,
+  ) -> list[dict[str, Any]]:
+    fdr = _benjamini_hochberg(pvalues) if len(pvalues) else pvalues
+    totals = self.totals[resource][hits]
+    return [
+        {
+            "stId": str(self.pathways[p]),
+            "name": str(self.names[p]),
+            "species": {"name": self.species},
+            "llp": bool(self.llp[p]),
+            "inDisease": bool(self.in_disease[p]),
+            "entities": {
+                "resource": resource,
+                "total": int(total),
+                "found": int(k),
+                "ratio": float(total) / universe,
+                "pValue": float(pvalue),
+                "fdr": float(q),
+                "exp": [],
+            },
+        }
+        for p, total, k, pvalue, q in zip(hits, totals, found, pvalues, fdr)
+    ]
+
+  def _result(
+      self,
+      resource: str,
+      pathways: list[dict[str, Any]],
+      not_found: int,
+      hit_count: int,
+      include_disease: bool,
+      projection: bool,
+      sample_name: str,
+  ) -> dict[str, Any]:
+    return {
+        "summary": {
+            "token": None,
+            "projection": projection,
+            "interactors": False,
+            "type": "OVERREPRESENTATION",
+            "sampleName": sample_name,
+            "text": True,
+            "includeDisease": include_disease,
+        },
+        "expression": {"columnNames": []},
+        "identifiersNotFound": not_found,
+        "pathwaysFound": hit_count,
+        "pathways": pathways,
+        "resourceSummary": [
+            {"resource": resource, "pathways": hit_count},
+            {"resource": "TOTAL", "pathways": hit_count},
+        ],
+        "speciesSummary": [{"name": self.species, "pathways": hit_count}],
+        "warnings": [
+            f"Offline analysis against the local Reactome index {self.path}"
+            f" ({self.species}, built {self.built}). No token is issued and"
+            " reaction counts are not computed."
+        ],
+    }
+
+
+def filter_result(
+    result: dict[str, Any],
+    fdr: float | None = None,
+    pvalue: float | None = None,
+) -> dict[str, Any]:
+  """Drops pathways above the FDR or p-value thresholds."""
+  if fdr is None and pvalue is None:
+    return result
+  result["pathways"] = [
+      p
+      for p in result["pathways"]
+      if (fdr is None or p["entities"]["fdr"] <= fdr)
+      and (pvalue is None or p["entities"]["pValue"] <= pvalue)
+  ]
+  result["pathwaysFound"] = len(result["pathways"])
+  return result
+
+
+def read_gene_lists(paths: list[str]) -> list[tuple[str, list[str]]]:
+  """Reads (name, identifiers) lists from list files and .gmt files."""
+  gene_lists = []
+  for path in paths:
+    with open(path) as f:
+      text = f.read()
+    if path.endswith(".gmt"):
+      for line in text.splitlines():
+        fields = line.rstrip("\r").split("\t")
+        if len(fields) >= 3:
+          gene_lists.append((fields[0], [g for g in fields[2:] if g]))
+    else:
+      name = os.path.splitext(os.path.basename(path))[0]
+      gene_lists.append((name, parse_identifiers(text)))
+  return gene_lists
+
+
+_WORKER_INDEX: PathwayIndex | None = None
+
+
+def _init_worker(index_path: str) -> None:
+  global _WORKER_INDEX
+  _WORKER_INDEX = PathwayIndex(index_path)
+
+
+def _output_names(names: list[str]) -> list[str]:
+  """Returns a distinct, file-system safe output name for each list name."""
+  used = set()
+  output_names = []
+  for name in names:
+    base = re.sub(r"[^\w.-]+", "_", name).strip("_") or "list"
+    output_name, n = base, 1
+    # Compared case-insensitively for case-insensitive file systems.
+    while output_name.lower() in used:
+      n += 1
+      output_name = f"{base}_{n}"
+    if output_name != base:
+      print(
+          f"Warning: list {name!r} is written as {output_name}.json",
+          file=sys.stderr,
+      )
+    used.add(output_name.lower())
+    output_names.append(output_name)
+  return output_names
+
+
+def _analyze_task(
+    gene_lists: list[tuple[str, list[str], str]],
+    output_dir: str,
+    options: dict[str, Any],
+) -> list[tuple[str, int]]:
+  """Analyzes a chunk of lists in a worker and writes one JSON per list."""
+  fdr = options.pop("fdr", None)
+  pvalue = options.pop("pvalue", None)
+  results = _WORKER_INDEX.analyze_lists(
+      [ids for _, ids, _ in gene_lists],
+      sample_names=[name for name, _, _ in gene_lists],
+      **options,
+  )
+  written = []
+  for (_, _, output_name), result in zip(gene_lists, results):
+    result = filter_result(result, fdr, pvalue)
+    with open(os.path.join(output_dir, f"{output_name}.json"), "w") as f:
+      json.dump(result, f)
+    written.append((output_name, result["pathwaysFound"]))
+  return written
+
+
+def analyze_files(
+    index_path: str,
+    gene_lists: list[tuple[str, list[str]]],
+    output_dir: str,
+    workers: int | None = None,
+    **options: Any,
+) -> int:
+  """Analyzes many named lists across processes and writes their results.
+
+  Args:
+    index_path: Path of the index built by build_index.
+    gene_lists: (name, identifiers) pairs. Each result is written to
+      <output_dir>/<name>.json, with the name made file-system safe and a
+      _2, _3, ... suffix added where names would collide.
+    output_dir: Directory for the result files.
+    workers: Worker processes (default: one per CPU).
+    **options: fdr, pvalue and the keyword arguments of
+      PathwayIndex.analyze_lists.
+
+  Returns:
+    The number of result files written.
+  """
+  os.makedirs(output_dir, exist_ok=True)
+  named = [
+      (name, ids, output_name)
+      for (name, ids), output_name in zip(
+          gene_lists, _output_names([name for name, _ in gene_lists])
+      )
+  ]
+  tasks = [
+      named[i : i + _TASK_SIZE] for i in range(0, len(named), _TASK_SIZE)
+  ]
+  workers = min(workers or os.cpu_count() or 1, len(tasks))
+  done = 0
+  if workers <= 1:
+    _init_worker(index_path)
+    for task in tasks:
+      done += len(_analyze_task(task, output_dir, dict(options)))
+      print(f"  {done}/{len(gene_lists)} lists analyzed")
+    return done
+
+  with concurrent.futures.ProcessPoolExecutor(
+      max_workers=workers,
+      initializer=_init_worker,
+      initargs=(index_path,),
+  ) as executor:
+    futures = [
+        executor.submit(_analyze_task, task, output_dir, dict(options))
+        for task in tasks
+    ]
+    for future in concurrent.futures.as_completed(futures):
+      done += len(future.result())
+      print(f"  {done}/{len(gene_lists)} lists analyzed")
+  return done
+
+
+def main() -> None:
+  """Entry point: builds an index or analyzes gene lists against one."""
+  parser = argparse.ArgumentParser(
+      description="Offline Reactome over-representation analysis."
+  )
+  parser.add_argument(
+      "--index",
+      default=DEFAULT_INDEX_PATH,
+      help=(
+          "Index path (default: $REACTOME_INDEX or"
+          " ~/.cache/reactome/reactome_index.npz)."
+      ),
+  )
+  sub = parser.add_subparsers(dest="command", required=True)
+
+  p_build = sub.add_parser("build", help="Build the index from a release")
+  p_build.add_argument(
+      "--source",
+      default=RELEASE_URL,
+      help=(
+          "Directory holding the Reactome release files, or their base URL"
+          f" (default: {RELEASE_URL})."
+      ),
+  )
+  p_build.add_argument(
+      "--species",
+      default="Homo sapiens",
+      help="Species name (default: Homo sapiens).",
+  )
+  p_build.add_argument(
+      "--resources",
+      default=",".join(RESOURCE_FILES),
+      help=(
+          "Comma-separated identifier types to index (default:"
+          f" {','.join(RESOURCE_FILES)})."
+      ),
+  )
+
+  p_analyze = sub.add_parser(
+      "analyze", help="Analyze many gene lists, one result JSON per list"
+  )
+  p_analyze.add_argument(
+      "files",
+      nargs="+",
+      help=(
+          "Gene list files (one identifier per line; the file name is the"
+          " list name) or .gmt files (one list per line)."
+      ),
+  )
+  p_analyze.add_argument(
+      "--output-dir", required=True, help="Directory for result JSON files."
+  )
+  p_analyze.add_argument(
+      "--workers",
+      type=int,
+      default=None,
+      help="Worker processes (default: one per CPU).",
+  )
+  p_analyze.add_argument(
+      "--resource",
+      default=None,
+      help="Identifier type to match (default: best match per list).",
+  )
+  p_analyze.add_argument(
+      "--exclude-disease",
+      action="store_true",
+      help="Leave out pathways under the top-level Disease pathway.",
+  )
+  p_analyze.add_argument(
+      "--page-size",
+      type=int,
+      default=None,
+      help="Keep only the top N pathways per list.",
+  )
+  p_analyze.add_argument(
+      "--fdr", type=float, default=None, help="Max FDR threshold."
+  )
+  p_analyze.add_argument(
+      "--pvalue", type=float, default=None, help="Max p-value threshold."
+  )
+  args = parser.parse_args()
+
+  try:
+    if args.command == "build":
+      counts = build_index(
+          args.source,
+          args.index,
+          args.species,
+          [r.strip().upper() for r in args.resources.split(",") if r.strip()],
+      )
+      print(f"Built {args.index}: {json.dumps(counts)}")
+    else:
+      gene_lists = read_gene_lists(args.files)
+      written = analyze_files(
+          args.index,
+          gene_lists,
+          args.output_dir,
+          args.workers,
+          resource=args.resource,
+          include_disease=not args.exclude_disease,
+          page_size=args.page_size,
+          fdr=args.fdr,
+          pvalue=args.pvalue,
+      )
+      print(f"Wrote {written} results to {args.output_dir}")
+  except (FileNotFoundError, ValueError) as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
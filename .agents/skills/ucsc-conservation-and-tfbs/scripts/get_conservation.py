@@ -12,25 +12,45 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Fetches Evolutionary Conservation scores from UCSC Database."""
+"""Fetches Evolutionary Conservation scores from UCSC Database.
+
+Regions on the same chromosome that overlap or lie within --merge-gap bases of
+each other are fetched with one request per track, and the returned items are
+split back to each region. (region, track) requests run --concurrency at a
+time through the shared UCSC rate limiter. Tracks found in --local-dir as
+bigWig/bigBed files (e.g. hg38.phyloP100way.bw from the UCSC downloads
+server) are read locally instead; this needs pyBigWig.
+"""
 
 # /// script
 # requires-python = ">=3.10"
 # dependencies = [
+#   "numpy",
 #   "polite-http",
 # ]
 # ///
 
 import argparse
+from concurrent import futures
 import json
+import os
 import re
 import sys
 from typing import Any
+import numpy as np
 from polite_http import http_client
 
 UCSC_API_URL = "https://api.genome.ucsc.edu/getData/track"
 CLIENT = http_client.HttpClient("https://api.genome.ucsc.edu/", qps=0.05)
 
+# Upper bound on the span of one merged request. Wiggle tracks return one
+# item per base, so this also bounds the size of a single response.
+MAX_MERGED_SPAN = 100_000
+# Items getData returns when maxItemsOutput is not set.
+DEFAULT_MAX_ITEMS = 1000
+
+LOCAL_TRACK_SUFFIXES = (".bw", ".bigWig", ".bb", ".bigBed")
+
 
 def parse_coordinate(coord_str: str) -> tuple[str, int, int]:
   """Parses a coordinate string like 'chr1:100-200' or 'chr1:100'.
@@ -61,22 +81,49 @@ def parse_coordinate(coord_str: str) -> tuple[str, int, int]:
 
 
 def get_conservation_data(
-    chrom: str, start: int, end: int, track: str, genome: str = "hg38"
+    chrom: str,
+    start: int,
+    end: int,
+    track: str,
+    genome: str = "hg38",
+    max_items: int | None = None,
 ) -> dict[str, Any]:
-  """Fetches track data for a given region."""
+  """Fetches track data for a given region.
+
+  Responses are cut at max_items items (UCSC default 1000), in which case
+  they carry "maxItemsLimit": true.
+  """
   url = f"{UCSC_API_URL}?genome={genome}&track={track}&chrom={chrom}&start={start}&end={end}"
+  if max_items is not None:
+    url += f"&maxItemsOutput={max_items}"
   print(f"Requesting URL: {url}")
   return CLIENT.fetch_json(url)
 
 
-def merge_results(
-    coords: list[str],
-    collection: str,
-    fetch_conserved: bool,
-    genome: str,
-    analyze: bool,
-) -> dict[str, dict[str, Any]]:
-  """Main fetching and merging logic."""
+def read_coordinates_file(path: str) -> list[str]:
+  """Reads coordinates, one per line, as 'chr:start-end' or BED lines.
+
+  BED lines (tab-separated chrom, start, end; 0-based) are converted to the
+  1-based 'chr:start-end' form used by --coordinates.
+  """
+  coords = []
+  with open(path) as f:
+    for line in f:
+      line = line.strip()
+      if not line or line.startswith(("#", "track", "browser")):
+        continue
+      fields = line.split("\t")
+      if len(fields) >= 3 and fields[1].isdigit() and fields[2].isdigit():
+        coords.append(f"{fields[0]}:{int(fields[1]) + 1}-{fields[2]}")
+      else:
+        coords.append(fields[0])
+  return coords
+
+
+def conservation_tracks(
+    collection: str, genome: str, fetch_conserved: bool
+) -> list[str]:
+  """Returns the phyloP, phastCons and (optionally) element tracks to fetch."""
   if genome == "hg38":
     if collection == "vertebrate":
       # UCSC 100-vertebrate Multiz alignment (default comparative genomics
@@ -140,40 +187,278 @@ def merge_results(
     # Note: 'haqer' and 'ucne' might exist depending on genome build,
     # but we stick to the core phastConsElements for robustness here.
     # Can add others if needed and verified exist.
+  return tracks_to_fetch
+
+
+def merge_regions(
+    regions: list[tuple[str, int, int]],
+    max_gap: int = 0,
+    max_span: int = MAX_MERGED_SPAN,
+) -> list[tuple[tuple[str, int, int], list[int]]]:
+  """Groups overlapping or nearby regions into fewer fetch regions.
+
+  Args:
+    regions: (chrom, start, end) regions, 0-based half-open.
+    max_gap: Regions at most this many bases apart are merged. 0 merges only
+      overlapping and adjacent regions.
+    max_span: A region is not merged into a group if that would make the
+      group span more than this many bases.
+
+  Returns:
+    (merged region, indices into regions) pairs, sorted by position.
+  """
+  groups = []
+  order = sorted(range(len(regions)), key=lambda i: regions[i])
+  for i in order:
+    chrom, start, end = regions[i]
+    if groups:
+      (g_chrom, g_start, g_end), members = groups[-1]
+      if (
+          g_chrom == chrom
+          and start <= g_end + max_gap
+          and max(end, g_end) - g_start <= max_span
+      ):
+        groups[-1] = ((chrom, g_start, max(end, g_end)), members + [i])
+        continue
+    groups.append(((chrom, start, end), [i]))
+  return groups
+
+
+def extract_track_items(
+    data: dict[str, Any], chrom: str, track: str
+) -> list[dict[str, Any]]:
+  """Returns the items of a getData/track response."""
+  # Extract actual track data items from the JSON
+  # (which usually places them under the chromosome name key or similar)
+  track_items = data.get(chrom, [])
+  if not track_items and track in data:
+    # fallback for some tracks
+    track_items = data.get(track, [])
+  return track_items
+
+
+def _item_bounds(items: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+  """Returns item starts and ends for wiggle or BED-like items."""
+  starts = np.fromiter(
+      (i.get("start", i.get("chromStart", 0)) for i in items),
+      dtype=np.int64,
+      count=len(items),
+  )
+  ends = np.fromiter(
+      (i.get("end", i.get("chromEnd", 0)) for i in items),
+      dtype=np.int64,
+      count=len(items),
+  )
+  return starts, ends
+
+
+def split_items(
+    items: list[dict[str, Any]], regions: list[tuple[str, int, int]]
+) -> list[list[dict[str, Any]]]:
+  """Splits the items of one merged fetch back into its member regions.
+
+  Each region gets the items that overlap it, in response order, which is
+  what fetching the region on its own returns.
+  """
+  if not items:
+    return [[] for _ in regions]
+  starts, ends = _item_bounds(items)
+  order = np.argsort(starts, kind="stable")
+  sorted_starts = starts[order]
+  # Running max of ends: items before `lo` all end at or before the region.
+  end_max = np.maximum.accumulate(ends[order])
+  split = []
+  for _, start, end in regions:
+    lo = np.searchsorted(end_max, start, side="right")
+    hi = np.searchsorted(sorted_starts, end, side="left")
+    candidates = order[lo:hi]
+    keep = np.sort(candidates[ends[candidates] > start])
+    split.append([items[k] for k in keep])
+  return split
+
+
+def find_local_track(
+    local_dir: str | None, track: str, genome: str
+) -> str | None:
+  """Returns the path of a local bigWig/bigBed file for track, if any."""
+  if not local_dir:
+    return None
+  for name in (f"{genome}.{track}", track):
+    for suffix in LOCAL_TRACK_SUFFIXES:
+      path = os.path.join(local_dir, name + suffix)
+      if os.path.exists(path):
+        return path
+  return None
+
+
+def _open_big_file(path: str):
+  try:
+    import pyBigWig  # pylint: disable=g-import-not-at-top
+  except ImportError:
+    sys.exit(
+        "Reading local bigWig/bigBed files needs pyBigWig: pip install"
+        " pyBigWig"
+    )
+  return pyBigWig.open(path)
+
+
+def _parse_bed_value(value: str) -> Any:
+  for cast in (int, float):
+    try:
+      return cast(value)
+    except ValueError:
+      pass
+  return value
+
+
+def read_local_items(
+    handle: Any, chrom: str, start: int, end: int
+) -> list[dict[str, Any]]:
+  """Reads items from an open bigWig/bigBed in the getData/track JSON shape."""
+  if chrom not in handle.chroms():
+    return []
+  if handle.isBigWig():
+    intervals = handle.intervals(chrom, start, end) or []
+    return [{"start": s, "end": e, "value": v} for s, e, v in intervals]
+  # bigBed: name the extra columns from the file's autoSql definition.
+  fields = re.findall(r"^\s*[\w\[\]]+\s+(\w+)\s*;", handle.SQL(), re.M)[3:]
+  items = []
+  for s, e, rest in handle.entries(chrom, start, end) or []:
+    item = {"chrom": chrom, "chromStart": s, "chromEnd": e}
+    for i, value in enumerate(rest.split("\t") if rest else []):
+      item[fields[i] if i < len(fields) else f"field{i + 3}"] = (
+          _parse_bed_value(value)
+      )
+    items.append(item)
+  return items
+
+
+def summarize_phylop(track_items: list[dict[str, Any]]) -> dict[str, Any]:
+  """Computes phyloP summary statistics for one region, or {} if no scores."""
+  values = np.array(
+      [i.get("value") or 0.0 for i in track_items], dtype=np.float64
+  )
+  # Missing and zero-valued items are skipped.
+  scores = values[(values != 0) & ~np.isnan(values)]
+  if not scores.size:
+    return {}
+  mean_score = float(scores.mean())
+  min_score = float(scores.min())
+  max_score = float(scores.max())
+  # Heuristic for acceleration: strong negative scores
+  is_accelerated = mean_score < -0.3 or min_score < -2.0
+  return {
+      "mean_phyloP": round(mean_score, 4),
+      "min_phyloP": round(min_score, 4),
+      "max_phyloP": round(max_score, 4),
+      "is_accelerated": is_accelerated,
+  }
+
+
+def fetch_track_items(
+    chrom: str, start: int, end: int, track: str, genome: str
+) -> list[dict[str, Any]]:
+  """Fetches all items of a track in a region.
+
+  maxItemsOutput is raised to cover one item per base. If the response is
+  still truncated, the region is fetched again in two halves.
+  """
+  max_items = max(end - start, DEFAULT_MAX_ITEMS)
+  data = get_conservation_data(
+      chrom, start, end, track, genome=genome, max_items=max_items
+  )
+  track_items = extract_track_items(data, chrom, track)
+  if not data.get("maxItemsLimit"):
+    return track_items
+  if end - start < 2:
+    raise RuntimeError(
+        f"UCSC truncated {track} at {chrom}:{start}-{end} to"
+        f" {len(track_items)} items."
+    )
+  mid = (start + end) // 2
+  print(f"{track} response truncated; splitting {chrom}:{start}-{end}...")
+  left = fetch_track_items(chrom, start, mid, track, genome)
+  right = fetch_track_items(chrom, mid, end, track, genome)
+  # Items spanning mid are in both halves; keep them from the left one.
+  right_starts, _ = _item_bounds(right)
+  return left + [i for i, s in zip(right, right_starts) if s >= mid]
+
+
+def fetch_merged_track(
+    group: tuple[tuple[str, int, int], list[int]],
+    regions: list[tuple[str, int, int]],
+    track: str,
+    genome: str,
+) -> list[list[dict[str, Any]]]:
+  """Fetches one track over a merged region and splits it per member region."""
+  (chrom, start, end), members = group
+  print(f"Fetching {track} for region {chrom}:{start}-{end}...")
+  track_items = fetch_track_items(chrom, start, end, track, genome)
+  if len(members) == 1 and regions[members[0]] == (chrom, start, end):
+    return [track_items]
+  return split_items(track_items, [regions[i] for i in members])
+
+
+def merge_results(
+    coords: list[str],
+    collection: str,
+    fetch_conserved: bool,
+    genome: str,
+    analyze: bool,
+    concurrency: int = 1,
+    merge_gap: int = 0,
+    local_dir: str | None = None,
+) -> dict[str, dict[str, Any]]:
+  """Main fetching and merging logic."""
+  tracks_to_fetch = conservation_tracks(collection, genome, fetch_conserved)
+  regions = [parse_coordinate(coord) for coord in coords]
+
+  # items[track][i] holds the items of regions[i].
+  items = {}
+  remote_tracks = []
+  for track in tracks_to_fetch:
+    path = find_local_track(local_dir, track, genome)
+    if path is None:
+      remote_tracks.append(track)
+      continue
+    print(f"Reading {track} from {path}...")
+    with _open_big_file(path) as handle:
+      items[track] = [read_local_items(handle, *region) for region in regions]
+
+  groups = merge_regions(regions, max_gap=merge_gap)
+  if remote_tracks and len(groups) < len(set(regions)):
+    print(
+        f"Merged {len(set(regions))} regions into {len(groups)} requests per"
+        " track."
+    )
+  pairs = [(group, track) for track in remote_tracks for group in groups]
+  # Requests go through the shared client rate limiter, so running pairs
+  # concurrently only overlaps latency; it never exceeds the UCSC QPS budget.
+  with futures.ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+    fetched = list(
+        pool.map(
+            lambda pair: fetch_merged_track(pair[0], regions, pair[1], genome),
+            pairs,
+        )
+    )
+  for track in remote_tracks:
+    items[track] = [None] * len(regions)
+  for ((_, members), track), split in zip(pairs, fetched):
+    for i, track_items in zip(members, split):
+      items[track][i] = track_items
 
   results = {}
-  for coord in coords:
-    chrom, start, end = parse_coordinate(coord)
+  for i, (coord, (chrom, start, end)) in enumerate(zip(coords, regions)):
     region_result = {"coordinate": f"{chrom}:{start}-{end}", "tracks": {}}
 
     for track in tracks_to_fetch:
-      print(f"Fetching {track} for region {chrom}:{start}-{end}...")
-      data = get_conservation_data(chrom, start, end, track, genome=genome)
-
-      # Extract actual track data items from the JSON
-      # (which usually places them under the chromosome name key or similar)
-      track_items = data.get(chrom, [])
-      if not track_items and track in data:
-        # fallback for some tracks
-        track_items = data.get(track, [])
+      track_items = items[track][i]
       region_result["tracks"][track] = track_items
 
       if analyze and track.startswith("phyloP"):
-        scores = [i.get("value") for i in track_items if i.get("value")]
-        if scores:
-          mean_score = sum(scores) / len(scores)
-          min_score = min(scores)
-          max_score = max(scores)
-          # Heuristic for acceleration: strong negative scores
-          is_accelerated = mean_score < -0.3 or min_score < -2.0
-
-          region_result["analysis"] = {
-              "track": track,
-              "mean_phyloP": round(mean_score, 4),
-              "min_phyloP": round(min_score, 4),
-              "max_phyloP": round(max_score, 4),
-              "is_accelerated": is_accelerated,
-          }
+        summary = summarize_phylop(track_items)
+        if summary:
+          region_result["analysis"] = {"track": track, **summary}
     results[coord] = region_result
 
   return results
@@ -183,15 +468,22 @@ def main():
   parser = argparse.ArgumentParser(
       description="Fetch Evolutionary Conservation scores from UCSC Database."
   )
-  parser.add_argument(
+  coordinates = parser.add_mutually_exclusive_group(required=True)
+  coordinates.add_argument(
       "--coordinates",
-      required=True,
       nargs="+",
       help=(
           "One or more genomic coordinates (e.g., 'chr1:100-200' or"
           " 'chr1:100')."
       ),
   )
+  coordinates.add_argument(
+      "--coordinates-file",
+      help=(
+          "File with one coordinate per line ('chr1:100-200') or a BED file,"
+          " for scoring many regions in one run."
+      ),
+  )
   parser.add_argument(
       "--collection",
       choices=["vertebrate", "mammal", "primate", "vertebrate46"],
@@ -221,15 +513,49 @@ def main():
       action="store_true",
       help="Analyze phyloP scores for signals of evolutionary acceleration.",
   )
+  parser.add_argument(
+      "--concurrency",
+      type=int,
+      default=1,
+      help=(
+          "Maximum concurrent (region, track) requests. Requests still share"
+          " the UCSC QPS budget."
+      ),
+  )
+  parser.add_argument(
+      "--merge-gap",
+      type=int,
+      default=0,
+      help=(
+          "Fetch regions within this many bases of each other in one request"
+          " (default 0: only overlapping or adjacent regions)."
+      ),
+  )
+  parser.add_argument(
+      "--local-dir",
+      default=None,
+      help=(
+          "Directory with local bigWig/bigBed files named <track>.bw or"
+          " <genome>.<track>.bw (or .bigWig/.bb/.bigBed). Matching tracks are"
+          " read locally instead of from the API. Needs pyBigWig."
+      ),
+  )
 
   args = parser.parse_args()
 
+  coords = args.coordinates
+  if args.coordinates_file:
+    coords = read_coordinates_file(args.coordinates_file)
+
   results = merge_results(
-      args.coordinates,
+      coords,
       args.collection,
       args.conserved_elements,
       args.genome,
       args.analyze,
+      concurrency=args.concurrency,
+      merge_gap=args.merge_gap,
+      local_dir=args.local_dir,
   )
 
   # Dump final output to specified file
@@ -0,0 +1,90 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for merged getData/track fetches in get_conservation."""
+
+import contextlib
+import io
+import unittest
+from unittest import mock
+import urllib.parse
+
+import get_conservation
+
+
+class _FakeGetData:
+  """Serves one wiggle item per base, truncated like the UCSC API."""
+
+  def __init__(self, server_limit=None):
+    self.server_limit = server_limit
+    self.urls = []
+
+  def __call__(self, url):
+    self.urls.append(url)
+    query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query))
+    start, end = int(query["start"]), int(query["end"])
+    limit = int(query.get("maxItemsOutput", 1000))
+    if self.server_limit is not None:
+      limit = min(limit, self.server_limit)
+    items = [
+        {"start": s, "end": s + 1, "value": (s % 7) - 3.0}
+        for s in range(start, end)
+    ]
+    data = {query["chrom"]: items[:limit]}
+    if len(items) > limit:
+      data["maxItemsLimit"] = True
+    return data
+
+
+class MergedFetchTest(unittest.TestCase):
+
+  def _merge_results(self, fake, coords):
+    with mock.patch.object(
+        get_conservation.CLIENT, "fetch_json", fake
+    ), contextlib.redirect_stdout(io.StringIO()):
+      return get_conservation.merge_results(
+          coords, "vertebrate", False, "hg38", True, merge_gap=1000
+      )
+
+  def _assert_per_base(self, results):
+    for result in results.values():
+      chrom, span = result["coordinate"].split(":")
+      start, end = map(int, span.split("-"))
+      for items in result["tracks"].values():
+        self.assertEqual(
+            [i["start"] for i in items], list(range(start, end)), chrom
+        )
+
+  def test_merged_span_over_default_item_limit(self):
+    fake = _FakeGetData()
+    coords = ["chr1:1001-1500", "chr1:2001-4500"]
+    results = self._merge_results(fake, coords)
+    # One request per track for both regions, asking for the whole span.
+    self.assertEqual(len(fake.urls), 2)
+    self.assertTrue(all("maxItemsOutput=3500" in u for u in fake.urls))
+    self._assert_per_base(results)
+    values = [(s % 7) - 3.0 for s in range(2000, 4500)]
+    self.assertEqual(
+        results["chr1:2001-4500"]["analysis"]["max_phyloP"], max(values)
+    )
+
+  def test_truncated_response_is_split(self):
+    fake = _FakeGetData(server_limit=1000)
+    results = self._merge_results(fake, ["chr1:1-1500", "chr1:2001-4500"])
+    self.assertGreater(len(fake.urls), 2)
+    self._assert_per_base(results)
+
+
+if __name__ == "__main__":
+  unittest.main()
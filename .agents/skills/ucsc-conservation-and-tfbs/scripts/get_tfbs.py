@@ -22,6 +22,7 @@
 # ///
 
 import argparse
+from concurrent import futures
 import json
 import re
 import sys
@@ -62,6 +63,62 @@ def get_tfbs_data(
   return api_client.fetch_json(url)
 
 
+def fetch_track_items(
+    chrom: str,
+    start: int,
+    end: int,
+    track: str,
+    genome: str = "hg38",
+    tf_filter: str | None = None,
+) -> list[Any] | dict[str, Any]:
+  """Fetches one (region, track) pair and returns its items or an error."""
+  print(f"Fetching {track} for region {chrom}:{start}-{end}...")
+  data = get_tfbs_data(chrom, start, end, track, genome=genome)
+
+  # Extract actual track data items from the JSON.
+  if "error" in data:
+    print(f"API Error for track '{track}': {data['error']}")
+    return {"error": data["error"]}
+
+  # Try both track name and chromosome as key
+  track_items = data.get(track, [])
+  if not track_items and chrom in data:
+    track_items = data.get(chrom, [])
+
+  # Fallback to look for ANY list that looks like data
+  if not track_items:
+    for k, v in data.items():
+      if isinstance(v, list) and k not in [
+          "downloadTime",
+          "downloadTimeStamp",
+          "dataTime",
+          "dataTimeStamp",
+          "genome",
+          "track",
+          "chrom",
+          "start",
+          "end",
+      ]:
+        track_items = v
+        break
+
+  # Apply TF name filter if specified.
+  if tf_filter and track_items:
+    tf_filter_lower = tf_filter.lower()
+    filtered = [
+        item
+        for item in track_items
+        if tf_filter_lower in item.get("TFName", "").lower()
+    ]
+    print(
+        f"  Filtered {len(track_items)} items to {len(filtered)} matching"
+        f" TFName containing '{tf_filter}'."
+    )
+    track_items = filtered
+
+  return track_items
+
+
 def main():
   parser = argparse.ArgumentParser(
       description=(
@@ -102,62 +159,39 @@ def main():
   parser.add_argument(
       "--genome", default="hg38", help="Genome assembly. Defaults to hg38."
   )
+  parser.add_argument(
+      "--concurrency",
+      type=int,
+      default=1,
+      help=(
+          "Maximum concurrent (region, track) requests. Requests still share"
+          " the UCSC QPS budget."
+      ),
+  )
 
   args = parser.parse_args()
 
+  regions = [parse_coordinate(coord) for coord in args.coordinates]
+  pairs = [(region, track) for region in regions for track in args.tracks]
+
+  # Requests go through the shared client rate limiter, so running pairs
+  # concurrently only overlaps latency; it never exceeds the UCSC QPS budget.
+  with futures.ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+    fetched = list(
+        pool.map(
+            lambda pair: fetch_track_items(
+                *pair[0], pair[1], genome=args.genome, tf_filter=args.tf_filter
+            ),
+            pairs,
+        )
+    )
+
   results = {}
-  for coord in args.coordinates:
-    chrom, start, end = parse_coordinate(coord)
+  items_by_pair = iter(fetched)
+  for coord, (chrom, start, end) in zip(args.coordinates, regions):
     region_result = {"coordinate": f"{chrom}:{start}-{end}", "tracks": {}}
-
     for track in args.tracks:
-      print(f"Fetching {track} for region {chrom}:{start}-{end}...")
-      data = get_tfbs_data(chrom, start, end, track, genome=args.genome)
-
-      # Extract actual track data items from the JSON.
-      if "error" in data:
-        print(f"API Error for track '{track}': {data['error']}")
-        region_result["tracks"][track] = {"error": data["error"]}
-        continue
-
-      # Try both track name and chromosome as key
-      track_items = data.get(track, [])
-      if not track_items and chrom in data:
-        track_items = data.get(chrom, [])
-
-      # Fallback to look for ANY list that looks like data
-      if not track_items:
-        for k, v in data.items():
-          if isinstance(v, list) and k not in [
-              "downloadTime",
-              "downloadTimeStamp",
-              "dataTime",
-              "dataTimeStamp",
-              "genome",
-              "track",
-              "chrom",
-              "start",
-              "end",
-          ]:
-            track_items = v
-            break
-
-      # Apply TF name filter if specified.
-      if args.tf_filter and track_items:
-        tf_filter_lower = args.tf_filter.lower()
-        filtered = [
-            item
-            for item in track_items
-            if tf_filter_lower in item.get("TFName", "").lower()
-        ]
-        print(
-            f"  Filtered {len(track_items)} items to {len(filtered)} matching"
-            f" TFName containing '{args.tf_filter}'."
-        )
-        track_items = filtered
-
-      region_result["tracks"][track] = track_items
-
+      region_result["tracks"][track] = next(items_by_pair)
     results[coord] = region_result
 
   # Dump final output to specified file
@@ -33,6 +33,7 @@ from typing import Any, Iterator
 import urllib.parse
 
 from polite_http import http_client
+import response_cache
 
 
 class UniProtError(Exception):
@@ -43,6 +44,28 @@ BASE_URL = "https://rest.uniprot.org"
 SPARQL_URL = "https://sparql.uniprot.org/sparql"
 CLIENT = http_client.HttpClient(BASE_URL, qps=1.0)
 SPARQL_CLIENT = http_client.HttpClient(SPARQL_URL, qps=1.0)
+# UniProt publishes a new release every ~8 weeks; a week is safely stale-free.
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+_cached_client = None
+_cache_dir = response_cache.DEFAULT_CACHE_DIR
+
+
+def configure_cache(cache_dir: str | None) -> None:
+  """Sets the response cache directory; None disables the cache."""
+  global _cached_client, _cache_dir
+  _cache_dir = cache_dir
+  _cached_client = None
+
+
+def _get_cached_client():
+  """Returns CLIENT wrapped with the persistent response cache."""
+  global _cached_client
+  if _cached_client is None:
+    _cached_client = response_cache.wrap_client(
+        CLIENT, "uniprot", CACHE_TTL_SECONDS, _cache_dir
+    )
+  return _cached_client
 
 
 def _add_params_to_url(url: str, params: dict[str, Any] | None = None) -> str:
@@ -68,14 +91,21 @@ def _get_decompressed_data(resp: http_client.HttpResponse) -> str:
 
 
 def _fetch(
-    url: str, method="GET", headers=None, data=None, *, as_json=False
+    url: str,
+    method="GET",
+    headers=None,
+    data=None,
+    *,
+    as_json=False,
+    cache=True,
 ) -> dict[str, Any] | str:
   """Fetch JSON and parse, handling server double-gzipping content."""
   if not headers:
     headers = {}
   if as_json:
     headers |= {"Accept": "application/json"}
-  response = CLIENT.fetch(url, headers=headers, method=method, data=data)
+  client = _get_cached_client() if cache else CLIENT
+  response = client.fetch(url, headers=headers, method=method, data=data)
   decoded_data = _get_decompressed_data(response)
   if as_json:
     return json.loads(decoded_data)
@@ -123,7 +153,7 @@ def search_proteins(
 
     while next_url:
       full_url = _add_params_to_url(next_url, current_params)
-      resp = CLIENT.fetch(full_url)
+      resp = _get_cached_client().fetch(full_url)
       if total_results is None:
         total_results = _get_header(resp, "X-Total-Results")
       data = _get_decompressed_data(resp)
@@ -219,7 +249,7 @@ def get_count(query: str, dataset: str = "uniprotkb") -> int:
   """Retrieve the total number of hits for a query."""
   url = f"{BASE_URL}/{dataset}/search"
   params = {"query": query, "size": 1, "format": "json"}
-  resp = CLIENT.fetch(_add_params_to_url(url, params))
+  resp = _get_cached_client().fetch(_add_params_to_url(url, params))
   return int(_get_header(resp, "X-Total-Results") or 0)
 
 
@@ -254,7 +284,7 @@ def run_id_mapping(ids: list[str], from_db: str, to_db: str) -> dict[str, Any]:
   status_url = f"{BASE_URL}/idmapping/status/{job_id}"
   results_resp = None
   while True:
-    status_resp = _fetch(status_url, as_json=True)
+    status_resp = _fetch(status_url, as_json=True, cache=False)
     if not isinstance(status_resp, dict):
       raise UniProtError(
           f"ID mapping job status response is not a dict: {status_resp}"
@@ -326,6 +356,7 @@ def stream_results(
 
 if __name__ == "__main__":
   parser = argparse.ArgumentParser(description=__doc__)
+  response_cache.add_cache_arguments(parser)
   subparsers = parser.add_subparsers(dest="command")
 
   # Search command
@@ -386,6 +417,7 @@ if __name__ == "__main__":
   st_parser.add_argument("--fields")
 
   args = parser.parse_args()
+  configure_cache(None if args.no_cache else args.cache_dir)
 
   # Validate that --format is lowercase (UniProt API requires lowercase).
   if hasattr(args, "format") and args.format != args.format.lower():
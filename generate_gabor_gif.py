@@ -4,9 +4,29 @@
 1 cpd부터 30 cpd까지 공간주파수가 변화하는 가보 패치 이미지 30개를 생성하고 GIF로 합성합니다.
 """
 
+import argparse
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import json
 import math
 from PIL import Image, ImageDraw, ImageFont
 import os
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 순수 Python 경로로 대체
+    np = None
+
+# 원형 구경(사각틀 내 최대한 큰 원)의 반지름/가장자리 폭 비율
+APERTURE_RADIUS_RATIO = 0.48
+APERTURE_FEATHER_RATIO = 0.04
+
+# 프레임 캐시 버전: 렌더링 수식이 바뀌면 올려서 기존 캐시를 무효화
+FRAME_CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = ".cache/gabor_frames"
 
 def _smoothstep(edge0: float, edge1: float, x: float) -> float:
     """0~1 사이에서 부드럽게 전이되는 함수."""
@@ -17,81 +37,496 @@ def _smoothstep(edge0: float, edge1: float, x: float) -> float:
     return t * t * (3 - 2 * t)
 
 
-def generate_gabor_patch(spatial_freq, size=200, contrast=0.8, sigma=None, phase=0.0, x_shift_px=0.0):
-    """
-    가보 패치 생성 (numpy 없이 순수 Python으로)
-    
-    Parameters:
-    -----------
-    spatial_freq : float
-        공간주파수 (cpd - cycles per degree)
-    size : int
-        이미지 크기 (픽셀)
-    contrast : float
-        대비 (0-1)
-    sigma : float
-        가우시안 표준편차 (None이면 자동 계산)
-    
-    Returns:
-    --------
-    PIL.Image
-        가보 패치 이미지
+def _default_sigma(size):
+    """가우시안 표준편차 기본값.
+
+    요구사항: 공간주파수별로 구경(가우시안 포락선)이 작아지지 않도록 sigma는 고정.
+    원형 구경을 사각틀 내에서 최대한 크게 보이도록 완만한 가우시안을 사용합니다.
     """
-    # 가우시안 표준편차 설정
-    # - 요구사항: 공간주파수별로 구경(가우시안 포락선)이 작아지지 않도록 sigma는 고정
-    if sigma is None:
-        # 원형 구경을 사각틀 내에서 최대한 크게 보이도록 완만한 가우시안
-        sigma = size / 2.2
-    
-    # 공간주파수를 픽셀 단위로 변환
-    # 1 cpd ≈ 60 pixels/cycle (시야각 1도 ≈ 60픽셀 가정)
+    return size / 2.2
+
+
+def _wavelength_px(spatial_freq, size):
+    """공간주파수(cpd)를 픽셀 단위 파장으로 변환 (1 cpd ≈ 60 pixels/cycle 가정)."""
     cycles_per_image = spatial_freq * (size / 60.0)
-    wavelength = size / cycles_per_image if cycles_per_image > 0 else size
-    
+    return size / cycles_per_image if cycles_per_image > 0 else size
+
+
+def _generate_gabor_patch_python(spatial_freq, size, contrast, sigma, phase, x_shift_px):
+    """가보 패치 생성 (numpy 없이 순수 Python으로). numpy가 없을 때의 대체 경로."""
+    wavelength = _wavelength_px(spatial_freq, size)
+
     # 이미지 생성
     img = Image.new('L', (size, size), 128)  # 회색 배경
     pixels = []
-    
+
     center = size / 2
-    
+    aperture_r = size * APERTURE_RADIUS_RATIO
+    feather = size * APERTURE_FEATHER_RATIO
+
     for y in range(size):
-        row = []
         for x in range(size):
             # 중심으로부터의 거리
             dx = x - center
             dy = y - center
             dist_sq = dx * dx + dy * dy
-            
+
             # 가우시안 포락선
             gaussian = math.exp(-dist_sq / (2 * sigma * sigma))
 
             # 원형 구경(사각틀 내 최대한 큰 원) + 부드러운 가장자리
             r = math.sqrt(dist_sq)
-            aperture_r = size * 0.48
-            feather = size * 0.04
             aperture = 1.0 - _smoothstep(aperture_r - feather, aperture_r, r)
-            
+
             # 정현파 격자 (수평 방향)
             # - x_shift_px > 0 이면 줄무늬가 좌→우로 이동하는 드리프트 느낌이 명확해짐
             grating = math.sin(2 * math.pi * (dx - x_shift_px) / wavelength + phase)
-            
+
             # 가보 패치 = (가우시안 × 원형 구경) × 정현파
             gabor_value = (gaussian * aperture) * grating
-            
+
             # 대비 조정 및 0-255 범위로 변환
             pixel_value = int((gabor_value * contrast + 1) / 2 * 255)
             pixel_value = max(0, min(255, pixel_value))  # 클리핑
-            
-            row.append(pixel_value)
-        pixels.append(row)
-    
-    # 픽셀 데이터를 이미지에 적용
-    for y in range(size):
-        for x in range(size):
-            img.putpixel((x, y), pixels[y][x])
-    
+
+            pixels.append(pixel_value)
+
+    # 픽셀 데이터를 이미지에 한 번에 적용 (putpixel 반복 대신)
+    img.putdata(pixels)
+
     return img
 
+
+@functools.lru_cache(maxsize=8)
+def _gabor_envelope(size, sigma):
+    """(가우시안 포락선 × 원형 구경) 마스크와 x 좌표(중심 기준)를 계산.
+
+    크기/sigma 조합별로 한 번만 계산하고 캐시하여 모든 프레임에서 재사용합니다.
+    반환된 배열은 읽기 전용입니다.
+
+    Returns:
+    --------
+    (mask, dx) : (numpy.ndarray, numpy.ndarray)
+        mask는 (size, size) float64, dx는 (size,) float64
+    """
+    center = size / 2
+    dx = np.arange(size, dtype=np.float64) - center
+    dy = dx[:, None]
+    dist_sq = dx[None, :] * dx[None, :] + dy * dy
+
+    gaussian = np.exp(-dist_sq / (2 * sigma * sigma))
+
+    aperture_r = size * APERTURE_RADIUS_RATIO
+    feather = size * APERTURE_FEATHER_RATIO
+    edge0 = aperture_r - feather
+    t = np.clip((np.sqrt(dist_sq) - edge0) / (aperture_r - edge0), 0.0, 1.0)
+    aperture = 1.0 - t * t * (3 - 2 * t)
+
+    mask = gaussian * aperture
+    mask.setflags(write=False)
+    dx.setflags(write=False)
+    return mask, dx
+
+
+def render_gabor_frames(spatial_freqs, size=200, contrast=0.8, sigma=None, phase=0.0, x_shift_px=0.0):
+    """
+    여러 프레임의 가보 패치를 numpy로 한 번에 렌더링
+
+    spatial_freqs 외의 파라미터는 스칼라(모든 프레임 공통) 또는
+    프레임 수와 같은 길이의 시퀀스(프레임별 값)를 받을 수 있습니다.
+
+    Parameters:
+    -----------
+    spatial_freqs : sequence of float
+        프레임별 공간주파수 (cpd)
+    size : int
+        이미지 크기 (픽셀)
+    contrast, phase, x_shift_px : float 또는 sequence of float
+        대비(0-1), 위상(rad), 수평 이동량(픽셀)
+    sigma : float
+        가우시안 표준편차 (None이면 자동 계산)
+
+    Returns:
+    --------
+    numpy.ndarray
+        (frames, size, size) uint8 배열
+    """
+    if np is None:
+        raise RuntimeError("render_gabor_frames에는 numpy가 필요합니다: pip3 install numpy")
+    if sigma is None:
+        sigma = _default_sigma(size)
+
+    mask, dx = _gabor_envelope(size, sigma)
+
+    freqs = np.asarray(spatial_freqs, dtype=np.float64).reshape(-1)
+    n_frames = freqs.shape[0]
+    wavelengths = np.array([_wavelength_px(f, size) for f in freqs], dtype=np.float64)
+    contrasts = np.broadcast_to(np.asarray(contrast, dtype=np.float64), (n_frames,))
+    phases = np.broadcast_to(np.asarray(phase, dtype=np.float64), (n_frames,))
+    shifts = np.broadcast_to(np.asarray(x_shift_px, dtype=np.float64), (n_frames,))
+
+    # 정현파 격자는 수평 방향으로만 변하므로 프레임별 1행(frames, W)만 계산
+    gratings = np.sin(
+        2 * np.pi * (dx[None, :] - shifts[:, None]) / wavelengths[:, None] + phases[:, None]
+    )
+
+    # 순수 Python 경로와 같은 연산 순서를 유지해 동일한 픽셀 값을 얻음
+    gabor = mask[None, :, :] * gratings[:, None, :]
+    gabor *= contrasts[:, None, None]
+    gabor += 1
+    gabor /= 2
+    gabor *= 255
+    np.trunc(gabor, out=gabor)  # int()와 같은 0 방향 절사
+    np.clip(gabor, 0, 255, out=gabor)
+    return gabor.astype(np.uint8)
+
+
+def render_gabor_images(spatial_freqs, size=200, contrast=0.8, sigma=None, phase=0.0,
+                        x_shift_px=0.0, use_numpy=None):
+    """
+    render_gabor_frames 결과를 PIL 이미지(L 모드) 리스트로 반환
+
+    numpy가 없거나 use_numpy=False이면 프레임마다 순수 Python 경로로 생성합니다.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        frames = render_gabor_frames(
+            spatial_freqs, size=size, contrast=contrast, sigma=sigma,
+            phase=phase, x_shift_px=x_shift_px,
+        )
+        return [Image.fromarray(frame, mode='L') for frame in frames]
+
+    spatial_freqs = list(spatial_freqs)
+    n_frames = len(spatial_freqs)
+
+    def per_frame(value):
+        if isinstance(value, (int, float)):
+            return [value] * n_frames
+        return list(value)
+
+    return [
+        generate_gabor_patch(f, size=size, contrast=c, sigma=sigma, phase=p,
+                             x_shift_px=x, use_numpy=False)
+        for f, c, p, x in zip(spatial_freqs, per_frame(contrast),
+                              per_frame(phase), per_frame(x_shift_px))
+    ]
+
+
+def generate_gabor_patch(spatial_freq, size=200, contrast=0.8, sigma=None, phase=0.0,
+                         x_shift_px=0.0, use_numpy=None):
+    """
+    가보 패치 생성
+
+    numpy가 설치되어 있으면 벡터화된 경로(render_gabor_frames)를 사용하고,
+    없으면 순수 Python 경로로 대체합니다.
+
+    Parameters:
+    -----------
+    spatial_freq : float
+        공간주파수 (cpd - cycles per degree)
+    size : int
+        이미지 크기 (픽셀)
+    contrast : float
+        대비 (0-1)
+    sigma : float
+        가우시안 표준편차 (None이면 자동 계산)
+    use_numpy : bool
+        None이면 numpy 설치 여부에 따라 자동 선택
+
+    Returns:
+    --------
+    PIL.Image
+        가보 패치 이미지
+    """
+    if sigma is None:
+        sigma = _default_sigma(size)
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    if use_numpy:
+        frame = render_gabor_frames(
+            [spatial_freq], size=size, contrast=contrast, sigma=sigma,
+            phase=phase, x_shift_px=x_shift_px,
+        )[0]
+        return Image.fromarray(frame, mode='L')
+    return _generate_gabor_patch_python(spatial_freq, size, contrast, sigma, phase, x_shift_px)
+
+# ---------------------------------------------------------------------------
+# 빌드 파이프라인: 프레임 캐시 + 프로세스 풀 렌더링 + 변경 없는 GIF 건너뛰기
+# ---------------------------------------------------------------------------
+
+# 프레임 하나를 결정하는 파라미터 (sigma는 기본값까지 풀어서 저장)
+FrameSpec = collections.namedtuple(
+    "FrameSpec", ["freq", "size", "contrast", "sigma", "phase", "shift"]
+)
+
+
+def make_frame_spec(spatial_freq, size=200, contrast=0.8, sigma=None, phase=0.0, x_shift_px=0.0):
+    """generate_gabor_patch와 같은 인자로 FrameSpec 생성."""
+    if sigma is None:
+        sigma = _default_sigma(size)
+    return FrameSpec(
+        float(spatial_freq), int(size), float(contrast), float(sigma), float(phase), float(x_shift_px)
+    )
+
+
+def frame_cache_key(spec):
+    """(freq, size, contrast, sigma, phase, shift) 기반 콘텐츠 주소 키 (sha256)."""
+    payload = json.dumps([FRAME_CACHE_VERSION, *spec])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write_bytes(path, data):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class FrameCache:
+    """렌더링된 프레임(L 모드 원시 바이트)을 키별 파일로 저장하는 디스크 캐시.
+
+    빌드 매니페스트(출력 GIF 해시)도 같은 디렉토리의 builds/ 아래에 저장합니다.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _frame_path(self, key):
+        return os.path.join(self.cache_dir, "frames", key[:2], f"{key}.raw")
+
+    def load(self, spec):
+        """캐시된 프레임을 PIL 이미지로 반환 (없거나 손상되었으면 None)."""
+        path = self._frame_path(frame_cache_key(spec))
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != spec.size * spec.size:
+            return None
+        return Image.frombytes("L", (spec.size, spec.size), data)
+
+    def store(self, spec, img):
+        path = self._frame_path(frame_cache_key(spec))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _atomic_write_bytes(path, img.tobytes())
+
+    def _manifest_path(self, output_path):
+        name = hashlib.sha256(os.path.abspath(output_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "builds", f"{name}.json")
+
+    def load_manifest(self, output_path):
+        try:
+            with open(self._manifest_path(output_path), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store_manifest(self, output_path, manifest):
+        path = self._manifest_path(output_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _atomic_write_bytes(path, json.dumps(manifest, indent=2).encode("utf-8"))
+
+
+def new_build_stats():
+    """--bench 보고용 통계 dict."""
+    return {
+        "frames": 0,
+        "unique_frames": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "render_seconds": 0.0,
+        "frame_seconds": [],
+        "encode_seconds": 0.0,
+        "skipped": False,
+    }
+
+
+def _render_chunk(specs, use_numpy=None):
+    """프로세스 풀 작업 단위: 같은 (size, sigma) 프레임들을 한 번에 렌더링.
+
+    Returns:
+    --------
+    (list of bytes, float)
+        프레임별 L 모드 원시 바이트, 렌더링 소요 시간(초)
+    """
+    start = time.perf_counter()
+    size, sigma = specs[0].size, specs[0].sigma
+    images = render_gabor_images(
+        [spec.freq for spec in specs],
+        size=size,
+        contrast=[spec.contrast for spec in specs],
+        sigma=sigma,
+        phase=[spec.phase for spec in specs],
+        x_shift_px=[spec.shift for spec in specs],
+        use_numpy=use_numpy,
+    )
+    return [img.tobytes() for img in images], time.perf_counter() - start
+
+
+def render_frames(specs, jobs=None, cache=None, use_numpy=None, stats=None):
+    """
+    FrameSpec 목록을 렌더링하여 PIL 이미지(L 모드) 리스트로 반환
+
+    - 같은 spec은 한 번만 렌더링
+    - cache가 있으면 캐시된 프레임을 재사용하고, 새로 렌더링한 프레임을 저장
+    - 캐시에 없는 프레임은 jobs개 프로세스로 나누어 병렬 렌더링
+
+    Parameters:
+    -----------
+    specs : sequence of FrameSpec
+    jobs : int
+        프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 렌더링)
+    cache : FrameCache
+        None이면 캐시를 사용하지 않음
+    stats : dict
+        new_build_stats() 결과. 주어지면 통계를 누적
+    """
+    specs = list(specs)
+    unique_specs = list(dict.fromkeys(specs))
+    rendered = {}
+
+    misses = []
+    for spec in unique_specs:
+        img = cache.load(spec) if cache is not None else None
+        if img is None:
+            misses.append(spec)
+        else:
+            rendered[spec] = img
+
+    if stats is not None:
+        stats["frames"] += len(specs)
+        stats["unique_frames"] += len(unique_specs)
+        stats["cache_hits"] += len(unique_specs) - len(misses)
+        stats["cache_misses"] += len(misses)
+
+    if misses:
+        # (size, sigma)가 같은 프레임끼리 묶은 뒤 jobs개 청크로 분할
+        groups = collections.defaultdict(list)
+        for spec in misses:
+            groups[(spec.size, spec.sigma)].append(spec)
+        jobs = max(1, jobs or os.cpu_count() or 1)
+        chunks = []
+        for group in groups.values():
+            chunk_size = max(1, math.ceil(len(group) / jobs))
+            chunks.extend(group[i:i + chunk_size] for i in range(0, len(group), chunk_size))
+
+        start = time.perf_counter()
+        if jobs > 1 and len(chunks) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+                results = list(pool.map(_render_chunk, chunks, [use_numpy] * len(chunks)))
+        else:
+            results = [_render_chunk(chunk, use_numpy) for chunk in chunks]
+
+        for chunk, (frames, elapsed) in zip(chunks, results):
+            for spec, data in zip(chunk, frames):
+                img = Image.frombytes("L", (spec.size, spec.size), data)
+                rendered[spec] = img
+                if cache is not None:
+                    cache.store(spec, img)
+            if stats is not None:
+                stats["frame_seconds"].extend([elapsed / len(chunk)] * len(chunk))
+        if stats is not None:
+            stats["render_seconds"] += time.perf_counter() - start
+
+    return [rendered[spec] for spec in specs]
+
+
+def build_gif(output_path, specs, duration, jobs=None, cache=None, use_numpy=None, force=False, stats=None):
+    """
+    FrameSpec 목록으로 GIF를 빌드
+
+    캐시가 있으면 (프레임 키 + 인코딩 옵션) 해시를 빌드 매니페스트에 기록하고,
+    해시가 같고 기존 출력 파일의 sha256도 기록과 일치하면 GIF 합성을 건너뜁니다.
+
+    Returns:
+    --------
+    bool
+        GIF를 새로 기록했으면 True, 변경이 없어 건너뛰었으면 False
+    """
+    specs = list(specs)
+    build_hash = hashlib.sha256(
+        json.dumps({
+            "frames": [frame_cache_key(spec) for spec in specs],
+            "duration": duration,
+            "loop": 0,
+        }).encode("utf-8")
+    ).hexdigest()
+
+    if cache is not None and not force and os.path.exists(output_path):
+        manifest = cache.load_manifest(output_path)
+        if (
+            manifest
+            and manifest.get("build_hash") == build_hash
+            and manifest.get("output_sha256") == _file_sha256(output_path)
+        ):
+            print(f"변경 없음, GIF 합성 건너뜀: {output_path}")
+            if stats is not None:
+                stats["frames"] += len(specs)
+                stats["skipped"] = True
+            return False
+
+    images = [
+        img.convert("RGB")
+        for img in render_frames(specs, jobs=jobs, cache=cache, use_numpy=use_numpy, stats=stats)
+    ]
+
+    print(f"GIF 저장 중: {output_path}")
+    start = time.perf_counter()
+    images[0].save(
+        output_path,
+        save_all=True,
+        append_images=images[1:],
+        duration=duration,
+        loop=0  # 무한 반복
+    )
+    if stats is not None:
+        stats["encode_seconds"] += time.perf_counter() - start
+
+    if cache is not None:
+        cache.store_manifest(output_path, {
+            "build_hash": build_hash,
+            "output_sha256": _file_sha256(output_path),
+        })
+
+    # 파일 크기 확인
+    file_size = os.path.getsize(output_path) / (1024 * 1024)  # MB
+    print(f"완료! 파일 크기: {file_size:.2f} MB")
+    return True
+
+
+def format_build_stats(name, stats):
+    """--bench 출력용 한 블록 문자열."""
+    lookups = stats["cache_hits"] + stats["cache_misses"]
+    hit_rate = stats["cache_hits"] / lookups if lookups else 0.0
+    frame_seconds = stats["frame_seconds"]
+    lines = [
+        f"[bench] {name}",
+        f"  프레임: {stats['frames']} (고유 {stats['unique_frames']})",
+        f"  캐시 적중: {stats['cache_hits']}/{lookups} ({hit_rate:.0%})",
+    ]
+    if frame_seconds:
+        mean_ms = sum(frame_seconds) / len(frame_seconds) * 1000
+        max_ms = max(frame_seconds) * 1000
+        lines.append(f"  프레임 렌더링: 평균 {mean_ms:.2f} ms, 최대 {max_ms:.2f} ms")
+    lines.append(f"  렌더링 전체: {stats['render_seconds'] * 1000:.1f} ms")
+    if stats["skipped"]:
+        lines.append("  인코딩: 건너뜀 (출력 해시 동일)")
+    else:
+        lines.append(f"  인코딩: {stats['encode_seconds'] * 1000:.1f} ms")
+    return "\n".join(lines)
+
+
 def create_gabor_with_text(spatial_freq, patch_size=200, canvas_padding_bottom=40, label="spatial"):
     """
     텍스트가 포함된 가보 패치 이미지 생성
@@ -154,7 +589,8 @@ def create_gabor_with_text(spatial_freq, patch_size=200, canvas_padding_bottom=4
     
     return img
 
-def create_gabor_gif(output_path="gabor_spatial_frequency.gif", patch_size=200, duration=100):
+def create_gabor_gif(output_path="gabor_spatial_frequency.gif", patch_size=200, duration=100, use_numpy=None,
+                     jobs=None, cache=None, force=False, stats=None):
     """
     가보 패치 GIF 생성
     
@@ -166,44 +602,32 @@ def create_gabor_gif(output_path="gabor_spatial_frequency.gif", patch_size=200,
         가보 패치 사각틀 크기(픽셀)
     duration : int
         각 프레임 지속 시간 (밀리초)
+    use_numpy : bool
+        None이면 numpy 설치 여부에 따라 자동 선택
+    jobs, cache, force, stats :
+        build_gif 참고
     """
     print("가보 패치 GIF 생성 중...")
     
     # 1부터 30 cpd까지 이미지 생성
-    images = []
-    spatial_freqs = range(1, 31)  # 1부터 30까지
-    
-    for i, freq in enumerate(spatial_freqs):
-        print(f"생성 중: {freq} cpd ({i+1}/30)")
-        # 캡션은 HTML에서 처리: GIF는 순수 패치(200x200)만 생성
-        img = generate_gabor_patch(freq, size=patch_size).convert("RGB")
-        images.append(img)
-    
-    # GIF로 저장
-    print(f"GIF 저장 중: {output_path}")
-    images[0].save(
-        output_path,
-        save_all=True,
-        append_images=images[1:],
-        duration=duration,
-        loop=0  # 무한 반복
-    )
-    
-    # 파일 크기 확인
-    file_size = os.path.getsize(output_path) / (1024 * 1024)  # MB
-    print(f"완료! 파일 크기: {file_size:.2f} MB")
-    
+    spatial_freqs = list(range(1, 31))  # 1부터 30까지
+
+    # 캡션은 HTML에서 처리: GIF는 순수 패치(200x200)만 생성
+    print(f"생성 중: {spatial_freqs[0]}~{spatial_freqs[-1]} cpd ({len(spatial_freqs)}프레임)")
+    specs = [make_frame_spec(freq, size=patch_size) for freq in spatial_freqs]
+    build_gif(output_path, specs, duration, jobs=jobs, cache=cache, use_numpy=use_numpy,
+              force=force, stats=stats)
     return output_path
 
 
-def create_temporal_frequency_gif(output_path="temporal_frequency.gif", patch_size=200, duration=100):
+def create_temporal_frequency_gif(output_path="temporal_frequency.gif", patch_size=200, duration=100, use_numpy=None,
+                                  jobs=None, cache=None, force=False, stats=None):
     """
     시간주파수(1~30Hz) 플리커(깜빡임) GIF 생성
     - 사용자 체감이 중요한 시각화이므로, 프레임이 진행될수록 플리커가 빨라지는 '램프' 형태로 구현
     - 낮은 Hz에서는 천천히 명확하게 깜빡이고, 높은 Hz에서는 점점 깜빡임이 느껴지지 않도록(거의 안정된 회색/평균화) 유도
     """
     print("시간주파수 GIF 생성 중...")
-    images = []
 
     fixed_spatial_cpd = 4  # 시간주파수 표현용: 공간 패턴은 고정
 
@@ -216,6 +640,8 @@ def create_temporal_frequency_gif(output_path="temporal_frequency.gif", patch_si
 
     # 깜빡임을 'ON/OFF'로 단순화: ON은 원 패턴, OFF는 평균(회색)으로
     # 높은 Hz에서는 거의 정지처럼 보이도록 대비를 점진적으로 낮춤
+    # 프레임별 대비만 먼저 계산하고, 패턴은 아래에서 한 번에 렌더링
+    frame_contrasts = []
 
     for i in range(n_frames):
         # 시간에 따라 주파수가 1Hz -> 30Hz로 선형 증가
@@ -236,35 +662,16 @@ def create_temporal_frequency_gif(output_path="temporal_frequency.gif", patch_si
             eased = _smoothstep(0.0, 1.0, ramp)
             contrast_scale = 1.0 - eased * (1.0 - min_contrast_scale)
         on_contrast = 0.8 * contrast_scale
-        off_contrast = 0.0
-
-        if is_on:
-            patch = generate_gabor_patch(
-                spatial_freq=fixed_spatial_cpd,
-                size=patch_size,
-                contrast=on_contrast,
-                phase=0.0,
-            ).convert("RGB")
-        else:
-            patch = generate_gabor_patch(
-                spatial_freq=fixed_spatial_cpd,
-                size=patch_size,
-                contrast=off_contrast,  # 회색(평균)로 떨어뜨려 깜빡임을 강하게 체감
-                phase=0.0,
-            ).convert("RGB")
+        off_contrast = 0.0  # 회색(평균)로 떨어뜨려 깜빡임을 강하게 체감
 
-        images.append(patch)
+        frame_contrasts.append(on_contrast if is_on else off_contrast)
 
-    print(f"GIF 저장 중: {output_path}")
-    images[0].save(
-        output_path,
-        save_all=True,
-        append_images=images[1:],
-        duration=frame_duration_ms,
-        loop=0,
-    )
-    file_size = os.path.getsize(output_path) / (1024 * 1024)
-    print(f"완료! 파일 크기: {file_size:.2f} MB")
+    specs = [
+        make_frame_spec(fixed_spatial_cpd, size=patch_size, contrast=c, phase=0.0)
+        for c in frame_contrasts
+    ]
+    build_gif(output_path, specs, frame_duration_ms, jobs=jobs, cache=cache, use_numpy=use_numpy,
+              force=force, stats=stats)
     return output_path
 
 def create_temporal_base_images(output_on_path, output_off_path, patch_size=200):
@@ -274,35 +681,37 @@ def create_temporal_base_images(output_on_path, output_off_path, patch_size=200)
     - OFF: 평균 밝기의 회색(contrast=0)
     """
     fixed_spatial_cpd = 4
-    on_patch = generate_gabor_patch(
-        spatial_freq=fixed_spatial_cpd,
-        size=patch_size,
-        contrast=0.8,
-        phase=0.0,
-    ).convert("RGB")
-    off_patch = generate_gabor_patch(
-        spatial_freq=fixed_spatial_cpd,
-        size=patch_size,
-        contrast=0.0,
-        phase=0.0,
-    ).convert("RGB")
+    on_patch, off_patch = (
+        img.convert("RGB")
+        for img in render_gabor_images(
+            [fixed_spatial_cpd, fixed_spatial_cpd],
+            size=patch_size,
+            contrast=[0.8, 0.0],
+            phase=0.0,
+        )
+    )
     on_patch.save(output_on_path)
     off_patch.save(output_off_path)
 
-if __name__ == "__main__":
-    # 필요한 라이브러리 확인
-    try:
-        from PIL import Image, ImageDraw, ImageFont
-    except ImportError:
-        print("=" * 60)
-        print("Pillow 라이브러리가 필요합니다.")
-        print("설치 방법: pip3 install Pillow")
-        print("또는: python3 -m pip install Pillow")
-        print("=" * 60)
-        exit(1)
-    
+def main():
+    parser = argparse.ArgumentParser(description="가보 패치 공간/시간주파수 GIF 생성")
+    parser.add_argument("--output-dir", default="assets/images", help="출력 디렉토리")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="프레임 렌더링 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="프레임/빌드 캐시 디렉토리")
+    parser.add_argument("--no-cache", action="store_true", help="프레임 캐시와 빌드 건너뛰기 비활성화")
+    parser.add_argument("--force", action="store_true", help="출력 해시가 같아도 GIF를 다시 합성")
+    parser.add_argument("--no-numpy", action="store_true", help="numpy가 있어도 순수 Python 경로 사용")
+    parser.add_argument("--bench", action="store_true",
+                        help="프레임 렌더링/인코딩 시간과 캐시 적중률 보고")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else FrameCache(args.cache_dir)
+    use_numpy = False if args.no_numpy else None
+    build_kwargs = dict(use_numpy=use_numpy, jobs=args.jobs, cache=cache, force=args.force)
+
     # 출력 디렉토리 확인
-    output_dir = "assets/images"
+    output_dir = args.output_dir
     os.makedirs(output_dir, exist_ok=True)
     
     # GIF 생성
@@ -313,12 +722,16 @@ if __name__ == "__main__":
     print(f"프레임 수: 30개 (1-30 cpd)")
     print(f"프레임 지속 시간: 150ms\n")
     
-    create_gabor_gif(output_path, patch_size=200, duration=150)  # 150ms per frame
+    spatial_stats = new_build_stats()
+    create_gabor_gif(output_path, patch_size=200, duration=150,  # 150ms per frame
+                     stats=spatial_stats, **build_kwargs)
     
     print(f"\n✅ 생성 완료: {output_path}")
 
     temporal_output_path = os.path.join(output_dir, "temporal_frequency.gif")
-    create_temporal_frequency_gif(temporal_output_path, patch_size=200, duration=150)
+    temporal_stats = new_build_stats()
+    create_temporal_frequency_gif(temporal_output_path, patch_size=200, duration=150,
+                                  stats=temporal_stats, **build_kwargs)
     print(f"\n✅ 생성 완료: {temporal_output_path}")
 
     temporal_on_path = os.path.join(output_dir, "temporal_frequency_on.png")
@@ -326,3 +739,12 @@ if __name__ == "__main__":
     create_temporal_base_images(temporal_on_path, temporal_off_path, patch_size=200)
     print(f"\n✅ 생성 완료: {temporal_on_path}")
     print(f"✅ 생성 완료: {temporal_off_path}")
+
+    if args.bench:
+        print()
+        print(format_build_stats(os.path.basename(output_path), spatial_stats))
+        print(format_build_stats(os.path.basename(temporal_output_path), temporal_stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Manifest-driven image asset processor.
+
+Replaces the one-off tweak_images.py / process_phase4_study2.py scripts.
+Each manifest job names a source image, a list of operations (crop, resize)
+applied once after decoding, and one or more outputs (responsive variants
+such as 1x/2x, JPEG plus WebP) written from that single decode pass.
+
+Manifest (JSON, or YAML when PyYAML is installed):
+
+    {
+      "jobs": [
+        {
+          "src": "assets/images/research/_originals/photo.png",
+          "ops": [
+            {"op": "crop", "bottom": 0.15},
+            {"op": "resize", "height": 350}
+          ],
+          "outputs": [
+            {"path": "assets/images/research/photo.jpg", "quality": 90},
+            {"path": "assets/images/research/photo@2x.webp", "scale": 2}
+          ]
+        }
+      ]
+    }
+
+Operations:
+    crop    top/bottom/left/right as fractions of the current size, or
+            "box": [left, top, right, bottom] in pixels
+    resize  one of "scale", "height" or "width" (aspect ratio preserved)
+
+Outputs may set "scale", "height" or "width" to derive a size variant from
+the processed image, plus "quality" for JPEG/WebP. The format follows the
+file extension.
+
+An output that would keep the decoded pixels as they are, in the source's own
+format, is a byte copy of the source (nothing is written when it is the
+source itself), so unchanged images are never re-encoded.
+
+Animated GIF sources are streamed frame by frame to each output instead of
+being held in memory as RGBA.
+
+Jobs run across a process pool. A state file records the source hash, the
+job spec hash and the output hashes, and unchanged jobs are skipped on the
+next run.
+
+Usage:
+    python3 process_assets.py assets/images/research/manifest.json
+    python3 process_assets.py manifest.yaml --jobs 4 --force
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+from PIL import Image, ImageSequence
+
+# Bump when processing semantics change so every job is re-run.
+STATE_VERSION = 2
+DEFAULT_STATE_PATH = ".cache/assets/state.json"
+DEFAULT_QUALITY = 90
+
+
+def load_manifest(path):
+    """Loads a JSON or YAML manifest and returns its list of jobs."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yml", ".yaml")):
+            try:
+                import yaml
+            except ImportError:
+                sys.exit("PyYAML is required for YAML manifests: pip3 install pyyaml")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    jobs = data.get("jobs", []) if isinstance(data, dict) else data
+    for job in jobs:
+        if "src" not in job or not job.get("outputs"):
+            raise ValueError(f"Manifest job needs 'src' and 'outputs': {job}")
+    return jobs
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def spec_hash(job):
+    payload = json.dumps(
+        {"version": STATE_VERSION, "ops": job.get("ops", []), "outputs": job["outputs"]},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _target_size(size, scale=None, height=None, width=None):
+    """Returns the resized size keeping the aspect ratio (same rounding as the old scripts)."""
+    w, h = size
+    if scale:
+        return (int(w * scale), int(h * scale))
+    if height:
+        return (int(w * (height / float(h))), int(height))
+    if width:
+        return (int(width), int(h * (width / float(w))))
+    return size
+
+
+def _resized(img, scale=None, height=None, width=None):
+    new_size = _target_size(img.size, scale, height, width)
+    if new_size == img.size:
+        return img
+    return img.resize(new_size, Image.Resampling.LANCZOS)
+
+
+def _keeps_source(img, ops, output):
+    """True if the output would hold the source's pixels in the source's format."""
+    if _output_format(output["path"]) != img.format:
+        return False
+    sizes = [(op.get("scale"), op.get("height"), op.get("width")) for op in ops if op.get("op") == "resize"]
+    if len(sizes) != len(ops):
+        return False
+    sizes.append((output.get("scale"), output.get("height"), output.get("width")))
+    return all(_target_size(img.size, *size) == img.size for size in sizes)
+
+
+def _copy_source(src, path):
+    if os.path.abspath(src) != os.path.abspath(path):
+        _atomic_save(path, lambda p: shutil.copyfile(src, p))
+
+
+def apply_op(img, op):
+    """Applies a single manifest operation to an image."""
+    kind = op.get("op")
+    if kind == "crop":
+        w, h = img.size
+        if "box" in op:
+            return img.crop(tuple(op["box"]))
+        left = int(w * op.get("left", 0))
+        top = int(h * op.get("top", 0))
+        right = w - int(w * op.get("right", 0))
+        bottom = h - int(h * op.get("bottom", 0))
+        return img.crop((left, top, right, bottom))
+    if kind == "resize":
+        return _resized(img, op.get("scale"), op.get("height"), op.get("width"))
+    raise ValueError(f"Unknown operation: {kind}")
+
+
+def apply_ops(img, ops):
+    for op in ops:
+        img = apply_op(img, op)
+    return img
+
+
+def _output_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    fmt = Image.registered_extensions().get(ext)
+    if fmt is None:
+        raise ValueError(f"Unsupported output format: {path}")
+    return fmt
+
+
+def _save_kwargs(fmt, output):
+    if fmt == "JPEG":
+        return {"quality": output.get("quality", DEFAULT_QUALITY), "optimize": True}
+    if fmt == "WEBP":
+        return {"quality": output.get("quality", DEFAULT_QUALITY)}
+    if fmt == "PNG":
+        return {"optimize": True}
+    return {}
+
+
+def _for_format(img, fmt):
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        return img.convert("RGB")
+    return img
+
+
+def _atomic_save(path, save):
+    """Writes through a temp file so in-place jobs never read a half-written source."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_still(base, output):
+    fmt = _output_format(output["path"])
+    img = _for_format(_resized(base, output.get("scale"), output.get("height"), output.get("width")), fmt)
+    _atomic_save(output["path"], lambda p: img.save(p, format=fmt, **_save_kwargs(fmt, output)))
+
+
+def _write_animated(src_img, ops, output):
+    """Streams processed frames into the output encoder one at a time."""
+    fmt = _output_format(output["path"])
+    if fmt not in ("GIF", "WEBP", "PNG"):
+        raise ValueError(f"Animated source needs a GIF/WebP/PNG output: {output['path']}")
+
+    def frames():
+        for frame in ImageSequence.Iterator(src_img):
+            frame = apply_ops(frame.convert("RGBA"), ops)
+            yield _resized(frame, output.get("scale"), output.get("height"), output.get("width"))
+
+    stream = frames()
+    first = next(stream)
+    kwargs = {
+        "save_all": True,
+        "append_images": stream,
+        "duration": src_img.info.get("duration", 100),
+        "loop": 0,
+    }
+    if fmt == "GIF":
+        kwargs["optimize"] = True
+    else:
+        kwargs.update(_save_kwargs(fmt, output))
+    _atomic_save(output["path"], lambda p: first.save(p, format=fmt, **kwargs))
+
+
+def process_job(job):
+    """Runs one manifest job (in a worker process) and returns the output hashes."""
+    src = job["src"]
+    ops = job.get("ops", [])
+    with Image.open(src) as img:
+        encoded = []
+        for output in job["outputs"]:
+            if _keeps_source(img, ops, output):
+                _copy_source(src, output["path"])
+            else:
+                encoded.append(output)
+        if encoded and getattr(img, "is_animated", False):
+            for output in encoded:
+                img.seek(0)
+                _write_animated(img, ops, output)
+        elif encoded:
+            img.load()
+            base = apply_ops(img, ops)
+            for output in encoded:
+                _write_still(base, output)
+    return {output["path"]: file_sha256(output["path"]) for output in job["outputs"]}
+
+
+def is_up_to_date(job, entry, src_hash):
+    """True if the spec and source are unchanged and every output is intact."""
+    if not entry or entry.get("spec") != spec_hash(job):
+        return False
+    recorded = entry.get("outputs", {})
+    for output in job["outputs"]:
+        path = output["path"]
+        if not os.path.exists(path) or file_sha256(path) != recorded.get(path):
+            return False
+    # In-place jobs: the source is now the recorded output of the last run.
+    return src_hash == entry.get("source") or src_hash == recorded.get(job["src"])
+
+
+def job_key(job):
+    """State key: a job is identified by the outputs it owns."""
+    return "|".join(output["path"] for output in job["outputs"])
+
+
+def load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path, state):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manifest-driven image asset processor")
+    parser.add_argument("manifest", help="JSON/YAML manifest of jobs")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="State file for skipping unchanged jobs")
+    parser.add_argument("--force", action="store_true", help="Process every job even if unchanged")
+    args = parser.parse_args()
+
+    jobs = load_manifest(args.manifest)
+    state = load_state(args.state)
+
+    pending = []
+    unchanged = 0
+    failures = 0
+    for job in jobs:
+        src = job["src"]
+        if not os.path.exists(src):
+            failures += 1
+            print(f"File not found: {src}")
+            continue
+        src_hash = file_sha256(src)
+        if not args.force and is_up_to_date(job, state.get(job_key(job)), src_hash):
+            unchanged += 1
+            print(f"Unchanged: {src}")
+            continue
+        pending.append((job, src_hash))
+
+    processed = 0
+    workers = max(1, min(args.jobs or os.cpu_count() or 1, len(pending) or 1))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_job, job): (job, src_hash) for job, src_hash in pending}
+        for future in concurrent.futures.as_completed(futures):
+            job, src_hash = futures[future]
+            try:
+                outputs = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"Error processing {job['src']}: {e}")
+                continue
+            processed += 1
+            state[job_key(job)] = {"source": src_hash, "spec": spec_hash(job), "outputs": outputs}
+            for path in outputs:
+                print(f"Processed: {job['src']} -> {path}")
+
+    save_state(args.state, state)
+    print(f"{processed} processed, {unchanged} unchanged, {failures} failed")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()